@@ -0,0 +1,144 @@
+# api_client.py
+# Thin client for api_server.py with the InterviewOrchestrator surface streamlit_app.py uses
+# (rate_limit_hit, current_topic, session_id, start_interview(), process_user_answer()).
+# - stream_user_answer() yields the Server-Sent Events of /answer/stream;
+#   process_user_answer_events() maps them to InterviewOrchestrator.process_user_answer_events().
+# - Every answer carries an Idempotency-Key; process_user_answer() retries a request that got no
+#   response with the same key, so the server never runs the turn twice.
+# - cancel() stops the session's running turn on the server (quit / reset).
+# - save_extra() stores client data (the UI transcript) with the session; resume() reattaches
+#   to a saved session after a reconnect.
+# Usage: bot = RemoteOrchestrator("http://localhost:8000", "Machine Learning"); q = bot.start_interview()
+
+import json
+import uuid
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+
+
+class OrchestratorAPIError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class RemoteOrchestrator:
+    def __init__(self, base_url: str, domain: Optional[str] = None, session_id: Optional[str] = None,
+                 timeout: float = 120.0, http: Optional[requests.Session] = None):
+        """Starts a new interview for `domain`, or attaches to `session_id` when given."""
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.http = http or requests.Session()
+        self.domain = domain
+        self.session_id = session_id
+        self.rate_limit_hit = False
+        self.current_topic = None
+        self._first_question = None
+        if session_id is None:
+            self._create(domain)
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        try:
+            return self.http.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise OrchestratorAPIError(f"Orchestrator API unreachable: {e}") from e
+
+    @staticmethod
+    def _json(response: requests.Response) -> Dict:
+        try:
+            data = response.json()
+        except ValueError:
+            data = {"error": response.text[:200]}
+        if response.status_code >= 400:
+            raise OrchestratorAPIError(data.get("error") or f"HTTP {response.status_code}", response.status_code)
+        return data
+
+    def _create(self, domain: str) -> None:
+        response = self._request("POST", "/sessions", json={"domain": domain})
+        if response.status_code == 429:
+            self.rate_limit_hit = True
+            return
+        if response.status_code == 502:
+            return   # no syllabus: current_topic stays None, as with InterviewOrchestrator
+        data = self._json(response)
+        self.session_id = data["session_id"]
+        self.current_topic = data.get("current_topic")
+        self._first_question = data.get("question")
+
+    def start_interview(self):
+        """The opening question (generated by the server when the session was created)."""
+        if self._first_question is None:
+            return {"status": "TERMINATED", "reason": "RateLimit"}
+        return self._first_question
+
+    def process_user_answer(self, user_answer: str, idempotency_key: Optional[str] = None,
+                            retries: int = 1) -> Dict:
+        headers = {"Idempotency-Key": idempotency_key or uuid.uuid4().hex}
+        for attempt in range(retries + 1):
+            try:
+                return self._json(self._request("POST", f"/sessions/{self.session_id}/answer",
+                                                json={"answer": user_answer}, headers=headers))
+            except OrchestratorAPIError as e:
+                if e.status is not None or attempt == retries:
+                    raise
+
+    def stream_user_answer(self, user_answer: str, idempotency_key: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+        """(event, data) pairs: "stage" and "processing" events, then "result" or "error", then "done"."""
+        response = self._request("POST", f"/sessions/{self.session_id}/answer/stream",
+                                 json={"answer": user_answer}, stream=True,
+                                 headers={"Idempotency-Key": idempotency_key or uuid.uuid4().hex})
+        if response.status_code >= 400:
+            self._json(response)
+        event = "message"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line[len("data:"):].strip() or "{}")
+                if event == "done":
+                    return
+
+    def process_user_answer_events(self, user_answer: str, idempotency_key: Optional[str] = None) -> Iterator[Dict]:
+        """Stage progress events, then {"type": "result", "result": ...}; same shape as InterviewOrchestrator."""
+        for event, data in self.stream_user_answer(user_answer, idempotency_key):
+            if event == "stage":
+                yield dict(data, type="stage")
+            elif event == "result":
+                yield {"type": "result", "result": data}
+                return
+            elif event == "error":
+                raise OrchestratorAPIError(data.get("error") or "Turn failed")
+
+    def cancel(self, reason: str = "cancelled", timeout: Optional[float] = None) -> bool:
+        """Asks the server to cancel the running turn; True if one was running."""
+        if self.session_id is None:
+            return False
+        try:
+            data = self._json(self._request("POST", f"/sessions/{self.session_id}/cancel", json={"reason": reason}))
+        except OrchestratorAPIError:
+            return False
+        return bool(data.get("cancelled"))
+
+    def save_extra(self, extra: Dict, finished: bool = False) -> None:
+        self._json(self._request("PUT", f"/sessions/{self.session_id}/extra",
+                                 json={"extra": extra, "finished": finished}))
+
+    def state(self) -> Dict:
+        return self._json(self._request("GET", f"/sessions/{self.session_id}"))
+
+    @classmethod
+    def resume(cls, base_url: str, session_id: str, **kwargs) -> Optional[Tuple["RemoteOrchestrator", Dict]]:
+        """(client, saved state) for an existing session, or None if the server does not know it."""
+        bot = cls(base_url, session_id=session_id, **kwargs)
+        try:
+            state = bot.state()
+        except OrchestratorAPIError as e:
+            if e.status == 404:
+                return None
+            raise
+        bot.domain = state["domain"]
+        bot.current_topic = state.get("current_topic")
+        return bot, state
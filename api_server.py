@@ -0,0 +1,357 @@
+"""
+Flask API Server for the Interview Orchestrator
+Stateless turn-processing service: every request restores the session from the session store,
+runs one step of InterviewOrchestrator and saves it back, so any worker (or node sharing the
+store) can serve any session. streamlit_app.py uses it as a thin client when
+ORCHESTRATOR_API_URL is set (see api_client.py).
+
+Run several workers behind a load balancer, e.g.:
+    gunicorn -w 4 --threads 8 -b 0.0.0.0:8000 api_server:app
+"""
+
+from flask import Flask, request, jsonify, Response, stream_with_context
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+
+import metrics
+from kiro7 import InterviewOrchestrator
+from session_store import get_session_store
+from turn_registry import get_turn_registry
+from cancellation import CancelToken, TurnCancelled
+from pivot_prefetch import get_pivot_prefetcher
+
+app = Flask(__name__)
+
+# Configuration
+PORT = int(os.getenv("API_PORT", "8000"))
+STREAM_HEARTBEAT_SECONDS = 1.0   # "processing" events while a streamed turn is running
+
+# --- Metrics (exposed on /metrics in Prometheus text format) ---
+REQUESTS = metrics.counter("api_requests_total", "HTTP requests by endpoint and status code", ["endpoint", "status"])
+LATENCY = metrics.histogram("api_request_duration_seconds", "End-to-end request latency", ["endpoint"])
+TURNS = metrics.counter("api_turns_total", "Processed turns by result status", ["status"])
+CONFLICTS = metrics.counter("api_session_conflicts_total", "Turns discarded because another worker saved the session first")
+
+# Answers to one session are serialised inside this process (striped locks keep memory bounded);
+# across processes the store's turn check rejects the slower writer.
+_session_locks = [threading.Lock() for _ in range(64)]
+
+
+def _lock_for(session_id):
+    return _session_locks[zlib.crc32(session_id.encode("utf-8")) % len(_session_locks)]
+
+
+# Cancel tokens of the turns running in this process, by session (POST /sessions/<id>/cancel)
+_running = {}
+_running_lock = threading.Lock()
+
+
+def cancel_running_turn(session_id, reason):
+    with _running_lock:
+        token = _running.get(session_id)
+    return token.cancel(reason) if token is not None else False
+
+
+class SessionNotFound(Exception):
+    pass
+
+
+class SessionConflict(Exception):
+    pass
+
+
+class SessionFinished(Exception):
+    pass
+
+
+@app.errorhandler(SessionNotFound)
+def _not_found(e):
+    return jsonify({"error": f"Unknown session: {e}", "success": False}), 404
+
+
+@app.errorhandler(SessionConflict)
+def _conflict(e):
+    return jsonify({"error": f"Session {e} was updated by another request; reload and retry", "success": False}), 409
+
+
+@app.errorhandler(SessionFinished)
+def _finished(e):
+    return jsonify({"error": f"Session {e} has already ended", "success": False}), 409
+
+
+@app.before_request
+def _start_request_timer():
+    request.environ["api.start"] = time.time()
+
+
+@app.after_request
+def _record_request(response):
+    endpoint = request.endpoint or "unknown"
+    REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+    LATENCY.observe(time.time() - request.environ.get("api.start", time.time()), endpoint=endpoint)
+    return response
+
+
+def _idempotency_key():
+    """The client's Idempotency-Key header: resubmissions with the same key replay the first result."""
+    return (request.headers.get("Idempotency-Key") or "").strip() or None
+
+
+def run_turn(session_id, answer, on_event=None, idempotency_key=None, cancel=None):
+    """
+    Restore -> process_user_answer -> save. Returns the orchestrator's result dict.
+    on_event receives the turn's stage progress events (see InterviewOrchestrator.process_user_answer_events).
+    With idempotency_key, a duplicate request waits for (or replays) the first one instead of
+    running the turn again. Raises TurnCancelled if `cancel` (or POST /cancel) stops the turn;
+    nothing is saved then.
+    """
+    if idempotency_key:
+        result, _ = get_turn_registry().run(session_id, f"api:{idempotency_key}",
+                                            lambda: _run_turn(session_id, answer, on_event, cancel))
+        return result
+    return _run_turn(session_id, answer, on_event, cancel)
+
+
+def _run_turn(session_id, answer, on_event, cancel):
+    store = get_session_store()
+    cancel = cancel or CancelToken()
+    with _lock_for(session_id):
+        state = store.load(session_id)
+        if state is None:
+            raise SessionNotFound(session_id)
+        if state.finished:
+            raise SessionFinished(session_id)
+        bot = InterviewOrchestrator.restore(state)
+        bot.min_question_gap = 0   # pacing between questions is left to the client
+        with _running_lock:
+            _running[session_id] = cancel
+        try:
+            result = bot.process_user_answer(answer, on_event=on_event, cancel=cancel)
+        finally:
+            with _running_lock:
+                if _running.get(session_id) is cancel:
+                    del _running[session_id]
+        finished = result.get("status") == "TERMINATED"
+        if not store.save(bot.snapshot(finished=finished, extra=state.extra), expected_turn=state.turn):
+            CONFLICTS.inc()
+            raise SessionConflict(session_id)
+    TURNS.inc(status=result.get("status") or "unknown")
+    return result
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    return jsonify({"status": "healthy", "session_store": get_session_store().path})
+
+
+@app.route('/sessions', methods=['POST'])
+def create_session():
+    """
+    Start an interview
+
+    Expected JSON payload: {"domain": "Machine Learning"}
+    Returns: {"session_id": "...", "question": "...", "current_topic": "..."}
+    """
+    data = request.get_json(silent=True) or {}
+    domain = (data.get("domain") or "").strip()
+    if not domain:
+        return jsonify({"error": "No domain provided", "success": False}), 400
+
+    bot = InterviewOrchestrator(domain)
+    if bot.rate_limit_hit:
+        return jsonify({"error": "Rate limit reached", "reason": "RateLimit", "success": False}), 429
+    if not bot.current_topic:
+        return jsonify({"error": "Failed to create interview syllabus", "success": False}), 502
+
+    question = bot.start_interview()
+    if isinstance(question, dict) and question.get("status") == "TERMINATED":
+        return jsonify({"error": "Rate limit reached", "reason": question.get("reason"), "success": False}), 429
+
+    get_session_store().save(bot.snapshot())
+    return jsonify({
+        "success": True,
+        "session_id": bot.session_id,
+        "question": question,
+        "current_topic": bot.current_topic
+    }), 201
+
+
+@app.route('/sessions/<session_id>', methods=['GET'])
+def get_session(session_id):
+    """Saved state of a session (for a reconnecting client)"""
+    state = get_session_store().load(session_id)
+    if state is None:
+        raise SessionNotFound(session_id)
+    return jsonify({
+        "success": True,
+        "session_id": state.session_id,
+        "domain": state.domain,
+        "turn": state.turn,
+        "finished": state.finished,
+        "current_topic": state.current_topic,
+        "last_question": state.last_question,
+        "history": state.conversation_history,
+        "extra": state.extra
+    })
+
+
+@app.route('/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    cancel_running_turn(session_id, "deleted")
+    get_session_store().delete(session_id)
+    get_turn_registry().forget(session_id)
+    get_pivot_prefetcher().discard(session_id, "deleted")
+    return jsonify({"success": True})
+
+
+@app.route('/sessions/<session_id>/extra', methods=['PUT'])
+def update_extra(session_id):
+    """
+    Save client-owned data with the session (e.g. the UI transcript)
+
+    Expected JSON payload: {"extra": {...}, "finished": false}
+    """
+    data = request.get_json(silent=True) or {}
+    store = get_session_store()
+    with _lock_for(session_id):
+        state = store.load(session_id)
+        if state is None:
+            raise SessionNotFound(session_id)
+        state.extra = data.get("extra") or {}
+        state.finished = bool(data.get("finished", state.finished))
+        if not store.save(state, expected_turn=state.turn):
+            raise SessionConflict(session_id)
+    return jsonify({"success": True})
+
+
+@app.route('/sessions/<session_id>/answer', methods=['POST'])
+def submit_answer(session_id):
+    """
+    Process one candidate answer
+
+    Expected JSON payload: {"answer": "..."}; optional Idempotency-Key header
+    Returns the orchestrator result: {"status": "CONTINUE", "next_question": "...", "analysis": {...}}
+    or {"status": "TERMINATED", "reason": "..."}
+    """
+    data = request.get_json(silent=True) or {}
+    answer = data.get("answer")
+    if not answer:
+        return jsonify({"error": "No answer provided", "success": False}), 400
+    try:
+        return jsonify(run_turn(session_id, answer, idempotency_key=_idempotency_key()))
+    except TurnCancelled as e:
+        return jsonify({"error": str(e), "reason": e.reason, "success": False}), 409
+
+
+@app.route('/sessions/<session_id>/answer/stream', methods=['POST'])
+def stream_answer(session_id):
+    """
+    Same as /answer, as Server-Sent Events (a client that disconnects cancels the turn): a "stage" event as each backend stage starts and ends
+    ({"stage": "scoring", "label": "scoring", "status": "started" | "ok" | ..., "elapsed_ms": ...}),
+    "processing" heartbeats in between, then one "result" event with the orchestrator result
+    (or an "error" event) and a final "done".
+    """
+    data = request.get_json(silent=True) or {}
+    answer = data.get("answer")
+    if not answer:
+        return jsonify({"error": "No answer provided", "success": False}), 400
+    if get_session_store().load(session_id) is None:
+        raise SessionNotFound(session_id)
+
+    events = queue.Queue()
+    key = _idempotency_key()
+    token = CancelToken()
+
+    def worker():
+        try:
+            events.put(("result", run_turn(session_id, answer, on_event=lambda e: events.put(("stage", e)),
+                                           idempotency_key=key, cancel=token)))
+        except TurnCancelled as e:
+            events.put(("error", {"error": "TurnCancelled", "reason": e.reason}))
+        except (SessionConflict, SessionFinished) as e:
+            events.put(("error", {"error": type(e).__name__, "session_id": str(e)}))
+        except Exception as e:
+            events.put(("error", {"error": str(e)}))
+
+    threading.Thread(target=worker, name=f"turn-{session_id[:8]}", daemon=True).start()
+
+    def generate():
+        started = time.time()
+        finished = False
+        try:
+            while True:
+                try:
+                    event, payload = events.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield f"event: processing\ndata: {json.dumps({'elapsed': round(time.time() - started, 1)})}\n\n"
+                    continue
+                finished = event != "stage"
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+                if event == "stage":
+                    continue
+                yield "event: done\ndata: {}\n\n"
+                return
+        finally:
+            if not finished:
+                token.cancel("disconnected")   # the client went away: stop the turn
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route('/sessions/<session_id>/cancel', methods=['POST'])
+def cancel_turn(session_id):
+    """
+    Cancel the turn this worker is running for the session (quit / reset in the client)
+
+    Returns: {"success": true, "cancelled": true | false}
+    """
+    reason = (request.get_json(silent=True) or {}).get("reason") or "client"
+    return jsonify({"success": True, "cancelled": cancel_running_turn(session_id, reason)})
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint (API request metrics plus the orchestrator's own metrics)."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route('/', methods=['GET'])
+def index():
+    """Root endpoint with API documentation"""
+    return jsonify({
+        "name": "Interview Orchestrator API",
+        "version": "1.0.0",
+        "status": "running",
+        "endpoints": {
+            "/health": "GET - Health check",
+            "/sessions": "POST - Start an interview",
+            "/sessions/<id>": "GET - Session state / DELETE - Remove session",
+            "/sessions/<id>/answer": "POST - Submit an answer, get the next question",
+            "/sessions/<id>/answer/stream": "POST - Same, as Server-Sent Events",
+            "/sessions/<id>/extra": "PUT - Save client data with the session",
+            "/sessions/<id>/cancel": "POST - Cancel the running turn",
+            "/metrics": "GET - Prometheus metrics"
+        }
+    })
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("🎯 Interview Orchestrator API Server")
+    print("=" * 60)
+    print(f"🌐 Local URL: http://localhost:{PORT}")
+    print(f"💾 Session store: {get_session_store().path}")
+    print("=" * 60 + "\n")
+
+    app.run(
+        host='0.0.0.0',
+        port=PORT,
+        debug=False,
+        threaded=True
+    )
@@ -0,0 +1,108 @@
+# bench_clients.py
+# Gemini client setup cost: one client per session vs the process-wide handles.
+# - "per-session" repeats what every InterviewOrchestrator used to do: genai.configure(), a new
+#   GenerativeModel bound to a new GenerativeServiceClient (its own gRPC channel), and a new
+#   GenerationConfig built for every call.
+# - "shared" opens the same sessions through get_gemini_provider() and the process-wide handles
+#   in provider_pool.py, then reports the handle reuse rate and the setup time saved.
+# - Both build the real google.generativeai objects; no request is sent, so no network is needed.
+# Usage: python bench_clients.py --sessions 200 --calls 12 --threads 8
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("KIRO_LOG_LEVEL", "ERROR")
+
+import provider_pool
+from llm_providers import GeminiProvider, _gemini_generation_config, get_gemini_provider
+
+# The per-call configs the orchestrator asks for (see InterviewOrchestrator._call_llm callers)
+CALL_CONFIGS = [
+    (True, {"temperature": 0.2}),
+    (True, {"temperature": 0.0}),
+    (False, {"temperature": 0.7, "max_tokens": 120}),
+    (False, None),
+]
+
+
+def per_session_setup(api_key, model_name, calls):
+    """One session the old way: configure, fresh model + client, a new config per call."""
+    import google.generativeai as genai
+    from google.ai import generativelanguage as glm
+    genai.configure(api_key=api_key)
+    model = genai.GenerativeModel(model_name)
+    model._client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+    for i in range(calls):
+        json_mode, config = CALL_CONFIGS[i % len(CALL_CONFIGS)]
+        settings = dict(config or {})
+        if json_mode:
+            settings["response_mime_type"] = "application/json"
+        genai.GenerationConfig(**settings)
+    return model
+
+
+def shared_setup(api_key, model_name, calls):
+    """One session through the shared provider: handles come from the process-wide cache."""
+    provider = get_gemini_provider(api_key, model_name)
+    member = provider.pool.members[0]
+    for i in range(calls):
+        json_mode, config = CALL_CONFIGS[i % len(CALL_CONFIGS)]
+        GeminiProvider._generation_config(json_mode, config)
+    return member.model
+
+
+def run(fn, args):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        models = list(executor.map(lambda _: fn(args.api_key, args.model, args.calls), range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 4),
+        "ms_per_session": round(elapsed / args.sessions * 1000.0, 3),
+        "distinct_models": len({id(m) for m in models}),
+        "distinct_clients": len({id(getattr(m, "_client", None)) for m in models}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-session Gemini client setup with the shared handles.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=12, help="generation configs requested per session")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent session starts (Streamlit script threads)")
+    parser.add_argument("--api-key", default=os.getenv("GOOGLE_API_KEY") or "offline-client-benchmark")
+    parser.add_argument("--model", default="gemini-2.5-flash-lite")
+    parser.add_argument("--json-out")
+    args = parser.parse_args()
+
+    # Import cost is paid once by both modes; keep it out of the comparison.
+    import google.generativeai  # noqa: F401
+    from google.ai import generativelanguage  # noqa: F401
+
+    report = {"per_session": run(per_session_setup, args), "shared": run(shared_setup, args)}
+    report["clients"] = provider_pool.client_stats()
+    info = _gemini_generation_config.cache_info()
+    report["generation_configs"] = {"built": info.misses, "reused": info.hits}
+
+    old, new = report["per_session"], report["shared"]
+    print(f"{args.sessions} sessions x {args.calls} calls, {args.threads} threads")
+    print(f"  Per-session clients  {old['ms_per_session']:.3f}ms/session   "
+          f"{old['distinct_models']} models, {old['distinct_clients']} clients")
+    print(f"  Shared clients       {new['ms_per_session']:.3f}ms/session   "
+          f"{new['distinct_models']} models, {new['distinct_clients']} clients")
+    clients = report["clients"]
+    print(f"  Handle reuse rate    {clients['reuse_rate'] * 100:.1f}%  (setups {clients['setups']}, reuses {clients['reuses']})")
+    print(f"  Setup time saved     {clients['setup_seconds_saved'] * 1000.0:.1f}ms "
+          f"(spent {clients['setup_seconds'] * 1000.0:.1f}ms on first setup)")
+    print(f"  Generation configs   built {info.misses}, reused {info.hits}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
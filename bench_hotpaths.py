@@ -0,0 +1,281 @@
+# bench_hotpaths.py
+# Micro-benchmarks for the pure-Python per-turn hot paths.
+# - Output normalisation (_normalize_output), SLM draft validation (meaningful_word_count and the
+#   hesitation check) and compute_momentum, on realistic inputs including very long pasted text.
+# - momentum/interview: the per-turn momentum bookkeeping of a whole interview (list rebuild +
+#   compute_momentum + density and topic-completion rescans vs MomentumTracker.update()).
+# - Each case times the original per-call implementation (kept below as reference_*) against the
+#   current one and reports the speedup. Both sides are timed in interleaved rounds (--rounds) and
+#   the fastest run of each is kept, so a burst of machine load does not skew one side.
+# - --baseline compares speedups with bench_data/hotpath_baselines.json and exits with status 1
+#   when a case falls more than --max-regression below its stored speedup. The stored speedups
+#   are the lowest of several --update-baseline runs.
+# - tests/test_hotpaths.py checks that the two implementations agree on randomised inputs.
+# Usage: python bench_hotpaths.py --baseline bench_data/hotpath_baselines.json
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import timeit
+
+os.environ.setdefault("KIRO_LOG_LEVEL", "WARNING")
+
+import kiro7
+from momentum_signal import MomentumTracker, compute_momentum
+from text_utils import meaningful_word_count, slm_draft_rejection
+
+FORBIDDEN = kiro7.FORBIDDEN_TRANSITIONS
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_data", "hotpath_baselines.json")
+
+
+# ---------------- Reference implementations (as they were before text_utils.py) ----------------
+
+def reference_normalize_output(text):
+    if not text:
+        return text
+    text = text.strip().strip('"').strip("'")
+    text = text.replace("Therefore,", "So,")
+    text = text.replace("Moreover,", "Also,")
+    text = text.replace("In conclusion,", "Ultimately,")
+    text = text.replace(";", ",")
+    for phrase in FORBIDDEN:
+        pattern = re.compile(re.escape(phrase), flags=re.IGNORECASE)
+        text = pattern.sub("", text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s+([?.!,])', r'\1', text)
+    text = re.sub(r'([?.!,]){2,}', r'\1', text)
+    if not re.search(r'[.?!"\']$', text):
+        if re.search(r'\b(what|why|how|when|which|describe|explain|tell)\b', text.lower()):
+            text = text + "?"
+        else:
+            text = text + "."
+    sentences = re.split(r'(?<=[.!?])\s+', text)
+    if len(sentences) > 2:
+        sentences = sentences[-2:]
+    final = " ".join(s.strip() for s in sentences).strip()
+    final = final.strip()
+    final = re.sub(r'^[\s\.,;:]+', '', final)
+    final = re.sub(r'[\s\.,;:]+$', '', final)
+    return final
+
+
+def reference_meaningful_word_count(s):
+    fillers = {"umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "like", "...", "uhm"}
+    tokens = re.findall(r"[A-Za-z']+", s.lower())
+    meaningful = [t for t in tokens if t not in fillers and len(t) > 1]
+    return len(meaningful)
+
+
+def reference_slm_draft_rejection(next_question):
+    def meaningful_word_count(s):
+        fillers = {"umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "like", "...", "uhm"}
+        tokens = re.findall(r"[A-Za-z']+", s.lower())
+        meaningful = [t for t in tokens if t not in fillers and len(t) > 1]
+        return len(meaningful)
+
+    hesitation_tokens = ["umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "...", "uhm"]
+    if any(tok in next_question.lower() for tok in hesitation_tokens):
+        return "hesitation_detected"
+    if meaningful_word_count(next_question) < 3:
+        return "too_short"
+    return None
+
+
+def reference_compute_momentum(recent_scores, normalization_divisor=10.0, weight=0.8):
+    if len(recent_scores) < 3:
+        return {"raw": 0.0, "norm": 0.0, "weighted": 0.0, "signal": "NEUTRAL"}
+    s_n = float(recent_scores[-1])
+    s_n1 = float(recent_scores[-2])
+    s_n2 = float(recent_scores[-3])
+    diff1 = s_n - s_n1
+    diff2 = s_n1 - s_n2
+    raw_net = diff1 + diff2
+    norm = raw_net / normalization_divisor
+    if norm > 1.0:
+        norm = 1.0
+    if norm < -1.0:
+        norm = -1.0
+    weighted = norm * weight
+    STRONG_THRESH = 0.30
+    MILD_THRESH = 0.15
+    if norm >= STRONG_THRESH:
+        signal = "STRONG_POSITIVE"
+    elif norm >= MILD_THRESH:
+        signal = "MILD_POSITIVE"
+    elif norm <= -STRONG_THRESH:
+        signal = "STRONG_NEGATIVE"
+    elif norm <= -MILD_THRESH:
+        signal = "MILD_NEGATIVE"
+    else:
+        signal = "NEUTRAL"
+    return {"raw": raw_net, "norm": norm, "weighted": weighted, "signal": signal}
+
+
+def reference_turn_momentum(recent_scores, score):
+    """One turn of kiro7's momentum bookkeeping before MomentumTracker; returns the new list too."""
+    recent_scores.append(float(score))
+    if len(recent_scores) > 10:
+        recent_scores = recent_scores[-10:]
+    info = reference_compute_momentum(recent_scores, 5.0, 1.25)
+    recent_for_density = recent_scores[-2:]
+    low_count = sum(1 for s in recent_for_density if s <= 1.5)
+    low_density = len(recent_for_density) == 2 and (low_count / 2) >= 0.75
+    # fsum: the exact sum, as the tracker's integer sums give (plain sum() can land just below 6.0)
+    complete = ((len(recent_scores) >= 3 and all(s >= 7.0 for s in recent_scores[-3:]))
+                or (len(recent_scores) >= 4 and math.fsum(recent_scores[-4:]) / 4.0 >= 6.0))
+    return recent_scores, (info, low_density, complete)
+
+
+def tracker_turn_momentum(tracker, score):
+    info = tracker.update(score)
+    density = tracker.low_density()
+    average = tracker.rolling_average()
+    complete = tracker.strong_streak >= 3 or (average is not None and average >= 6.0)
+    return info, density is not None and density >= 0.75, complete
+
+
+def reference_interview(scores):
+    recent, out = [], None
+    for s in scores:
+        recent, out = reference_turn_momentum(recent, s)
+    return out
+
+
+def tracker_interview(scores):
+    tracker, out = MomentumTracker(window=10, normalization_divisor=5.0, weight=1.25), None
+    for s in scores:
+        out = tracker_turn_momentum(tracker, s)
+    return out
+
+
+# ---------------- Inputs ----------------
+
+LLM_OUTPUTS = [
+    "Alright, let's begin. What is the difference between supervised and unsupervised learning?",
+    "Got it. How would you detect overfitting in a gradient boosted model",
+    "\"Makes sense. Can you give an example of where precision matters more than recall?\"",
+    "That covers the basics; Therefore, how does regularisation change the loss surface ?",
+    "Let's switch gears. Pivoting to a new topic, what does a confusion matrix show??",
+]
+
+PASTED_PARAGRAPH = (
+    "In my last project we trained a gradient boosted model on tabular data with about two hundred "
+    "features; we tuned the learning rate, the depth and the number of estimators with cross validation, "
+    "and we tracked precision and recall because the classes were imbalanced. Moreover, we used SHAP "
+    "values to explain the predictions to the business team... Therefore, the final model was deployed "
+    "behind a REST API with a feature store in front of it. "
+)
+LONG_PASTE = PASTED_PARAGRAPH * 60          # ~27 KB pasted answer
+
+SLM_DRAFTS = [
+    "How would you apply L2 regularisation to a linear model?",
+    "Can you give a concrete example of data leakage?",
+    "umm, what?",
+    "Why?",
+]
+
+MOMENTUM_INPUTS = [[7.5, 6.0, 4.0], [2.0, 5.5, 8.5], [6.0, 6.2, 6.1, 5.9, 6.0], [8]]
+INTERVIEW_SCORES = [6.5, 7.0, 4.5, 1.0, 0.5, 6.0, 7.5, 8.0, 7.0, 5.5, 3.0, 6.0, 6.5, 7.5, 9.0, 2.0, 6.0, 7.0]
+
+CASES = [
+    ("normalize_output/typical", lambda: [reference_normalize_output(t) for t in LLM_OUTPUTS],
+     lambda: [kiro7.normalize_output(t) for t in LLM_OUTPUTS]),
+    ("normalize_output/long_paste", lambda: reference_normalize_output(LONG_PASTE),
+     lambda: kiro7.normalize_output(LONG_PASTE)),
+    ("meaningful_word_count/drafts", lambda: [reference_meaningful_word_count(t) for t in SLM_DRAFTS],
+     lambda: [meaningful_word_count(t) for t in SLM_DRAFTS]),
+    ("slm_draft_rejection/drafts", lambda: [reference_slm_draft_rejection(t) for t in SLM_DRAFTS],
+     lambda: [slm_draft_rejection(t) for t in SLM_DRAFTS]),
+    ("slm_draft_rejection/long_paste", lambda: reference_slm_draft_rejection(LONG_PASTE),
+     lambda: slm_draft_rejection(LONG_PASTE)),
+    ("compute_momentum/turn", lambda: [reference_compute_momentum(s, 5.0, 1.25) for s in MOMENTUM_INPUTS],
+     lambda: [compute_momentum(s, 5.0, 1.25) for s in MOMENTUM_INPUTS]),
+    ("momentum/interview", lambda: reference_interview(INTERVIEW_SCORES),
+     lambda: tracker_interview(INTERVIEW_SCORES)),
+]
+
+
+def time_per_call(fn, min_time=0.2, repeat=5):
+    """Best-of-`repeat` seconds per call, with the loop count chosen to run ~min_time each."""
+    timer = timeit.Timer(fn)
+    number, elapsed = 1, 0.0
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time / 5:
+            break
+        number *= 2
+    number = max(1, int(number * (min_time / max(elapsed, 1e-9)) / 5))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run_benchmarks(selected=None, rounds=5):
+    cases = [c for c in CASES if not selected or any(s in c[0] for s in selected)]
+    best = {name: [float("inf"), float("inf")] for name, _, _ in cases}
+    for _ in range(rounds):
+        for name, reference, current in cases:
+            best[name][0] = min(best[name][0], time_per_call(reference, repeat=3))
+            best[name][1] = min(best[name][1], time_per_call(current, repeat=3))
+    return {name: {"reference_us": round(ref * 1e6, 2), "optimized_us": round(cur * 1e6, 2),
+                   "speedup": round(ref / cur, 2)} for name, (ref, cur) in best.items()}
+
+
+def lowest_speedups(a, b):
+    """Per case, the result with the lower speedup of two runs."""
+    return {name: min(a[name], b[name], key=lambda r: r["speedup"]) for name in a}
+
+
+def check_regression(results, baseline, max_regression):
+    problems = []
+    for name, result in results.items():
+        stored = baseline.get(name)
+        if stored and result["speedup"] < stored["speedup"] * (1.0 - max_regression):
+            problems.append(f"{name}: speedup {result['speedup']}x vs baseline {stored['speedup']}x")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the orchestrator's pure-Python hot paths.")
+    parser.add_argument("--case", action="append", help="only run cases whose name contains this (repeatable)")
+    parser.add_argument("--rounds", type=int, default=5, help="interleaved timing rounds; the fastest is kept")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="compare speedups with a baseline file")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed relative drop in speedup vs the baseline (default 0.25)")
+    parser.add_argument("--update-baseline", nargs="?", const=DEFAULT_BASELINE, help="write results as the new baseline")
+    parser.add_argument("--baseline-runs", type=int, default=3,
+                        help="with --update-baseline: full runs to make; the lowest speedup per case is stored")
+    args = parser.parse_args()
+
+    status = 0
+    results = run_benchmarks(args.case, args.rounds)
+    if args.update_baseline:
+        for _ in range(args.baseline_runs - 1):
+            results = lowest_speedups(results, run_benchmarks(args.case, args.rounds))
+    print(f"\n{'case':<36} {'reference':>12} {'optimized':>12} {'speedup':>9}")
+    for name, r in results.items():
+        print(f"{name:<36} {r['reference_us']:>10.2f}us {r['optimized_us']:>10.2f}us {r['speedup']:>8.2f}x")
+
+    if args.update_baseline:
+        with open(args.update_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📝 Baseline written to {args.update_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = check_regression(results, baseline, args.max_regression)
+        if problems:
+            status = 1
+            print("\n❌ Regression against baseline:")
+            for p in problems:
+                print(f"   {p}")
+        else:
+            print("\n✅ Within tolerance of baseline.")
+
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# bench_render.py
+# Rerun cost of the Streamlit chat UI as the interview grows.
+# - Runs streamlit_app.py headless with streamlit.testing (AppTest), pre-seeded with an interview
+#   of N turns (question + answer + analysis each) and a stub orchestrator, then times:
+#     rerun: a plain script rerun (e.g. any widget interaction)
+#     turn:  submitting one answer, including the reruns the app triggers itself
+# - --turns 10,50,200 picks the history sizes; --ref REV also measures the app of another git
+#   revision for comparison (e.g. --ref HEAD~1).
+# Usage: python bench_render.py --turns 10,50,200 --repeat 5 --ref HEAD~1
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("KIRO_LOG_LEVEL", "ERROR")
+os.environ.setdefault("SESSION_DB_PATH", ":memory:")
+
+from streamlit.testing.v1 import AppTest
+
+from session_store import STATE_VERSION, SessionState
+
+# AppTest runs the script without a browser session; silence the "missing ScriptRunContext" noise
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(HERE, "streamlit_app.py")
+
+ANALYSIS = {
+    "answer_type": "Normal",
+    "analysis_notes": "Covers the main idea and gives one concrete example; misses the trade-off discussion.",
+    "content_summary": "Explains regularisation as a penalty on large weights that reduces variance.",
+}
+ANSWER = ("Regularisation adds a penalty on large weights to the loss, so the model prefers simpler "
+          "functions. L2 shrinks all weights, L1 drives some to zero, and both reduce variance.")
+
+
+class StubOrchestrator:
+    """Answers instantly; enough of InterviewOrchestrator for the UI."""
+
+    def __init__(self, domain="Machine Learning"):
+        self.domain = domain
+        self.session_id = "bench-render"
+        self.rate_limit_hit = False
+        self.current_topic = "Regularisation"
+        self.turn = 0
+
+    def process_user_answer(self, user_answer):
+        self.turn += 1
+        return {"status": "CONTINUE", "next_question": f"Question {self.turn + 1}: how would you pick lambda?",
+                "analysis": dict(ANALYSIS)}
+
+    def process_user_answer_events(self, user_answer, idempotency_key=None):
+        for label in ("analyzing", "scoring", "drafting"):
+            yield {"type": "stage", "stage": label, "label": label, "status": "started"}
+            yield {"type": "stage", "stage": label, "label": label, "status": "ok", "elapsed_ms": 0.0}
+        yield {"type": "result", "result": self.process_user_answer(user_answer)}
+
+    def cancel(self, reason="cancelled", timeout=None):
+        return False
+
+    def snapshot(self, finished=False, extra=None):
+        return SessionState(session_id=self.session_id, domain=self.domain, turn=self.turn,
+                            conversation_history=[], last_question="", recent_scores=[],
+                            topic_syllabus=[], current_topic=self.current_topic,
+                            questions_in_current_topic=0, hesitation_streak=0, low_score_streak=0,
+                            pivot_grace_counter=0, rate_limit_hit=False, finished=finished,
+                            extra=dict(extra or {}), updated_at=time.time(), version=STATE_VERSION)
+
+
+def seeded_messages(turns):
+    messages = [{"role": "bot", "content": "Question 1: what is regularisation?", "analysis": None}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": ANSWER, "analysis": None})
+        messages.append({"role": "bot", "content": f"Question {i + 2}: how would you pick lambda?",
+                         "analysis": dict(ANALYSIS)})
+    return messages
+
+
+def seeded_app(app_path, turns):
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at.session_state["initialized"] = False
+    at.session_state["chatbot"] = StubOrchestrator()
+    at.session_state["messages"] = seeded_messages(turns)
+    at.session_state["interview_started"] = True
+    at.session_state["interview_ended"] = False
+    at.session_state["domain"] = "Machine Learning"
+    at.session_state["question_count"] = turns + 1
+    at.session_state["show_analysis"] = {}
+    at.session_state["theme_color"] = "#667eea"
+    return at
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000.0
+
+
+def measure(app_path, turns, repeat):
+    at = seeded_app(app_path, turns)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{app_path} failed: {at.exception[0].message}")
+    reruns = [timed(at.run) for _ in range(repeat)]
+    elements = len(list(at.main)) + len(list(at.sidebar))
+
+    turn_times = []
+    for i in range(repeat):
+        at = seeded_app(app_path, turns)
+        at.run()
+        turn_times.append(timed(lambda: at.chat_input[0].set_value(f"{ANSWER} ({i})").run()))
+    return {
+        "turns": turns,
+        "rerun_ms": round(statistics.median(reruns), 1),
+        "turn_ms": round(statistics.median(turn_times), 1),
+        "top_level_elements": elements,
+    }
+
+
+def export_app(rev, target_dir):
+    source = subprocess.run(["git", "show", f"{rev}:streamlit_app.py"], cwd=HERE, check=True,
+                            capture_output=True, text=True).stdout
+    path = os.path.join(target_dir, "streamlit_app.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(source)
+    return path
+
+
+def print_table(label, rows):
+    print(f"{label}")
+    print(f"  {'turns':>6}  {'rerun':>10}  {'answer turn':>12}  {'elements':>9}")
+    for r in rows:
+        print(f"  {r['turns']:>6}  {r['rerun_ms']:>8.1f}ms  {r['turn_ms']:>10.1f}ms  {r['top_level_elements']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure streamlit_app.py rerun time against interview length.")
+    parser.add_argument("--turns", default="10,50,200", help="comma-separated history sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ref", help="also measure streamlit_app.py from this git revision")
+    parser.add_argument("--json-out")
+    args = parser.parse_args()
+    sizes = [int(n) for n in args.turns.split(",") if n.strip()]
+    sys.path.insert(0, HERE)
+
+    report = {"current": [measure(APP_PATH, n, args.repeat) for n in sizes]}
+    print_table("Working tree", report["current"])
+    if args.ref:
+        with tempfile.TemporaryDirectory(prefix="bench_render_") as tmp:
+            report["ref"] = [measure(export_app(args.ref, tmp), n, args.repeat) for n in sizes]
+        print()
+        print_table(args.ref, report["ref"])
+        print()
+        for old, new in zip(report["ref"], report["current"]):
+            print(f"⏱️  {new['turns']:>4} turns: rerun {old['rerun_ms']:.0f}ms -> {new['rerun_ms']:.0f}ms, "
+                  f"answer turn {old['turn_ms']:.0f}ms -> {new['turn_ms']:.0f}ms")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
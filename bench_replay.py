@@ -0,0 +1,251 @@
+# bench_replay.py
+# Offline replay benchmark for InterviewOrchestrator.
+# - Replays recorded candidate answers through process_user_answer() with Gemini and the SLM
+#   replaced by the deterministic stand-ins in stub_backends.py (no network, no GGUF model).
+# - Reports p50/p95/p99 turn latency, remote calls per turn by call type, and routing-branch
+#   frequencies (taken from the per-turn trace records).
+# - --baseline compares against a previous --json-out report and exits with status 1 when p95
+#   latency or calls per turn regress by more than --max-regression.
+# Usage: python bench_replay.py bench_data/sample_transcripts.json --gemini-latency lognormal:0.4,0.3
+#
+# Transcript file: a JSON list (or JSONL, one per line) of
+#   {"name": "...", "domain": "Machine Learning",
+#    "turns": [{"answer": "...", "answer_type": "Vague", "score": 4.0}, ...]}
+# "answers": ["...", ...] may be used instead of "turns" when nothing needs to be scripted.
+#
+# --question-bank N first builds an in-memory question bank (N questions per topic and difficulty)
+# with the stand-in, so the replay serves L0 and pivot questions from it.
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+# Keep the replay quiet and off disk before the orchestrator modules read their settings.
+os.environ.setdefault("KIRO_LOG_LEVEL", "WARNING")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ.setdefault("QUESTION_BANK_PATH", ":memory:")
+
+import kiro7
+import tracing
+from llm_providers import GeminiProvider, LlamaProvider, SLMServerProvider
+from pivot_prefetch import get_pivot_prefetcher
+from provider_pool import PoolMember, ProviderPool
+from question_bank import build_bank, get_question_bank
+from rate_limiter import get_rate_limiter
+from stub_backends import LatencyModel, StubGeminiModel, StubLlama
+
+SCRIPT_FIELDS = ("answer_type", "score", "strategic_question", "topic_is_complete",
+                 "terminate_interview", "reason_for_termination")
+
+
+def load_transcripts(path):
+    with open(path, "r", encoding="utf-8") as f:
+        raw = f.read().strip()
+    if raw.startswith("["):
+        transcripts = json.loads(raw)
+    else:
+        transcripts = [json.loads(line) for line in raw.splitlines() if line.strip()]
+    for i, t in enumerate(transcripts):
+        if "turns" not in t:
+            t["turns"] = [{"answer": a} for a in t.get("answers", [])]
+        t.setdefault("name", f"transcript-{i + 1}")
+        t.setdefault("domain", "Machine Learning")
+    return transcripts
+
+
+def build_script(transcripts):
+    """Scripted Gemini outputs keyed by answer text (turns without extra fields are left to the stub)."""
+    script = {}
+    for t in transcripts:
+        for turn in t["turns"]:
+            fields = {k: turn[k] for k in SCRIPT_FIELDS if k in turn}
+            if fields:
+                script[turn["answer"]] = fields
+    return script
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _latency(spec, seed):
+    return LatencyModel(spec, seed=seed)
+
+
+def run_replay(transcripts, args):
+    random.seed(args.seed)
+    latency = {"default": _latency(args.gemini_latency, args.seed)}
+    for item in args.call_latency or []:
+        call_type, _, spec = item.partition("=")
+        latency[call_type.strip()] = _latency(spec, args.seed)
+
+    gemini = StubGeminiModel(script=build_script(transcripts), latency=latency)
+    slm = StubLlama(latency=_latency(args.slm_latency, args.seed + 1), low_confidence_rate=args.slm_low_confidence)
+    pool = ProviderPool([PoolMember("stub", None, gemini.model_name, model=gemini)])
+    get_rate_limiter().configure("stub", rpm=args.rpm, tpm=args.tpm)
+    llm = GeminiProvider(pool=pool)
+    # --slm-url benchmarks against a running slm_server.py instead of the stand-in
+    slm_provider = SLMServerProvider(args.slm_url) if args.slm_url else LlamaProvider(model=slm)
+    bank = get_question_bank()
+    if args.question_bank and bank is not None:
+        for domain in sorted({t["domain"] for t in transcripts}):
+            build_bank(bank, domain, llm, per_difficulty=args.question_bank)
+
+    turn_records = []
+    triage_spans = [0]
+
+    def collect(record):
+        if record.get("type") == "turn":
+            turn_records.append(record)
+        elif record.get("call_type") == "SLM Triage":
+            triage_spans[0] += 1
+
+    tracing.add_sink(collect)
+
+    latencies = []
+    calls_per_turn = []
+    for t in transcripts:
+        if not args.keep_cache:
+            kiro7.ANALYSIS_CACHE.clear()
+            kiro7.SCORE_CACHE.clear()
+        bot = kiro7.InterviewOrchestrator(t["domain"], llm=llm, slm=slm_provider)
+        bot.min_question_gap = 0
+        bot.start_interview()
+        for turn in t["turns"]:
+            before_gemini = gemini.call_counts()
+            before_slm = slm.calls
+            before_triage_spans = triage_spans[0]
+            start = time.perf_counter()
+            result = bot.process_user_answer(turn["answer"])
+            latencies.append(time.perf_counter() - start)
+
+            after = gemini.call_counts()
+            counts = {k: after[k] - before_gemini.get(k, 0) for k in after if after[k] - before_gemini.get(k, 0)}
+            slm_delta = (triage_spans[0] - before_triage_spans) if args.slm_url else slm.calls - before_slm
+            if slm_delta:
+                counts["slm_triage"] = slm_delta
+            calls_per_turn.append(counts)
+            if result.get("status") == "TERMINATED":
+                break
+
+    turns = len(latencies)
+    totals = Counter()
+    for counts in calls_per_turn:
+        totals.update(counts)
+    branches = Counter(r.get("branch") or "none" for r in turn_records)
+    degraded = Counter(stage for r in turn_records for stage in r.get("degraded_stages") or [])
+
+    return {
+        "transcripts": len(transcripts),
+        "turns": turns,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000.0, 2),
+            "p95": round(percentile(latencies, 95) * 1000.0, 2),
+            "p99": round(percentile(latencies, 99) * 1000.0, 2),
+            "mean": round(sum(latencies) / turns * 1000.0, 2) if turns else 0.0,
+        },
+        "calls_per_turn": {k: round(v / turns, 3) for k, v in sorted(totals.items())} if turns else {},
+        "remote_calls_per_turn": round(sum(v for k, v in totals.items() if k != "slm_triage") / turns, 3) if turns else 0.0,
+        "branches": dict(branches.most_common()),
+        "degraded_stages": dict(degraded.most_common()),
+        "pivot_prefetch": get_pivot_prefetcher().stats(),
+        "question_bank": bank.stats() if bank is not None else None,
+        "settings": {"gemini_latency": args.gemini_latency, "slm_latency": args.slm_latency,
+                     "call_latency": args.call_latency or [], "seed": args.seed},
+    }
+
+
+def print_report(report):
+    print(f"Replayed {report['turns']} turns from {report['transcripts']} transcripts")
+    lat = report["latency_ms"]
+    print(f"  Turn latency  p50={lat['p50']:.1f}ms  p95={lat['p95']:.1f}ms  p99={lat['p99']:.1f}ms  mean={lat['mean']:.1f}ms")
+    print(f"  Remote calls per turn: {report['remote_calls_per_turn']:.2f}")
+    for call_type, per_turn in report["calls_per_turn"].items():
+        print(f"    {call_type:<12} {per_turn:.2f}")
+    print("  Routing branches:")
+    for branch, count in report["branches"].items():
+        print(f"    {branch:<26} {count}")
+    if report["degraded_stages"]:
+        print(f"  Degraded stages: {report['degraded_stages']}")
+    prefetch = report.get("pivot_prefetch")
+    if prefetch and prefetch["started"]:
+        coverage = "n/a" if prefetch["pivot_coverage"] is None else f"{prefetch['pivot_coverage']:.0%}"
+        print(f"  Pivot prefetch: {prefetch['started']} started, {prefetch['hit']} used "
+              f"(hit rate {prefetch['hit_rate']:.0%}), {prefetch['wasted_calls']} wasted calls, "
+              f"{coverage} of pivots served")
+    bank = report.get("question_bank")
+    if bank and bank["questions"]:
+        hit_rate = "n/a" if bank["hit_rate"] is None else f"{bank['hit_rate']:.0%}"
+        print(f"  Question bank: {bank['questions']} questions, hit rate {hit_rate} "
+              f"({bank['hit']} hit, {bank['nearby']} nearby, {bank['exhausted']} exhausted, {bank['miss']} miss)")
+
+
+def check_regression(report, baseline, max_regression):
+    """Returns a list of regression messages (empty when within tolerance)."""
+    problems = []
+    checks = [
+        ("p95 latency", report["latency_ms"]["p95"], baseline["latency_ms"]["p95"]),
+        ("p99 latency", report["latency_ms"]["p99"], baseline["latency_ms"]["p99"]),
+        ("remote calls per turn", report["remote_calls_per_turn"], baseline["remote_calls_per_turn"]),
+    ]
+    for label, current, previous in checks:
+        if previous > 0 and current > previous * (1.0 + max_regression):
+            problems.append(f"{label}: {current} vs baseline {previous} (+{(current / previous - 1.0) * 100:.1f}%)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded transcripts through the orchestrator with stub backends.")
+    parser.add_argument("transcripts", help="JSON/JSONL transcript file")
+    parser.add_argument("--gemini-latency", default="lognormal:0.35,0.35",
+                        help="default Gemini latency: fixed:S | uniform:A,B | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--call-latency", action="append", metavar="TYPE=SPEC",
+                        help="per call type override, e.g. scorer=fixed:0.2 (repeatable)")
+    parser.add_argument("--slm-latency", default="uniform:0.3,0.8")
+    parser.add_argument("--slm-url", help="use a running slm_server.py for triage instead of the stand-in")
+    parser.add_argument("--slm-low-confidence", type=float, default=0.1,
+                        help="fraction of SLM drafts returned as [CONFIDENCE_LOW]")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--rpm", type=int, default=100000, help="stub quota (keep high unless testing throttling)")
+    parser.add_argument("--tpm", type=int, default=100000000)
+    parser.add_argument("--question-bank", type=int, default=0, metavar="N",
+                        help="serve L0 / pivot questions from a bank of N questions per topic and difficulty")
+    parser.add_argument("--keep-cache", action="store_true", help="do not clear the result caches between transcripts")
+    parser.add_argument("--json-out", help="write the report as JSON")
+    parser.add_argument("--baseline", help="previous --json-out report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="allowed relative increase over the baseline (default 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    report = run_replay(load_transcripts(args.transcripts), args)
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json_out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = check_regression(report, baseline, args.max_regression)
+        if problems:
+            print("\n❌ Regression against baseline:")
+            for p in problems:
+                print(f"   {p}")
+            sys.exit(1)
+        print("\n✅ Within tolerance of baseline.")
+
+
+if __name__ == "__main__":
+    main()
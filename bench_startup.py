@@ -0,0 +1,129 @@
+# bench_startup.py
+# Cold-start import benchmark for the Streamlit worker.
+# - Runs `python -X importtime -c "import kiro7"` in fresh interpreters (no warm sys.modules) and
+#   reports the median cumulative import time of kiro7, the slowest imported modules, and whether
+#   the heavy backends (google.generativeai, llama_cpp) were pulled in at import time.
+# - --ref REV measures the same import in a `git archive` export of another revision, so the
+#   gain of a change can be shown side by side (e.g. --ref HEAD~1).
+# - --max-ms fails (exit 1) when the median import time is above a budget.
+# Usage: python bench_startup.py --runs 7 --ref HEAD~1
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("google.generativeai", "llama_cpp", "streamlit")
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[0].isdigit():
+            continue
+        modules[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return modules
+
+
+def measure_once(workdir, module, env):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=workdir, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["(no output)"]
+        raise RuntimeError(f"import {module} failed in {workdir}: {tail[0]}")
+    return parse_importtime(proc.stderr)
+
+
+def measure(workdir, module, runs, env):
+    totals = []
+    last = {}
+    for _ in range(runs):
+        last = measure_once(workdir, module, env)
+        totals.append(last.get(module, (0, 0))[1])
+    slowest = sorted(((name, cum) for name, (_, cum) in last.items() if "." not in name and name != module),
+                     key=lambda item: item[1], reverse=True)
+    return {
+        "workdir": workdir,
+        "median_ms": round(statistics.median(totals) / 1000.0, 1),
+        "min_ms": round(min(totals) / 1000.0, 1),
+        "modules_imported": len(last),
+        "heavy_imported": [m for m in HEAVY_MODULES if m in last],
+        "slowest": [(name, round(cum / 1000.0, 1)) for name, cum in slowest[:8]],
+    }
+
+
+def export_revision(rev, target):
+    """Writes the tree of a git revision into target (tracked files only)."""
+    archive = os.path.join(target, "tree.tar")
+    subprocess.run(["git", "archive", "--format=tar", "-o", archive, rev], cwd=HERE, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(target)
+    os.remove(archive)
+    return target
+
+
+def bench_env():
+    env = dict(os.environ)
+    # Keep the measured imports quiet and off disk, and make sure the interpreter does not pick the
+    # other tree up from the working directory of this script.
+    env.setdefault("TRACE_LOG_PATH", "")
+    env.setdefault("KIRO_LOG_LEVEL", "ERROR")
+    env.setdefault("GOOGLE_API_KEY", "startup-benchmark")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def print_result(label, result):
+    print(f"{label}: import {result['median_ms']:.1f}ms median (min {result['min_ms']:.1f}ms), "
+          f"{result['modules_imported']} modules")
+    heavy = ", ".join(result["heavy_imported"]) or "none"
+    print(f"  Heavy backends imported: {heavy}")
+    print("  Slowest top-level imports:")
+    for name, ms in result["slowest"]:
+        print(f"    {name:<28} {ms:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cold-start import time of the orchestrator.")
+    parser.add_argument("--module", default="kiro7", help="module to import (default kiro7)")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--ref", help="also measure this git revision (e.g. HEAD~1) for comparison")
+    parser.add_argument("--max-ms", type=float, help="fail when the median import time exceeds this")
+    parser.add_argument("--json-out")
+    args = parser.parse_args()
+
+    env = bench_env()
+    report = {"current": measure(HERE, args.module, args.runs, env)}
+    print_result("Working tree", report["current"])
+
+    if args.ref:
+        with tempfile.TemporaryDirectory(prefix="bench_startup_") as tmp:
+            report["ref"] = measure(export_revision(args.ref, tmp), args.module, args.runs, env)
+            report["ref"]["workdir"] = args.ref
+        print()
+        print_result(args.ref, report["ref"])
+        before, after = report["ref"]["median_ms"], report["current"]["median_ms"]
+        if after > 0:
+            print(f"\n⏱️  {before:.1f}ms -> {after:.1f}ms ({before / after:.1f}x faster cold start)")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json_out}")
+
+    if args.max_ms is not None and report["current"]["median_ms"] > args.max_ms:
+        print(f"\n❌ Import took {report['current']['median_ms']:.1f}ms (budget {args.max_ms:.1f}ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
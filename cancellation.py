@@ -0,0 +1,103 @@
+# cancellation.py
+# Cancellation of in-flight turns (quit, "Start New Interview", a closed browser tab or SSE stream).
+# - CancelToken: one per turn, passed down to every backend call (providers, the provider pool,
+#   the rate limiter, TurnBudget). cancel() wakes anything waiting on the token: admission waits,
+#   backoff and pacing sleeps, the wait for a stage result; the SLM decode loop stops at the next
+#   token and requests not sent yet are never sent.
+# - TurnCancelled is raised where a cancelled call is noticed. Like asyncio.CancelledError it is a
+#   BaseException, so the orchestrator's `except Exception` fallbacks do not swallow it.
+# - turns_cancelled_total{reason} and cancel_reclaimed_seconds_total{source} count cancellations
+#   and the time they saved (skipped pacing sleep; turn budget left when the turn stopped).
+# Usage: token = CancelToken(); bot.process_user_answer(answer, cancel=token) ... token.cancel("quit")
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+import metrics
+
+CANCELLED = metrics.counter("turns_cancelled_total", "Turns stopped before they finished", ["reason"])
+RECLAIMED = metrics.counter("cancel_reclaimed_seconds_total",
+                            "Seconds of pacing sleep and turn budget not spent because a turn was cancelled",
+                            ["source"])
+
+
+class TurnCancelled(BaseException):
+    """The turn was cancelled; its partial result must be discarded."""
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(f"Turn cancelled ({reason})")
+        self.reason = reason
+
+
+class CancelToken:
+    """Thread-safe, one-shot cancellation flag with wake-up callbacks."""
+
+    __slots__ = ("_event", "_lock", "_callbacks", "reason", "cancelled_at")
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+        self.cancelled_at: Optional[float] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Cancels the token; returns False if it already was. Callbacks run on the calling thread."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self.cancelled_at = time.monotonic()
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+        return True
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Registers callback (runs at once if already cancelled); returns a function that unregisters it."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise TurnCancelled(self.reason)
+
+    def sleep(self, seconds: float, source: Optional[str] = None) -> None:
+        """time.sleep() that raises TurnCancelled as soon as the token is cancelled."""
+        end = time.monotonic() + seconds
+        if self._event.wait(seconds):
+            if source:
+                RECLAIMED.inc(max(0.0, end - time.monotonic()), source=source)
+            raise TurnCancelled(self.reason)
+
+
+def check(cancel: Optional[CancelToken]) -> None:
+    """raise_if_cancelled() for an optional token."""
+    if cancel is not None and cancel.cancelled:
+        raise TurnCancelled(cancel.reason)
+
+
+def sleep(seconds: float, cancel: Optional[CancelToken], source: Optional[str] = None) -> None:
+    """Sleeps, interruptibly when a token is given."""
+    if cancel is None:
+        time.sleep(seconds)
+    else:
+        cancel.sleep(seconds, source)
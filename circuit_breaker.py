@@ -0,0 +1,179 @@
+# circuit_breaker.py
+# Closed / open / half-open circuit breakers for the orchestrator backends.
+# - CLOSED: calls flow; `failure_threshold` consecutive failures open the breaker.
+# - OPEN: allow() is False, so callers route straight to their fallback without paying
+#   the failure latency. After `recovery_timeout` seconds the breaker goes HALF_OPEN.
+# - HALF_OPEN: up to `half_open_max_calls` trial calls; a success closes the breaker,
+#   a failure re-opens it. A trial that ends with neither (the turn was cancelled) must call
+#   release(); a trial not settled within `trial_timeout` seconds is presumed abandoned.
+# Every state change is published as an event dict to the subscribed listeners.
+# Usage: from circuit_breaker import get_breaker, subscribe, recent_events
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RECOVERY_TIMEOUT = 30.0   # seconds
+DEFAULT_HALF_OPEN_MAX_CALLS = 1
+DEFAULT_TRIAL_TIMEOUT = 120.0     # seconds before an unsettled half-open trial stops blocking others
+
+logger = logging.getLogger("kiro7.breaker")
+
+_listeners: List[Callable[[Dict], None]] = []
+_events = deque(maxlen=200)
+_events_lock = threading.Lock()
+
+
+def subscribe(listener: Callable[[Dict], None]) -> None:
+    """Register a callable receiving every breaker state-change event."""
+    with _events_lock:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[Dict], None]) -> None:
+    with _events_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def recent_events(limit: int = 50) -> List[Dict]:
+    """Most recent state-change events (oldest first)."""
+    with _events_lock:
+        return list(_events)[-limit:]
+
+
+def _publish(event: Dict) -> None:
+    with _events_lock:
+        _events.append(event)
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(event)
+        except Exception as e:
+            logger.warning(f"...Circuit breaker listener failed: {e}")
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+                 half_open_max_calls: int = DEFAULT_HALF_OPEN_MAX_CALLS,
+                 trial_timeout: float = DEFAULT_TRIAL_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.trial_timeout = trial_timeout
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._trial_started = 0.0
+        self.short_circuited = 0
+
+    def _transition(self, new_state: str, reason: str) -> Dict:
+        event = {"breaker": self.name, "from": self._state, "to": new_state,
+                 "reason": reason, "at": time.time()}
+        self._state = new_state
+        if new_state == OPEN:
+            self._opened_at = time.monotonic()
+        if new_state != HALF_OPEN:
+            self._half_open_in_flight = 0
+        return event
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go to the backend now (a trial call when half-open)."""
+        event = None
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self.short_circuited += 1
+                    return False
+                event = self._transition(HALF_OPEN, "recovery_timeout_elapsed")
+            if self._state == HALF_OPEN:
+                if (self._half_open_in_flight
+                        and time.monotonic() - self._trial_started >= self.trial_timeout):
+                    self._half_open_in_flight = 0     # the trials in flight were abandoned
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    self.short_circuited += 1
+                    allowed = False
+                else:
+                    self._half_open_in_flight += 1
+                    self._trial_started = time.monotonic()
+                    allowed = True
+            else:
+                allowed = True
+        if event:
+            _publish(event)
+        return allowed
+
+    def release(self) -> None:
+        """Ends a call admitted by allow() without a verdict (e.g. cancelled), freeing its trial slot."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_in_flight > 0:
+                self._half_open_in_flight -= 1
+
+    def record_success(self) -> None:
+        event = None
+        with self._lock:
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                event = self._transition(CLOSED, "trial_call_succeeded")
+        if event:
+            _publish(event)
+
+    def record_failure(self, reason: str = "call_failed") -> None:
+        event = None
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN:
+                event = self._transition(OPEN, f"trial_call_failed: {reason}")
+            elif self._state == CLOSED and self._failures >= self.failure_threshold:
+                event = self._transition(OPEN, f"{self._failures} consecutive failures: {reason}")
+        if event:
+            _publish(event)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"state": self._state, "consecutive_failures": self._failures,
+                    "short_circuited": self.short_circuited}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Process-wide breaker for a backend, created on first use."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **kwargs)
+        return _breakers[name]
+
+
+def breaker_states() -> Dict[str, Dict]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
+
+
+def _log_event(event: Dict) -> None:
+    logger.warning(f"...Circuit breaker '{event['breaker']}': {event['from']} -> {event['to']} ({event['reason']})")
+
+
+subscribe(_log_event)
@@ -13,2208 +13,37 @@
 # KEY CHANGE (this file): pivot logic now requires 2 consecutive STRONG_NEGATIVE momentum detections
 # (a "grace window") before forcing an early pivot. This is implemented via self.pivot_grace_counter.
 
-import google.generativeai as genai
 import os
 import json
 import time
-from llama_cpp import Llama
 from dotenv import load_dotenv
 import re
 import random
+import logging
+import queue
+import threading
 from typing import List
 # add near other imports at top of file
-from momentum_signal import compute_momentum
+from routing_policy import EXPERT_BRANCHES, PIVOT_BRANCHES, RoutingConfig, route
+from score_cache import ResultCache
+from rate_limiter import RateLimitExhausted, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from llm_providers import ProviderUnavailable, get_gemini_provider, get_slm_provider
+from turn_budget import TurnBudget, StageTimeout, StageUnavailable
+from circuit_breaker import CLOSED, get_breaker
+from tracing import Tracer, annotate, configure_logging
+from text_utils import OutputNormalizer, slm_draft_rejection
+from session_store import STATE_VERSION, SessionState
+from turn_registry import get_turn_registry, turn_key
+from cancellation import CANCELLED, CancelToken, TurnCancelled
+from pivot_prefetch import get_pivot_prefetcher, pivot_likely
+from question_bank import difficulty_for, get_question_bank, lead_in
+from score_batcher import get_score_batcher
 
 # --- 1. Configuration ---
 load_dotenv()
 
-# --- ⚠️ IMPORTANT: USER MUST CONFIGURE THESE ---
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-SLM_MODEL_PATH = "Phi3_Interview_Merged-3.8B-F16.gguf"
-GEMINI_MODEL_NAME = "gemini-2.5-flash-lite"
-
-# Quality thresholds and tuning knobs
-QUALITY_THRESHOLD = 7         # used to mark strong overall performance (logging)
-DEEP_ESCALATION_THRESHOLD = 8.0  # >= this (and answer_type NORMAL) -> ask deeper/expert question
-AVERAGE_LOWER = 6.5          # 6.5-7.9 considered average
-WEAK_THRESHOLD = 6.5         # < this considered weak
-STRIKE_LIMIT = 2             # strike limit (kept but not enforced)
-
-# Momentum defaults (used when calling compute_momentum)
-DEFAULT_MOMENTUM_NORM_DIV = 5.0
-DEFAULT_MOMENTUM_WEIGHT = 1.25
-
-# Forbidden robotic phrases (used by multiple prompts)
-FORBIDDEN_TRANSITIONS = [
-    "let's switch gears",
-    "pivoting to a new topic",
-    "understood, let's move on",
-    "let's shift gears",
-    "let's move on",
-    "let's continue to",
-    "let's change topic",
-    "switching gears",
-    "pivoting"
-]
-
-# --- 2. Prompts (The "Brains" of the Operation) ---
-GLOBAL_INTERVIEWER_PROMPT = """
-You are a calm, professional, and natural-sounding technical interviewer.
-- Your tone is curious and encouraging, not robotic or like a textbook.
-- You ask one short, focused question at a time (transition sentence optionally allowed).
-- You do not use overly formal phrases like "Therefore" or "Moreover".
-- You seamlessly adapt the conversation based on the candidate's performance.
-
-**CRITICAL TONE RULE:**
-Your transitions must be natural and conversational. Do NOT use robotic phrases like any of: {forbidden}
-Do NOT use semicolons in your outputs. Short transition sentence (3-10 words) may be followed by a single question sentence.
-"""
-
-PROMPT_SYLLABUS_GENERATOR = """
-You are an expert technical recruiter. Generate a JSON list of 5-7 *distinct, non-overlapping* key sub-topics for a 15-minute interview on the domain of '{domain}'.
-Focus on *factual* areas. For example, for 'ML', topics should be like 'Supervised vs. Unsupervised', 'Regression Algorithms', 'Classification Metrics', 'Overfitting', 'Neural Networks'.
-Avoid abstract topics like 'Problem Framing'.
-Output *only* the JSON list.
-"""
-
-# [Call Type 1: Gemini L0 Generator]
-PROMPT_L0_GENERATOR = """
-You are an expert technical interviewer. You are about to begin an interview in the domain: {domain}.
-
-Generate exactly ONE concise, domain-factual opening question that:
-
-- feels like a natural, light opening (you MAY include a short greeting like "Alright, let's begin," or "Great, to start,"),
-- is simple, factual, and introductory,
-- stays strictly within the technical domain (NO motivation/interest/personal questions),
-- asks about a fundamental concept, principle, component, or mechanism,
-- avoids deep theoretical math or highly advanced subtopics,
-- is within ~18–20 words,
-- is a single question (no multi-part),
-- has no extra commentary or explanation,
-- outputs ONLY the question (with greeting if used).
-
-**STRICT RULE:** The question MUST be factual and technical.
-Output: one concise, factual opening question only.
-"""
-
-# [Call Type 2: Gemini Analyzer/Judge/Strategist]
-# NOTE: This prompt now includes the last 1-2 assistant questions (recent_questions)
-PROMPT_ANALYZER = """
-You are an expert interview judge and strategist. Your job is to analyze the candidate's last answer and provide a JSON-ONLY response to guide the next step.
-
-**Context**
-Question: {question}
-Answer: {answer}
-Recent_Assistant_Questions: {recent_questions_json}
-
-====================================================
-STRICT ANSWER CLASSIFICATION RULES (MATCH SYSTEM LOGIC)
-====================================================
-
-Before choosing `answer_type`, apply these exact rules:
-
-1. HESITATION_SIGNAL (Highest Priority – Overrides ALL others)
-- If the answer contains hesitation tokens: "umm", "uh", "uhh", "hmm", "er", "ah", "...", "uhm"
-- OR includes trailing-off / half-sentences like "it works when the signal..."
-- OR contains fewer than 3 meaningful words (ignore common fillers like "like", "sure", "okay", "well").
-
-→ answer_type = HESITATION_SIGNAL
-
-2. KNOWLEDGE_GAP (Only if user explicitly expresses not knowing)
-- If the user writes "idk", "I don't know", "not sure", "pata nhi", "no idea", "haven't read", etc.
-→ answer_type = KNOWLEDGE_GAP
-
-3. EVASIVE_NON_ANSWER
-- If user avoids answering without admitting ignorance: e.g., "can you rephrase?", "sure", "okay", "yes", "hmm", "I'll answer", "trying to think"
-→ answer_type = EVASIVE_NON_ANSWER
-
-4. EVASIVE_CHALLENGE
-- If user challenges the interviewer: e.g., "stupid question", "you tell", "this is pointless", "chup kar"
-→ answer_type = EVASIVE_CHALLENGE
-
-5. FACTUALLY_INCORRECT
-- If the content is confidently stated but factually wrong for the topic.
-→ answer_type = FACTUALLY_INCORRECT
-
-6. VAGUE
-- On-topic, >3 meaningful words, not factually wrong, but missing core details.
-→ answer_type = VAGUE
-
-7. NORMAL
-- Reasonably correct, enough detail, not hesitant, vague, or wrong.
-→ answer_type = NORMAL
-
-NOTE: The analyzer should provide a textual advisory score for human inspection only, but this orchestrator will IGNORE any numeric value from the analyzer and rely on a dedicated numeric scorer for decisions.
-
-FOLLOW-UP QUESTION GUIDELINES:
-- Your `strategic_question` must follow from the candidate's level, be factual, never repeat the same question,
-  and shift to a related sub-concept if the user struggles.
-- **Important:** If the proposed `strategic_question` would repeat any of the items in Recent_Assistant_Questions, choose a different, non-repeating strategic_question.
-
-OUTPUT STRICTLY THIS JSON:
-{{
-  "content_summary": "<one-line neutral summary of candidate's answer>",
-  "answer_quality_score": <float 0.0-10.0 rounded to 1 decimal, advisory only>,
-  "answer_type": "<One of: 'Normal','Vague','HESITATION_SIGNAL','Factually_Incorrect','KNOWLEDGE_GAP','EVASIVE_NON_ANSWER','EVASIVE_CHALLENGE'>",
-  "analysis_notes": "<one sentence explaining the classification and score>",
-  "strategic_question": "<ONE factual follow-up question ONLY, not repeating recent assistant questions>",
-  "topic_is_complete": false,
-  "safety_violation": false,
-  "terminate_interview": false,
-  "reason_for_termination": null
-}}
-"""
-
-# ---------------- NEW SCORER PROMPT (separate call) ----------------
-PROMPT_SCORER = """
-You are a strict numeric scorer for a short technical interview answer.
-Input:
-- Question: {question}
-- Answer: {answer}
-
-Output (JSON ONLY):
-{{
-  "score": <float between 0.0 and 10.0 rounded to 1 decimal>,
-  "score_reason": "<one-sentence justification for the score>"
-}}
-
-SCORING RULES:
-- 8.0–10.0: Correct, clear, and mostly complete.
-- 5.0–7.9: Partially correct, some important details missing.
-- 3.0–4.9: On-topic but vague or incomplete.
-- 1.1–2.9: Attempted but factually incorrect.
-- 0.0–1.0: Knowledge gap, hesitation, nonsense, or <3 meaningful words.
-
-Round to one decimal place. Output valid JSON and nothing else.
-"""
-
-# [Call Type 3: Gemini Expert/Fallback]
-PROMPT_GEMINI_EXPERT = """
-{global_prompt}
-
-You are taking over the conversation. 
-Interview Domain: {domain}
-Full Conversation History:
-{history}
-
-Your Task:
-Generate the next single, human-like, professional follow-up. No preamble.
-
-CRITICAL CONSTRAINTS:
-- Do NOT use semicolons.
-- Do NOT use any of the forbidden robotic phrases: {forbidden}.
-- Do NOT use praise words (good, great, excellent, nice, fascinating, interesting) for weak, vague, incorrect, or hesitation answers.
-- You MAY output up to TWO short sentences:
-  1) a short transition phrase (3-10 words) — OPTIONAL but allowed,
-  2) a HIGH-QUALITY factual question (<=20 words).
-- The final output must be natural, conversational, and not lecturing.
-- Do NOT repeat the exact last 1-2 assistant questions.
-
-**QUESTION QUALITY RULES:**
-- Do NOT just echo words from the candidate's answer and ask "what does X do?"
-- INSTEAD, ask questions that test deeper understanding:
-  • Request concrete examples or real-world applications
-  • Ask about specific algorithms, techniques, or mechanisms
-  • Compare related concepts or explore trade-offs
-  • Correct misconceptions and ask for clarification
-  • Ask "how would you implement/apply [concept]?" not "what is [concept]?"
-- If candidate is vague, ask for specifics, not more vagueness
-
-Strategic Hint: {hint}
-
-Output: exactly the transition (optional) plus the question (required), separated by a single space or newline.
-"""
-
-# [Call Type 4: SLM Triage Prompt] (The "Smart Triage" prompt)
-PROMPT_SLM_TRIAGE = """
-You are a succinct technical interviewer for the domain: {topic}.
-Your single job: produce ONE short-follow up question (12–18 words max) that is:
-- a factual, clarifying, or easy next step given the candidate's last answer,
-- never multi-part, never a lecture, and never includes praise (no good, great, excellent, nice, fascinating, interesting).
-Output must be exactly the question text only (no preamble, no commentary).
-
-Constraints:
-- If the candidate's last answer shows hesitation, trailing off, filler tokens (e.g., "umm", "uh", "hmm", "..."),
-  or contains fewer than 3 meaningful (non-filler) words, output the single token: [CONFIDENCE_LOW]
-- If you cannot produce a clear, concise question within 18 words, return: [CONFIDENCE_LOW]
-
-Tone: calm, short, and clarifying.
-"""
-
-# [Call Type 5: Gemini Refiner]
-PROMPT_REFINER = """
-{global_prompt}
-
-You are an Editor-in-Chief for an AI interviewer. Create the perfect, concise follow-up.
-You will be given the candidate's last (flawed) answer, the Judge's analysis, and a Draft question from an SLM interviewer.
-
-Candidate's Last Answer:
-"{user_answer}"
-
-Judge's Analysis:
-"{analysis_notes}"
-
-SLM Draft Question:
-"{slm_output}"
-
-Extra Meta: {extra_meta}
-
-Your Task:
-1) If extra_meta indicates answer_type is HESITATION_SIGNAL:
-   - Do NOT praise.
-   - Start with a short acknowledgement like "No problem, take your time." (<=6 words).
-   - Then ask one very simple clarifying question (<=12 words).
-   - Output may be two sentences: acknowledgement sentence + clarifying question sentence.
-2) Otherwise:
-   - Start with one short (3–7 word) natural feedback phrase (no lecture).
-   - CRITICAL: Do NOT use praise words (good, great, excellent, nice, fascinating, interesting) if answer_type is VAGUE, FACTUALLY_INCORRECT, EVASIVE_NON_ANSWER, or EVASIVE_CHALLENGE.
-   - Then ask exactly one HIGH-QUALITY follow-up question (<=20 words).
-   - Output may be two sentences: feedback sentence + question sentence.
-
-3) **CRITICAL - QUESTION QUALITY RULES:**
-   - Do NOT just pick words from the candidate's answer and ask "what does X do?" or "how does X work?"
-   - Do NOT ask vague questions like "tell me more" or "can you elaborate?"
-   - INSTEAD, ask questions that:
-     a) Request concrete examples: "Can you give an example of [concept] in practice?"
-     b) Test understanding: "How would you apply [concept] to [specific scenario]?"
-     c) Explore mechanisms: "What algorithm or technique is used for [task]?"
-     d) Compare concepts: "What's the difference between [A] and [B]?"
-     e) Correct misconceptions: If answer is wrong, gently correct and ask for clarification
-     f) Go deeper: Ask about trade-offs, challenges, or real-world applications
-   - If answer is VAGUE or INCORRECT, ask for specifics, examples, or mechanisms, not just "what does X mean?"
-
-4) Under all circumstances:
-   - Do NOT use semicolons.
-   - Do NOT use any forbidden robotic transitions: {forbidden}.
-   - Do NOT repeat any of the last 1–2 assistant questions.
-   - Output EXACTLY the feedback/acknowledgement + question (1-2 sentences), nothing else.
-5) Feedback rules:
-   - You MAY optionally skip the feedback phrase entirely (0–1 sentences). If you choose to include feedback, vary it widely and avoid repeating earlier patterns.
-   - When you choose to include feedback, rotate between:
-   - brief affirmations ("Alright", "Got it", "Makes sense")
-   - soft redirects ("Okay, let’s explore further", "Alright, another angle")
-   - neutral transitions ("Sure", "Alright then")
-
-Never repeat the same lead-in phrase twice in back-to-back turns.
-Avoid repeating the same phrases such as “That’s a good start”, “Right”, “Good”, “Okay”, or similar—vary your language.
-
-Final output must be natural and brief.
-"""
-
-# [Call Type 6: Gemini Pivot Generator]
-PROMPT_TOPIC_PIVOT = """
-You are generating the FIRST question for a NEW topic: {topic}.
-
-Input summary:
-- Candidate Answer: "{user_answer}"
-- Score: {score}
-- Answer Type: {answer_type}
-- Judge Notes: {analysis_notes}
-- Recent Assistant Questions: {recent_questions_json}
-
-Task:
-1) Produce up to TWO short sentences:
-   - Sentence 1 (optional): a short, human transition phrase (3–10 words) that reflects tone.
-   - Sentence 2 (required): one factual L0 opening but theoretical interview level question about the new topic (<=20 words).
-2) Do NOT use semicolons.
-3) Do NOT use any forbidden robotic phrases: {forbidden}.
-4) Do NOT repeat any of the items listed in Recent_Assistant_Questions.
-5) Difficulty should depend on recent performance: easier if confused, moderate if average, deeper if confident.
-6) Use a wide range of synonyms for acknowledgements and transitions. Do not reuse any phrase more than once per 5 turns.
-7) The transition should connect naturally to the user’s last response while smoothly guiding the conversation toward the pivot question.
-8) do NOT use praise or positive adjectives (fascinating, great, good, interesting, nice, excellent, etc.) if answer type is NOT Normal.
-8) Output EXACTLY the transition and question (required) as 1-2 sentences.
-
-Examples of valid output:
-"Alright, let's try something else. What is the main function of MAC protocols?"
-or
-"Good. What is the role of antenna diversity in wireless systems?"
-
-Output only the transition+question text.
-"""
-
-# -------------------------
-# InterviewOrchestrator class
-# -------------------------
-class InterviewOrchestrator:
-    """
-    Manages the ADAPTIVE interview flow, switching between SLM and Gemini.
-    Patches applied per user spec: analyzer receives last 1-2 assistant questions,
-    2 consecutive hesitations -> knowledge gap, momentum normalization configurable,
-    refined prompts forbidding robotic phrases and semicolons, and normalized outputs.
-
-    KEY CHANGE: Analyzer numeric/advisory score is IGNORED for orchestration decisions.
-               Numeric decisions rely on the dedicated Scorer (Gemini Scorer).
-               Pivot logic requires 2 consecutive STRONG_NEGATIVE momentum detections
-               (grace window), tracked by self.pivot_grace_counter.
-    """
-    def __init__(self, domain):
-        self.domain = domain
-        self.hesitation_streak = 0
-        self.vague_streak = 0  # Track consecutive poor answers
-        self.conversation_history = []
-        self.last_question = ""
-        self.low_score_streak = 0
-        self.recent_scores = []   # holds last user scores for momentum computation
-
-        self.topic_syllabus = []
-        self.current_topic = ""
-        # Track how many questions have been asked in the current topic
-        self.questions_in_current_topic = 0
-
-
-        # pivot grace counter: require N consecutive strong-negative momentum detections before forcing pivot
-        self.pivot_grace_counter = 0
-        self.PIVOT_GRACE_REQUIRED = 2  # require 2 consecutive weak turns to pivot
-
-        # 1. Configure Gemini
-        print(f"Configuring Gemini with model: {GEMINI_MODEL_NAME}")
-        genai.configure(api_key=GOOGLE_API_KEY)
-        self.gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        # a JSON config reused for JSON outputs
-        self.json_config = genai.GenerationConfig(response_mime_type="application/json")
-
-        # 2. Configure SLM
-        self.slm_model = None
-        try:
-            print(f"Loading SLM from: {SLM_MODEL_PATH}...")
-            print("This will take a moment as it loads into your M4's GPU RAM...")
-            start_load = time.time()
-            self.slm_model = Llama(
-                model_path=SLM_MODEL_PATH,
-                n_gpu_layers=-1,
-                n_ctx=2048,
-                verbose=False
-            )
-            load_time = time.time() - start_load
-            print(f"✅ SLM (GGUF) model loaded in {load_time:.2f} seconds.")
-        except Exception as e:
-            print(f"❌ FAILED TO LOAD SLM MODEL from {SLM_MODEL_PATH}")
-            print(f"   Make sure 'SLM_MODEL_PATH' is correct.")
-            print(f"   Error: {e}")
-            print("   Will continue in Gemini-only fallback mode.")
-
-        # 3. Generate the Syllabus
-        self._generate_syllabus()
-
-    def _generate_syllabus(self):
-        """[Call 0] Generates the interview topic plan at the start."""
-        print(f"\n...Generating interview syllabus for: {self.domain}...")
-        try:
-            prompt = PROMPT_SYLLABUS_GENERATOR.format(domain=self.domain)
-            json_config_syllabus = genai.GenerationConfig(response_mime_type="application/json")
-            response = self.gemini_model.generate_content(prompt, generation_config=json_config_syllabus)
-
-            clean_response = response.text.replace("```json", "").replace("```", "").strip()
-            self.topic_syllabus = json.loads(clean_response)
-
-            if not self.topic_syllabus:
-                raise ValueError("Syllabus is empty")
-
-            print("...Shuffling syllabus topics...")
-            random.shuffle(self.topic_syllabus)
-
-            # 1. Force the {domain} to be the very first item in the list
-            self.topic_syllabus.insert(0, self.domain)
-            # 2. Now pop it. current_topic becomes {domain}, and the rest wait in the queue.
-            self.current_topic = self.topic_syllabus.pop(0)
-            # Reset topic question counter
-            self.questions_in_current_topic = 0
-
-
-            print(f"✅ Syllabus created. First topic: {self.current_topic}")
-            print(f"   Remaining topics: {self.topic_syllabus}")
-
-        except Exception as e:
-            print(f"❌ FAILED TO GENERATE SYLLABUS. Error: {e}")
-            print("...Defaulting to a single-topic interview.")
-            self.current_topic = self.domain  # Fallback
-
-    def start_interview(self):
-        """[Call Type 1] Generates the first L0 question using Gemini."""
-        print(f"\n...Calling Gemini for L0 question (Topic: {self.current_topic})...")
-
-        prompt = PROMPT_L0_GENERATOR.format(
-            global_prompt=GLOBAL_INTERVIEWER_PROMPT,
-            domain=self.domain
-        )
-
-        response = self.gemini_model.generate_content(prompt)
-
-        l0_question = self._normalize_output(response.text.strip())
-        self.last_question = l0_question
-        self.conversation_history.append({"role": "assistant", "content": l0_question})
-        return l0_question
-
-    def _normalize_output(self, text: str) -> str:
-        """
-        Cleans up the bot's response to ensure a consistent, human tone.
-        Key fixes:
-        - Remove semicolons.
-        - Replace robotic glue phrases.
-        - Ensure proper punctuation (one question mark if missing).
-        - Prevent double spaces and trailing punctuation.
-        - Keep up to 2 sentences (transition + question) if present.
-        """
-        if not text:
-            return text
-
-        # Strip surrounding whitespace and quotes
-        text = text.strip().strip('"').strip("'")
-
-        # Replace a few canned formal connectors with friendlier phrases
-        text = text.replace("Therefore,", "So,")
-        text = text.replace("Moreover,", "Also,")
-        text = text.replace("In conclusion,", "Ultimately,")
-
-        # Remove semicolons entirely
-        text = text.replace(";", ",")
-
-        # Remove forbidden robotic phrases (case-insensitive)
-        for phrase in FORBIDDEN_TRANSITIONS:
-            pattern = re.compile(re.escape(phrase), flags=re.IGNORECASE)
-            text = pattern.sub("", text)
-
-        # Collapse multiple punctuation/whitespace
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\s+([?.!,])', r'\1', text)
-        text = re.sub(r'([?.!,]){2,}', r'\1', text)
-
-        # Ensure the output ends with punctuation; if the last sentence seems to be a question, ensure '?'
-        if not re.search(r'[.?!"\']$', text):
-            # if likely a question (contains words like what, why, how, when, which, describe), add '?'
-            if re.search(r'\b(what|why|how|when|which|describe|explain|tell)\b', text.lower()):
-                text = text + "?"
-            else:
-                text = text + "."
-
-        # Trim to at most two sentences.
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        if len(sentences) > 2:
-            sentences = sentences[-2:]  # keep last two sentences (transition+question preferred)
-        # Reconstruct with single space
-        final = " ".join(s.strip() for s in sentences).strip()
-
-        # Final safety: remove leading/trailing punctuation anomalies
-        final = final.strip()
-        final = re.sub(r'^[\s\.,;:]+', '', final)
-        final = re.sub(r'[\s\.,;:]+$', '', final)
-
-        return final
-
-    def _get_recent_assistant_questions(self, n: int = 2) -> List[str]:
-        """
-        Return the last n assistant questions content (most recent first).
-        """
-        assistant_qs = [turn['content'] for turn in reversed(self.conversation_history) if turn['role'] == 'assistant']
-        return assistant_qs[:n]
-
-    def _get_gemini_analysis(self, question: str, answer: str):
-        """[Call Type 2] Calls Gemini to analyze and classify the answer (Analyzer).
-        NOTE: The numeric 'answer_quality_score' produced by analyzer is advisory only and
-        intentionally IGNORED by the orchestrator. We still rely on analyzer for 'answer_type',
-        'analysis_notes', and 'strategic_question' textual guidance.
-        """
-        print("\n...Calling Gemini (Judge/Strategist) for analysis...")
-        recent_qs = self._get_recent_assistant_questions(2)
-        try:
-            recent_json = json.dumps(recent_qs)
-        except:
-            recent_json = "[]"
-
-        prompt = PROMPT_ANALYZER.format(
-            question=question,
-            answer=answer,
-            recent_questions_json=recent_json
-        )
-        try:
-            response = self.gemini_model.generate_content(
-                prompt,
-                generation_config=self.json_config
-            )
-            clean_response = response.text.replace("```json", "").replace("```", "").strip()
-            analysis = json.loads(clean_response)
-
-            def to_bool(val):
-                if isinstance(val, bool):
-                    return val
-                return str(val).lower() == 'true'
-
-            analysis['terminate_interview'] = to_bool(analysis.get('terminate_interview'))
-            # Keep analyzer's topic_is_complete parsed but we will not rely on it for orchestrator decisions per user instruction
-            analysis['topic_is_complete'] = to_bool(analysis.get('topic_is_complete'))
-
-            return analysis
-
-        except Exception as e:
-            print(f"❌ Error parsing Gemini analysis JSON: {e}")
-            try:
-                raw = response.text
-            except:
-                raw = "<no raw response>"
-            print(f"   Raw response: {raw}")
-            return {
-                "content_summary": "Analysis failed",
-                "answer_quality_score": 0.0,
-                "answer_type": "Normal",
-                "analysis_notes": "JSON parsing error.",
-                "strategic_question": "Ask a simple, re-phrased question.",
-                "topic_is_complete": False,
-                "terminate_interview": False,
-                "reason_for_termination": "Analysis Error"
-            }
-
-    def _get_gemini_score(self, question: str, answer: str):
-        """NEW: [Call SCORER] Calls Gemini with the separate scoring prompt and returns a float score and reason."""
-        print("\n...Calling Gemini (Scorer) for numeric score...")
-        prompt = PROMPT_SCORER.format(question=question, answer=answer)
-        try:
-            # Use json config for strict JSON parsing
-            response = self.gemini_model.generate_content(prompt, generation_config=self.json_config)
-            clean_response = response.text.replace("```json", "").replace("```", "").strip()
-            score_json = json.loads(clean_response)
-            # Ensure rounding to 1 decimal
-            score_val = float(score_json.get("score", 0.0))
-            # Clamp between 0 and 10
-            if score_val < 0.0:
-                score_val = 0.0
-            if score_val > 10.0:
-                score_val = 10.0
-            # Round to 1 decimal
-            score_val = round(score_val, 1)
-            score_reason = str(score_json.get("score_reason", "")).strip()
-            print(f"...Scorer returned: {score_val} — {score_reason}")
-            return {"score": score_val, "score_reason": score_reason}
-        except Exception as e:
-            print(f"❌ Scorer call or JSON parse failed: {e}")
-            try:
-                raw = response.text
-            except:
-                raw = "<no raw response>"
-            print(f"   Raw scorer response: {raw}")
-            # Important: DO NOT fallback to analyzer numeric score; instead return failure indicator
-            return {"score": None, "score_reason": "Scorer failed"}
-
-    def _get_slm_triage_question(self):
-        """[Call Type 4] Calls the local SLM to *think*."""
-        if self.slm_model is None:
-            print("...SLM not loaded. Skipping...")
-            return None
-
-        print("...Calling local SLM (Triage) to *think*...")
-
-        system_content = PROMPT_SLM_TRIAGE.format(topic=self.current_topic)
-
-        messages = []
-        messages.append({"role": "system", "content": system_content})
-        messages.extend(self.conversation_history)
-
-        try:
-            # Conservative SLM call: short, low temperature for concise drafts
-            output = self.slm_model.create_chat_completion(
-                messages=messages,
-                max_tokens=80,   # shorter drafts
-                stop=["<|end|>", "<|user|>", "You:", "Candidate:", "Interviewer:"],
-                temperature=0.25  # conservative, less creative
-            )
-            next_question = output['choices'][0]['message']['content'].strip()
-
-            if not next_question:
-                print("...SLM FAILED (empty response).")
-                return None
-
-            # If SLM itself returned the bailout token, accept it.
-            if "[CONFIDENCE_LOW]" in next_question:
-                print("...SLM successfully triggered [CONFIDENCE_LOW].")
-                return "[CONFIDENCE_LOW]"
-
-            # Post-validate the SLM question: require at least 3 meaningful words,
-            # and reject if it contains hesitation tokens or ellipses.
-            def meaningful_word_count(s):
-                # remove common filler tokens and punctuation, then count words of length>1
-                fillers = {"umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "like", "...", "uhm"}
-                tokens = re.findall(r"[A-Za-z']+", s.lower())
-                meaningful = [t for t in tokens if t not in fillers and len(t) > 1]
-                return len(meaningful)
-
-            hesitation_tokens = ["umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "...", "uhm"]
-
-            if any(tok in next_question.lower() for tok in hesitation_tokens):
-                print("...SLM output contains hesitation tokens; treating as [CONFIDENCE_LOW].")
-                return "[CONFIDENCE_LOW]"
-
-            if meaningful_word_count(next_question) < 3:
-                print("...SLM output too short (fewer than 3 meaningful words); treating as [CONFIDENCE_LOW].")
-                return "[CONFIDENCE_LOW]"
-
-            # All checks passed — accept SLM draft.
-            print(f"...SLM (Triage) generated draft: \"{next_question}\"")
-            return next_question
-
-        except Exception as e:
-            print(f"...SLM FAILED (Exception): {e}")
-            return None
-
-    def _get_gemini_expert_question(self, hint: str):
-        """[Call Type 3] Calls Gemini for an "Expert" or "Fallback" question."""
-        print(f"...Calling Gemini (Expert/Fallback). Hint: {hint}...")
-
-        history_str = ""
-        for turn in self.conversation_history:
-            role = "Interviewer" if turn['role'] == 'assistant' else "Candidate"
-            history_str += f"{role}: {turn['content']}\n"
-
-        prompt = PROMPT_GEMINI_EXPERT.format(
-            global_prompt=GLOBAL_INTERVIEWER_PROMPT,
-            domain=self.domain,
-            history=history_str,
-            hint=hint,
-            forbidden=", ".join([f'"{p}"' for p in FORBIDDEN_TRANSITIONS])
-        )
-
-        response = self.gemini_model.generate_content(prompt)
-        return response.text.strip()
-
-    def _get_gemini_refinement(self, user_answer: str, analysis_notes: str, slm_output: str, hint: str, answer_type: str = None):
-        """[Call Type 5] Calls Gemini "Editor" to create the final, concise response."""
-        print(f"...Sending all context to Gemini (Editor) for final question...")
-
-        # Compose extra_meta from explicit answer_type (if provided).
-        if answer_type:
-            extra_meta = f"[ANSWER_TYPE: {answer_type}]"
-        else:
-            # Fallback: infer neutral
-            extra_meta = "[ANSWER_TYPE: NORMAL]"
-
-        # Provide recent assistant questions to the refiner so it doesn't repeat.
-        recent_qs = self._get_recent_assistant_questions(2)
-        extra_meta = extra_meta + f" [RECENT_ASSISTANT_QS: {json.dumps(recent_qs)}]"
-
-        prompt = PROMPT_REFINER.format(
-            global_prompt=GLOBAL_INTERVIEWER_PROMPT,
-            user_answer=user_answer,
-            analysis_notes=analysis_notes,
-            slm_output=slm_output,
-            extra_meta=extra_meta,
-            forbidden=", ".join([f'"{p}"' for p in FORBIDDEN_TRANSITIONS])
-        )
-
-        response = self.gemini_model.generate_content(prompt)
-        return response.text.strip()
-
-    def _get_gemini_pivot_question(self, new_topic: str, user_answer: str, score, answer_type: str, analysis_notes: str):
-        """[Call Type 6] Calls Gemini to get a new L0 question for a topic pivot."""
-        print(f"...Calling Gemini (Pivot) for new L0 question on: {new_topic}...")
-
-        recent_qs = self._get_recent_assistant_questions(2)
-        recent_json = json.dumps(recent_qs)
-
-        prompt = PROMPT_TOPIC_PIVOT.format(
-            global_prompt=GLOBAL_INTERVIEWER_PROMPT,
-            topic=new_topic,
-            user_answer=user_answer,
-            score=score,
-            answer_type=answer_type,
-            analysis_notes=analysis_notes,
-            recent_questions_json=recent_json,
-            forbidden=", ".join([f'"{p}"' for p in FORBIDDEN_TRANSITIONS])
-        )
-
-        response = self.gemini_model.generate_content(prompt)
-        return response.text.strip()
-
-    def process_user_answer(self, user_answer: str):
-        """
-        Main orchestration: Analyzer -> (dedicated) Scorer -> Triage/Refiner/Pivot decisions.
-
-        KEY BEHAVIORAL NOTES:
-        - Analyzer is used for classification (answer_type) and text guidance only.
-        - Analyzer numeric score is IGNORED by the orchestrator.
-        - Dedicated numeric decisions come from the separate Gemini Scorer call.
-        - If Scorer fails to return a numeric score, we fall back to a conservative default:
-          use the last known valid score (if any) else 0.0. We do NOT use analyzer numeric values.
-        - For strong NORMAL answers (score >= DEEP_ESCALATION_THRESHOLD) we escalate
-          to an expert-level question (via Gemini Expert) to ask deeper technical / formulaic questions.
-        - Pivot logic: momentum-caused pivot requires PIVOT_GRACE_REQUIRED consecutive detections.
-        """
-        self.conversation_history.append({"role": "user", "content": user_answer})
-        analysis = self._get_gemini_analysis(self.last_question, user_answer)
-
-        # Extract classification and notes from analyzer
-        answer_type = analysis.get("answer_type", "Normal")
-
-        # Track consecutive hesitations
-        if answer_type == "HESITATION_SIGNAL":
-            self.hesitation_streak += 1
-        else:
-            self.hesitation_streak = 0
-
-        # Track consecutive vague/incorrect/evasive/hesitation answers (MORE AGGRESSIVE)
-        if answer_type in ("VAGUE", "FACTUALLY_INCORRECT", "EVASIVE_NON_ANSWER", "EVASIVE_CHALLENGE", "HESITATION_SIGNAL"):
-            self.vague_streak += 1
-        else:
-            self.vague_streak = 0
-        
-        # AUTO-CONVERT 2 consecutive poor answers into KNOWLEDGE_GAP (faster pivot on gibberish)
-        if self.vague_streak >= 2:
-            answer_type = "KNOWLEDGE_GAP"
-            analysis["answer_type"] = "KNOWLEDGE_GAP"
-            print("...Multiple consecutive poor answers detected → treating as KNOWLEDGE_GAP for mercy pivot.")
-            self.vague_streak = 0  # Reset
-            self.hesitation_streak = 0  # Also reset hesitation
-
-        # AUTO-CONVERT 2 consecutive hesitations into KNOWLEDGE_GAP (user requested) - REDUNDANT NOW but kept for compatibility
-        if self.hesitation_streak >= 2 and answer_type == "HESITATION_SIGNAL":
-            answer_type = "KNOWLEDGE_GAP"
-            analysis["answer_type"] = "KNOWLEDGE_GAP"
-            print("...Multiple consecutive hesitations detected → treating as KNOWLEDGE_GAP for mercy pivot.")
-
-        analysis_notes = analysis.get("analysis_notes", "")
-        hint = analysis.get("strategic_question", "Ask a logical follow-up.")
-        # ignore analyzer's topic_is_complete for orchestration decisions (user requested)
-        topic_complete_flag = False
-
-        # ------------- Priority 1: Safety / Immediate Termination -------------
-        if analysis.get("terminate_interview", False):
-            reason = analysis.get("reason_for_termination", "Safety violation or candidate refusal.")
-            print(f"\nTERMINATING INTERVIEW. Reason: {reason}")
-            return {"status": "TERMINATED", "analysis": analysis}
-
-        # ------------- Priority 2: Knowledge Gap (instant mercy pivot) -------------
-        # If user explicitly says "I don't know" (KNOWLEDGE_GAP) — immediate mercy pivot (no scoring call)
-        if answer_type == "KNOWLEDGE_GAP":
-            print(f"...User 'KNOWLEDGE_GAP' detected. Forcing a 'Mercy Pivot' (no scoring).")
-            topic_complete_flag = True
-            hint = f"Candidate is stuck on '{self.current_topic}'. Ask a new L0 question for the next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-            # Do not call scorer — immediate pivot
-            score = 0.0
-            # defensive: prevent momentum forced pivot this round
-            momentum_causes_forced_pivot = False
-        else:
-            # ------------- Else: call the separate scorer -------------
-            score_result = self._get_gemini_score(self.last_question, user_answer)
-            score = score_result.get("score", None)
-            score_reason = score_result.get("score_reason", "")
-
-            # If scorer failed, do NOT fallback to analyzer numeric score.
-            if score is None:
-                # fallback: last known valid score or 0.0
-                last_valid = None
-                for s in reversed(self.recent_scores):
-                    try:
-                        if s is not None:
-                            last_valid = float(s)
-                            break
-                    except:
-                        continue
-                if last_valid is not None:
-                    score = round(last_valid, 1)
-                    print(f"...Scorer failed. Falling back to last known score: {score}")
-                else:
-                    score = 0.0
-                    print("...Scorer failed. No previous score found. Using conservative score: 0.0")
-            else:
-                # we have a valid scorer value
-                pass
-
-        # Maintain recent scores for momentum and density (oldest...newest)
-        try:
-            self.recent_scores.append(float(score))
-        except:
-            self.recent_scores.append(0.0)
-
-        if len(self.recent_scores) > 10:
-            self.recent_scores = self.recent_scores[-10:]
-
-        # Compute sliding-window momentum signal (uses normalization_divisor and weight)
-        momentum_info = compute_momentum(self.recent_scores,
-                                        normalization_divisor=DEFAULT_MOMENTUM_NORM_DIV,
-                                        weight=DEFAULT_MOMENTUM_WEIGHT)
-        momentum_signal = momentum_info['signal']
-        momentum_norm = momentum_info['norm']
-        momentum_weighted = momentum_info['weighted']
-
-        # Debug output for momentum
-        print(f"...[MOMENTUM DEBUG] raw={momentum_info['raw']:.3f}, norm={momentum_norm:.3f}, "
-              f"weighted={momentum_weighted:.3f}, signal={momentum_signal}")
-
-        # Update low_score_streak for logging/observability (use scorer-derived score)
-        if float(score) <= 1.5:
-            self.low_score_streak += 1
-            print(f"...Low score streak is now: {self.low_score_streak}")
-        else:
-            self.low_score_streak = 0
-
-        # Grade letter (for logs)
-        grade_letter = "A"
-        if score <= 1.5:
-            grade_letter = "L"
-        elif score >= QUALITY_THRESHOLD:
-            grade_letter = "H"
-
-        print(f"...Score ({score}) [{grade_letter}] Analysis...")
-
-        # ------- Minimal density-based fallback (replaces hard strike-limit) -------
-        density_window = 2  # Reduced for faster pivot
-        density_thresh = 0.75  # e.g., 75% of window being L triggers pivot
-        recent_for_density = self.recent_scores[-density_window:]
-        low_count = sum(1 for s in recent_for_density if s <= 1.5)
-        low_density_trigger = (len(recent_for_density) == density_window and (low_count / density_window) >= density_thresh)
-
-        # ------- Momentum-influenced policy adjustments (soft MP3) -------
-        momentum_causes_forced_pivot = (momentum_signal == "STRONG_NEGATIVE")
-        # Prevent momentum-caused pivot if knowledge gap was detected earlier
-        if answer_type == "KNOWLEDGE_GAP":
-            momentum_causes_forced_pivot = False
-
-        next_question = None
-
-        # ---------------- ROUTING LOGIC (preserve original priorities) ----------------
-        # 3. Judge's (Gemini) pivot — NOT used for topic_is_complete orchestration, but keep compatibility:
-        # We will ignore analysis['topic_is_complete'] for automatic pivoting to avoid false positives.
-
-        # 4. Behavioral interceptors (EVASIVE / CHALLENGE)
-        if answer_type == "EVASIVE_NON_ANSWER":
-            print(f"...User is stalling. Calling Gemini (Expert) to be firm.")
-            hint = f"The candidate is stalling ('{user_answer}'). Politely but firmly, re-ask the last question: '{self.last_question}'"
-            next_question = self._get_gemini_expert_question(hint=hint)
-
-        elif answer_type == "EVASIVE_CHALLENGE":
-            print(f"...User is challenging. Calling Gemini (Expert) to restate role.")
-            hint = f"The candidate is challenging ('{user_answer}'). Politely restate your role as the interviewer and then re-ask the last question: '{self.last_question}'"
-            next_question = self._get_gemini_expert_question(hint=hint)
-
-        # ---------- BEGIN: PRIORITIZED HESITATION / KNOWLEDGE / PIVOT GUARDS ----------
-        # Optional: Hesitation shortcut — prefer a short clarifying question and skip pivots
-        if answer_type == "HESITATION_SIGNAL" and next_question is None and not topic_complete_flag:
-            print("...Answer marked HESITATION_SIGNAL. Using Gemini Expert to produce a short clarifying question.")
-            hint = f"Candidate hesitated on '{self.current_topic}'. Ask a short, simple clarifying question (<=12 words)."
-            next_question = self._get_gemini_expert_question(hint=hint)
-
-        # If Gemini Expert already produced a next_question (e.g., from EVASIVE_* or HESITATION),
-        # we prefer that expert-crafted question and skip pivoting logic this turn.
-        expert_escalation_present = (next_question is not None)
-
-        # ------- Natural "topic complete" detection (soft, human-like) -------
-        # This orchestration respects your instruction: do not depend on analyzer.topic_is_complete
-        natural_topic_complete = False
-        try:
-            if (not expert_escalation_present) and answer_type not in ("HESITATION_SIGNAL", "KNOWLEDGE_GAP"):
-                if len(self.recent_scores) >= 3 and all(s >= 7.0 for s in self.recent_scores[-3:]) and momentum_weighted >= 0.0:
-                    natural_topic_complete = True
-                elif len(self.recent_scores) >= 4 and (sum(self.recent_scores[-4:]) / 4.0) >= 6.0 and momentum_weighted >= 0.0:
-                    natural_topic_complete = True
-                else:
-                    natural_topic_complete = False
-        except Exception:
-            natural_topic_complete = False
-
-        if natural_topic_complete:
-            # Block natural topic completion if fewer than 2 questions asked
-            if self.questions_in_current_topic < 2:
-                print("...Natural topic completion triggered early but BLOCKED (min 2 questions rule).")
-                natural_topic_complete = False
-            else:
-                print("...Natural topic completion detected by recent scorer pattern. Preparing to pivot.")
-                topic_complete_flag = True
-                hint = f"Candidate has demonstrated stable competence on '{self.current_topic}'. Pivot to next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-
-        # ------- Momentum & Density pivots (run ONLY if no higher-priority expert actions) -------
-        allow_pivot_checks = (not topic_complete_flag) and (not expert_escalation_present) and (answer_type not in ("HESITATION_SIGNAL", "KNOWLEDGE_GAP"))
-
-        if allow_pivot_checks:
-            # 5. Momentum forced pivot (soft) with grace window requiring consecutive detections
-            if momentum_causes_forced_pivot:
-                # If momentum negative, increment grace counter. Only pivot after PIVOT_GRACE_REQUIRED consecutive detections.
-                if self.pivot_grace_counter < (self.PIVOT_GRACE_REQUIRED - 1):
-                    self.pivot_grace_counter += 1
-                    print(f"...Momentum negative detected (grace {self.pivot_grace_counter}/{self.PIVOT_GRACE_REQUIRED}). Not pivoting yet.")
-                    # Do not pivot this turn; treat as not forcing pivot
-                    momentum_causes_forced_pivot = False
-                else:
-                    # this is the Nth consecutive negative detection -> pivot now
-                    print(f"...Momentum signal STRONG_NEGATIVE after grace window → pivot.")
-                    topic_complete_flag = True
-                    hint = f"Candidate shows a clear declining trend on '{self.current_topic}'. Pivot to next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-                    # reset low score streak only for safety
-                    self.low_score_streak = 0
-                    # reset pivot grace counter after pivot
-                    self.pivot_grace_counter = 0
-            else:
-                # momentum not negative -> reset grace counter (break consecutive streak)
-                if self.pivot_grace_counter != 0:
-                    print("...Momentum recovered or not negative — resetting pivot grace counter.")
-                self.pivot_grace_counter = 0
-
-            # 6. Low-score density fallback (conservative)
-            if low_density_trigger and answer_type != "EVASIVE_NON_ANSWER":
-                print(f"...Low-score density detected ({low_count}/{density_window}). Forcing a pivot.")
-                topic_complete_flag = True
-                hint = f"Multiple weak answers on '{self.current_topic}'. Pivoting to next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-                self.low_score_streak = 0
-                # reset pivot grace counter since we pivot due to density
-                self.pivot_grace_counter = 0
-        # ---------- END: PRIORITIZED HESITATION / KNOWLEDGE / PIVOT GUARDS ----------
-
-        # 7. Topic Pivot handling
-        if topic_complete_flag:
-            # 🚨 NEW RULE:
-            # If pivot was caused by KNOWLEDGE_GAP → bypass min-2 requirement
-            if analysis.get("answer_type") != "KNOWLEDGE_GAP":
-                # Old rule still applies for all other pivot types
-                if self.questions_in_current_topic < 2:
-                    print("...Pivot blocked: fewer than 2 questions asked in this topic. Continuing within the same topic.")
-                    topic_complete_flag = False
-                    return {
-                        "status": "CONTINUE",
-                        "next_question": self.last_question,
-                        "analysis": analysis
-                    }
-
-            # ---- Continue with normal pivot ----
-            print(f"...Topic '{self.current_topic}' is complete. Pivoting...")
-            self.low_score_streak = 0
-
-
-            if not self.topic_syllabus:
-                print("...Syllabus complete. Ending interview.")
-                return {"status": "TERMINATED", "analysis": analysis, "reason": "SyllabusFinished"}
-
-            self.current_topic = self.topic_syllabus.pop(0)
-            print(f"...Pivoting to new topic: {self.current_topic}")
-            self.questions_in_current_topic = 0
-
-            next_question = self._get_gemini_pivot_question(
-                new_topic=self.current_topic,
-                user_answer=user_answer,
-                score=score,
-                answer_type=answer_type,
-                analysis_notes=analysis_notes
-            )
-
-        # 8. Default 'Fusion Pass' (SLM triage + Gemini refinement)
-        elif next_question is None:
-            # NEW: Expert escalation for truly strong NORMAL answers (skip SLM triage, ask deeper expert Q)
-            if answer_type == "NORMAL" and float(score) >= DEEP_ESCALATION_THRESHOLD:
-                print(f"...Strong NORMAL answer detected (score={score}). Escalating to expert-level follow-up.")
-                # Provide a hint to the Gemini Expert to ask a deeper, expert-level follow-up. Avoid praise and robotic transitions.
-                expert_hint = ("Candidate appears well-read. Ask a deeper, expert-level technical follow-up. "
-                               "You may include a short formula, a comparison, or ask for trade-offs. "
-                               "Do NOT use praise words.")
-                next_question = self._get_gemini_expert_question(hint=expert_hint)
-
-            else:
-                print(f"...Score ({score}) routed to Fusion Pass (SLM -> Gemini Editor).")
-                slm_draft_question = self._get_slm_triage_question()
-
-                if slm_draft_question is None or slm_draft_question == "[CONFIDENCE_LOW]":
-                    print("...SLM failed or escalated. Calling Gemini (Fallback).")
-                    fallback_hint = f"Candidate's score was {score} and the SLM (TFailure) failed. Use this hint: {hint}"
-                    next_question = self._get_gemini_expert_question(hint=fallback_hint)
-                else:
-                    # pass answer_type to refiner via extra_meta so it can adapt wording
-                    next_question = self._get_gemini_refinement(
-                        user_answer=user_answer,
-                        analysis_notes=analysis_notes,
-                        slm_output=slm_draft_question,
-                        hint=hint,
-                        answer_type=answer_type
-                    )
-
-        normalized_question = self._normalize_output(next_question)
-        self.last_question = normalized_question
-        self.conversation_history.append({"role": "assistant", "content": normalized_question})
-        # Count this question toward topic depth
-        self.questions_in_current_topic += 1
-
-
-        # Attach the latest score into the analysis return for user debugging
-        analysis_return = analysis.copy()
-        analysis_return['score_used'] = round(float(score), 1) if isinstance(score, (int, float)) else score
-
-        return {"status": "CONTINUE", "next_question": normalized_question, "analysis": analysis_return}
-
-# --- 3. Main execution loop ---
-def main():
-    if not GOOGLE_API_KEY:
-        print("❌ GOOGLE_API_KEY not found. Please set it in your .env file.")
-        return
-
-    if "phi3_interview_merged" not in SLM_MODEL_PATH.lower():
-        print(f"❌ Please update 'SLM_MODEL_PATH' (currently: {SLM_MODEL_PATH})")
-        print("   to point to your 'phi3_interview_merged.Q4_K_M.gguf' or '...F16.gguf' file.")
-        return
-
-    domain = input("Enter the interview domain (e.g., 'Data Science with Python'): ")
-
-    try:
-        chatbot = InterviewOrchestrator(domain)
-        if not chatbot.current_topic:
-            print("❌ Failed to create interview syllabus. Exiting.")
-            return
-
-        question = chatbot.start_interview()
-
-        while True:
-            print(f"\n{'='*20}\nBot: {question}\n{'='*20}")
-
-            try:
-                answer = input("You: ")
-            except KeyboardInterrupt:
-                print("\nInterview interrupted.")
-                break
-
-            if answer.lower() in ['quit', 'exit']:
-                print("Interview ended.")
-                break
-
-            response = chatbot.process_user_answer(answer)
-
-            print(f"\n--- [DEBUG ANALYSIS]: {json.dumps(response['analysis'], indent=2)} ---")
-
-            if response['status'] == "TERMINATED":
-                if response.get("reason") == "SyllabusFinished":
-                    print("\nBot: That covers all the main topics I wanted to discuss. Thank you for your time!")
-                else:
-                    print("\nBot: Thank you for your time. This concludes the interview.")
-                break
-
-            question = response['next_question']
-
-    except Exception as e: 
-        print("\n🚨 AN UNEXPECTED ERROR OCCURRED 🚨")
-        print(e)
-        print("\nPlease check your configuration and try again.")
-
-
-if __name__ == "__main__":
-    main()
-
-
-# interview_orchestrator.py
-# Merged and patched interview orchestrator per your final choices.
-# - Keeps your orchestration logic unchanged (Option A).
-# - Adds safer, human-like output normalization.
-# - Uses a separate Gemini Analyzer + separate Gemini Scorer.
-# - Treats 2 consecutive HESITATION_SIGNAL as KNOWLEDGE_GAP (mercy pivot).
-# - Momentum normalization_divisor and weight are configurable; defaults tuned below.
-# - Analyzer prompt now gets the last 1-2 assistant questions to help avoid repetition.
-# - Gemini Expert / Pivot prompts forbids robotic pivot phrases and semicolons and allows a 2-sentence output:
-#     sentence 1 = short transition (3-10 words)
-#     sentence 2 = concise factual question (<=20 words)
-#
-# KEY CHANGE (this file): pivot logic now requires 2 consecutive STRONG_NEGATIVE momentum detections
-# (a "grace window") before forcing an early pivot. This is implemented via self.pivot_grace_counter.
-
-import google.generativeai as genai
-import os
-import json
-import time
-from llama_cpp import Llama
-from dotenv import load_dotenv
-import re
-import random
-from typing import List
-# add near other imports at top of file
-from momentum_signal import compute_momentum
-
-# --- 1. Configuration ---
-load_dotenv()
-
-# --- ⚠️ IMPORTANT: USER MUST CONFIGURE THESE ---
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-SLM_MODEL_PATH = "Phi3_Interview_Merged-3.8B-F16.gguf"
-GEMINI_MODEL_NAME = "gemini-2.5-flash-lite"
-
-# Quality thresholds and tuning knobs
-QUALITY_THRESHOLD = 7         # used to mark strong overall performance (logging)
-DEEP_ESCALATION_THRESHOLD = 8.0  # >= this (and answer_type NORMAL) -> ask deeper/expert question
-AVERAGE_LOWER = 6.5          # 6.5-7.9 considered average
-WEAK_THRESHOLD = 6.5         # < this considered weak
-STRIKE_LIMIT = 2             # strike limit (kept but not enforced)
-
-# Momentum defaults (used when calling compute_momentum)
-DEFAULT_MOMENTUM_NORM_DIV = 5.0
-DEFAULT_MOMENTUM_WEIGHT = 1.25
-
-# Forbidden robotic phrases (used by multiple prompts)
-FORBIDDEN_TRANSITIONS = [
-    "let's switch gears",
-    "pivoting to a new topic",
-    "understood, let's move on",
-    "let's shift gears",
-    "let's move on",
-    "let's continue to",
-    "let's change topic",
-    "switching gears",
-    "pivoting"
-]
-
-# --- 2. Prompts (The "Brains" of the Operation) ---
-GLOBAL_INTERVIEWER_PROMPT = """
-You are a calm, professional, and natural-sounding technical interviewer.
-- Your tone is curious and encouraging, not robotic or like a textbook.
-- You ask one short, focused question at a time (transition sentence optionally allowed).
-- You do not use overly formal phrases like "Therefore" or "Moreover".
-- You seamlessly adapt the conversation based on the candidate's performance.
-
-**CRITICAL TONE RULE:**
-Your transitions must be natural and conversational. Do NOT use robotic phrases like any of: {forbidden}
-Do NOT use semicolons in your outputs. Short transition sentence (3-10 words) may be followed by a single question sentence.
-"""
-
-PROMPT_SYLLABUS_GENERATOR = """
-You are an expert technical recruiter. Generate a JSON list of 5-7 *distinct, non-overlapping* key sub-topics for a 15-minute interview on the domain of '{domain}'.
-Focus on *factual* areas. For example, for 'ML', topics should be like 'Supervised vs. Unsupervised', 'Regression Algorithms', 'Classification Metrics', 'Overfitting', 'Neural Networks'.
-Avoid abstract topics like 'Problem Framing'.
-Output *only* the JSON list.
-"""
-
-# [Call Type 1: Gemini L0 Generator]
-PROMPT_L0_GENERATOR = """
-You are an expert technical interviewer. You are about to begin an interview in the domain: {domain}.
-
-Generate exactly ONE concise, domain-factual opening question that:
-
-- feels like a natural, light opening (you MAY include a short greeting like "Alright, let's begin," or "Great, to start,"),
-- is simple, factual, and introductory,
-- stays strictly within the technical domain (NO motivation/interest/personal questions),
-- asks about a fundamental concept, principle, component, or mechanism,
-- avoids deep theoretical math or highly advanced subtopics,
-- is within ~18–20 words,
-- is a single question (no multi-part),
-- has no extra commentary or explanation,
-- outputs ONLY the question (with greeting if used).
-
-**STRICT RULE:** The question MUST be factual and technical.
-Output: one concise, factual opening question only.
-"""
-
-# [Call Type 2: Gemini Analyzer/Judge/Strategist]
-# NOTE: This prompt now includes the last 1-2 assistant questions (recent_questions)
-PROMPT_ANALYZER = """
-You are an expert interview judge and strategist. Your job is to analyze the candidate's last answer and provide a JSON-ONLY response to guide the next step.
-
-**Context**
-Question: {question}
-Answer: {answer}
-Recent_Assistant_Questions: {recent_questions_json}
-
-====================================================
-STRICT ANSWER CLASSIFICATION RULES (MATCH SYSTEM LOGIC)
-====================================================
-
-Before choosing `answer_type`, apply these exact rules:
-
-1. HESITATION_SIGNAL (Highest Priority – Overrides ALL others)
-- If the answer contains hesitation tokens: "umm", "uh", "uhh", "hmm", "er", "ah", "...", "uhm"
-- OR includes trailing-off / half-sentences like "it works when the signal..."
-- OR contains fewer than 3 meaningful words (ignore common fillers like "like", "sure", "okay", "well").
-
-→ answer_type = HESITATION_SIGNAL
-
-2. KNOWLEDGE_GAP (Only if user explicitly expresses not knowing)
-- If the user writes "idk", "I don't know", "not sure", "pata nhi", "no idea", "haven't read", etc.
-→ answer_type = KNOWLEDGE_GAP
-
-3. EVASIVE_NON_ANSWER
-- If user avoids answering without admitting ignorance: e.g., "can you rephrase?", "sure", "okay", "yes", "hmm", "I'll answer", "trying to think"
-→ answer_type = EVASIVE_NON_ANSWER
-
-4. EVASIVE_CHALLENGE
-- If user challenges the interviewer: e.g., "stupid question", "you tell", "this is pointless", "chup kar"
-→ answer_type = EVASIVE_CHALLENGE
-
-5. FACTUALLY_INCORRECT
-- If the content is confidently stated but factually wrong for the topic.
-→ answer_type = FACTUALLY_INCORRECT
-
-6. VAGUE
-- On-topic, >3 meaningful words, not factually wrong, but missing core details.
-→ answer_type = VAGUE
-
-7. NORMAL
-- Reasonably correct, enough detail, not hesitant, vague, or wrong.
-→ answer_type = NORMAL
-
-NOTE: The analyzer should provide a textual advisory score for human inspection only, but this orchestrator will IGNORE any numeric value from the analyzer and rely on a dedicated numeric scorer for decisions.
-
-FOLLOW-UP QUESTION GUIDELINES:
-- Your `strategic_question` must follow from the candidate's level, be factual, never repeat the same question,
-  and shift to a related sub-concept if the user struggles.
-- **Important:** If the proposed `strategic_question` would repeat any of the items in Recent_Assistant_Questions, choose a different, non-repeating strategic_question.
-
-OUTPUT STRICTLY THIS JSON:
-{{
-  "content_summary": "<one-line neutral summary of candidate's answer>",
-  "answer_quality_score": <float 0.0-10.0 rounded to 1 decimal, advisory only>,
-  "answer_type": "<One of: 'Normal','Vague','HESITATION_SIGNAL','Factually_Incorrect','KNOWLEDGE_GAP','EVASIVE_NON_ANSWER','EVASIVE_CHALLENGE'>",
-  "analysis_notes": "<one sentence explaining the classification and score>",
-  "strategic_question": "<ONE factual follow-up question ONLY, not repeating recent assistant questions>",
-  "topic_is_complete": false,
-  "safety_violation": false,
-  "terminate_interview": false,
-  "reason_for_termination": null
-}}
-"""
-
-# ---------------- NEW SCORER PROMPT (separate call) ----------------
-PROMPT_SCORER = """
-You are a strict numeric scorer for a short technical interview answer.
-Input:
-- Question: {question}
-- Answer: {answer}
-
-Output (JSON ONLY):
-{{
-  "score": <float between 0.0 and 10.0 rounded to 1 decimal>,
-  "score_reason": "<one-sentence justification for the score>"
-}}
-
-SCORING RULES:
-- 8.0–10.0: Correct, clear, and mostly complete.
-- 5.0–7.9: Partially correct, some important details missing.
-- 3.0–4.9: On-topic but vague or incomplete.
-- 1.1–2.9: Attempted but factually incorrect.
-- 0.0–1.0: Knowledge gap, hesitation, nonsense, or <3 meaningful words.
-
-Round to one decimal place. Output valid JSON and nothing else.
-"""
-
-# [Call Type 3: Gemini Expert/Fallback]
-PROMPT_GEMINI_EXPERT = """
-{global_prompt}
-
-You are taking over the conversation. 
-Interview Domain: {domain}
-Full Conversation History:
-{history}
-
-Your Task:
-Generate the next single, human-like, professional follow-up. No preamble.
-
-CRITICAL CONSTRAINTS:
-- Do NOT use semicolons.
-- Do NOT use any of the forbidden robotic phrases: {forbidden}.
-- Do NOT use praise words (good, great, excellent, nice, fascinating, interesting) for weak, vague, incorrect, or hesitation answers.
-- You MAY output up to TWO short sentences:
-  1) a short transition phrase (3-10 words) — OPTIONAL but allowed,
-  2) a HIGH-QUALITY factual question (<=20 words).
-- The final output must be natural, conversational, and not lecturing.
-- Do NOT repeat the exact last 1-2 assistant questions.
-
-**QUESTION QUALITY RULES:**
-- Do NOT just echo words from the candidate's answer and ask "what does X do?"
-- INSTEAD, ask questions that test deeper understanding:
-  • Request concrete examples or real-world applications
-  • Ask about specific algorithms, techniques, or mechanisms
-  • Compare related concepts or explore trade-offs
-  • Correct misconceptions and ask for clarification
-  • Ask "how would you implement/apply [concept]?" not "what is [concept]?"
-- If candidate is vague, ask for specifics, not more vagueness
-
-Strategic Hint: {hint}
-
-Output: exactly the transition (optional) plus the question (required), separated by a single space or newline.
-"""
-
-# [Call Type 4: SLM Triage Prompt] (The "Smart Triage" prompt)
-PROMPT_SLM_TRIAGE = """
-You are a succinct technical interviewer for the domain: {topic}.
-Your single job: produce ONE short-follow up question (12–18 words max) that is:
-- a factual, clarifying, or easy next step given the candidate's last answer,
-- never multi-part, never a lecture, and never includes praise (no good, great, excellent, nice, fascinating, interesting).
-Output must be exactly the question text only (no preamble, no commentary).
-
-Constraints:
-- If the candidate's last answer shows hesitation, trailing off, filler tokens (e.g., "umm", "uh", "hmm", "..."),
-  or contains fewer than 3 meaningful (non-filler) words, output the single token: [CONFIDENCE_LOW]
-- If you cannot produce a clear, concise question within 18 words, return: [CONFIDENCE_LOW]
-
-Tone: calm, short, and clarifying.
-"""
-
-# [Call Type 5: Gemini Refiner]
-PROMPT_REFINER = """
-{global_prompt}
-
-You are an Editor-in-Chief for an AI interviewer. Create the perfect, concise follow-up.
-You will be given the candidate's last (flawed) answer, the Judge's analysis, and a Draft question from an SLM interviewer.
-
-Candidate's Last Answer:
-"{user_answer}"
-
-Judge's Analysis:
-"{analysis_notes}"
-
-SLM Draft Question:
-"{slm_output}"
-
-Extra Meta: {extra_meta}
-
-Your Task:
-1) If extra_meta indicates answer_type is HESITATION_SIGNAL:
-   - Do NOT praise.
-   - Start with a short acknowledgement like "No problem, take your time." (<=6 words).
-   - Then ask one very simple clarifying question (<=12 words).
-   - Output may be two sentences: acknowledgement sentence + clarifying question sentence.
-2) Otherwise:
-   - Start with one short (3–7 word) natural feedback phrase (no lecture).
-   - CRITICAL: Do NOT use praise words (good, great, excellent, nice, fascinating, interesting) if answer_type is VAGUE, FACTUALLY_INCORRECT, EVASIVE_NON_ANSWER, or EVASIVE_CHALLENGE.
-   - Then ask exactly one HIGH-QUALITY follow-up question (<=20 words).
-   - Output may be two sentences: feedback sentence + question sentence.
-
-3) **CRITICAL - QUESTION QUALITY RULES:**
-   - Do NOT just pick words from the candidate's answer and ask "what does X do?" or "how does X work?"
-   - Do NOT ask vague questions like "tell me more" or "can you elaborate?"
-   - INSTEAD, ask questions that:
-     a) Request concrete examples: "Can you give an example of [concept] in practice?"
-     b) Test understanding: "How would you apply [concept] to [specific scenario]?"
-     c) Explore mechanisms: "What algorithm or technique is used for [task]?"
-     d) Compare concepts: "What's the difference between [A] and [B]?"
-     e) Correct misconceptions: If answer is wrong, gently correct and ask for clarification
-     f) Go deeper: Ask about trade-offs, challenges, or real-world applications
-   - If answer is VAGUE or INCORRECT, ask for specifics, examples, or mechanisms, not just "what does X mean?"
-
-4) Under all circumstances:
-   - Do NOT use semicolons.
-   - Do NOT use any forbidden robotic transitions: {forbidden}.
-   - Do NOT repeat any of the last 1–2 assistant questions.
-   - Output EXACTLY the feedback/acknowledgement + question (1-2 sentences), nothing else.
-5) Feedback rules:
-   - You MAY optionally skip the feedback phrase entirely (0–1 sentences). If you choose to include feedback, vary it widely and avoid repeating earlier patterns.
-   - When you choose to include feedback, rotate between:
-   - brief affirmations ("Alright", "Got it", "Makes sense")
-   - soft redirects ("Okay, let’s explore further", "Alright, another angle")
-   - neutral transitions ("Sure", "Alright then")
-
-Never repeat the same lead-in phrase twice in back-to-back turns.
-Avoid repeating the same phrases such as “That’s a good start”, “Right”, “Good”, “Okay”, or similar—vary your language.
-
-Final output must be natural and brief.
-"""
-
-# [Call Type 6: Gemini Pivot Generator]
-PROMPT_TOPIC_PIVOT = """
-You are generating the FIRST question for a NEW topic: {topic}.
-
-Input summary:
-- Candidate Answer: "{user_answer}"
-- Score: {score}
-- Answer Type: {answer_type}
-- Judge Notes: {analysis_notes}
-- Recent Assistant Questions: {recent_questions_json}
-
-Task:
-1) Produce up to TWO short sentences:
-   - Sentence 1 (optional): a short, human transition phrase (3–10 words) that reflects tone.
-   - Sentence 2 (required): one factual L0 opening but theoretical interview level question about the new topic (<=20 words).
-2) Do NOT use semicolons.
-3) Do NOT use any forbidden robotic phrases: {forbidden}.
-4) Do NOT repeat any of the items listed in Recent_Assistant_Questions.
-5) Difficulty should depend on recent performance: easier if confused, moderate if average, deeper if confident.
-6) Use a wide range of synonyms for acknowledgements and transitions. Do not reuse any phrase more than once per 5 turns.
-7) The transition should connect naturally to the user’s last response while smoothly guiding the conversation toward the pivot question.
-8) do NOT use praise or positive adjectives (fascinating, great, good, interesting, nice, excellent, etc.) if answer type is NOT Normal.
-8) Output EXACTLY the transition and question (required) as 1-2 sentences.
-
-Examples of valid output:
-"Alright, let's try something else. What is the main function of MAC protocols?"
-or
-"Good. What is the role of antenna diversity in wireless systems?"
-
-Output only the transition+question text.
-"""
-
-# -------------------------
-# InterviewOrchestrator class
-# -------------------------
-class InterviewOrchestrator:
-    """
-    Manages the ADAPTIVE interview flow, switching between SLM and Gemini.
-    Patches applied per user spec: analyzer receives last 1-2 assistant questions,
-    2 consecutive hesitations -> knowledge gap, momentum normalization configurable,
-    refined prompts forbidding robotic phrases and semicolons, and normalized outputs.
-
-    KEY CHANGE: Analyzer numeric/advisory score is IGNORED for orchestration decisions.
-               Numeric decisions rely on the dedicated Scorer (Gemini Scorer).
-               Pivot logic requires 2 consecutive STRONG_NEGATIVE momentum detections
-               (grace window), tracked by self.pivot_grace_counter.
-    """
-    def __init__(self, domain):
-        self.domain = domain
-        self.hesitation_streak = 0
-        self.conversation_history = []
-        self.last_question = ""
-        self.low_score_streak = 0
-        self.recent_scores = []   # holds last user scores for momentum computation
-
-        self.topic_syllabus = []
-        self.current_topic = ""
-        # Track how many questions have been asked in the current topic
-        self.questions_in_current_topic = 0
-
-        # Question spacing control: enforce minimum gap between final questions
-        self.last_question_time = 0
-
-        # pivot grace counter: require N consecutive strong-negative momentum detections before forcing pivot
-        self.pivot_grace_counter = 0
-        self.PIVOT_GRACE_REQUIRED = 2  # require 2 consecutive weak turns to pivot
-
-        # 1. Configure Gemini
-        print(f"Configuring Gemini with model: {GEMINI_MODEL_NAME}")
-        genai.configure(api_key=GOOGLE_API_KEY)
-        self.gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        # a JSON config reused for JSON outputs
-        self.json_config = genai.GenerationConfig(response_mime_type="application/json")
-
-        # 2. Configure SLM
-        self.slm_model = None
-        try:
-            print(f"Loading SLM from: {SLM_MODEL_PATH}...")
-            print("This will take a moment as it loads into your M4's GPU RAM...")
-            start_load = time.time()
-            self.slm_model = Llama(
-                model_path=SLM_MODEL_PATH,
-                n_gpu_layers=-1,
-                n_ctx=2048,
-                verbose=False
-            )
-            load_time = time.time() - start_load
-            print(f"✅ SLM (GGUF) model loaded in {load_time:.2f} seconds.")
-        except Exception as e:
-            print(f"❌ FAILED TO LOAD SLM MODEL from {SLM_MODEL_PATH}")
-            print(f"   Make sure 'SLM_MODEL_PATH' is correct.")
-            print(f"   Error: {e}")
-            print("   Will continue in Gemini-only fallback mode.")
-
-        # 3. Generate the Syllabus
-        self._generate_syllabus()
-
-    def _respect_question_gap(self, min_gap=4):
-        """
-        Enforces a minimum time gap between final interview questions sent to the user.
-        This prevents rapid-fire questioning and creates a more natural interview pace.
-        """
-        now = time.time()
-        elapsed = now - self.last_question_time
-        if elapsed < min_gap:
-            wait = min_gap - elapsed
-            print(f"...Question spacing guard: waiting {wait:.2f}s before sending next question...")
-            time.sleep(wait)
-        self.last_question_time = time.time()
-
-    def _generate_syllabus(self):
-        """[Call 0] Generates the interview topic plan at the start."""
-        print(f"\n...Generating interview syllabus for: {self.domain}...")
-        try:
-            prompt = PROMPT_SYLLABUS_GENERATOR.format(domain=self.domain)
-            json_config_syllabus = genai.GenerationConfig(response_mime_type="application/json")
-            response = self.gemini_model.generate_content(prompt, generation_config=json_config_syllabus)
-
-            clean_response = response.text.replace("```json", "").replace("```", "").strip()
-            self.topic_syllabus = json.loads(clean_response)
-
-            if not self.topic_syllabus:
-                raise ValueError("Syllabus is empty")
-
-            print("...Shuffling syllabus topics...")
-            random.shuffle(self.topic_syllabus)
-
-            # 1. Force the {domain} to be the very first item in the list
-            self.topic_syllabus.insert(0, self.domain)
-            # 2. Now pop it. current_topic becomes {domain}, and the rest wait in the queue.
-            self.current_topic = self.topic_syllabus.pop(0)
-            # Reset topic question counter
-            self.questions_in_current_topic = 0
-
-
-            print(f"✅ Syllabus created. First topic: {self.current_topic}")
-            print(f"   Remaining topics: {self.topic_syllabus}")
-
-        except Exception as e:
-            print(f"❌ FAILED TO GENERATE SYLLABUS. Error: {e}")
-            print("...Defaulting to a single-topic interview.")
-            self.current_topic = self.domain  # Fallback
-
-    def start_interview(self):
-        """[Call Type 1] Generates the first L0 question using Gemini."""
-        print(f"\n...Calling Gemini for L0 question (Topic: {self.current_topic})...")
-
-        prompt = PROMPT_L0_GENERATOR.format(
-            global_prompt=GLOBAL_INTERVIEWER_PROMPT,
-            domain=self.domain
-        )
-
-        self._respect_question_gap()
-        response = self.gemini_model.generate_content(prompt)
-
-        l0_question = self._normalize_output(response.text.strip())
-        self.last_question = l0_question
-        self.conversation_history.append({"role": "assistant", "content": l0_question})
-        return l0_question
-
-    def _normalize_output(self, text: str) -> str:
-        """
-        Cleans up the bot's response to ensure a consistent, human tone.
-        Key fixes:
-        - Remove semicolons.
-        - Replace robotic glue phrases.
-        - Ensure proper punctuation (one question mark if missing).
-        - Prevent double spaces and trailing punctuation.
-        - Keep up to 2 sentences (transition + question) if present.
-        """
-        if not text:
-            return text
-
-        # Strip surrounding whitespace and quotes
-        text = text.strip().strip('"').strip("'")
-
-        # Replace a few canned formal connectors with friendlier phrases
-        text = text.replace("Therefore,", "So,")
-        text = text.replace("Moreover,", "Also,")
-        text = text.replace("In conclusion,", "Ultimately,")
-
-        # Remove semicolons entirely
-        text = text.replace(";", ",")
-
-        # Remove forbidden robotic phrases (case-insensitive)
-        for phrase in FORBIDDEN_TRANSITIONS:
-            pattern = re.compile(re.escape(phrase), flags=re.IGNORECASE)
-            text = pattern.sub("", text)
-
-        # Collapse multiple punctuation/whitespace
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\s+([?.!,])', r'\1', text)
-        text = re.sub(r'([?.!,]){2,}', r'\1', text)
-
-        # Ensure the output ends with punctuation; if the last sentence seems to be a question, ensure '?'
-        if not re.search(r'[.?!"\']$', text):
-            # if likely a question (contains words like what, why, how, when, which, describe), add '?'
-            if re.search(r'\b(what|why|how|when|which|describe|explain|tell)\b', text.lower()):
-                text = text + "?"
-            else:
-                text = text + "."
-
-        # Trim to at most two sentences.
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        if len(sentences) > 2:
-            sentences = sentences[-2:]  # keep last two sentences (transition+question preferred)
-        # Reconstruct with single space
-        final = " ".join(s.strip() for s in sentences).strip()
-
-        # Final safety: remove leading/trailing punctuation anomalies
-        final = final.strip()
-        final = re.sub(r'^[\s\.,;:]+', '', final)
-        final = re.sub(r'[\s\.,;:]+$', '', final)
-
-        return final
-
-    def _get_recent_assistant_questions(self, n: int = 2) -> List[str]:
-        """
-        Return the last n assistant questions content (most recent first).
-        """
-        assistant_qs = [turn['content'] for turn in reversed(self.conversation_history) if turn['role'] == 'assistant']
-        return assistant_qs[:n]
-
-    def _get_gemini_analysis(self, question: str, answer: str):
-        """[Call Type 2] Calls Gemini to analyze and classify the answer (Analyzer).
-        NOTE: The numeric 'answer_quality_score' produced by analyzer is advisory only and
-        intentionally IGNORED by the orchestrator. We still rely on analyzer for 'answer_type',
-        'analysis_notes', and 'strategic_question' textual guidance.
-        """
-        print("\n...Calling Gemini (Judge/Strategist) for analysis...")
-        recent_qs = self._get_recent_assistant_questions(2)
-        try:
-            recent_json = json.dumps(recent_qs)
-        except:
-            recent_json = "[]"
-
-        prompt = PROMPT_ANALYZER.format(
-            question=question,
-            answer=answer,
-            recent_questions_json=recent_json
-        )
-        try:
-            response = self.gemini_model.generate_content(
-                prompt,
-                generation_config=self.json_config
-            )
-            clean_response = response.text.replace("```json", "").replace("```", "").strip()
-            analysis = json.loads(clean_response)
-
-            def to_bool(val):
-                if isinstance(val, bool):
-                    return val
-                return str(val).lower() == 'true'
-
-            analysis['terminate_interview'] = to_bool(analysis.get('terminate_interview'))
-            # Keep analyzer's topic_is_complete parsed but we will not rely on it for orchestrator decisions per user instruction
-            analysis['topic_is_complete'] = to_bool(analysis.get('topic_is_complete'))
-
-            return analysis
-
-        except Exception as e:
-            print(f"❌ Error parsing Gemini analysis JSON: {e}")
-            try:
-                raw = response.text
-            except:
-                raw = "<no raw response>"
-            print(f"   Raw response: {raw}")
-            return {
-                "content_summary": "Analysis failed",
-                "answer_quality_score": 0.0,
-                "answer_type": "Normal",
-                "analysis_notes": "JSON parsing error.",
-                "strategic_question": "Ask a simple, re-phrased question.",
-                "topic_is_complete": False,
-                "terminate_interview": False,
-                "reason_for_termination": "Analysis Error"
-            }
-
-    def _get_gemini_score(self, question: str, answer: str):
-        """NEW: [Call SCORER] Calls Gemini with the separate scoring prompt and returns a float score and reason."""
-        print("\n...Calling Gemini (Scorer) for numeric score...")
-        prompt = PROMPT_SCORER.format(question=question, answer=answer)
-        try:
-            # Use json config for strict JSON parsing
-            response = self.gemini_model.generate_content(prompt, generation_config=self.json_config)
-            clean_response = response.text.replace("```json", "").replace("```", "").strip()
-            score_json = json.loads(clean_response)
-            # Ensure rounding to 1 decimal
-            score_val = float(score_json.get("score", 0.0))
-            # Clamp between 0 and 10
-            if score_val < 0.0:
-                score_val = 0.0
-            if score_val > 10.0:
-                score_val = 10.0
-            # Round to 1 decimal
-            score_val = round(score_val, 1)
-            score_reason = str(score_json.get("score_reason", "")).strip()
-            print(f"...Scorer returned: {score_val} — {score_reason}")
-            return {"score": score_val, "score_reason": score_reason}
-        except Exception as e:
-            print(f"❌ Scorer call or JSON parse failed: {e}")
-            try:
-                raw = response.text
-            except:
-                raw = "<no raw response>"
-            print(f"   Raw scorer response: {raw}")
-            # Important: DO NOT fallback to analyzer numeric score; instead return failure indicator
-            return {"score": None, "score_reason": "Scorer failed"}
-
-    def _get_slm_triage_question(self):
-        """[Call Type 4] Calls the local SLM to *think*."""
-        if self.slm_model is None:
-            print("...SLM not loaded. Skipping...")
-            return None
-
-        print("...Calling local SLM (Triage) to *think*...")
-
-        system_content = PROMPT_SLM_TRIAGE.format(topic=self.current_topic)
-
-        messages = []
-        messages.append({"role": "system", "content": system_content})
-        messages.extend(self.conversation_history)
-
-        try:
-            # Conservative SLM call: short, low temperature for concise drafts
-            output = self.slm_model.create_chat_completion(
-                messages=messages,
-                max_tokens=80,   # shorter drafts
-                stop=["<|end|>", "<|user|>", "You:", "Candidate:", "Interviewer:"],
-                temperature=0.25  # conservative, less creative
-            )
-            next_question = output['choices'][0]['message']['content'].strip()
-
-            if not next_question:
-                print("...SLM FAILED (empty response).")
-                return None
-
-            # If SLM itself returned the bailout token, accept it.
-            if "[CONFIDENCE_LOW]" in next_question:
-                print("...SLM successfully triggered [CONFIDENCE_LOW].")
-                return "[CONFIDENCE_LOW]"
-
-            # Post-validate the SLM question: require at least 3 meaningful words,
-            # and reject if it contains hesitation tokens or ellipses.
-            def meaningful_word_count(s):
-                # remove common filler tokens and punctuation, then count words of length>1
-                fillers = {"umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "like", "...", "uhm"}
-                tokens = re.findall(r"[A-Za-z']+", s.lower())
-                meaningful = [t for t in tokens if t not in fillers and len(t) > 1]
-                return len(meaningful)
-
-            hesitation_tokens = ["umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "...", "uhm"]
-
-            if any(tok in next_question.lower() for tok in hesitation_tokens):
-                print("...SLM output contains hesitation tokens; treating as [CONFIDENCE_LOW].")
-                return "[CONFIDENCE_LOW]"
-
-            if meaningful_word_count(next_question) < 3:
-                print("...SLM output too short (fewer than 3 meaningful words); treating as [CONFIDENCE_LOW].")
-                return "[CONFIDENCE_LOW]"
-
-            # All checks passed — accept SLM draft.
-            print(f"...SLM (Triage) generated draft: \"{next_question}\"")
-            return next_question
-
-        except Exception as e:
-            print(f"...SLM FAILED (Exception): {e}")
-            return None
-
-    def _get_gemini_expert_question(self, hint: str):
-        """[Call Type 3] Calls Gemini for an "Expert" or "Fallback" question."""
-        print(f"...Calling Gemini (Expert/Fallback). Hint: {hint}...")
-
-        history_str = ""
-        for turn in self.conversation_history:
-            role = "Interviewer" if turn['role'] == 'assistant' else "Candidate"
-            history_str += f"{role}: {turn['content']}\n"
-
-        prompt = PROMPT_GEMINI_EXPERT.format(
-            global_prompt=GLOBAL_INTERVIEWER_PROMPT,
-            domain=self.domain,
-            history=history_str,
-            hint=hint,
-            forbidden=", ".join([f'"{p}"' for p in FORBIDDEN_TRANSITIONS])
-        )
-
-        response = self.gemini_model.generate_content(prompt)
-        return response.text.strip()
-
-    def _get_gemini_refinement(self, user_answer: str, analysis_notes: str, slm_output: str, hint: str, answer_type: str = None):
-        """[Call Type 5] Calls Gemini "Editor" to create the final, concise response."""
-        print(f"...Sending all context to Gemini (Editor) for final question...")
-
-        # Compose extra_meta from explicit answer_type (if provided).
-        if answer_type:
-            extra_meta = f"[ANSWER_TYPE: {answer_type}]"
-        else:
-            # Fallback: infer neutral
-            extra_meta = "[ANSWER_TYPE: NORMAL]"
-
-        # Provide recent assistant questions to the refiner so it doesn't repeat.
-        recent_qs = self._get_recent_assistant_questions(2)
-        extra_meta = extra_meta + f" [RECENT_ASSISTANT_QS: {json.dumps(recent_qs)}]"
-
-        prompt = PROMPT_REFINER.format(
-            global_prompt=GLOBAL_INTERVIEWER_PROMPT,
-            user_answer=user_answer,
-            analysis_notes=analysis_notes,
-            slm_output=slm_output,
-            extra_meta=extra_meta,
-            forbidden=", ".join([f'"{p}"' for p in FORBIDDEN_TRANSITIONS])
-        )
-
-        self._respect_question_gap()
-        response = self.gemini_model.generate_content(prompt)
-        return response.text.strip()
-
-    def _get_gemini_pivot_question(self, new_topic: str, user_answer: str, score, answer_type: str, analysis_notes: str):
-        """[Call Type 6] Calls Gemini to get a new L0 question for a topic pivot."""
-        print(f"...Calling Gemini (Pivot) for new L0 question on: {new_topic}...")
-
-        recent_qs = self._get_recent_assistant_questions(2)
-        recent_json = json.dumps(recent_qs)
-
-        prompt = PROMPT_TOPIC_PIVOT.format(
-            global_prompt=GLOBAL_INTERVIEWER_PROMPT,
-            topic=new_topic,
-            user_answer=user_answer,
-            score=score,
-            answer_type=answer_type,
-            analysis_notes=analysis_notes,
-            recent_questions_json=recent_json,
-            forbidden=", ".join([f'"{p}"' for p in FORBIDDEN_TRANSITIONS])
-        )
-
-        self._respect_question_gap()
-        response = self.gemini_model.generate_content(prompt)
-        return response.text.strip()
-
-    def process_user_answer(self, user_answer: str):
-        """
-        Main orchestration: Analyzer -> (dedicated) Scorer -> Triage/Refiner/Pivot decisions.
-
-        KEY BEHAVIORAL NOTES:
-        - Analyzer is used for classification (answer_type) and text guidance only.
-        - Analyzer numeric score is IGNORED by the orchestrator.
-        - Dedicated numeric decisions come from the separate Gemini Scorer call.
-        - If Scorer fails to return a numeric score, we fall back to a conservative default:
-          use the last known valid score (if any) else 0.0. We do NOT use analyzer numeric values.
-        - For strong NORMAL answers (score >= DEEP_ESCALATION_THRESHOLD) we escalate
-          to an expert-level question (via Gemini Expert) to ask deeper technical / formulaic questions.
-        - Pivot logic: momentum-caused pivot requires PIVOT_GRACE_REQUIRED consecutive detections.
-        """
-        self.conversation_history.append({"role": "user", "content": user_answer})
-        analysis = self._get_gemini_analysis(self.last_question, user_answer)
-
-        # Extract classification and notes from analyzer
-        answer_type = analysis.get("answer_type", "Normal")
-
-        # Track consecutive hesitations
-        if answer_type == "HESITATION_SIGNAL":
-            self.hesitation_streak += 1
-        else:
-            self.hesitation_streak = 0
-
-        # AUTO-CONVERT 2 consecutive hesitations into KNOWLEDGE_GAP (user requested)
-        if self.hesitation_streak >= 2 and answer_type == "HESITATION_SIGNAL":
-            answer_type = "KNOWLEDGE_GAP"
-            analysis["answer_type"] = "KNOWLEDGE_GAP"
-            print("...Multiple consecutive hesitations detected → treating as KNOWLEDGE_GAP for mercy pivot.")
-
-        analysis_notes = analysis.get("analysis_notes", "")
-        hint = analysis.get("strategic_question", "Ask a logical follow-up.")
-        # ignore analyzer's topic_is_complete for orchestration decisions (user requested)
-        topic_complete_flag = False
-
-        # ------------- Priority 1: Safety / Immediate Termination -------------
-        if analysis.get("terminate_interview", False):
-            reason = analysis.get("reason_for_termination", "Safety violation or candidate refusal.")
-            print(f"\nTERMINATING INTERVIEW. Reason: {reason}")
-            return {"status": "TERMINATED", "analysis": analysis}
-
-        # ------------- Priority 2: Knowledge Gap (instant mercy pivot) -------------
-        # If user explicitly says "I don't know" (KNOWLEDGE_GAP) — immediate mercy pivot (no scoring call)
-        if answer_type == "KNOWLEDGE_GAP":
-            print(f"...User 'KNOWLEDGE_GAP' detected. Forcing a 'Mercy Pivot' (no scoring).")
-            topic_complete_flag = True
-            hint = f"Candidate is stuck on '{self.current_topic}'. Ask a new L0 question for the next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-            # Do not call scorer — immediate pivot
-            score = 0.0
-            # defensive: prevent momentum forced pivot this round
-            momentum_causes_forced_pivot = False
-        else:
-            # ------------- Else: call the separate scorer -------------
-            score_result = self._get_gemini_score(self.last_question, user_answer)
-            score = score_result.get("score", None)
-            score_reason = score_result.get("score_reason", "")
-
-            # If scorer failed, do NOT fallback to analyzer numeric score.
-            if score is None:
-                # fallback: last known valid score or 0.0
-                last_valid = None
-                for s in reversed(self.recent_scores):
-                    try:
-                        if s is not None:
-                            last_valid = float(s)
-                            break
-                    except:
-                        continue
-                if last_valid is not None:
-                    score = round(last_valid, 1)
-                    print(f"...Scorer failed. Falling back to last known score: {score}")
-                else:
-                    score = 0.0
-                    print("...Scorer failed. No previous score found. Using conservative score: 0.0")
-            else:
-                # we have a valid scorer value
-                pass
-
-        # Maintain recent scores for momentum and density (oldest...newest)
-        try:
-            self.recent_scores.append(float(score))
-        except:
-            self.recent_scores.append(0.0)
-
-        if len(self.recent_scores) > 10:
-            self.recent_scores = self.recent_scores[-10:]
-
-        # Compute sliding-window momentum signal (uses normalization_divisor and weight)
-        momentum_info = compute_momentum(self.recent_scores,
-                                        normalization_divisor=DEFAULT_MOMENTUM_NORM_DIV,
-                                        weight=DEFAULT_MOMENTUM_WEIGHT)
-        momentum_signal = momentum_info['signal']
-        momentum_norm = momentum_info['norm']
-        momentum_weighted = momentum_info['weighted']
-
-        # Debug output for momentum
-        print(f"...[MOMENTUM DEBUG] raw={momentum_info['raw']:.3f}, norm={momentum_norm:.3f}, "
-              f"weighted={momentum_weighted:.3f}, signal={momentum_signal}")
-
-        # Update low_score_streak for logging/observability (use scorer-derived score)
-        if float(score) <= 1.5:
-            self.low_score_streak += 1
-            print(f"...Low score streak is now: {self.low_score_streak}")
-        else:
-            self.low_score_streak = 0
-
-        # Grade letter (for logs)
-        grade_letter = "A"
-        if score <= 1.5:
-            grade_letter = "L"
-        elif score >= QUALITY_THRESHOLD:
-            grade_letter = "H"
-
-        print(f"...Score ({score}) [{grade_letter}] Analysis...")
-
-        # ------- Minimal density-based fallback (replaces hard strike-limit) -------
-        density_window = 2  # Reduced for faster pivot
-        density_thresh = 0.75  # e.g., 75% of window being L triggers pivot
-        recent_for_density = self.recent_scores[-density_window:]
-        low_count = sum(1 for s in recent_for_density if s <= 1.5)
-        low_density_trigger = (len(recent_for_density) == density_window and (low_count / density_window) >= density_thresh)
-
-        # ------- Momentum-influenced policy adjustments (soft MP3) -------
-        momentum_causes_forced_pivot = (momentum_signal == "STRONG_NEGATIVE")
-        # Prevent momentum-caused pivot if knowledge gap was detected earlier
-        if answer_type == "KNOWLEDGE_GAP":
-            momentum_causes_forced_pivot = False
-
-        next_question = None
-
-        # ---------------- ROUTING LOGIC (preserve original priorities) ----------------
-        # 3. Judge's (Gemini) pivot — NOT used for topic_is_complete orchestration, but keep compatibility:
-        # We will ignore analysis['topic_is_complete'] for automatic pivoting to avoid false positives.
-
-        # 4. Behavioral interceptors (EVASIVE / CHALLENGE)
-        if answer_type == "EVASIVE_NON_ANSWER":
-            print(f"...User is stalling. Calling Gemini (Expert) to be firm.")
-            hint = f"The candidate is stalling ('{user_answer}'). Politely but firmly, re-ask the last question: '{self.last_question}'"
-            next_question = self._get_gemini_expert_question(hint=hint)
-
-        elif answer_type == "EVASIVE_CHALLENGE":
-            print(f"...User is challenging. Calling Gemini (Expert) to restate role.")
-            hint = f"The candidate is challenging ('{user_answer}'). Politely restate your role as the interviewer and then re-ask the last question: '{self.last_question}'"
-            next_question = self._get_gemini_expert_question(hint=hint)
-
-        # ---------- BEGIN: PRIORITIZED HESITATION / KNOWLEDGE / PIVOT GUARDS ----------
-        # Optional: Hesitation shortcut — prefer a short clarifying question and skip pivots
-        if answer_type == "HESITATION_SIGNAL" and next_question is None and not topic_complete_flag:
-            print("...Answer marked HESITATION_SIGNAL. Using Gemini Expert to produce a short clarifying question.")
-            hint = f"Candidate hesitated on '{self.current_topic}'. Ask a short, simple clarifying question (<=12 words)."
-            next_question = self._get_gemini_expert_question(hint=hint)
-
-        # If Gemini Expert already produced a next_question (e.g., from EVASIVE_* or HESITATION),
-        # we prefer that expert-crafted question and skip pivoting logic this turn.
-        expert_escalation_present = (next_question is not None)
-
-        # ------- Natural "topic complete" detection (soft, human-like) -------
-        # This orchestration respects your instruction: do not depend on analyzer.topic_is_complete
-        natural_topic_complete = False
-        try:
-            if (not expert_escalation_present) and answer_type not in ("HESITATION_SIGNAL", "KNOWLEDGE_GAP"):
-                if len(self.recent_scores) >= 3 and all(s >= 7.0 for s in self.recent_scores[-3:]) and momentum_weighted >= 0.0:
-                    natural_topic_complete = True
-                elif len(self.recent_scores) >= 4 and (sum(self.recent_scores[-4:]) / 4.0) >= 6.0 and momentum_weighted >= 0.0:
-                    natural_topic_complete = True
-                else:
-                    natural_topic_complete = False
-        except Exception:
-            natural_topic_complete = False
-
-        if natural_topic_complete:
-            # Block natural topic completion if fewer than 2 questions asked
-            if self.questions_in_current_topic < 2:
-                print("...Natural topic completion triggered early but BLOCKED (min 2 questions rule).")
-                natural_topic_complete = False
-            else:
-                print("...Natural topic completion detected by recent scorer pattern. Preparing to pivot.")
-                topic_complete_flag = True
-                hint = f"Candidate has demonstrated stable competence on '{self.current_topic}'. Pivot to next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-
-        # ------- Momentum & Density pivots (run ONLY if no higher-priority expert actions) -------
-        allow_pivot_checks = (not topic_complete_flag) and (not expert_escalation_present) and (answer_type not in ("HESITATION_SIGNAL", "KNOWLEDGE_GAP"))
-
-        if allow_pivot_checks:
-            # 5. Momentum forced pivot (soft) with grace window requiring consecutive detections
-            if momentum_causes_forced_pivot:
-                # If momentum negative, increment grace counter. Only pivot after PIVOT_GRACE_REQUIRED consecutive detections.
-                if self.pivot_grace_counter < (self.PIVOT_GRACE_REQUIRED - 1):
-                    self.pivot_grace_counter += 1
-                    print(f"...Momentum negative detected (grace {self.pivot_grace_counter}/{self.PIVOT_GRACE_REQUIRED}). Not pivoting yet.")
-                    # Do not pivot this turn; treat as not forcing pivot
-                    momentum_causes_forced_pivot = False
-                else:
-                    # this is the Nth consecutive negative detection -> pivot now
-                    print(f"...Momentum signal STRONG_NEGATIVE after grace window → pivot.")
-                    topic_complete_flag = True
-                    hint = f"Candidate shows a clear declining trend on '{self.current_topic}'. Pivot to next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-                    # reset low score streak only for safety
-                    self.low_score_streak = 0
-                    # reset pivot grace counter after pivot
-                    self.pivot_grace_counter = 0
-            else:
-                # momentum not negative -> reset grace counter (break consecutive streak)
-                if self.pivot_grace_counter != 0:
-                    print("...Momentum recovered or not negative — resetting pivot grace counter.")
-                self.pivot_grace_counter = 0
-
-            # 6. Low-score density fallback (conservative)
-            if low_density_trigger and answer_type != "EVASIVE_NON_ANSWER":
-                print(f"...Low-score density detected ({low_count}/{density_window}). Forcing a pivot.")
-                topic_complete_flag = True
-                hint = f"Multiple weak answers on '{self.current_topic}'. Pivoting to next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-                self.low_score_streak = 0
-                # reset pivot grace counter since we pivot due to density
-                self.pivot_grace_counter = 0
-        # ---------- END: PRIORITIZED HESITATION / KNOWLEDGE / PIVOT GUARDS ----------
-
-        # 7. Topic Pivot handling
-        if topic_complete_flag:
-            # 🚨 NEW RULE:
-            # If pivot was caused by KNOWLEDGE_GAP → bypass min-2 requirement
-            if analysis.get("answer_type") != "KNOWLEDGE_GAP":
-                # Old rule still applies for all other pivot types
-                if self.questions_in_current_topic < 2:
-                    print("...Pivot blocked: fewer than 2 questions asked in this topic. Continuing within the same topic.")
-                    topic_complete_flag = False
-                    return {
-                        "status": "CONTINUE",
-                        "next_question": self.last_question,
-                        "analysis": analysis
-                    }
-
-            # ---- Continue with normal pivot ----
-            print(f"...Topic '{self.current_topic}' is complete. Pivoting...")
-            self.low_score_streak = 0
-
-
-            if not self.topic_syllabus:
-                print("...Syllabus complete. Ending interview.")
-                return {"status": "TERMINATED", "analysis": analysis, "reason": "SyllabusFinished"}
-
-            self.current_topic = self.topic_syllabus.pop(0)
-            print(f"...Pivoting to new topic: {self.current_topic}")
-            self.questions_in_current_topic = 0
-
-            next_question = self._get_gemini_pivot_question(
-                new_topic=self.current_topic,
-                user_answer=user_answer,
-                score=score,
-                answer_type=answer_type,
-                analysis_notes=analysis_notes
-            )
-
-        # 8. Default 'Fusion Pass' (SLM triage + Gemini refinement)
-        elif next_question is None:
-            # NEW: Expert escalation for truly strong NORMAL answers (skip SLM triage, ask deeper expert Q)
-            if answer_type == "NORMAL" and float(score) >= DEEP_ESCALATION_THRESHOLD:
-                print(f"...Strong NORMAL answer detected (score={score}). Escalating to expert-level follow-up.")
-                # Provide a hint to the Gemini Expert to ask a deeper, expert-level follow-up. Avoid praise and robotic transitions.
-                expert_hint = ("Candidate appears well-read. Ask a deeper, expert-level technical follow-up. "
-                               "You may include a short formula, a comparison, or ask for trade-offs. "
-                               "Do NOT use praise words.")
-                next_question = self._get_gemini_expert_question(hint=expert_hint)
-
-            else:
-                print(f"...Score ({score}) routed to Fusion Pass (SLM -> Gemini Editor).")
-                slm_draft_question = self._get_slm_triage_question()
-
-                if slm_draft_question is None or slm_draft_question == "[CONFIDENCE_LOW]":
-                    print("...SLM failed or escalated. Calling Gemini (Fallback).")
-                    fallback_hint = f"Candidate's score was {score} and the SLM (TFailure) failed. Use this hint: {hint}"
-                    next_question = self._get_gemini_expert_question(hint=fallback_hint)
-                else:
-                    # pass answer_type to refiner via extra_meta so it can adapt wording
-                    next_question = self._get_gemini_refinement(
-                        user_answer=user_answer,
-                        analysis_notes=analysis_notes,
-                        slm_output=slm_draft_question,
-                        hint=hint,
-                        answer_type=answer_type
-                    )
-
-        normalized_question = self._normalize_output(next_question)
-        self.last_question = normalized_question
-        self.conversation_history.append({"role": "assistant", "content": normalized_question})
-        # Count this question toward topic depth
-        self.questions_in_current_topic += 1
-
-
-        # Attach the latest score into the analysis return for user debugging
-        analysis_return = analysis.copy()
-        analysis_return['score_used'] = round(float(score), 1) if isinstance(score, (int, float)) else score
-
-        return {"status": "CONTINUE", "next_question": normalized_question, "analysis": analysis_return}
-
-# --- 3. Main execution loop ---
-def main():
-    if not GOOGLE_API_KEY:
-        print("❌ GOOGLE_API_KEY not found. Please set it in your .env file.")
-        return
-
-    if "phi3_interview_merged" not in SLM_MODEL_PATH.lower():
-        print(f"❌ Please update 'SLM_MODEL_PATH' (currently: {SLM_MODEL_PATH})")
-        print("   to point to your 'phi3_interview_merged.Q4_K_M.gguf' or '...F16.gguf' file.")
-        return
-
-    domain = input("Enter the interview domain (e.g., 'Data Science with Python'): ")
-
-    try:
-        chatbot = InterviewOrchestrator(domain)
-        if not chatbot.current_topic:
-            print("❌ Failed to create interview syllabus. Exiting.")
-            return
-
-        question = chatbot.start_interview()
-
-        while True:
-            print(f"\n{'='*20}\nBot: {question}\n{'='*20}")
-
-            try:
-                answer = input("You: ")
-            except KeyboardInterrupt:
-                print("\nInterview interrupted.")
-                break
-
-            if answer.lower() in ['quit', 'exit']:
-                print("Interview ended.")
-                break
-
-            response = chatbot.process_user_answer(answer)
-
-            print(f"\n--- [DEBUG ANALYSIS]: {json.dumps(response['analysis'], indent=2)} ---")
-
-            if response['status'] == "TERMINATED":
-                if response.get("reason") == "SyllabusFinished":
-                    print("\nBot: That covers all the main topics I wanted to discuss. Thank you for your time!")
-                else:
-                    print("\nBot: Thank you for your time. This concludes the interview.")
-                break
-
-            question = response['next_question']
-
-    except Exception as e: 
-        print("\n🚨 AN UNEXPECTED ERROR OCCURRED 🚨")
-        print(e)
-        print("\nPlease check your configuration and try again.")
-
-
-if __name__ == "__main__":
-    main()
-
-# interview_orchestrator.py
-# Merged and patched interview orchestrator per your final choices.
-# - Keeps your orchestration logic unchanged (Option A).
-# - Adds safer, human-like output normalization.
-# - Uses a separate Gemini Analyzer + separate Gemini Scorer.
-# - Treats 2 consecutive HESITATION_SIGNAL as KNOWLEDGE_GAP (mercy pivot).
-# - Momentum normalization_divisor and weight are configurable; defaults tuned below.
-# - Analyzer prompt now gets the last 1-2 assistant questions to help avoid repetition.
-# - Gemini Expert / Pivot prompts forbids robotic pivot phrases and semicolons and allows a 2-sentence output:
-#     sentence 1 = short transition (3-10 words)
-#     sentence 2 = concise factual question (<=20 words)
-#
-# KEY CHANGE (this file): pivot logic now requires 2 consecutive STRONG_NEGATIVE momentum detections
-# (a "grace window") before forcing an early pivot. This is implemented via self.pivot_grace_counter.
-
-import google.generativeai as genai
-import os
-import json
-import time
-from llama_cpp import Llama
-from dotenv import load_dotenv
-import re
-import random
-from typing import List
-# add near other imports at top of file
-from momentum_signal import compute_momentum
-
-# --- 1. Configuration ---
-load_dotenv()
+logger = logging.getLogger("kiro7")
+configure_logging()
 
 # --- ⚠️ IMPORTANT: USER MUST CONFIGURE THESE ---
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -2228,9 +57,76 @@ AVERAGE_LOWER = 6.5          # 6.5-7.9 considered average
 WEAK_THRESHOLD = 6.5         # < this considered weak
 STRIKE_LIMIT = 2             # strike limit (kept but not enforced)
 
-# Momentum defaults (used when calling compute_momentum)
+# Trace names for each orchestrator stage (see tracing.py)
+STAGE_CALL_TYPES = {
+    "analysis": "Analyzer",
+    "scoring": "Scorer",
+    "triage": "SLM Triage",
+    "expert": "Expert",
+    "refinement": "Refiner",
+    "pivot": "Pivot",
+}
+
+# Progress label of each stage in process_user_answer_events()
+STAGE_PROGRESS_LABELS = {
+    "analysis": "analyzing",
+    "scoring": "scoring",
+    "triage": "drafting",
+    "expert": "drafting",
+    "refinement": "refining",
+    "pivot": "pivoting",
+}
+
+# Momentum defaults (used by the per-session MomentumTracker)
 DEFAULT_MOMENTUM_NORM_DIV = 5.0
 DEFAULT_MOMENTUM_WEIGHT = 1.25
+MOMENTUM_VARIANT = os.getenv("MOMENTUM_VARIANT", "window2")   # window2 | ewma | slope (see momentum_signal.py)
+MOMENTUM_WINDOW = int(os.getenv("MOMENTUM_WINDOW", "10"))     # scores kept in recent_scores
+
+# Thresholds of the score-driven routing (see routing_policy.py; tune them with routing_sim.py)
+ROUTING_CONFIG = RoutingConfig(normalization_divisor=DEFAULT_MOMENTUM_NORM_DIV,
+                               momentum_weight=DEFAULT_MOMENTUM_WEIGHT,
+                               deep_escalation_threshold=DEEP_ESCALATION_THRESHOLD)
+
+# Minimum pause between questions sent to the candidate (natural pacing)
+QUESTION_GAP_SECONDS = 4
+
+# Per-turn latency budget, split across stages (see turn_budget.STAGE_SHARES). A stage that runs
+# out of its share degrades to a local fallback; rate-limit termination happens only once the
+# whole budget is spent.
+TURN_DEADLINE_SECONDS = float(os.getenv("TURN_DEADLINE_SECONDS", "45"))
+
+# Draft the pivot question in the background when the next answer is likely to trigger a pivot
+# (see pivot_prefetch.py). A background draft gets PIVOT_PREFETCH_DEADLINE_SECONDS; at pivot time
+# a draft still running is waited for at most this share of the pivot stage's allowance.
+PIVOT_PREFETCH = os.getenv("PIVOT_PREFETCH", "1") == "1"
+PIVOT_PREFETCH_DEADLINE_SECONDS = 60.0
+PIVOT_PREFETCH_WAIT_SHARE = 0.5
+
+# Serve the syllabus, L0 and pivot questions from the offline question bank (question_bank.py,
+# built with `python question_bank.py --domain ...`) when it has them; Gemini only on a miss.
+QUESTION_BANK = os.getenv("QUESTION_BANK", "1") == "1"
+
+# Cross-session Scorer batching (score_batcher.py): score requests from concurrent sessions that
+# arrive within this window share one multi-item request. 0 = off (each turn sends its own).
+SCORE_BATCH_WINDOW_MS = float(os.getenv("SCORE_BATCH_WINDOW_MS", "0"))
+SCORE_BATCH_MAX = int(os.getenv("SCORE_BATCH_MAX", "16"))
+
+# Result cache for Analyzer / Scorer (shared by all sessions in this process)
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "512"))
+RESULT_CACHE_NEAR_DUPLICATES = os.getenv("RESULT_CACHE_NEAR_DUPLICATES", "1") == "1"
+RESULT_CACHE_SIMILARITY = 0.9   # estimated Jaccard similarity needed for a near-duplicate hit
+# Scores are exact-match only by default: a one-word edit ("not") can flip an answer's score
+# while leaving it a near duplicate, so a reused score would be wrong.
+SCORE_CACHE_NEAR_DUPLICATES = os.getenv("SCORE_CACHE_NEAR_DUPLICATES", "0") == "1"
+
+ANALYSIS_CACHE = ResultCache("analysis", max_entries=RESULT_CACHE_SIZE,
+                             near_duplicates=RESULT_CACHE_NEAR_DUPLICATES,
+                             similarity_threshold=RESULT_CACHE_SIMILARITY)
+SCORE_CACHE = ResultCache("score", max_entries=RESULT_CACHE_SIZE,
+                          near_duplicates=SCORE_CACHE_NEAR_DUPLICATES,
+                          similarity_threshold=RESULT_CACHE_SIMILARITY)
+
 
 # Forbidden robotic phrases (used by multiple prompts)
 FORBIDDEN_TRANSITIONS = [
@@ -2245,6 +141,9 @@ FORBIDDEN_TRANSITIONS = [
     "pivoting"
 ]
 
+# Output cleanup with every pattern compiled once (see text_utils.py)
+normalize_output = OutputNormalizer(FORBIDDEN_TRANSITIONS)
+
 # --- 2. Prompts (The "Brains" of the Operation) ---
 GLOBAL_INTERVIEWER_PROMPT = """
 You are a calm, professional, and natural-sounding technical interviewer.
@@ -2376,6 +275,30 @@ SCORING RULES:
 Round to one decimal place. Output valid JSON and nothing else.
 """
 
+# [Call SCORER, batched] Same rules for several answers from concurrent sessions (score_batcher.py)
+PROMPT_BATCH_SCORER = """
+You are a strict numeric scorer for a batch of {count} short technical interview answers.
+Score every item on its own; items are unrelated and come from different interviews.
+Input (JSON list of {{"id", "question", "answer"}}):
+{items_json}
+
+Output (JSON ONLY), one entry per input id:
+{{
+  "scores": [
+    {{"id": "<id>", "score": <float between 0.0 and 10.0 rounded to 1 decimal>, "score_reason": "<one-sentence justification>"}}
+  ]
+}}
+
+SCORING RULES:
+- 8.0–10.0: Correct, clear, and mostly complete.
+- 5.0–7.9: Partially correct, some important details missing.
+- 3.0–4.9: On-topic but vague or incomplete.
+- 1.1–2.9: Attempted but factually incorrect.
+- 0.0–1.0: Knowledge gap, hesitation, nonsense, or <3 meaningful words.
+
+Round to one decimal place. Output valid JSON and nothing else.
+"""
+
 # [Call Type 3: Gemini Expert/Fallback]
 PROMPT_GEMINI_EXPERT = """
 {global_prompt}
@@ -2521,6 +444,43 @@ or
 Output only the transition+question text.
 """
 
+
+# -------------------------
+# Analyzer / Scorer response parsing (also used by rescore_pipeline.py)
+# -------------------------
+def _strip_json_fences(text: str) -> str:
+    return text.replace("```json", "").replace("```", "").strip()
+
+
+def parse_analysis_response(text: str) -> dict:
+    """Analyzer JSON with the boolean flags normalized; raises ValueError on invalid JSON."""
+    analysis = json.loads(_strip_json_fences(text))
+
+    def to_bool(val):
+        if isinstance(val, bool):
+            return val
+        return str(val).lower() == 'true'
+
+    analysis['terminate_interview'] = to_bool(analysis.get('terminate_interview'))
+    # Keep analyzer's topic_is_complete parsed but we will not rely on it for orchestrator decisions per user instruction
+    analysis['topic_is_complete'] = to_bool(analysis.get('topic_is_complete'))
+    return analysis
+
+
+def parse_score_response(text: str) -> dict:
+    """Scorer JSON -> {"score": 0.0-10.0 rounded to 1 decimal, "score_reason": str}; raises on invalid JSON."""
+    score_json = json.loads(_strip_json_fences(text))
+    score_val = float(score_json.get("score", 0.0))
+    # Clamp between 0 and 10
+    if score_val < 0.0:
+        score_val = 0.0
+    if score_val > 10.0:
+        score_val = 10.0
+    # Round to 1 decimal
+    score_val = round(score_val, 1)
+    return {"score": score_val, "score_reason": str(score_json.get("score_reason", "")).strip()}
+
+
 # -------------------------
 # InterviewOrchestrator class
 # -------------------------
@@ -2536,13 +496,42 @@ class InterviewOrchestrator:
                Pivot logic requires 2 consecutive STRONG_NEGATIVE momentum detections
                (grace window), tracked by self.pivot_grace_counter.
     """
-    def __init__(self, domain):
+    def __init__(self, domain, llm=None, slm=None):
+        """
+        llm / slm: optional LLMProvider backends (see llm_providers.py) for the Gemini-side calls
+        and the SLM triage draft. By default Gemini goes through the shared provider pool and the
+        SLM backend is chosen by SLM_BACKEND (in-process GGUF model unless configured otherwise).
+        """
+        self._init_state(domain)
+        self._init_backends(llm, slm)
+
+        # 3. Generate the Syllabus
+        with self.tracer.span("Syllabus") as span:
+            syllabus_result = self._generate_syllabus()
+            if isinstance(syllabus_result, dict):
+                span.set(outcome="rate_limited")
+        if isinstance(syllabus_result, dict) and syllabus_result.get("status") == "TERMINATED" and syllabus_result.get("reason") == "RateLimit":
+            self.rate_limit_hit = True
+            self.current_topic = None
+
+    @property
+    def recent_scores(self) -> List[float]:
+        """The last MOMENTUM_WINDOW scores (oldest ... newest), as kept by the momentum tracker."""
+        return self.momentum.scores
+
+    @recent_scores.setter
+    def recent_scores(self, scores):
+        self.momentum = self.routing.tracker(window=MOMENTUM_WINDOW, variant=MOMENTUM_VARIANT, scores=scores)
+
+    def _init_state(self, domain, session_id=None):
+        """Per-session interview state (everything SessionState persists, plus the tracer)."""
         self.domain = domain
         self.hesitation_streak = 0
         self.conversation_history = []
         self.last_question = ""
         self.low_score_streak = 0
-        self.recent_scores = []   # holds last user scores for momentum computation
+        self.routing = ROUTING_CONFIG
+        self.recent_scores = []   # holds last user scores for momentum computation (see the property)
 
         self.topic_syllabus = []
         self.current_topic = ""
@@ -2551,79 +540,198 @@ class InterviewOrchestrator:
 
         # Question spacing control: enforce minimum gap between final questions
         self.last_question_time = 0
+        self.min_question_gap = QUESTION_GAP_SECONDS
+
+        # Structured tracing: one span per backend call, tied together by session id and turn
+        self.tracer = Tracer(session_id)
+        self.session_id = self.tracer.session_id
+        self._branch = None
+        self._on_event = None   # progress callback of the running turn (process_user_answer_events)
+        self.last_turn_duplicate = None   # "attached" / "cached" when the last submission was a duplicate
+        self.cancel_token = CancelToken()   # token of the running (or last) turn; see cancel()
+        self._pivot_context = None   # answer / score / type / notes of the last turn, for pivot prefetch
+        self._turn_idle = threading.Event()
+        self._turn_idle.set()
 
         # pivot grace counter: require N consecutive strong-negative momentum detections before forcing pivot
         self.pivot_grace_counter = 0
-        self.PIVOT_GRACE_REQUIRED = 2  # require 2 consecutive weak turns to pivot
+        self.PIVOT_GRACE_REQUIRED = self.routing.pivot_grace_required  # require 2 consecutive weak turns to pivot
+        self.rate_limit_hit = False
 
-        # 1. Configure Gemini
-        print(f"Configuring Gemini with model: {GEMINI_MODEL_NAME}")
-        genai.configure(api_key=GOOGLE_API_KEY)
-        self.gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        # a JSON config reused for JSON outputs
-        self.json_config = genai.GenerationConfig(response_mime_type="application/json")
+    def _init_backends(self, llm=None, slm=None):
+        """Gemini / SLM providers and circuit breakers; all process-wide, so this is cheap after the first session."""
+        # 1. Configure Gemini (or the injected backend)
+        logger.info(f"Configuring Gemini with model: {GEMINI_MODEL_NAME}")
+        self.llm = llm or get_gemini_provider(GOOGLE_API_KEY, GEMINI_MODEL_NAME)
+        self.turn_budget = TurnBudget(TURN_DEADLINE_SECONDS)
 
         # 2. Configure SLM
-        self.slm_model = None
-        try:
-            print(f"Loading SLM from: {SLM_MODEL_PATH}...")
-            print("This will take a moment as it loads into your M4's GPU RAM...")
-            start_load = time.time()
-            self.slm_model = Llama(
-                model_path=SLM_MODEL_PATH,
-                n_gpu_layers=-1,
-                n_ctx=2048,
-                verbose=False
-            )
-            load_time = time.time() - start_load
-            print(f"✅ SLM (GGUF) model loaded in {load_time:.2f} seconds.")
-        except Exception as e:
-            print(f"❌ FAILED TO LOAD SLM MODEL from {SLM_MODEL_PATH}")
-            print(f"   Make sure 'SLM_MODEL_PATH' is correct.")
-            print(f"   Error: {e}")
-            print("   Will continue in Gemini-only fallback mode.")
-
-        # 3. Generate the Syllabus
-        self.rate_limit_hit = False
-        syllabus_result = self._generate_syllabus()
-        if isinstance(syllabus_result, dict) and syllabus_result.get("status") == "TERMINATED" and syllabus_result.get("reason") == "RateLimit":
-            self.rate_limit_hit = True
-            self.current_topic = None
+        self.slm = slm
+        if self.slm is not None:
+            logger.info(f"Using injected SLM backend: {self.slm.name}")
+        else:
+            try:
+                logger.info(f"Loading SLM from: {SLM_MODEL_PATH}...")
+                logger.info("This will take a moment as it loads into your M4's GPU RAM...")
+                start_load = time.time()
+                self.slm = get_slm_provider(SLM_MODEL_PATH)
+                load_time = time.time() - start_load
+                if self.slm is None:
+                    logger.info("SLM disabled (SLM_BACKEND=none). Running in Gemini-only mode.")
+                else:
+                    logger.info(f"✅ SLM backend '{self.slm.name}' ready in {load_time:.2f} seconds.")
+            except Exception as e:
+                logger.warning(f"❌ FAILED TO LOAD SLM MODEL from {SLM_MODEL_PATH}")
+                logger.warning(f"   Make sure 'SLM_MODEL_PATH' is correct.")
+                logger.warning(f"   Error: {e}")
+                logger.warning("   Will continue in Gemini-only fallback mode.")
+
+        # Process-wide circuit breakers, one per backend. While a breaker is open the turn goes
+        # straight to that stage's fallback.
+        self.breakers = {
+            "analysis": get_breaker("analyzer"),
+            "scoring": get_breaker("scorer"),
+            "expert": get_breaker("gemini_generation"),
+            "refinement": get_breaker("gemini_generation"),
+            "pivot": get_breaker("gemini_generation"),
+            "triage": get_breaker("slm_triage"),
+        }
+
+    def snapshot(self, finished=False, extra=None) -> SessionState:
+        """Serializable copy of the interview state (see session_store.py)."""
+        return SessionState(
+            session_id=self.session_id,
+            domain=self.domain,
+            turn=self.tracer.turn,
+            conversation_history=list(self.conversation_history),
+            last_question=self.last_question,
+            recent_scores=list(self.recent_scores),
+            topic_syllabus=list(self.topic_syllabus),
+            current_topic=self.current_topic,
+            questions_in_current_topic=self.questions_in_current_topic,
+            hesitation_streak=self.hesitation_streak,
+            low_score_streak=self.low_score_streak,
+            pivot_grace_counter=self.pivot_grace_counter,
+            rate_limit_hit=self.rate_limit_hit,
+            finished=finished,
+            extra=dict(extra or {}),
+            updated_at=time.time(),
+            version=STATE_VERSION,
+        )
 
-    def _respect_question_gap(self, min_gap=4):
+    @classmethod
+    def restore(cls, state: SessionState, llm=None, slm=None):
+        """
+        Orchestrator continuing a saved session. Backends come from the process-wide providers
+        (no model load after the first session) and no Gemini call is made: the syllabus and
+        history are taken from the state.
+        """
+        bot = cls.__new__(cls)
+        bot._init_state(state.domain, session_id=state.session_id)
+        bot._init_backends(llm, slm)
+        bot._apply_state(state)
+        logger.info(f"Restored session {state.session_id} at turn {state.turn} (topic: {state.current_topic})")
+        return bot
+
+    def _apply_state(self, state: SessionState):
+        """Sets the interview state from a snapshot (restore, and rollback of a cancelled turn)."""
+        self.tracer.turn = state.turn
+        self.conversation_history = list(state.conversation_history)
+        self.last_question = state.last_question
+        self.recent_scores = list(state.recent_scores)
+        self.topic_syllabus = list(state.topic_syllabus)
+        self.current_topic = state.current_topic
+        self.questions_in_current_topic = state.questions_in_current_topic
+        self.hesitation_streak = state.hesitation_streak
+        self.low_score_streak = state.low_score_streak
+        self.pivot_grace_counter = state.pivot_grace_counter
+        self.rate_limit_hit = state.rate_limit_hit
+
+    def cancel(self, reason: str = "cancelled", timeout: float = None) -> bool:
+        """
+        Cancels the running turn from any thread (quit, reset, disconnect): its backend calls and
+        pacing sleep stop, the interview state is rolled back to before the answer and the turn
+        raises TurnCancelled. A pending pivot prefetch is discarded. Waits up to `timeout` seconds for the turn to unwind. Returns False
+        if no turn was running.
+        """
+        running = not self._turn_idle.is_set()
+        self.cancel_token.cancel(reason)
+        get_pivot_prefetcher().discard(self.session_id, reason)
+        if running and timeout:
+            self._turn_idle.wait(timeout)
+        return running
+
+    def _respect_question_gap(self, min_gap=None):
         """
         Enforces a minimum time gap between final interview questions sent to the user.
         This prevents rapid-fire questioning and creates a more natural interview pace.
         """
+        if min_gap is None:
+            min_gap = self.min_question_gap
         now = time.time()
         elapsed = now - self.last_question_time
         if elapsed < min_gap:
             wait = min_gap - elapsed
-            print(f"...Question spacing guard: waiting {wait:.2f}s before sending next question...")
-            time.sleep(wait)
+            logger.info(f"...Question spacing guard: waiting {wait:.2f}s before sending next question...")
+            self.cancel_token.sleep(wait, source="pacing")
         self.last_question_time = time.time()
 
+    def _start_turn_budget(self):
+        """Starts a fresh latency budget for the current turn (or setup step)."""
+        self.turn_budget = TurnBudget(TURN_DEADLINE_SECONDS, cancel=self.cancel_token)
+
+    def _call_llm(self, call_type, prompt, json_mode=False, config=None, priority=PRIORITY_INTERACTIVE):
+        """
+        Single entry point for the Gemini-side calls (syllabus, l0, analyzer, scorer, expert,
+        refiner, pivot), served by self.llm. With the default GeminiProvider the shared pool picks
+        a healthy (key, model) member, admission goes through the shared RPM/TPM limiter, and
+        429/5xx errors fail over or back off; RateLimitExhausted is raised only once the turn
+        deadline is used up. If only the current stage's allowance ran out, StageTimeout is
+        raised instead so the turn can degrade that stage.
+        """
+        try:
+            result = self.llm.generate(
+                prompt,
+                call_type=call_type,
+                json_mode=json_mode,
+                config=config,
+                deadline=self.turn_budget.stage_deadline,
+                priority=priority,
+                cancel=self.cancel_token
+            )
+            annotate(prompt_tokens=result.prompt_tokens, output_tokens=result.output_tokens)
+            return result
+        except RateLimitExhausted:
+            if self.turn_budget.stage_deadline < self.turn_budget.deadline:
+                # only this stage's share is spent; let the turn degrade the stage
+                raise StageTimeout(call_type, 0.0)
+            raise
+
     def _generate_syllabus(self):
         """[Call 0] Generates the interview topic plan at the start."""
-        print(f"\n...Generating interview syllabus for: {self.domain}...")
+        logger.info(f"...Generating interview syllabus for: {self.domain}...")
         try:
-            prompt = PROMPT_SYLLABUS_GENERATOR.format(domain=self.domain)
-            json_config_syllabus = genai.GenerationConfig(response_mime_type="application/json")
-            try:
-                response = self.gemini_model.generate_content(prompt, generation_config=json_config_syllabus)
-            except Exception as e:
-                if "429" in str(e):
-                    print("\n🚨 Gemini rate limit reached. Concluding interview gracefully.\n")
+            bank = self._question_bank()
+            banked_topics = bank.topics(self.domain) if bank is not None else []
+            if banked_topics:
+                logger.info("...Syllabus taken from the question bank. Skipping Gemini syllabus call.")
+                annotate(outcome="question_bank")
+                self.topic_syllabus = banked_topics
+            else:
+                prompt = PROMPT_SYLLABUS_GENERATOR.format(domain=self.domain)
+                try:
+                    response = self._call_llm("syllabus", prompt, json_mode=True)
+                except RateLimitExhausted:
+                    logger.warning("🚨 Gemini rate limit persisted past the turn deadline. Concluding interview gracefully.")
                     return {"status": "TERMINATED", "reason": "RateLimit"}
-                raise
 
-            clean_response = response.text.replace("```json", "").replace("```", "").strip()
-            self.topic_syllabus = json.loads(clean_response)
+                clean_response = response.text.replace("```json", "").replace("```", "").strip()
+                self.topic_syllabus = json.loads(clean_response)
 
             if not self.topic_syllabus:
                 raise ValueError("Syllabus is empty")
 
-            print("...Shuffling syllabus topics...")
+            logger.info("...Shuffling syllabus topics...")
             random.shuffle(self.topic_syllabus)
 
             # 1. Force the {domain} to be the very first item in the list
@@ -2634,17 +742,18 @@ class InterviewOrchestrator:
             self.questions_in_current_topic = 0
 
 
-            print(f"✅ Syllabus created. First topic: {self.current_topic}")
-            print(f"   Remaining topics: {self.topic_syllabus}")
+            logger.info(f"✅ Syllabus created. First topic: {self.current_topic}")
+            logger.info(f"   Remaining topics: {self.topic_syllabus}")
 
         except Exception as e:
-            print(f"❌ FAILED TO GENERATE SYLLABUS. Error: {e}")
-            print("...Defaulting to a single-topic interview.")
+            logger.warning(f"❌ FAILED TO GENERATE SYLLABUS. Error: {e}")
+            logger.info("...Defaulting to a single-topic interview.")
             self.current_topic = self.domain  # Fallback
 
     def start_interview(self):
         """[Call Type 1] Generates the first L0 question using Gemini."""
-        print(f"\n...Calling Gemini for L0 question (Topic: {self.current_topic})...")
+        logger.info(f"...Calling Gemini for L0 question (Topic: {self.current_topic})...")
+        self._start_turn_budget()
 
         prompt = PROMPT_L0_GENERATOR.format(
             global_prompt=GLOBAL_INTERVIEWER_PROMPT,
@@ -2652,15 +761,19 @@ class InterviewOrchestrator:
         )
 
         self._respect_question_gap()
-        try:
-            response = self.gemini_model.generate_content(prompt)
-        except Exception as e:
-            if "429" in str(e):
-                print("\n🚨 Gemini rate limit reached. Concluding interview gracefully.\n")
-                return {"status": "TERMINATED", "reason": "RateLimit"}
-            raise
+        with self.tracer.span("L0") as span:
+            l0_question = self._banked_question("l0", "easy")
+            if l0_question is not None:
+                span.set(outcome="question_bank")
+            else:
+                try:
+                    l0_question = self._call_llm("l0", prompt).text.strip()
+                except RateLimitExhausted:
+                    span.set(outcome="rate_limited")
+                    logger.warning("🚨 Gemini rate limit persisted past the turn deadline. Concluding interview gracefully.")
+                    return {"status": "TERMINATED", "reason": "RateLimit"}
 
-        l0_question = self._normalize_output(response.text.strip())
+        l0_question = self._normalize_output(l0_question)
         self.last_question = l0_question
         self.conversation_history.append({"role": "assistant", "content": l0_question})
         return l0_question
@@ -2675,51 +788,7 @@ class InterviewOrchestrator:
         - Prevent double spaces and trailing punctuation.
         - Keep up to 2 sentences (transition + question) if present.
         """
-        if not text:
-            return text
-
-        # Strip surrounding whitespace and quotes
-        text = text.strip().strip('"').strip("'")
-
-        # Replace a few canned formal connectors with friendlier phrases
-        text = text.replace("Therefore,", "So,")
-        text = text.replace("Moreover,", "Also,")
-        text = text.replace("In conclusion,", "Ultimately,")
-
-        # Remove semicolons entirely
-        text = text.replace(";", ",")
-
-        # Remove forbidden robotic phrases (case-insensitive)
-        for phrase in FORBIDDEN_TRANSITIONS:
-            pattern = re.compile(re.escape(phrase), flags=re.IGNORECASE)
-            text = pattern.sub("", text)
-
-        # Collapse multiple punctuation/whitespace
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'\s+([?.!,])', r'\1', text)
-        text = re.sub(r'([?.!,]){2,}', r'\1', text)
-
-        # Ensure the output ends with punctuation; if the last sentence seems to be a question, ensure '?'
-        if not re.search(r'[.?!"\']$', text):
-            # if likely a question (contains words like what, why, how, when, which, describe), add '?'
-            if re.search(r'\b(what|why|how|when|which|describe|explain|tell)\b', text.lower()):
-                text = text + "?"
-            else:
-                text = text + "."
-
-        # Trim to at most two sentences.
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        if len(sentences) > 2:
-            sentences = sentences[-2:]  # keep last two sentences (transition+question preferred)
-        # Reconstruct with single space
-        final = " ".join(s.strip() for s in sentences).strip()
-
-        # Final safety: remove leading/trailing punctuation anomalies
-        final = final.strip()
-        final = re.sub(r'^[\s\.,;:]+', '', final)
-        final = re.sub(r'[\s\.,;:]+$', '', final)
-
-        return final
+        return normalize_output(text)
 
     def _get_recent_assistant_questions(self, n: int = 2) -> List[str]:
         """
@@ -2734,7 +803,14 @@ class InterviewOrchestrator:
         intentionally IGNORED by the orchestrator. We still rely on analyzer for 'answer_type',
         'analysis_notes', and 'strategic_question' textual guidance.
         """
-        print("\n...Calling Gemini (Judge/Strategist) for analysis...")
+        cached, hit_kind = ANALYSIS_CACHE.get(question, answer)
+        if cached is not None:
+            logger.info(f"...Analysis cache hit ({hit_kind}). Skipping Gemini analyzer call.")
+            annotate(outcome=f"cache_hit_{hit_kind}")
+            cached["cache_hit"] = hit_kind
+            return cached
+
+        logger.info("...Calling Gemini (Judge/Strategist) for analysis...")
         recent_qs = self._get_recent_assistant_questions(2)
         try:
             recent_json = json.dumps(recent_qs)
@@ -2748,36 +824,23 @@ class InterviewOrchestrator:
         )
         try:
             try:
-                response = self.gemini_model.generate_content(
-                    prompt,
-                    generation_config=self.json_config
-                )
-            except Exception as e:
-                if "429" in str(e):
-                    print("\n🚨 Gemini rate limit reached. Concluding interview gracefully.\n")
-                    return {"status": "TERMINATED", "reason": "RateLimit"}
-                raise
-            clean_response = response.text.replace("```json", "").replace("```", "").strip()
-            analysis = json.loads(clean_response)
-
-            def to_bool(val):
-                if isinstance(val, bool):
-                    return val
-                return str(val).lower() == 'true'
-
-            analysis['terminate_interview'] = to_bool(analysis.get('terminate_interview'))
-            # Keep analyzer's topic_is_complete parsed but we will not rely on it for orchestrator decisions per user instruction
-            analysis['topic_is_complete'] = to_bool(analysis.get('topic_is_complete'))
-
+                response = self._call_llm("analyzer", prompt, json_mode=True)
+            except RateLimitExhausted:
+                logger.warning("🚨 Gemini rate limit persisted past the turn deadline. Concluding interview gracefully.")
+                return {"status": "TERMINATED", "reason": "RateLimit"}
+            analysis = parse_analysis_response(response.text)
+            ANALYSIS_CACHE.put(question, answer, analysis)
             return analysis
 
+        except StageTimeout:
+            raise
         except Exception as e:
-            print(f"❌ Error parsing Gemini analysis JSON: {e}")
+            logger.warning(f"❌ Error parsing Gemini analysis JSON: {e}")
             try:
                 raw = response.text
             except:
                 raw = "<no raw response>"
-            print(f"   Raw response: {raw}")
+            logger.warning(f"   Raw response: {raw}")
             return {
                 "content_summary": "Analysis failed",
                 "answer_quality_score": 0.0,
@@ -2791,48 +854,61 @@ class InterviewOrchestrator:
 
     def _get_gemini_score(self, question: str, answer: str):
         """NEW: [Call SCORER] Calls Gemini with the separate scoring prompt and returns a float score and reason."""
-        print("\n...Calling Gemini (Scorer) for numeric score...")
+        cached, hit_kind = SCORE_CACHE.get(question, answer)
+        if cached is not None:
+            logger.info(f"...Score cache hit ({hit_kind}): {cached.get('score')}")
+            annotate(outcome=f"cache_hit_{hit_kind}")
+            cached["cache_hit"] = hit_kind
+            return cached
+
+        logger.info("...Calling Gemini (Scorer) for numeric score...")
         prompt = PROMPT_SCORER.format(question=question, answer=answer)
         try:
-            # Use json config for strict JSON parsing
-            try:
-                response = self.gemini_model.generate_content(prompt, generation_config=self.json_config)
-            except Exception as e:
-                if "429" in str(e):
-                    print("\n🚨 Gemini rate limit reached. Concluding interview gracefully.\n")
+            result = self._batched_score(question, answer) if SCORE_BATCH_WINDOW_MS > 0 else None
+            if result is None:
+                # Use json config for strict JSON parsing
+                try:
+                    response = self._call_llm("scorer", prompt, json_mode=True)
+                except RateLimitExhausted:
+                    logger.warning("🚨 Gemini rate limit persisted past the turn deadline. Concluding interview gracefully.")
                     return {"status": "TERMINATED", "reason": "RateLimit"}
-                raise
-            clean_response = response.text.replace("```json", "").replace("```", "").strip()
-            score_json = json.loads(clean_response)
-            # Ensure rounding to 1 decimal
-            score_val = float(score_json.get("score", 0.0))
-            # Clamp between 0 and 10
-            if score_val < 0.0:
-                score_val = 0.0
-            if score_val > 10.0:
-                score_val = 10.0
-            # Round to 1 decimal
-            score_val = round(score_val, 1)
-            score_reason = str(score_json.get("score_reason", "")).strip()
-            print(f"...Scorer returned: {score_val} — {score_reason}")
-            return {"score": score_val, "score_reason": score_reason}
+                result = parse_score_response(response.text)
+            logger.info(f"...Scorer returned: {result['score']} — {result['score_reason']}")
+            SCORE_CACHE.put(question, answer, result)
+            return result
+        except StageTimeout:
+            raise
         except Exception as e:
-            print(f"❌ Scorer call or JSON parse failed: {e}")
+            logger.warning(f"❌ Scorer call or JSON parse failed: {e}")
             try:
                 raw = response.text
             except:
                 raw = "<no raw response>"
-            print(f"   Raw scorer response: {raw}")
+            logger.warning(f"   Raw scorer response: {raw}")
             # Important: DO NOT fallback to analyzer numeric score; instead return failure indicator
             return {"score": None, "score_reason": "Scorer failed"}
 
+    def _batched_score(self, question: str, answer: str):
+        """
+        Scores through the cross-session batcher. None means this turn sends its own request: no
+        other session scored within the window, or the batch reply had no usable entry for it.
+        """
+        batcher = get_score_batcher(self.llm, PROMPT_BATCH_SCORER, parse_score_response,
+                                    window=SCORE_BATCH_WINDOW_MS / 1000.0, max_batch=SCORE_BATCH_MAX)
+        result = batcher.score(question, answer, deadline=self.turn_budget.stage_deadline, cancel=self.cancel_token)
+        if result is not None:
+            annotate(outcome="batched")
+        elif time.monotonic() >= self.turn_budget.stage_deadline:
+            raise StageTimeout("scorer", 0.0)
+        return result
+
     def _get_slm_triage_question(self):
         """[Call Type 4] Calls the local SLM to *think*."""
-        if self.slm_model is None:
-            print("...SLM not loaded. Skipping...")
+        if self.slm is None:
+            logger.info("...SLM not loaded. Skipping...")
             return None
 
-        print("...Calling local SLM (Triage) to *think*...")
+        logger.info("...Calling local SLM (Triage) to *think*...")
 
         system_content = PROMPT_SLM_TRIAGE.format(topic=self.current_topic)
 
@@ -2842,53 +918,54 @@ class InterviewOrchestrator:
 
         try:
             # Conservative SLM call: short, low temperature for concise drafts
-            output = self.slm_model.create_chat_completion(
-                messages=messages,
-                max_tokens=80,   # shorter drafts
-                stop=["<|end|>", "<|user|>", "You:", "Candidate:", "Interviewer:"],
-                temperature=0.25  # conservative, less creative
+            result = self.slm.generate(
+                messages,
+                call_type="slm_triage",
+                config={
+                    "max_tokens": 80,   # shorter drafts
+                    "stop": ["<|end|>", "<|user|>", "You:", "Candidate:", "Interviewer:"],
+                    "temperature": 0.25  # conservative, less creative
+                },
+                deadline=self.turn_budget.stage_deadline,
+                cancel=self.cancel_token
             )
-            next_question = output['choices'][0]['message']['content'].strip()
+            next_question = result.text.strip()
+            annotate(prompt_tokens=result.prompt_tokens, output_tokens=result.output_tokens)
 
             if not next_question:
-                print("...SLM FAILED (empty response).")
+                logger.warning("...SLM FAILED (empty response).")
                 return None
 
             # If SLM itself returned the bailout token, accept it.
             if "[CONFIDENCE_LOW]" in next_question:
-                print("...SLM successfully triggered [CONFIDENCE_LOW].")
+                logger.info("...SLM successfully triggered [CONFIDENCE_LOW].")
                 return "[CONFIDENCE_LOW]"
 
             # Post-validate the SLM question: require at least 3 meaningful words,
             # and reject if it contains hesitation tokens or ellipses.
-            def meaningful_word_count(s):
-                # remove common filler tokens and punctuation, then count words of length>1
-                fillers = {"umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "like", "...", "uhm"}
-                tokens = re.findall(r"[A-Za-z']+", s.lower())
-                meaningful = [t for t in tokens if t not in fillers and len(t) > 1]
-                return len(meaningful)
-
-            hesitation_tokens = ["umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "...", "uhm"]
-
-            if any(tok in next_question.lower() for tok in hesitation_tokens):
-                print("...SLM output contains hesitation tokens; treating as [CONFIDENCE_LOW].")
+            rejection = slm_draft_rejection(next_question)
+            if rejection == "hesitation_detected":
+                logger.info("...SLM output contains hesitation tokens; treating as [CONFIDENCE_LOW].")
                 return "[CONFIDENCE_LOW]"
-
-            if meaningful_word_count(next_question) < 3:
-                print("...SLM output too short (fewer than 3 meaningful words); treating as [CONFIDENCE_LOW].")
+            if rejection == "too_short":
+                logger.info("...SLM output too short (fewer than 3 meaningful words); treating as [CONFIDENCE_LOW].")
                 return "[CONFIDENCE_LOW]"
 
             # All checks passed — accept SLM draft.
-            print(f"...SLM (Triage) generated draft: \"{next_question}\"")
+            logger.info(f"...SLM (Triage) generated draft: \"{next_question}\"")
             return next_question
 
+        except ProviderUnavailable as e:
+            # e.g. the in-process model is still busy with a decode abandoned by a timed-out turn
+            logger.info(f"...SLM unavailable ({e}). Skipping...")
+            return None
         except Exception as e:
-            print(f"...SLM FAILED (Exception): {e}")
+            logger.warning(f"...SLM FAILED (Exception): {e}")
             return None
 
     def _get_gemini_expert_question(self, hint: str):
         """[Call Type 3] Calls Gemini for an "Expert" or "Fallback" question."""
-        print(f"...Calling Gemini (Expert/Fallback). Hint: {hint}...")
+        logger.info(f"...Calling Gemini (Expert/Fallback). Hint: {hint}...")
 
         history_str = ""
         for turn in self.conversation_history:
@@ -2904,17 +981,15 @@ class InterviewOrchestrator:
         )
 
         try:
-            response = self.gemini_model.generate_content(prompt)
-        except Exception as e:
-            if "429" in str(e):
-                print("\n🚨 Gemini rate limit reached. Concluding interview gracefully.\n")
-                return {"status": "TERMINATED", "reason": "RateLimit"}
-            raise
+            response = self._call_llm("expert", prompt)
+        except RateLimitExhausted:
+            logger.warning("🚨 Gemini rate limit persisted past the turn deadline. Concluding interview gracefully.")
+            return {"status": "TERMINATED", "reason": "RateLimit"}
         return response.text.strip()
 
     def _get_gemini_refinement(self, user_answer: str, analysis_notes: str, slm_output: str, hint: str, answer_type: str = None):
         """[Call Type 5] Calls Gemini "Editor" to create the final, concise response."""
-        print(f"...Sending all context to Gemini (Editor) for final question...")
+        logger.info(f"...Sending all context to Gemini (Editor) for final question...")
 
         # Compose extra_meta from explicit answer_type (if provided).
         if answer_type:
@@ -2938,22 +1013,30 @@ class InterviewOrchestrator:
 
         self._respect_question_gap()
         try:
-            response = self.gemini_model.generate_content(prompt)
-        except Exception as e:
-            if "429" in str(e):
-                print("\n🚨 Gemini rate limit reached. Concluding interview gracefully.\n")
-                return {"status": "TERMINATED", "reason": "RateLimit"}
-            raise
+            response = self._call_llm("refiner", prompt)
+        except RateLimitExhausted:
+            logger.warning("🚨 Gemini rate limit persisted past the turn deadline. Concluding interview gracefully.")
+            return {"status": "TERMINATED", "reason": "RateLimit"}
         return response.text.strip()
 
     def _get_gemini_pivot_question(self, new_topic: str, user_answer: str, score, answer_type: str, analysis_notes: str):
         """[Call Type 6] Calls Gemini to get a new L0 question for a topic pivot."""
-        print(f"...Calling Gemini (Pivot) for new L0 question on: {new_topic}...")
+        logger.info(f"...Calling Gemini (Pivot) for new L0 question on: {new_topic}...")
+        prompt = self._pivot_prompt(new_topic, user_answer, score, answer_type, analysis_notes)
 
+        self._respect_question_gap()
+        try:
+            response = self._call_llm("pivot", prompt)
+        except RateLimitExhausted:
+            logger.warning("🚨 Gemini rate limit persisted past the turn deadline. Concluding interview gracefully.")
+            return {"status": "TERMINATED", "reason": "RateLimit"}
+        return response.text.strip()
+
+    def _pivot_prompt(self, new_topic: str, user_answer: str, score, answer_type: str, analysis_notes: str) -> str:
         recent_qs = self._get_recent_assistant_questions(2)
         recent_json = json.dumps(recent_qs)
 
-        prompt = PROMPT_TOPIC_PIVOT.format(
+        return PROMPT_TOPIC_PIVOT.format(
             global_prompt=GLOBAL_INTERVIEWER_PROMPT,
             topic=new_topic,
             user_answer=user_answer,
@@ -2964,17 +1047,194 @@ class InterviewOrchestrator:
             forbidden=", ".join([f'"{p}"' for p in FORBIDDEN_TRANSITIONS])
         )
 
-        self._respect_question_gap()
+    def _question_bank(self):
+        """The process-wide question bank, or None when disabled or not built."""
+        return get_question_bank() if QUESTION_BANK else None
+
+    def _banked_question(self, kind: str, difficulty: str, answer_type: str = None):
+        """
+        A banked L0 question for the current topic that this session has not been asked yet, behind
+        a locally chosen transition sentence; None on a bank miss.
+        """
+        bank = self._question_bank()
+        if bank is None:
+            return None
+        asked = [turn['content'] for turn in self.conversation_history if turn['role'] == 'assistant']
+        question = bank.pick(self.domain, self.current_topic, difficulty, asked, kind=kind)
+        self.tracer.event("question_bank", question_kind=kind, topic=self.current_topic, difficulty=difficulty,
+                          outcome="hit" if question else "miss")
+        if question is None:
+            return None
+        logger.info(f"...Serving a banked {difficulty} question for '{self.current_topic}'. Skipping Gemini.")
+        return f"{lead_in(kind, answer_type, self._get_recent_assistant_questions(2))} {question}"
+
+    def _banked_pivot_question(self, score, answer_type: str):
+        """The banked opening question for the topic just pivoted to, at the difficulty the last answer calls for."""
+        question = self._banked_question("pivot", difficulty_for(score, answer_type), answer_type)
+        if question is not None:
+            self._respect_question_gap()
+        return question
+
+    def _maybe_prefetch_pivot(self, status: str):
+        """
+        After a turn: drafts the next topic's L0 question in the background if the next answer is
+        likely to pivot, otherwise drops the unused draft of the previous question. The draft uses
+        this turn's answer as context; the pivot turn's own answer is not known yet.
+        """
+        prefetcher = get_pivot_prefetcher()
+        reason = None
+        if (PIVOT_PREFETCH and status == "CONTINUE" and self.topic_syllabus and not self.rate_limit_hit
+                and self._pivot_context is not None and self.breakers["pivot"].state == CLOSED):
+            reason = pivot_likely(self.routing, self.questions_in_current_topic, self.recent_scores,
+                                  self.pivot_grace_counter, self.hesitation_streak)
+        bank = self._question_bank()
+        if reason is not None and bank is not None and bank.has_topic(self.domain, self.topic_syllabus[0]):
+            reason = None   # the pivot question will come from the question bank
+        if reason is None:
+            prefetcher.discard(self.session_id, "no_pivot")
+            return
+        topic = self.topic_syllabus[0]
+        prompt = self._pivot_prompt(topic, **self._pivot_context)
+        llm = self.llm
+
+        def draft(cancel):
+            return llm.generate(prompt, call_type="pivot", priority=PRIORITY_BACKGROUND,
+                                deadline=time.monotonic() + PIVOT_PREFETCH_DEADLINE_SECONDS, cancel=cancel).text
+
+        if prefetcher.start(self.session_id, topic, self.last_question, reason, draft):
+            self.tracer.event("pivot_prefetch", outcome="started", reason=reason, topic=topic)
+
+    def _take_prefetched_pivot(self):
+        """The fresh prefetched L0 question for the topic just pivoted to, or None."""
+        if not PIVOT_PREFETCH:
+            return None
+        wait = self.turn_budget.allowance("pivot") * PIVOT_PREFETCH_WAIT_SHARE
+        question = get_pivot_prefetcher().take(self.session_id, self.current_topic, self.last_question, wait)
+        self.tracer.event("pivot_prefetch", outcome="hit" if question else "miss", topic=self.current_topic)
+        if question is not None:
+            self._respect_question_gap()
+        return question
+
+    # ---------- Degraded-stage fallbacks (stage timed out, failed, or its breaker is open) ----------
+    def _rule_based_analysis(self, answer: str):
+        """Local stand-in for the Analyzer, following the same classification order as PROMPT_ANALYZER."""
+        text = (answer or "").lower()
+        words = re.findall(r"[a-z']+", text)
+        fillers = {"umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "like", "uhm", "sure", "okay", "well"}
+        meaningful = [w for w in words if w not in fillers and len(w) > 1]
+        hesitation = {"umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "uhm"}
+
+        if "..." in text or hesitation.intersection(words) or len(meaningful) < 3:
+            answer_type = "HESITATION_SIGNAL"
+        elif any(p in text for p in ("idk", "i don't know", "not sure", "no idea", "pata nhi", "haven't read")):
+            answer_type = "KNOWLEDGE_GAP"
+        else:
+            answer_type = "Normal"
+
+        return {
+            "content_summary": "Analysis degraded (rule-based)",
+            "answer_quality_score": 0.0,
+            "answer_type": answer_type,
+            "analysis_notes": "Analyzer unavailable; classified with local rules.",
+            "strategic_question": self.last_question,
+            "topic_is_complete": False,
+            "terminate_interview": False,
+            "reason_for_termination": None,
+            "degraded": True
+        }
+
+    def _rule_based_score(self, answer: str, answer_type: str):
+        """Conservative local score following PROMPT_SCORER's bands; never high enough to escalate."""
+        words = [w for w in re.findall(r"[A-Za-z']+", answer or "") if len(w) > 1]
+        if answer_type in ("HESITATION_SIGNAL", "KNOWLEDGE_GAP") or len(words) < 3:
+            score = 0.5
+        elif answer_type in ("EVASIVE_NON_ANSWER", "EVASIVE_CHALLENGE"):
+            score = 1.0
+        elif len(words) < 8:
+            score = 3.5
+        elif len(words) < 20:
+            score = 5.0
+        else:
+            score = 6.0
+        return {"score": score, "score_reason": "Scorer unavailable; rule-based estimate.", "degraded": True}
+
+    def _fallback_pivot_question(self, topic: str) -> str:
+        """Template L0 question for a new topic when the Pivot stage degrades."""
+        return f"Let's look at {topic} next. What is the core idea behind {topic}?"
+
+    def _stage_failed(self, stage: str, result) -> bool:
+        """Whether a stage's return value is one of its in-band failure markers."""
+        if isinstance(result, dict) and result.get("status") == "TERMINATED":
+            return True
+        if stage == "analysis":
+            return result.get("reason_for_termination") == "Analysis Error"
+        if stage == "scoring":
+            return result.get("score") is None
+        if stage == "triage":
+            return result is None and self.slm is not None
+        return result is None
+
+    def _run_stage(self, stage: str, fn, *args, **kwargs):
+        """
+        Runs one backend stage behind its circuit breaker and against the turn budget.
+        Raises StageUnavailable immediately while the breaker is open, and after a timeout
+        or backend exception (which also count as breaker failures).
+        """
+        breaker = self.breakers[stage]
+        with self.tracer.span(STAGE_CALL_TYPES[stage], branch=self._branch) as span:
+            self._emit_stage(stage, "started")
+            try:
+                if not breaker.allow():
+                    span.set(outcome="circuit_open")
+                    self.turn_budget.degrade(stage, "circuit_open")
+                    raise StageUnavailable(stage, "circuit_open")
+                try:
+                    result = self.turn_budget.run(stage, fn, *args, **kwargs)
+                except StageTimeout:
+                    span.set(outcome="timeout")
+                    breaker.record_failure("timeout")
+                    raise
+                except TurnCancelled:
+                    span.set(outcome="cancelled")
+                    breaker.release()      # no verdict on the backend; free a half-open trial slot
+                    raise
+                except Exception as e:
+                    span.set(outcome=f"error:{type(e).__name__}")
+                    breaker.record_failure(type(e).__name__)
+                    self.turn_budget.degrade(stage, "error")
+                    raise StageUnavailable(stage, "error", f"Stage '{stage}' failed: {e}") from e
+                if self._stage_failed(stage, result):
+                    if span.outcome == "ok":
+                        span.set(outcome="failed_result")
+                    breaker.record_failure("failed_result")
+                else:
+                    breaker.record_success()
+                return result
+            finally:
+                self._emit_stage(stage, span.outcome, time.perf_counter() - span.start)
+
+    def _emit_stage(self, stage: str, status: str, elapsed: float = None):
+        """Reports a stage start ("started") or end (the span outcome) to the turn's progress callback."""
+        if self._on_event is None:
+            return
+        event = {"type": "stage", "stage": stage, "label": STAGE_PROGRESS_LABELS[stage], "status": status}
+        if elapsed is not None:
+            event["elapsed_ms"] = round(elapsed * 1000.0, 1)
         try:
-            response = self.gemini_model.generate_content(prompt)
+            self._on_event(event)
         except Exception as e:
-            if "429" in str(e):
-                print("\n🚨 Gemini rate limit reached. Concluding interview gracefully.\n")
-                return {"status": "TERMINATED", "reason": "RateLimit"}
-            raise
-        return response.text.strip()
+            logger.debug(f"...Progress callback failed: {e}")
+
+    def _run_expert(self, hint: str, fallback: str):
+        """Runs the Expert stage; if unavailable returns `fallback` (the analyzer's strategic question)."""
+        try:
+            return self._run_stage("expert", self._get_gemini_expert_question, hint=hint)
+        except StageUnavailable as e:
+            logger.info(f"...Gemini (Expert) unavailable ({e.reason}). Using the analyzer's strategic question.")
+            return fallback
 
-    def process_user_answer(self, user_answer: str):
+    def process_user_answer(self, user_answer: str, on_event=None, idempotency_key: str = None,
+                            cancel: CancelToken = None):
         """
         Main orchestration: Analyzer -> (dedicated) Scorer -> Triage/Refiner/Pivot decisions.
 
@@ -2987,9 +1247,112 @@ class InterviewOrchestrator:
         - For strong NORMAL answers (score >= DEEP_ESCALATION_THRESHOLD) we escalate
           to an expert-level question (via Gemini Expert) to ask deeper technical / formulaic questions.
         - Pivot logic: momentum-caused pivot requires PIVOT_GRACE_REQUIRED consecutive detections.
+
+        on_event: optional callback receiving a progress event as each backend stage starts and
+        ends (see process_user_answer_events).
+        idempotency_key: identifies the submission; a duplicate of a running or finished turn gets
+        that turn's result without any backend call (see turn_registry.py). Defaults to this
+        answer to the current question.
+        cancel: token that stops the turn (see cancel()); TurnCancelled is raised and the state is
+        left as it was before the answer.
+        """
+        key = idempotency_key or self.default_turn_key(user_answer)
+        result, duplicate = get_turn_registry().run(self.session_id, key,
+                                                    lambda: self._run_turn(user_answer, on_event, cancel))
+        self.last_turn_duplicate = duplicate
+        if duplicate:
+            logger.info(f"...Duplicate submission ({duplicate}); returning the turn's result without backend calls.")
+            self.tracer.event("duplicate_turn", outcome=duplicate, key=key)
+        return result
+
+    def default_turn_key(self, user_answer: str) -> str:
+        """Idempotency key of `user_answer` to the question currently asked (stable while the turn runs)."""
+        asked = sum(1 for m in self.conversation_history if m.get("role") == "assistant")
+        return turn_key(asked, self.last_question, user_answer)
+
+    def _run_turn(self, user_answer: str, on_event, cancel):
+        self.cancel_token = cancel or CancelToken()
+        self._turn_idle.clear()
+        before = self.snapshot()
+        self.tracer.next_turn()
+        self._branch = None
+        self._on_event = on_event
+        start = time.perf_counter()
+        try:
+            result = self._process_user_answer(user_answer)
+        except TurnCancelled as e:
+            self._apply_state(before)
+            CANCELLED.inc(reason=e.reason)
+            logger.info(f"...Turn cancelled ({e.reason}); state rolled back to before the answer.")
+            self.tracer.event("turn_cancelled", reason=e.reason,
+                              duration_ms=round((time.perf_counter() - start) * 1000.0, 2))
+            raise
+        finally:
+            self._on_event = None
+            self._turn_idle.set()
+        self._maybe_prefetch_pivot(result.get("status"))
+        self.tracer.event(
+            "turn",
+            duration_ms=round((time.perf_counter() - start) * 1000.0, 2),
+            status=result.get("status"),
+            reason=result.get("reason"),
+            branch=self._branch,
+            degraded_stages=self.turn_budget.degraded_stages(),
+            stage_timings_ms={k: round(v * 1000.0, 2) for k, v in self.turn_budget.timings.items()}
+        )
+        return result
+
+    def process_user_answer_events(self, user_answer: str, idempotency_key: str = None):
         """
+        process_user_answer() as a stream of progress events for UIs. The turn runs on a worker
+        thread; this generator yields
+          {"type": "stage", "stage": "scoring", "label": "scoring", "status": "started"}
+          {"type": "stage", ..., "status": "ok" | "timeout" | "circuit_open" | ..., "elapsed_ms": 812.4}
+        as each backend stage starts and ends, then
+          {"type": "result", "result": {...}, "elapsed_ms": ..., "stage_timings_ms": {...}}.
+        An exception raised by the turn is re-raised from the generator. Closing the generator
+        before the result (e.g. the Streamlit script run was stopped) cancels the turn.
+        """
+        events = queue.Queue()
+        token = CancelToken()
+
+        def run():
+            try:
+                result = self.process_user_answer(user_answer, on_event=events.put,
+                                                  idempotency_key=idempotency_key, cancel=token)
+                events.put({"type": "result", "result": result})
+            except (Exception, TurnCancelled) as e:
+                events.put({"type": "error", "error": e})
+
+        start = time.perf_counter()
+        threading.Thread(target=run, name=f"turn-{self.session_id[:8]}", daemon=True).start()
+        finished = False
+        try:
+            while True:
+                event = events.get()
+                if event["type"] == "error":
+                    finished = True
+                    raise event["error"]
+                if event["type"] == "result":
+                    finished = True
+                    event["elapsed_ms"] = round((time.perf_counter() - start) * 1000.0, 1)
+                    event["stage_timings_ms"] = {k: round(v * 1000.0, 1) for k, v in self.turn_budget.timings.items()}
+                    yield event
+                    return
+                yield event
+        finally:
+            if not finished:
+                token.cancel("abandoned")
+
+    def _process_user_answer(self, user_answer: str):
+        """Body of process_user_answer (the public wrapper adds the per-turn trace record)."""
+        self._start_turn_budget()
         self.conversation_history.append({"role": "user", "content": user_answer})
-        analysis = self._get_gemini_analysis(self.last_question, user_answer)
+        try:
+            analysis = self._run_stage("analysis", self._get_gemini_analysis, self.last_question, user_answer)
+        except StageUnavailable as e:
+            logger.info(f"...Gemini (Analyzer) unavailable ({e.reason}). Using rule-based classification.")
+            analysis = self._rule_based_analysis(user_answer)
         
         # Check for rate limit termination
         if isinstance(analysis, dict) and analysis.get("status") == "TERMINATED" and analysis.get("reason") == "RateLimit":
@@ -3008,32 +1371,36 @@ class InterviewOrchestrator:
         if self.hesitation_streak >= 2 and answer_type == "HESITATION_SIGNAL":
             answer_type = "KNOWLEDGE_GAP"
             analysis["answer_type"] = "KNOWLEDGE_GAP"
-            print("...Multiple consecutive hesitations detected → treating as KNOWLEDGE_GAP for mercy pivot.")
+            logger.info("...Multiple consecutive hesitations detected → treating as KNOWLEDGE_GAP for mercy pivot.")
 
         analysis_notes = analysis.get("analysis_notes", "")
         hint = analysis.get("strategic_question", "Ask a logical follow-up.")
-        # ignore analyzer's topic_is_complete for orchestration decisions (user requested)
-        topic_complete_flag = False
+        # Used verbatim in place of the Expert if that stage degrades
+        strategic_fallback = analysis.get("strategic_question") or self.last_question
 
         # ------------- Priority 1: Safety / Immediate Termination -------------
         if analysis.get("terminate_interview", False):
             reason = analysis.get("reason_for_termination", "Safety violation or candidate refusal.")
-            print(f"\nTERMINATING INTERVIEW. Reason: {reason}")
+            logger.warning(f"TERMINATING INTERVIEW. Reason: {reason}")
+            self._branch = "terminate"
             return {"status": "TERMINATED", "analysis": analysis}
 
         # ------------- Priority 2: Knowledge Gap (instant mercy pivot) -------------
         # If user explicitly says "I don't know" (KNOWLEDGE_GAP) — immediate mercy pivot (no scoring call)
         if answer_type == "KNOWLEDGE_GAP":
-            print(f"...User 'KNOWLEDGE_GAP' detected. Forcing a 'Mercy Pivot' (no scoring).")
-            topic_complete_flag = True
+            logger.info(f"...User 'KNOWLEDGE_GAP' detected. Forcing a 'Mercy Pivot' (no scoring).")
+            self._branch = "knowledge_gap_pivot"
             hint = f"Candidate is stuck on '{self.current_topic}'. Ask a new L0 question for the next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
             # Do not call scorer — immediate pivot
             score = 0.0
-            # defensive: prevent momentum forced pivot this round
-            momentum_causes_forced_pivot = False
+            score_cache_hit = None
         else:
             # ------------- Else: call the separate scorer -------------
-            score_result = self._get_gemini_score(self.last_question, user_answer)
+            try:
+                score_result = self._run_stage("scoring", self._get_gemini_score, self.last_question, user_answer)
+            except StageUnavailable as e:
+                logger.info(f"...Gemini (Scorer) unavailable ({e.reason}). Using rule-based score.")
+                score_result = self._rule_based_score(user_answer, answer_type)
             
             # Check for rate limit termination
             if isinstance(score_result, dict) and score_result.get("status") == "TERMINATED" and score_result.get("reason") == "RateLimit":
@@ -3041,53 +1408,39 @@ class InterviewOrchestrator:
             
             score = score_result.get("score", None)
             score_reason = score_result.get("score_reason", "")
+            score_cache_hit = score_result.get("cache_hit")
 
             # If scorer failed, do NOT fallback to analyzer numeric score.
             if score is None:
                 # fallback: last known valid score or 0.0
-                last_valid = None
-                for s in reversed(self.recent_scores):
-                    try:
-                        if s is not None:
-                            last_valid = float(s)
-                            break
-                    except:
-                        continue
+                last_valid = self.momentum.last_score
                 if last_valid is not None:
                     score = round(last_valid, 1)
-                    print(f"...Scorer failed. Falling back to last known score: {score}")
+                    logger.info(f"...Scorer failed. Falling back to last known score: {score}")
                 else:
                     score = 0.0
-                    print("...Scorer failed. No previous score found. Using conservative score: 0.0")
+                    logger.info("...Scorer failed. No previous score found. Using conservative score: 0.0")
             else:
                 # we have a valid scorer value
                 pass
 
-        # Maintain recent scores for momentum and density (oldest...newest)
+        # Update momentum, density and rolling statistics with the new score (O(1), see MomentumTracker)
         try:
-            self.recent_scores.append(float(score))
-        except:
-            self.recent_scores.append(0.0)
-
-        if len(self.recent_scores) > 10:
-            self.recent_scores = self.recent_scores[-10:]
-
-        # Compute sliding-window momentum signal (uses normalization_divisor and weight)
-        momentum_info = compute_momentum(self.recent_scores,
-                                        normalization_divisor=DEFAULT_MOMENTUM_NORM_DIV,
-                                        weight=DEFAULT_MOMENTUM_WEIGHT)
+            momentum_info = self.momentum.update(float(score))
+        except (TypeError, ValueError):
+            momentum_info = self.momentum.update(0.0)
         momentum_signal = momentum_info['signal']
         momentum_norm = momentum_info['norm']
         momentum_weighted = momentum_info['weighted']
 
         # Debug output for momentum
-        print(f"...[MOMENTUM DEBUG] raw={momentum_info['raw']:.3f}, norm={momentum_norm:.3f}, "
+        logger.debug(f"...[MOMENTUM DEBUG] raw={momentum_info['raw']:.3f}, norm={momentum_norm:.3f}, "
               f"weighted={momentum_weighted:.3f}, signal={momentum_signal}")
 
         # Update low_score_streak for logging/observability (use scorer-derived score)
         if float(score) <= 1.5:
             self.low_score_streak += 1
-            print(f"...Low score streak is now: {self.low_score_streak}")
+            logger.info(f"...Low score streak is now: {self.low_score_streak}")
         else:
             self.low_score_streak = 0
 
@@ -3098,186 +1451,150 @@ class InterviewOrchestrator:
         elif score >= QUALITY_THRESHOLD:
             grade_letter = "H"
 
-        print(f"...Score ({score}) [{grade_letter}] Analysis...")
+        logger.info(f"...Score ({score}) [{grade_letter}] Analysis...")
 
-        # ------- Minimal density-based fallback (replaces hard strike-limit) -------
-        density_window = 2  # Reduced for faster pivot
-        density_thresh = 0.75  # e.g., 75% of window being L triggers pivot
-        recent_for_density = self.recent_scores[-density_window:]
-        low_count = sum(1 for s in recent_for_density if s <= 1.5)
-        low_density_trigger = (len(recent_for_density) == density_window and (low_count / density_window) >= density_thresh)
-
-        # ------- Momentum-influenced policy adjustments (soft MP3) -------
-        momentum_causes_forced_pivot = (momentum_signal == "STRONG_NEGATIVE")
-        # Prevent momentum-caused pivot if knowledge gap was detected earlier
-        if answer_type == "KNOWLEDGE_GAP":
-            momentum_causes_forced_pivot = False
+        # ---------------- ROUTING DECISION (pure and score-driven, see routing_policy.py) ----------------
+        # The analyzer's topic_is_complete is ignored for automatic pivoting to avoid false positives.
+        decision = route(self.routing, answer_type, score, momentum_info, self.momentum.strong_streak,
+                         self.momentum.rolling_average(), self.momentum.low_density(),
+                         self.questions_in_current_topic, self.pivot_grace_counter)
+        next_topic = self.topic_syllabus[0] if self.topic_syllabus else 'a new area'
 
         next_question = None
+        self._pivot_context = {"user_answer": user_answer, "score": score, "answer_type": answer_type,
+                               "analysis_notes": analysis_notes}
 
-        # ---------------- ROUTING LOGIC (preserve original priorities) ----------------
-        # 3. Judge's (Gemini) pivot — NOT used for topic_is_complete orchestration, but keep compatibility:
-        # We will ignore analysis['topic_is_complete'] for automatic pivoting to avoid false positives.
-
-        # 4. Behavioral interceptors (EVASIVE / CHALLENGE)
-        if answer_type == "EVASIVE_NON_ANSWER":
-            print(f"...User is stalling. Calling Gemini (Expert) to be firm.")
+        # 4. Behavioral interceptors (EVASIVE / CHALLENGE) and the hesitation shortcut: the Gemini
+        #    Expert answers, and pivoting is skipped this turn.
+        if decision.branch == "evasive_expert":
+            logger.info(f"...User is stalling. Calling Gemini (Expert) to be firm.")
             hint = f"The candidate is stalling ('{user_answer}'). Politely but firmly, re-ask the last question: '{self.last_question}'"
-            next_question = self._get_gemini_expert_question(hint=hint)
-            if isinstance(next_question, dict) and next_question.get("status") == "TERMINATED" and next_question.get("reason") == "RateLimit":
-                return next_question
-
-        elif answer_type == "EVASIVE_CHALLENGE":
-            print(f"...User is challenging. Calling Gemini (Expert) to restate role.")
+        elif decision.branch == "challenge_expert":
+            logger.info(f"...User is challenging. Calling Gemini (Expert) to restate role.")
             hint = f"The candidate is challenging ('{user_answer}'). Politely restate your role as the interviewer and then re-ask the last question: '{self.last_question}'"
-            next_question = self._get_gemini_expert_question(hint=hint)
-            if isinstance(next_question, dict) and next_question.get("status") == "TERMINATED" and next_question.get("reason") == "RateLimit":
-                return next_question
-
-        # ---------- BEGIN: PRIORITIZED HESITATION / KNOWLEDGE / PIVOT GUARDS ----------
-        # Optional: Hesitation shortcut — prefer a short clarifying question and skip pivots
-        if answer_type == "HESITATION_SIGNAL" and next_question is None and not topic_complete_flag:
-            print("...Answer marked HESITATION_SIGNAL. Using Gemini Expert to produce a short clarifying question.")
+        elif decision.branch == "hesitation_expert":
+            logger.info("...Answer marked HESITATION_SIGNAL. Using Gemini Expert to produce a short clarifying question.")
             hint = f"Candidate hesitated on '{self.current_topic}'. Ask a short, simple clarifying question (<=12 words)."
-            next_question = self._get_gemini_expert_question(hint=hint)
+        if decision.branch in EXPERT_BRANCHES:
+            self._branch = decision.branch
+            next_question = self._run_expert(hint, strategic_fallback)
             if isinstance(next_question, dict) and next_question.get("status") == "TERMINATED" and next_question.get("reason") == "RateLimit":
                 return next_question
 
-        # If Gemini Expert already produced a next_question (e.g., from EVASIVE_* or HESITATION),
-        # we prefer that expert-crafted question and skip pivoting logic this turn.
-        expert_escalation_present = (next_question is not None)
-
-        # ------- Natural "topic complete" detection (soft, human-like) -------
-        # This orchestration respects your instruction: do not depend on analyzer.topic_is_complete
-        natural_topic_complete = False
-        try:
-            if (not expert_escalation_present) and answer_type not in ("HESITATION_SIGNAL", "KNOWLEDGE_GAP"):
-                if len(self.recent_scores) >= 3 and all(s >= 7.0 for s in self.recent_scores[-3:]) and momentum_weighted >= 0.0:
-                    natural_topic_complete = True
-                elif len(self.recent_scores) >= 4 and (sum(self.recent_scores[-4:]) / 4.0) >= 6.0 and momentum_weighted >= 0.0:
-                    natural_topic_complete = True
-                else:
-                    natural_topic_complete = False
-        except Exception:
-            natural_topic_complete = False
-
-        if natural_topic_complete:
-            # Block natural topic completion if fewer than 2 questions asked
-            if self.questions_in_current_topic < 2:
-                print("...Natural topic completion triggered early but BLOCKED (min 2 questions rule).")
-                natural_topic_complete = False
-            else:
-                print("...Natural topic completion detected by recent scorer pattern. Preparing to pivot.")
-                topic_complete_flag = True
-                hint = f"Candidate has demonstrated stable competence on '{self.current_topic}'. Pivot to next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-
-        # ------- Momentum & Density pivots (run ONLY if no higher-priority expert actions) -------
-        allow_pivot_checks = (not topic_complete_flag) and (not expert_escalation_present) and (answer_type not in ("HESITATION_SIGNAL", "KNOWLEDGE_GAP"))
-
-        if allow_pivot_checks:
-            # 5. Momentum forced pivot (soft) with grace window requiring consecutive detections
-            if momentum_causes_forced_pivot:
-                # If momentum negative, increment grace counter. Only pivot after PIVOT_GRACE_REQUIRED consecutive detections.
-                if self.pivot_grace_counter < (self.PIVOT_GRACE_REQUIRED - 1):
-                    self.pivot_grace_counter += 1
-                    print(f"...Momentum negative detected (grace {self.pivot_grace_counter}/{self.PIVOT_GRACE_REQUIRED}). Not pivoting yet.")
-                    # Do not pivot this turn; treat as not forcing pivot
-                    momentum_causes_forced_pivot = False
-                else:
-                    # this is the Nth consecutive negative detection -> pivot now
-                    print(f"...Momentum signal STRONG_NEGATIVE after grace window → pivot.")
-                    topic_complete_flag = True
-                    hint = f"Candidate shows a clear declining trend on '{self.current_topic}'. Pivot to next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-                    # reset low score streak only for safety
-                    self.low_score_streak = 0
-                    # reset pivot grace counter after pivot
-                    self.pivot_grace_counter = 0
-            else:
-                # momentum not negative -> reset grace counter (break consecutive streak)
-                if self.pivot_grace_counter != 0:
-                    print("...Momentum recovered or not negative — resetting pivot grace counter.")
-                self.pivot_grace_counter = 0
-
-            # 6. Low-score density fallback (conservative)
-            if low_density_trigger and answer_type != "EVASIVE_NON_ANSWER":
-                print(f"...Low-score density detected ({low_count}/{density_window}). Forcing a pivot.")
-                topic_complete_flag = True
-                hint = f"Multiple weak answers on '{self.current_topic}'. Pivoting to next topic: '{self.topic_syllabus[0] if self.topic_syllabus else 'a new area'}'."
-                self.low_score_streak = 0
-                # reset pivot grace counter since we pivot due to density
-                self.pivot_grace_counter = 0
-        # ---------- END: PRIORITIZED HESITATION / KNOWLEDGE / PIVOT GUARDS ----------
+        # 5. Natural topic completion, momentum pivot (grace window) and low-score density pivot
+        if decision.completion_blocked:
+            logger.info("...Natural topic completion triggered early but BLOCKED (min 2 questions rule).")
+        if decision.pivot_grace_counter > self.pivot_grace_counter:
+            logger.info(f"...Momentum negative detected (grace {decision.pivot_grace_counter}/{self.PIVOT_GRACE_REQUIRED}). Not pivoting yet.")
+        elif decision.pivot_grace_counter == 0 and self.pivot_grace_counter != 0 and (decision.cause or decision.branch) not in PIVOT_BRANCHES:
+            logger.info("...Momentum recovered or not negative — resetting pivot grace counter.")
+        self.pivot_grace_counter = decision.pivot_grace_counter
+
+        cause = decision.cause or decision.branch
+        if cause == "natural_completion_pivot":
+            logger.info("...Natural topic completion detected by recent scorer pattern. Preparing to pivot.")
+            hint = f"Candidate has demonstrated stable competence on '{self.current_topic}'. Pivot to next topic: '{next_topic}'."
+        elif cause == "momentum_pivot":
+            logger.info(f"...Momentum signal STRONG_NEGATIVE after grace window → pivot.")
+            hint = f"Candidate shows a clear declining trend on '{self.current_topic}'. Pivot to next topic: '{next_topic}'."
+            self.low_score_streak = 0
+        elif cause == "density_pivot":
+            logger.info(f"...Low-score density detected ({self.momentum.low_count}/{self.routing.density_window}). Forcing a pivot.")
+            hint = f"Multiple weak answers on '{self.current_topic}'. Pivoting to next topic: '{next_topic}'."
+            self.low_score_streak = 0
 
         # 7. Topic Pivot handling
+        topic_complete_flag = decision.pivot or decision.branch == "pivot_blocked"
         if topic_complete_flag:
-            # 🚨 NEW RULE:
-            # If pivot was caused by KNOWLEDGE_GAP → bypass min-2 requirement
-            if analysis.get("answer_type") != "KNOWLEDGE_GAP":
-                # Old rule still applies for all other pivot types
-                if self.questions_in_current_topic < 2:
-                    print("...Pivot blocked: fewer than 2 questions asked in this topic. Continuing within the same topic.")
-                    topic_complete_flag = False
-                    return {
-                        "status": "CONTINUE",
-                        "next_question": self.last_question,
-                        "analysis": analysis
-                    }
+            # Pivots other than KNOWLEDGE_GAP need 2 questions on the topic first
+            if decision.branch == "pivot_blocked":
+                logger.info("...Pivot blocked: fewer than 2 questions asked in this topic. Continuing within the same topic.")
+                self._branch = "pivot_blocked"
+                return {
+                    "status": "CONTINUE",
+                    "next_question": self.last_question,
+                    "analysis": analysis,
+                    "degraded_stages": self.turn_budget.degraded_stages()
+                }
+            self._branch = decision.branch
 
             # ---- Continue with normal pivot ----
-            print(f"...Topic '{self.current_topic}' is complete. Pivoting...")
+            logger.info(f"...Topic '{self.current_topic}' is complete. Pivoting...")
             self.low_score_streak = 0
 
 
             if not self.topic_syllabus:
-                print("...Syllabus complete. Ending interview.")
+                logger.info("...Syllabus complete. Ending interview.")
+                self._branch = "syllabus_finished"
                 return {"status": "TERMINATED", "analysis": analysis, "reason": "SyllabusFinished"}
 
             self.current_topic = self.topic_syllabus.pop(0)
-            print(f"...Pivoting to new topic: {self.current_topic}")
+            logger.info(f"...Pivoting to new topic: {self.current_topic}")
             self.questions_in_current_topic = 0
 
-            next_question = self._get_gemini_pivot_question(
-                new_topic=self.current_topic,
-                user_answer=user_answer,
-                score=score,
-                answer_type=answer_type,
-                analysis_notes=analysis_notes
-            )
+            try:
+                next_question = self._banked_pivot_question(score, answer_type) or self._take_prefetched_pivot()
+                if next_question is None:
+                    next_question = self._run_stage(
+                        "pivot",
+                        self._get_gemini_pivot_question,
+                        new_topic=self.current_topic,
+                        user_answer=user_answer,
+                        score=score,
+                        answer_type=answer_type,
+                        analysis_notes=analysis_notes
+                    )
+            except StageUnavailable as e:
+                logger.info(f"...Gemini (Pivot) unavailable ({e.reason}). Using a template opening question.")
+                next_question = self._fallback_pivot_question(self.current_topic)
             if isinstance(next_question, dict) and next_question.get("status") == "TERMINATED" and next_question.get("reason") == "RateLimit":
                 return next_question
 
         # 8. Default 'Fusion Pass' (SLM triage + Gemini refinement)
         elif next_question is None:
             # NEW: Expert escalation for truly strong NORMAL answers (skip SLM triage, ask deeper expert Q)
-            if answer_type == "NORMAL" and float(score) >= DEEP_ESCALATION_THRESHOLD:
-                print(f"...Strong NORMAL answer detected (score={score}). Escalating to expert-level follow-up.")
+            if decision.branch == "expert_escalation":
+                logger.info(f"...Strong NORMAL answer detected (score={score}). Escalating to expert-level follow-up.")
+                self._branch = "expert_escalation"
                 # Provide a hint to the Gemini Expert to ask a deeper, expert-level follow-up. Avoid praise and robotic transitions.
                 expert_hint = ("Candidate appears well-read. Ask a deeper, expert-level technical follow-up. "
                                "You may include a short formula, a comparison, or ask for trade-offs. "
                                "Do NOT use praise words.")
-                next_question = self._get_gemini_expert_question(hint=expert_hint)
+                next_question = self._run_expert(expert_hint, strategic_fallback)
                 if isinstance(next_question, dict) and next_question.get("status") == "TERMINATED" and next_question.get("reason") == "RateLimit":
                     return next_question
 
             else:
-                print(f"...Score ({score}) routed to Fusion Pass (SLM -> Gemini Editor).")
-                slm_draft_question = self._get_slm_triage_question()
+                logger.info(f"...Score ({score}) routed to Fusion Pass (SLM -> Gemini Editor).")
+                self._branch = "fusion_refine"
+                try:
+                    slm_draft_question = self._run_stage("triage", self._get_slm_triage_question)
+                except StageUnavailable as e:
+                    logger.info(f"...SLM (Triage) unavailable ({e.reason}).")
+                    slm_draft_question = None
 
                 if slm_draft_question is None or slm_draft_question == "[CONFIDENCE_LOW]":
-                    print("...SLM failed or escalated. Calling Gemini (Fallback).")
+                    logger.info("...SLM failed or escalated. Calling Gemini (Fallback).")
+                    self._branch = "fusion_fallback_expert"
                     fallback_hint = f"Candidate's score was {score} and the SLM (TFailure) failed. Use this hint: {hint}"
-                    next_question = self._get_gemini_expert_question(hint=fallback_hint)
+                    next_question = self._run_expert(fallback_hint, strategic_fallback)
                     if isinstance(next_question, dict) and next_question.get("status") == "TERMINATED" and next_question.get("reason") == "RateLimit":
                         return next_question
                 else:
                     # pass answer_type to refiner via extra_meta so it can adapt wording
-                    next_question = self._get_gemini_refinement(
-                        user_answer=user_answer,
-                        analysis_notes=analysis_notes,
-                        slm_output=slm_draft_question,
-                        hint=hint,
-                        answer_type=answer_type
-                    )
+                    try:
+                        next_question = self._run_stage(
+                            "refinement",
+                            self._get_gemini_refinement,
+                            user_answer=user_answer,
+                            analysis_notes=analysis_notes,
+                            slm_output=slm_draft_question,
+                            hint=hint,
+                            answer_type=answer_type
+                        )
+                    except StageUnavailable as e:
+                        logger.info(f"...Gemini (Editor) unavailable ({e.reason}). Using the raw SLM draft.")
+                        next_question = slm_draft_question
                     if isinstance(next_question, dict) and next_question.get("status") == "TERMINATED" and next_question.get("reason") == "RateLimit":
                         return next_question
 
@@ -3295,8 +1612,11 @@ class InterviewOrchestrator:
         # Attach the latest score into the analysis return for user debugging
         analysis_return = analysis.copy()
         analysis_return['score_used'] = round(float(score), 1) if isinstance(score, (int, float)) else score
+        if score_cache_hit:
+            analysis_return['score_cache_hit'] = score_cache_hit
 
-        return {"status": "CONTINUE", "next_question": normalized_question, "analysis": analysis_return}
+        return {"status": "CONTINUE", "next_question": normalized_question, "analysis": analysis_return,
+                "degraded_stages": self.turn_budget.degraded_stages()}
 
 # --- 3. Main execution loop ---
 def main():
@@ -0,0 +1,438 @@
+# llm_providers.py
+# Pluggable LLM backends for InterviewOrchestrator.
+# - LLMProvider: generate() (sync), agenerate() (async) and stream() (text chunks). A prompt is
+#   either a string or a chat message list; json_mode and a per-call config dict
+#   (temperature, max_tokens, stop, top_p) are accepted by every backend.
+# - Adapters: GeminiProvider (shared provider pool + rate limiter), LlamaProvider (in-process
+#   llama.cpp), SLMServerProvider (the slm_server.py HTTP API) and FakeProvider (deterministic,
+#   offline; built on stub_backends.py).
+# - get_gemini_provider() returns the process-wide GeminiProvider shared by all sessions.
+# - slm_provider_from_env() picks the SLM backend from SLM_BACKEND=llama|server|fake|none;
+#   get_slm_provider() caches it for the process.
+# - Every call takes an optional CancelToken (cancellation.py): requests not sent yet are never
+#   sent, the llama.cpp decode stops at the next token, SLM server requests are closed and
+#   streams end; TurnCancelled is raised.
+# Usage: from llm_providers import GeminiProvider, slm_provider_from_env
+
+import functools
+import json
+import os
+import socket
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Union
+
+import cancellation
+from rate_limiter import PRIORITY_INTERACTIVE, get_rate_limiter
+
+Prompt = Union[str, List[Dict[str, str]]]
+
+DEFAULT_SLM_SERVER_TIMEOUT = 30.0   # seconds, when the caller gives no deadline
+
+
+class ProviderUnavailable(Exception):
+    """The backend cannot serve the call right now (busy, not loaded, HTTP error)."""
+
+
+class GenerationResult:
+    """Text plus token usage of one call. `raw` keeps the backend's own response object."""
+
+    def __init__(self, text: str, prompt_tokens: Optional[int] = None, output_tokens: Optional[int] = None,
+                 model: Optional[str] = None, raw=None):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+        self.model = model
+        self.raw = raw
+
+    def __repr__(self):
+        return f"GenerationResult(model={self.model!r}, text={self.text[:40]!r})"
+
+
+def as_messages(prompt: Prompt) -> List[Dict[str, str]]:
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return list(prompt)
+
+
+def as_text(prompt: Prompt) -> str:
+    """Flattens a message list for completion-style backends."""
+    if isinstance(prompt, str):
+        return prompt
+    lines = []
+    for m in prompt:
+        role = m.get("role", "user")
+        lines.append(m["content"] if role == "system" else f"{role.capitalize()}: {m['content']}")
+    return "\n\n".join(lines)
+
+
+def _timeout_for(deadline: Optional[float], default: float) -> float:
+    if deadline is None:
+        return default
+    return max(0.1, deadline - time.monotonic())
+
+
+class LLMProvider:
+    """
+    Base class. Subclasses implement generate(); stream() and agenerate() default to running
+    generate() (one chunk / on a worker thread) for backends without native support.
+    deadline is a time.monotonic() timestamp.
+    """
+
+    name = "llm"
+
+    def generate(self, prompt: Prompt, call_type: str = "default", json_mode: bool = False,
+                 config: Optional[Dict] = None, deadline: Optional[float] = None,
+                 priority: int = PRIORITY_INTERACTIVE, cancel=None) -> GenerationResult:
+        raise NotImplementedError
+
+    def stream(self, prompt: Prompt, call_type: str = "default", json_mode: bool = False,
+               config: Optional[Dict] = None, deadline: Optional[float] = None,
+               priority: int = PRIORITY_INTERACTIVE, cancel=None) -> Iterator[str]:
+        yield self.generate(prompt, call_type=call_type, json_mode=json_mode, config=config,
+                            deadline=deadline, priority=priority, cancel=cancel).text
+
+    async def agenerate(self, prompt: Prompt, **kwargs) -> GenerationResult:
+        import asyncio  # only async callers pay for the import
+        return await asyncio.to_thread(self.generate, prompt, **kwargs)
+
+
+@functools.lru_cache(maxsize=64)
+def _gemini_generation_config(json_mode: bool, temperature, top_p, max_tokens, stop) -> Optional[Dict]:
+    """
+    Generation config for one combination of settings, built once and shared by every call
+    (generate_content accepts a plain dict in place of genai.GenerationConfig). Treat as read-only.
+    """
+    settings = {}
+    if json_mode:
+        settings["response_mime_type"] = "application/json"
+    if temperature is not None:
+        settings["temperature"] = temperature
+    if top_p is not None:
+        settings["top_p"] = top_p
+    if max_tokens is not None:
+        settings["max_output_tokens"] = max_tokens
+    if stop:
+        settings["stop_sequences"] = list(stop)
+    return settings or None
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini through the shared ProviderPool (key/model failover) and the shared RPM/TPM limiter."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str] = None, model_name: str = "gemini-2.5-flash-lite",
+                 pool=None, limiter=None):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._pool = pool
+        self._pool_lock = threading.Lock()
+        self.limiter = limiter or get_rate_limiter()
+
+    @property
+    def pool(self):
+        """
+        The provider pool, built on first use. google.generativeai is only imported here, so
+        constructing the provider (and importing kiro7) stays cheap until a request is made.
+        """
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    from provider_pool import configure_genai, get_provider_pool
+                    configure_genai(self.api_key)
+                    self._pool = get_provider_pool(self.api_key, self.model_name)
+        return self._pool
+
+    @staticmethod
+    def _generation_config(json_mode: bool, config: Optional[Dict]) -> Optional[Dict]:
+        config = config or {}
+        stop = config.get("stop")
+        return _gemini_generation_config(bool(json_mode), config.get("temperature"), config.get("top_p"),
+                                         config.get("max_tokens"), tuple(stop) if stop else None)
+
+    def generate(self, prompt, call_type="default", json_mode=False, config=None, deadline=None,
+                 priority=PRIORITY_INTERACTIVE, cancel=None):
+        response = self.pool.generate(call_type, as_text(prompt),
+                                      generation_config=self._generation_config(json_mode, config),
+                                      limiter=self.limiter, deadline=deadline, priority=priority,
+                                      cancel=cancel)
+        usage = getattr(response, "usage_metadata", None)
+        return GenerationResult(
+            response.text,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            output_tokens=getattr(usage, "candidates_token_count", None),
+            model=self.name,
+            raw=response,
+        )
+
+    def stream(self, prompt, call_type="default", json_mode=False, config=None, deadline=None,
+               priority=PRIORITY_INTERACTIVE, cancel=None):
+        response = self.pool.generate(call_type, as_text(prompt),
+                                      generation_config=self._generation_config(json_mode, config),
+                                      limiter=self.limiter, deadline=deadline, priority=priority,
+                                      stream=True, cancel=cancel)
+        for chunk in response:
+            cancellation.check(cancel)
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+
+class LlamaProvider(LLMProvider):
+    """
+    In-process llama.cpp model. llama.cpp is not re-entrant, so calls are serialised; a call
+    that cannot get the model before its deadline raises ProviderUnavailable.
+    """
+
+    name = "llama"
+
+    def __init__(self, model_path: Optional[str] = None, model=None, n_gpu_layers: int = -1, n_ctx: int = 2048):
+        if model is None:
+            from llama_cpp import Llama
+            model = Llama(model_path=model_path, n_gpu_layers=n_gpu_layers, n_ctx=n_ctx, verbose=False)
+        self.model = model
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _kwargs(prompt, json_mode, config):
+        config = config or {}
+        kwargs = {"messages": as_messages(prompt),
+                  "max_tokens": config.get("max_tokens", 256),
+                  "temperature": config.get("temperature", 0.25)}
+        if config.get("stop"):
+            kwargs["stop"] = list(config["stop"])
+        if config.get("top_p") is not None:
+            kwargs["top_p"] = config["top_p"]
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    def _acquire(self, deadline, cancel=None):
+        timeout = -1 if deadline is None else max(0.0, deadline - time.monotonic())
+        if not self._lock.acquire(timeout=timeout):
+            raise ProviderUnavailable("SLM busy with another decode")
+        if cancel is not None and cancel.cancelled:
+            self._lock.release()
+            raise cancellation.TurnCancelled(cancel.reason)
+
+    def generate(self, prompt, call_type="default", json_mode=False, config=None, deadline=None,
+                 priority=PRIORITY_INTERACTIVE, cancel=None):
+        if cancel is not None:
+            # decode token by token so a cancelled turn frees the model at the next token
+            chunks = list(self.stream(prompt, call_type=call_type, json_mode=json_mode, config=config,
+                                      deadline=deadline, priority=priority, cancel=cancel))
+            return GenerationResult("".join(chunks), output_tokens=len(chunks), model=self.name)
+        self._acquire(deadline)
+        try:
+            output = self.model.create_chat_completion(**self._kwargs(prompt, json_mode, config))
+        finally:
+            self._lock.release()
+        usage = output.get("usage") or {}
+        return GenerationResult(
+            output["choices"][0]["message"]["content"] or "",
+            prompt_tokens=usage.get("prompt_tokens"),
+            output_tokens=usage.get("completion_tokens"),
+            model=self.name,
+            raw=output,
+        )
+
+    def stream(self, prompt, call_type="default", json_mode=False, config=None, deadline=None,
+               priority=PRIORITY_INTERACTIVE, cancel=None):
+        self._acquire(deadline, cancel)
+        try:
+            for chunk in self.model.create_chat_completion(stream=True, **self._kwargs(prompt, json_mode, config)):
+                cancellation.check(cancel)
+                text = chunk["choices"][0].get("delta", {}).get("content")
+                if text:
+                    yield text
+        finally:
+            self._lock.release()
+
+
+def _abort_response(response) -> None:
+    """Closes a streamed requests response from another thread; shutdown() wakes a read blocked on it."""
+    raw = response.raw
+    sock = getattr(getattr(raw, "connection", None), "sock", None)
+    if sock is None:      # http.client hands the socket to the body reader on "Connection: close"
+        reader = getattr(getattr(raw, "_fp", None), "fp", None)
+        sock = getattr(getattr(reader, "raw", None), "_sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    response.close()
+
+
+class SLMServerProvider(LLMProvider):
+    """
+    The /generate endpoint of slm_server.py (e.g. reached through ngrok). Replies are streamed, so
+    a cancelled call closes the connection and the server stops decoding at the next token.
+    json_mode is forwarded to the server (llama.cpp's JSON response format).
+    """
+
+    name = "slm_server"
+
+    def __init__(self, base_url: str, timeout: float = DEFAULT_SLM_SERVER_TIMEOUT):
+        import requests
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _payload(self, prompt, call_type, json_mode, config):
+        config = config or {}
+        payload = {"messages": as_messages(prompt),
+                   "max_tokens": config.get("max_tokens", 80),
+                   "temperature": config.get("temperature", 0.25),
+                   "stream": True,
+                   "call_type": call_type}   # the server counts slm_triage outcomes
+        if config.get("stop"):
+            payload["stop"] = list(config["stop"])
+        if json_mode:
+            payload["json_mode"] = True
+        return payload
+
+    def generate(self, prompt, call_type="default", json_mode=False, config=None, deadline=None,
+                 priority=PRIORITY_INTERACTIVE, cancel=None):
+        chunks = list(self.stream(prompt, call_type=call_type, json_mode=json_mode, config=config,
+                                  deadline=deadline, priority=priority, cancel=cancel))
+        return GenerationResult("".join(chunks), output_tokens=len(chunks), model=self.name)
+
+    def stream(self, prompt, call_type="default", json_mode=False, config=None, deadline=None,
+               priority=PRIORITY_INTERACTIVE, cancel=None):
+        cancellation.check(cancel)
+        timeout = _timeout_for(deadline, self.timeout)
+        give_up = time.monotonic() + timeout
+        try:
+            response = self.session.post(f"{self.base_url}/generate", json=self._payload(prompt, call_type, json_mode, config),
+                                         timeout=timeout, stream=True)
+        except Exception as e:
+            raise ProviderUnavailable(f"SLM server request failed: {e}")
+        # aborting the response from the cancelling thread breaks the read below
+        unregister = cancel.on_cancel(lambda: _abort_response(response)) if cancel is not None else None
+        try:
+            if "ndjson" not in response.headers.get("Content-Type", ""):
+                data = response.json()    # an error, or a server without streaming support
+                if not data.get("success"):
+                    raise ProviderUnavailable(f"SLM server error ({response.status_code}): {data.get('error')}")
+                yield data.get("text", "")
+                return
+            done = False
+            for line in response.iter_lines():
+                cancellation.check(cancel)
+                if time.monotonic() > give_up:
+                    raise ProviderUnavailable("SLM server reply exceeded the deadline")
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get("text"):
+                    yield event["text"]
+                elif event.get("success") is False:
+                    raise ProviderUnavailable(f"SLM server error: {event.get('error')}")
+                elif event.get("done"):
+                    done = True
+            cancellation.check(cancel)
+            if not done:
+                raise ProviderUnavailable("SLM server closed the stream early")
+        except (ProviderUnavailable, cancellation.TurnCancelled):
+            raise
+        except Exception as e:
+            cancellation.check(cancel)     # the read failed because the cancel closed the response
+            raise ProviderUnavailable(f"SLM server request failed: {e}")
+        finally:
+            if unregister is not None:
+                unregister()
+            response.close()
+
+
+class FakeProvider(LLMProvider):
+    """
+    Deterministic offline backend. String prompts are answered like Gemini (call type detected from
+    the prompt, scripted JSON for the Analyzer / Scorer); message lists like the SLM triage model.
+    """
+
+    name = "fake"
+
+    def __init__(self, script: Optional[Dict[str, Dict]] = None, latency=None, slm_latency=None,
+                 low_confidence_rate: float = 0.0):
+        from stub_backends import StubGeminiModel, StubLlama
+        self.gemini = StubGeminiModel(script=script, latency=latency)
+        self.slm = StubLlama(latency=slm_latency, low_confidence_rate=low_confidence_rate)
+
+    def generate(self, prompt, call_type="default", json_mode=False, config=None, deadline=None,
+                 priority=PRIORITY_INTERACTIVE, cancel=None):
+        cancellation.check(cancel)
+        if isinstance(prompt, str):
+            request_options = {"timeout": _timeout_for(deadline, 60.0)}
+            response = self.gemini.generate_content(prompt, request_options=request_options)
+            usage = response.usage_metadata
+            return GenerationResult(response.text, usage.prompt_token_count, usage.candidates_token_count,
+                                    model=self.name, raw=response)
+        output = self.slm.create_chat_completion(messages=prompt, **{k: v for k, v in (config or {}).items()
+                                                                     if k in ("max_tokens", "stop", "temperature")})
+        usage = output["usage"]
+        return GenerationResult(output["choices"][0]["message"]["content"], usage["prompt_tokens"],
+                                usage["completion_tokens"], model=self.name, raw=output)
+
+    def stream(self, prompt, call_type="default", json_mode=False, config=None, deadline=None,
+               priority=PRIORITY_INTERACTIVE, cancel=None):
+        text = self.generate(prompt, call_type=call_type, json_mode=json_mode, config=config,
+                             deadline=deadline, priority=priority, cancel=cancel).text
+        for i, word in enumerate(text.split(" ")):
+            cancellation.check(cancel)
+            yield word if i == 0 else " " + word
+
+
+_shared_gemini: Dict = {}
+_shared_gemini_lock = threading.Lock()
+
+
+def get_gemini_provider(api_key: Optional[str], model_name: str) -> GeminiProvider:
+    """
+    The process-wide GeminiProvider for (api_key, model_name). Sessions share it, and with it the
+    provider pool, the Gemini client handles and the cached generation configs, so a new session
+    costs no client setup. Safe to call from Streamlit's script threads.
+    """
+    from provider_pool import CLIENT_REUSES, CLIENT_SETUPS
+    with _shared_gemini_lock:
+        provider = _shared_gemini.get((api_key, model_name))
+        if provider is None:
+            provider = _shared_gemini[(api_key, model_name)] = GeminiProvider(api_key, model_name)
+            CLIENT_SETUPS.inc(kind="provider")
+        else:
+            CLIENT_REUSES.inc(kind="provider")
+        return provider
+
+
+def slm_provider_from_env(default_model_path: str) -> Optional[LLMProvider]:
+    """
+    SLM_BACKEND=llama   (default) load SLM_MODEL_PATH in-process with llama.cpp
+    SLM_BACKEND=server  call slm_server.py at SLM_SERVER_URL
+    SLM_BACKEND=fake    deterministic stand-in
+    SLM_BACKEND=none    Gemini-only mode
+    """
+    backend = os.getenv("SLM_BACKEND", "llama").strip().lower()
+    if backend == "none":
+        return None
+    if backend == "server":
+        return SLMServerProvider(os.getenv("SLM_SERVER_URL", "http://localhost:5000"))
+    if backend == "fake":
+        return FakeProvider()
+    return LlamaProvider(model_path=os.getenv("SLM_MODEL_PATH", default_model_path))
+
+
+_shared_slm: Dict = {}
+_shared_slm_lock = threading.Lock()
+
+
+def get_slm_provider(default_model_path: str) -> Optional[LLMProvider]:
+    """
+    The process-wide SLM backend from slm_provider_from_env(), loaded once and shared by every
+    session (LlamaProvider already serialises decodes). A failed load is not cached, so the next
+    session tries again.
+    """
+    with _shared_slm_lock:
+        if default_model_path not in _shared_slm:
+            _shared_slm[default_model_path] = slm_provider_from_env(default_model_path)
+        return _shared_slm[default_model_path]
@@ -0,0 +1,316 @@
+# load_test.py
+# Offline load test: many simulated candidates interviewing at once.
+# - Each candidate runs its own InterviewOrchestrator session and answers from a corpus of
+#   normal / vague / hesitation / idk answers, mixed by --mix, with optional think time.
+# - Candidates start on a linear ramp (--users over --ramp-seconds), so concurrency climbs
+#   gradually to the target.
+# - Gemini is replaced by StubGeminiModel behind the real provider pool and rate limiter (with
+#   optional injected 429 / 503 errors); the SLM is StubLlama, in-process or served over HTTP by
+#   StubSLMServer (same API as slm_server.py). Nothing leaves the machine.
+# - Reports throughput, turn latency percentiles, error and 429 rates and memory per session.
+# - --target URL drives a running api_server.py instead (whatever backends it is configured with);
+#   only the client-side figures are reported then.
+# Usage: python load_test.py --users 200 --ramp-seconds 30 --turns 6 --rate-limit-rate 0.02
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("KIRO_LOG_LEVEL", "ERROR")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-load-test")
+
+import kiro7
+import tracing
+from bench_replay import percentile
+from llm_providers import GeminiProvider, LlamaProvider, SLMServerProvider
+from provider_pool import PoolMember, ProviderPool
+from rate_limiter import get_rate_limiter
+from score_batcher import batch_stats
+from stub_backends import LatencyModel, StubGeminiModel, StubLlama, StubSLMServer
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_data", "answer_corpus.json")
+
+# How the stub Analyzer classifies each corpus class
+CLASS_ANSWER_TYPES = {
+    "normal": "Normal",
+    "vague": "Vague",
+    "hesitation": "HESITATION_SIGNAL",
+    "idk": "KNOWLEDGE_GAP",
+}
+
+
+def parse_mix(spec):
+    """'normal=0.5,vague=0.2,...' -> {class: weight}"""
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip():
+            mix[name.strip()] = float(weight or 1.0)
+    unknown = set(mix) - set(CLASS_ANSWER_TYPES)
+    if unknown:
+        raise SystemExit(f"Unknown answer classes in --mix: {sorted(unknown)}")
+    return mix
+
+
+class LocalSession:
+    """One candidate talking to an in-process InterviewOrchestrator."""
+
+    def __init__(self, domain, llm, slm):
+        self.bot = kiro7.InterviewOrchestrator(domain, llm=llm, slm=slm)
+        self.bot.min_question_gap = 0
+
+    def start(self):
+        return self.bot.start_interview()
+
+    def answer(self, text):
+        return self.bot.process_user_answer(text)
+
+
+class RemoteSession:
+    """One candidate talking to api_server.py over HTTP."""
+
+    def __init__(self, base_url, domain):
+        from api_client import RemoteOrchestrator
+        self.bot = RemoteOrchestrator(base_url, domain)
+        if self.bot.session_id is None:
+            raise RuntimeError("RateLimit" if self.bot.rate_limit_hit else "NoSyllabus")
+
+    def start(self):
+        return self.bot.start_interview()
+
+    def answer(self, text):
+        return self.bot.process_user_answer(text)
+
+
+class LoadStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = Counter()          # exception type -> count
+        self.terminated = Counter()      # termination reason -> count
+        self.sessions_started = 0
+        self.sessions_completed = 0
+        self.active = 0
+        self.peak_active = 0
+
+    def session_started(self):
+        with self.lock:
+            self.sessions_started += 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+    def session_finished(self):
+        with self.lock:
+            self.active -= 1
+            self.sessions_completed += 1
+
+
+def run_candidate(index, start_at, args, corpus, mix, factory, stats, sessions):
+    rng = random.Random(args.seed * 100003 + index)
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    stats.session_started()
+    try:
+        session = factory()
+        sessions.append(session)
+        session.start()
+        classes, weights = list(mix), list(mix.values())
+        for _ in range(args.turns):
+            if args.think_time > 0:
+                time.sleep(rng.uniform(0, args.think_time))
+            answer = rng.choice(corpus[rng.choices(classes, weights=weights, k=1)[0]])
+            start = time.perf_counter()
+            try:
+                result = session.answer(answer)
+            except Exception as e:
+                with stats.lock:
+                    stats.latencies.append(time.perf_counter() - start)
+                    stats.errors[type(e).__name__] += 1
+                break
+            with stats.lock:
+                stats.latencies.append(time.perf_counter() - start)
+            if result.get("status") == "TERMINATED":
+                with stats.lock:
+                    stats.terminated[result.get("reason") or "Terminated"] += 1
+                break
+    except Exception as e:
+        with stats.lock:
+            stats.errors[f"setup:{type(e).__name__}"] += 1
+    finally:
+        stats.session_finished()
+
+
+def drive(args, corpus, mix, factory, stats, sessions):
+    """Starts every candidate on the ramp and waits for all of them; returns the wall time."""
+    started = time.monotonic()
+    ramp_step = args.ramp_seconds / max(1, args.users)
+    with ThreadPoolExecutor(max_workers=args.users, thread_name_prefix="candidate") as executor:
+        for i in range(args.users):
+            executor.submit(run_candidate, i, started + i * ramp_step, args, corpus, mix, factory, stats, sessions)
+    return time.monotonic() - started
+
+
+def client_report(args, stats, wall):
+    turns = len(stats.latencies)
+    failed_turns = sum(stats.errors.values())
+    return {
+        "users": args.users,
+        "ramp_seconds": args.ramp_seconds,
+        "peak_concurrency": stats.peak_active,
+        "sessions_completed": stats.sessions_completed,
+        "wall_seconds": round(wall, 2),
+        "turns": turns,
+        "throughput_turns_per_sec": round(turns / wall, 2) if wall else 0.0,
+        "latency_ms": {p: round(percentile(stats.latencies, int(p[1:])) * 1000.0, 1) for p in ("p50", "p95", "p99")},
+        "error_rate": round(failed_turns / turns, 4) if turns else 0.0,
+        "errors": dict(stats.errors),
+        "terminated": dict(stats.terminated),
+    }
+
+
+def run_remote(args, corpus, mix):
+    stats = LoadStats()
+    wall = drive(args, corpus, mix, lambda: RemoteSession(args.target, args.domain), stats, [])
+    report = client_report(args, stats, wall)
+    report["target"] = args.target
+    return report
+
+
+def run_load(args):
+    random.seed(args.seed)
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+    mix = parse_mix(args.mix)
+    if args.target:
+        return run_remote(args, corpus, mix)
+    script = {answer: {"answer_type": CLASS_ANSWER_TYPES[cls]} for cls in mix for answer in corpus[cls]}
+
+    gemini = StubGeminiModel(script=script, latency=LatencyModel(args.gemini_latency, seed=args.seed),
+                             rate_limit_rate=args.rate_limit_rate, error_rate=args.error_rate, seed=args.seed)
+    members = [PoolMember(f"stub{i}", None, gemini.model_name, model=gemini) for i in range(args.pool_size)]
+    limiter = get_rate_limiter()
+    for member in members:
+        limiter.configure(member.name, rpm=args.rpm, tpm=args.tpm)
+    pool = ProviderPool(members)
+    llm = GeminiProvider(pool=pool, limiter=limiter)
+    kiro7.SCORE_BATCH_WINDOW_MS = args.score_batch_window
+
+    llama = StubLlama(latency=LatencyModel(args.slm_latency, seed=args.seed + 1),
+                      low_confidence_rate=args.slm_low_confidence)
+    slm_server = None
+    if args.slm == "http":
+        slm_server = StubSLMServer(llama)
+        slm = SLMServerProvider(slm_server.start())
+    else:
+        slm = LlamaProvider(model=llama)
+
+    stats = LoadStats()
+    degraded = Counter()
+
+    def collect(record):
+        if record.get("type") == "turn" and record.get("degraded_stages"):
+            with stats.lock:
+                degraded.update(record["degraded_stages"])
+
+    tracing.add_sink(collect)
+    sessions = []
+    if args.memory:
+        tracemalloc.start()
+    baseline_memory = tracemalloc.get_traced_memory()[0] if args.memory else 0
+
+    wall = drive(args, corpus, mix, lambda: LocalSession(args.domain, llm, slm), stats, sessions)
+
+    memory_per_session = None
+    if args.memory:
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory_per_session = (retained - baseline_memory) / max(1, len(sessions))
+    if slm_server is not None:
+        slm_server.stop()
+
+    gemini_calls = sum(gemini.call_counts().values())
+    report = client_report(args, stats, wall)
+    report.update({
+        "gemini_calls": gemini_calls,
+        "gemini_429_rate": round(gemini.injected["429"] / gemini_calls, 4) if gemini_calls else 0.0,
+        "gemini_5xx_rate": round(gemini.injected["503"] / gemini_calls, 4) if gemini_calls else 0.0,
+        "pool_failovers": pool.stats()["failovers"],
+        "limiter": dict(limiter.stats),
+        "slm_calls": llama.calls,
+        "degraded_stages": dict(degraded.most_common()),
+        "score_batching": batch_stats() if args.score_batch_window > 0 else None,
+        "memory_per_session_kb": round(memory_per_session / 1024.0, 1) if memory_per_session is not None else None,
+    })
+    return report
+
+
+def print_report(report):
+    print(f"Load test: {report['users']} candidates, ramp {report['ramp_seconds']}s, peak concurrency {report['peak_concurrency']}")
+    print(f"  Wall time       {report['wall_seconds']:.1f}s   turns {report['turns']}   throughput {report['throughput_turns_per_sec']:.1f} turns/s")
+    lat = report["latency_ms"]
+    print(f"  Turn latency    p50={lat['p50']:.0f}ms  p95={lat['p95']:.0f}ms  p99={lat['p99']:.0f}ms")
+    print(f"  Error rate      {report['error_rate'] * 100:.2f}%  {report['errors'] or ''}")
+    if "target" in report:
+        print(f"  Target          {report['target']}")
+        if report["terminated"]:
+            print(f"  Terminated      {report['terminated']}")
+        return
+    print(f"  Gemini calls    {report['gemini_calls']}  429 rate {report['gemini_429_rate'] * 100:.2f}%  "
+          f"5xx rate {report['gemini_5xx_rate'] * 100:.2f}%  failovers {report['pool_failovers']}")
+    print(f"  Rate limiter    {report['limiter']}")
+    if report["terminated"]:
+        print(f"  Terminated      {report['terminated']}")
+    if report["degraded_stages"]:
+        print(f"  Degraded        {report['degraded_stages']}")
+    batching = report.get("score_batching")
+    if batching:
+        wait = batching["window_wait_ms"]
+        print(f"  Score batching  {batching['items']} requests -> {batching['requests_sent']} sent "
+              f"({batching['request_reduction'] * 100:.0f}% fewer), mean batch {batching['mean_batch_size']}, "
+              f"fallbacks {batching['fallback']}, window wait mean {wait['mean']}ms p95 {wait['p95']}ms")
+    if report["memory_per_session_kb"] is not None:
+        print(f"  Memory/session  {report['memory_per_session_kb']:.1f} KB (retained, tracemalloc)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many concurrent candidates against stub backends.")
+    parser.add_argument("--users", type=int, default=50, help="simulated candidates")
+    parser.add_argument("--ramp-seconds", type=float, default=10.0, help="time over which candidates start")
+    parser.add_argument("--turns", type=int, default=6, help="answers per candidate")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause before each answer (s)")
+    parser.add_argument("--domain", default="Machine Learning")
+    parser.add_argument("--target", help="URL of a running api_server.py to load instead of in-process stubs")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--mix", default="normal=0.5,vague=0.2,hesitation=0.15,idk=0.15")
+    parser.add_argument("--gemini-latency", default="lognormal:0.35,0.35")
+    parser.add_argument("--slm-latency", default="uniform:0.3,0.8")
+    parser.add_argument("--slm", choices=("inproc", "http"), default="inproc",
+                        help="call the SLM stand-in in-process or through the slm_server HTTP API")
+    parser.add_argument("--slm-low-confidence", type=float, default=0.1)
+    parser.add_argument("--pool-size", type=int, default=2, help="stub Gemini keys in the provider pool")
+    parser.add_argument("--rpm", type=int, default=100000, help="client-side quota per pool member")
+    parser.add_argument("--tpm", type=int, default=100000000)
+    parser.add_argument("--score-batch-window", type=float, default=0.0, metavar="MS",
+                        help="batch concurrent Scorer requests within this window (0: off)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of Gemini calls answering 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of Gemini calls answering 503")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip tracemalloc accounting")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json-out")
+    args = parser.parse_args()
+
+    report = run_load(args)
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,23 @@
 # momentum_signal.py
 # Helper module implementing the sliding-window-2 momentum signal
-# Usage: from momentum_signal import compute_momentum
+# - compute_momentum(recent_scores): stateless signal from the last three scores.
+# - MomentumTracker: the same signal kept incrementally, updated once per score in O(1), with a
+#   configurable score window, "ewma" and "slope" variants, and the running statistics the
+#   orchestrator routes on (low-score density, rolling average, strong-score streak).
+# Usage: from momentum_signal import compute_momentum, MomentumTracker
 
-from typing import List, Dict
+import math
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+# Signal bands on the normalized momentum (compute_momentum keeps them as locals for speed)
+STRONG_THRESH = 0.30
+MILD_THRESH = 0.15
+
+VARIANTS = ("window2", "ewma", "slope")
+
+_NEUTRAL = {"raw": 0.0, "norm": 0.0, "weighted": 0.0, "signal": "NEUTRAL"}
+_UNITS = 1000000   # statistics are kept in integer micro-points, so running sums do not drift
 
 def compute_momentum(recent_scores: List[float],
                      normalization_divisor: float = 10.0,
@@ -29,13 +44,9 @@ def compute_momentum(recent_scores: List[float],
     if len(recent_scores) < 3:
         return {"raw": 0.0, "norm": 0.0, "weighted": 0.0, "signal": "NEUTRAL"}
 
-    s_n   = float(recent_scores[-1])
-    s_n1  = float(recent_scores[-2])
-    s_n2  = float(recent_scores[-3])
-
-    diff1 = s_n - s_n1
-    diff2 = s_n1 - s_n2
-    raw_net = diff1 + diff2
+    s_n1 = float(recent_scores[-2])
+    # (s_n - s_n1) + (s_n1 - s_n2), kept in this order so rounding matches the two-step form
+    raw_net = (float(recent_scores[-1]) - s_n1) + (s_n1 - float(recent_scores[-3]))
 
     # normalize
     norm = raw_net / normalization_divisor
@@ -46,7 +57,7 @@ def compute_momentum(recent_scores: List[float],
 
     weighted = norm * weight
 
-    # thresholds (tunable)
+    # thresholds (tunable); plain locals are cheaper to read than module globals
     STRONG_THRESH = 0.30
     MILD_THRESH = 0.15
 
@@ -67,3 +78,169 @@ def compute_momentum(recent_scores: List[float],
         "weighted": weighted,
         "signal": signal
     }
+
+
+def classify_momentum(raw_net: float, normalization_divisor: float = 10.0, weight: float = 0.8) -> Dict:
+    """compute_momentum's output dict for an already computed raw net change."""
+    norm = raw_net / normalization_divisor
+    if norm > 1.0:
+        norm = 1.0
+    if norm < -1.0:
+        norm = -1.0
+
+    if norm >= STRONG_THRESH:
+        signal = "STRONG_POSITIVE"
+    elif norm >= MILD_THRESH:
+        signal = "MILD_POSITIVE"
+    elif norm <= -STRONG_THRESH:
+        signal = "STRONG_NEGATIVE"
+    elif norm <= -MILD_THRESH:
+        signal = "MILD_NEGATIVE"
+    else:
+        signal = "NEUTRAL"
+    return {"raw": raw_net, "norm": norm, "weighted": norm * weight, "signal": signal}
+
+
+class MomentumTracker:
+    """
+    Incremental momentum state for one interview; update() once per score, every read is O(1).
+
+    variant:
+      "window2" - compute_momentum's net change over the last two answers (identical output)
+      "ewma"    - exponentially weighted mean of the answer-to-answer changes (ewma_alpha), x2
+      "slope"   - least-squares slope over the last slope_window scores, x2
+    The ewma and slope variants are scaled to a change over two answers, so the same
+    normalization_divisor and signal bands apply. All variants stay NEUTRAL below three scores.
+
+    Statistics: low_density() over the last density_window scores (a score <= low_score is low),
+    rolling_average() over the last average_window scores, strong_streak (consecutive scores
+    >= strong_score). scores holds the last `window` scores (oldest ... newest) for persistence.
+    Sums are kept in integer micro-points: no drift, and a rolling average of 6.0 compares as
+    6.0 however its scores were rounded. Non-finite scores count as 0 in the sums.
+    """
+
+    __slots__ = ("variant", "window", "normalization_divisor", "weight", "ewma_alpha", "slope_window",
+                 "low_score", "density_window", "average_window", "strong_score", "count", "strong_streak",
+                 "_scores", "_last3", "_low", "_low_count", "_avg", "_avg_units", "_slope", "_slope_y",
+                 "_slope_xy", "_ewma", "_momentum")
+
+    def __init__(self, window: int = 10, variant: str = "window2", normalization_divisor: float = 10.0,
+                 weight: float = 0.8, ewma_alpha: float = 0.5, slope_window: int = 3, low_score: float = 1.5,
+                 density_window: int = 2, average_window: int = 4, strong_score: float = 7.0,
+                 scores: Iterable[float] = ()):
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown momentum variant: {variant} (expected one of {', '.join(VARIANTS)})")
+        if min(window, slope_window, density_window, average_window) < 1 or slope_window < 2:
+            raise ValueError("Momentum windows must be >= 1 (slope_window >= 2)")
+        self.variant = variant
+        self.window = window
+        self.normalization_divisor = normalization_divisor
+        self.weight = weight
+        self.ewma_alpha = ewma_alpha
+        self.slope_window = slope_window
+        self.low_score = low_score
+        self.density_window = density_window
+        self.average_window = average_window
+        self.strong_score = strong_score
+        self.count = 0
+        self.strong_streak = 0
+        self._scores = deque(maxlen=window)
+        self._last3 = deque(maxlen=3)
+        self._low = deque(maxlen=density_window)
+        self._low_count = 0
+        self._avg = deque(maxlen=average_window)
+        self._avg_units = 0
+        self._slope = deque(maxlen=slope_window)
+        self._slope_y = 0
+        self._slope_xy = 0
+        self._ewma = None
+        self._momentum = dict(_NEUTRAL)
+        for score in scores:
+            self.update(score)
+
+    def update(self, score: float) -> Dict:
+        """Adds the newest score; returns the momentum dict (same keys as compute_momentum)."""
+        score = float(score)
+        units = round(score * _UNITS) if math.isfinite(score) else 0
+
+        previous = self._last3[-1] if self._last3 else None
+        self._scores.append(score)
+        self._last3.append(score)
+        self.count += 1
+
+        is_low = 1 if score <= self.low_score else 0
+        if len(self._low) == self.density_window:
+            self._low_count -= self._low[0]
+        self._low.append(is_low)
+        self._low_count += is_low
+
+        if len(self._avg) == self.average_window:
+            self._avg_units -= self._avg[0]
+        self._avg.append(units)
+        self._avg_units += units
+
+        self.strong_streak = self.strong_streak + 1 if score >= self.strong_score else 0
+
+        if self.variant == "slope":
+            # sliding sums of y and x*y with x = 0 .. n-1 (oldest first)
+            n = len(self._slope)
+            if n == self.slope_window:
+                oldest = self._slope[0]
+                self._slope_xy = self._slope_xy - (self._slope_y - oldest) + (n - 1) * units
+                self._slope_y += units - oldest
+            else:
+                self._slope_xy += n * units
+                self._slope_y += units
+            self._slope.append(units)
+        elif self.variant == "ewma" and previous is not None:
+            delta = score - previous
+            self._ewma = delta if self._ewma is None else self.ewma_alpha * delta + (1.0 - self.ewma_alpha) * self._ewma
+
+        self._momentum = self._compute()
+        return self._momentum
+
+    def _compute(self) -> Dict:
+        if self.count < 3:
+            return dict(_NEUTRAL)
+        if self.variant == "window2":
+            s_n1 = self._last3[1]
+            raw_net = (self._last3[2] - s_n1) + (s_n1 - self._last3[0])
+        elif self.variant == "ewma":
+            raw_net = 2.0 * self._ewma
+        else:
+            n = len(self._slope)
+            sum_x = n * (n - 1) / 2.0
+            sum_xx = (n - 1) * n * (2 * n - 1) / 6.0
+            slope = (n * self._slope_xy - sum_x * self._slope_y) / (n * sum_xx - sum_x * sum_x) / _UNITS
+            raw_net = 2.0 * slope
+        return classify_momentum(raw_net, self.normalization_divisor, self.weight)
+
+    @property
+    def momentum(self) -> Dict:
+        """The momentum dict after the last update (NEUTRAL before three scores)."""
+        return self._momentum
+
+    @property
+    def scores(self) -> List[float]:
+        return list(self._scores)
+
+    @property
+    def last_score(self) -> Optional[float]:
+        return self._last3[-1] if self._last3 else None
+
+    @property
+    def low_count(self) -> int:
+        """Low scores among the last density_window scores."""
+        return self._low_count
+
+    def low_density(self) -> Optional[float]:
+        """Share of low scores in the last density_window scores; None until the window is full."""
+        if len(self._low) < self.density_window:
+            return None
+        return self._low_count / self.density_window
+
+    def rolling_average(self) -> Optional[float]:
+        """Mean of the last average_window scores; None until the window is full."""
+        if len(self._avg) < self.average_window:
+            return None
+        return self._avg_units / self.average_window / _UNITS
@@ -0,0 +1,182 @@
+# pivot_prefetch.py
+# Speculative prefetch of the topic-pivot question.
+# - The signals that lead to a pivot are visible a turn ahead (see pivot_likely(), which reads
+#   its thresholds from the orchestrator's RoutingConfig): the momentum grace counter one short
+#   of pivot_grace_required, low scores that one more low answer turns into a density pivot,
+#   strong scores about to complete the topic, or a hesitation that a second one turns into a
+#   mercy pivot.
+# - After such a turn the orchestrator calls start(): the L0 question for topic_syllabus[0] is
+#   drafted in the background (background rate-limiter priority, own CancelToken).
+# - take() at pivot time returns the draft only if it is fresh: same topic, drafted after the
+#   question the candidate just answered, not older than PREFETCH_MAX_AGE. A draft still being
+#   generated is waited for (it is at least as close to done as a new call would be).
+# - discard() drops an unused draft (no pivot happened, session reset or deleted) and cancels it
+#   if it is still running.
+# - pivot_prefetch_total{outcome} counts started / hit / miss / stale / late / failed / wasted /
+#   dropped; stats() reports the hit rate (drafts used / drafts started), the share of pivots
+#   served by a draft and the calls made for nothing.
+# Usage: get_pivot_prefetcher().start(session_id, topic, question, reason, lambda cancel: ...)
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional
+
+import metrics
+from cancellation import CancelToken, TurnCancelled
+from routing_policy import RoutingConfig
+
+PREFETCH_MAX_AGE = float(os.getenv("PIVOT_PREFETCH_MAX_AGE", "900"))   # seconds a draft stays usable
+PREFETCH_WORKERS = int(os.getenv("PIVOT_PREFETCH_WORKERS", "4"))
+
+PREFETCHES = metrics.counter("pivot_prefetch_total", "Pivot question prefetches by outcome", ["outcome"])
+
+logger = logging.getLogger("kiro7.prefetch")
+
+# Shared by all sessions; abandoned drafts are cancelled, so the pool does not fill up with them
+_EXECUTOR = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="pivot-prefetch")
+
+
+def pivot_likely(config: RoutingConfig, questions_in_topic: int, recent_scores: List[float],
+                 pivot_grace_counter: int, hesitation_streak: int) -> Optional[str]:
+    """Why the next answer is likely to trigger a pivot under route(config, ...), or None."""
+    if hesitation_streak >= 1:
+        return "hesitation"          # a second hesitation becomes a KNOWLEDGE_GAP mercy pivot
+    if questions_in_topic < config.min_questions_per_topic:
+        return None                  # other pivots are blocked by the min-questions rule
+    if config.pivot_grace_required > 1 and pivot_grace_counter >= config.pivot_grace_required - 1:
+        return "momentum"
+    # each check below asks whether one more answer completes the condition route() pivots on
+    window = config.density_window
+    if window > 1 and recent_scores:
+        lows = sum(1 for s in recent_scores[-(window - 1):] if s <= config.low_score)
+        if lows and (lows + 1) / window >= config.density_threshold:
+            return "low_density"
+    run = config.strong_run - 1
+    if run > 0 and len(recent_scores) >= run and all(s >= config.strong_score for s in recent_scores[-run:]):
+        return "natural_completion"
+    window = config.average_window - 1
+    if (window > 0 and len(recent_scores) >= window
+            and sum(recent_scores[-window:]) >= config.average_threshold * window):
+        return "natural_completion"   # the rolling average then needs only an answer at the bar
+    return None
+
+
+class _Draft:
+    __slots__ = ("topic", "base_question", "reason", "started", "future", "cancel")
+
+    def __init__(self, topic: str, base_question: str, reason: str):
+        self.topic = topic
+        self.base_question = base_question
+        self.reason = reason
+        self.started = time.monotonic()
+        self.future = None
+        self.cancel = CancelToken()
+
+
+class PivotPrefetcher:
+    """At most one pending pivot draft per session; thread-safe."""
+
+    def __init__(self, max_age: float = PREFETCH_MAX_AGE, executor: Optional[ThreadPoolExecutor] = None):
+        self.max_age = max_age
+        self.executor = executor or _EXECUTOR
+        self._lock = threading.Lock()
+        self._drafts: Dict[str, _Draft] = {}
+        self.counts = {k: 0 for k in ("started", "hit", "miss", "stale", "late", "failed", "wasted", "dropped")}
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.counts[outcome] += 1
+        PREFETCHES.inc(outcome=outcome)
+
+    def start(self, session_id: str, topic: str, base_question: str, reason: str,
+              fn: Callable[[CancelToken], str]) -> bool:
+        """Drafts the pivot question in the background with fn(cancel); False if already pending."""
+        with self._lock:
+            current = self._drafts.get(session_id)
+            if current is not None and current.topic == topic and current.base_question == base_question:
+                return False
+        self.discard(session_id, "superseded")
+        draft = _Draft(topic, base_question, reason)
+        draft.future = self.executor.submit(self._run, draft, fn)
+        with self._lock:
+            self._drafts[session_id] = draft
+        self._count("started")
+        logger.info(f"...Prefetching the pivot question for '{topic}' (pivot likely: {reason}).")
+        return True
+
+    @staticmethod
+    def _run(draft: _Draft, fn) -> Optional[str]:
+        if draft.cancel.cancelled:
+            return None
+        try:
+            text = fn(draft.cancel)
+        except TurnCancelled:
+            return None
+        except Exception as e:
+            logger.info(f"...Pivot prefetch for '{draft.topic}' failed: {e}")
+            return None
+        return text.strip() if isinstance(text, str) and text.strip() else None
+
+    def take(self, session_id: str, topic: str, base_question: str, timeout: float) -> Optional[str]:
+        """The prefetched question if it is fresh for this pivot (waiting up to `timeout`), else None."""
+        with self._lock:
+            draft = self._drafts.pop(session_id, None)
+        if draft is None:
+            self._count("miss")
+            return None
+        if (draft.topic != topic or draft.base_question != base_question
+                or time.monotonic() - draft.started > self.max_age):
+            draft.cancel.cancel("stale")
+            self._count("stale")
+            return None
+        try:
+            text = draft.future.result(timeout=max(0.0, timeout))
+        except FutureTimeout:
+            draft.cancel.cancel("late")
+            self._count("late")
+            return None
+        if not text:
+            self._count("failed")
+            return None
+        self._count("hit")
+        logger.info(f"...Using the prefetched pivot question for '{topic}' "
+                    f"(drafted {time.monotonic() - draft.started:.1f}s ago).")
+        return text
+
+    def discard(self, session_id: str, reason: str = "no_pivot") -> None:
+        """Drops the session's pending draft; counted as wasted if its call had already started."""
+        with self._lock:
+            draft = self._drafts.pop(session_id, None)
+        if draft is None:
+            return
+        draft.cancel.cancel(reason)
+        if draft.future.cancel():
+            self._count("dropped")      # never left the queue: no call made
+        else:
+            self._count("wasted")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self.counts)
+            pending = len(self._drafts)
+        pivots = counts["hit"] + counts["miss"] + counts["stale"] + counts["late"] + counts["failed"]
+        return dict(counts, pending=pending,
+                    hit_rate=round(counts["hit"] / counts["started"], 3) if counts["started"] else None,
+                    pivot_coverage=round(counts["hit"] / pivots, 3) if pivots else None,
+                    wasted_calls=counts["wasted"] + counts["stale"] + counts["late"])
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_pivot_prefetcher() -> PivotPrefetcher:
+    """The process-wide prefetcher; drafts are keyed by session, so restored orchestrators share them."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = PivotPrefetcher()
+        return _prefetcher
@@ -0,0 +1,325 @@
+# provider_pool.py
+# Weighted pool of Gemini (api_key, model) members with health tracking and failover.
+# - Each call type (syllabus, l0, analyzer, scorer, expert, refiner, pivot) is routed to a
+#   healthy member, chosen by weight and adjusted by recent error rate and latency.
+# - 429 / 5xx errors put the member into a short cooldown and the call fails over to the next
+#   member without the caller noticing. RateLimitExhausted is raised only at the deadline.
+# - Admission still goes through the shared rate limiter, with one bucket set per member.
+# - Gemini clients are process-wide: one GenerativeServiceClient (one gRPC channel) per API key
+#   and one GenerativeModel per (key, model), shared by every pool and session in the process.
+#   client_stats() reports how often a handle was reused instead of rebuilt.
+# Usage: from provider_pool import get_provider_pool
+
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cancellation
+import metrics
+from cancellation import CancelToken
+from rate_limiter import (PRIORITY_INTERACTIVE, RateLimitExhausted, backoff_delay,
+                          estimate_tokens, is_failover_error, is_rate_limit_error)
+
+EWMA_ALPHA = 0.2               # smoothing for error rate and latency
+ADMISSION_WAIT = 2.0           # seconds to wait on one member's quota before trying another
+RATE_LIMIT_COOLDOWN = 10.0     # base cooldown after a 429 (doubles per consecutive failure)
+SERVER_ERROR_COOLDOWN = 5.0    # base cooldown after a 5xx
+MAX_COOLDOWN = 60.0
+
+
+# --- Process-wide Gemini handles ---
+CLIENT_SETUPS = metrics.counter("gemini_client_setups_total", "Gemini handles created", ["kind"])
+CLIENT_REUSES = metrics.counter("gemini_client_reuses_total", "Gemini handles served from the process-wide cache", ["kind"])
+CLIENT_SETUP_SECONDS = metrics.counter("gemini_client_setup_seconds_total", "Time spent creating Gemini handles", ["kind"])
+
+_configured_keys = set()
+_clients: Dict[str, object] = {}
+_models: Dict[Tuple[Optional[str], str], object] = {}
+_handles_lock = threading.RLock()
+
+
+def _cached_handle(kind: str, cache: Dict, key, factory):
+    """cache[key], created by factory() under the lock on first use; setups and reuses are counted."""
+    with _handles_lock:
+        handle = cache.get(key)
+        if handle is not None:
+            CLIENT_REUSES.inc(kind=kind)
+            return handle
+        start = time.perf_counter()
+        handle = factory()
+        CLIENT_SETUP_SECONDS.inc(time.perf_counter() - start, kind=kind)
+        CLIENT_SETUPS.inc(kind=kind)
+        cache[key] = handle
+        return handle
+
+
+def configure_genai(api_key: Optional[str]) -> None:
+    """genai.configure() once per key and process (it only sets the module-global default client)."""
+    with _handles_lock:
+        if api_key in _configured_keys:
+            CLIENT_REUSES.inc(kind="configure")
+            return
+        import google.generativeai as genai
+        start = time.perf_counter()
+        genai.configure(api_key=api_key)
+        CLIENT_SETUP_SECONDS.inc(time.perf_counter() - start, kind="configure")
+        CLIENT_SETUPS.inc(kind="configure")
+        _configured_keys.add(api_key)
+
+
+def get_client(api_key: str):
+    """The GenerativeServiceClient for api_key. Its gRPC channel is thread-safe and shared by all models."""
+    def build():
+        from google.ai import generativelanguage as glm
+        return glm.GenerativeServiceClient(client_options={"api_key": api_key})
+    return _cached_handle("client", _clients, api_key, build)
+
+
+def get_model(api_key: Optional[str], model_name: str):
+    """
+    GenerativeModel bound to its own API key (genai.configure only holds one global key).
+    generate_content() keeps no per-call state on the model, so one handle serves every session.
+    """
+    def build():
+        import google.generativeai as genai
+        model = genai.GenerativeModel(model_name)
+        if api_key:
+            model._client = get_client(api_key)
+        return model
+    return _cached_handle("model", _models, (api_key, model_name), build)
+
+
+def client_stats() -> Dict:
+    """
+    Handle setups vs reuses per kind, the reuse rate, and the setup time saved by reusing. A reused
+    "provider" (a session sharing llm_providers.get_gemini_provider()) is credited with the whole
+    configure + client + model setup it skipped.
+    """
+    kinds = ("provider", "configure", "client", "model")
+    setups = {kind: int(CLIENT_SETUPS.value(kind=kind)) for kind in kinds}
+    reuses = {kind: int(CLIENT_REUSES.value(kind=kind)) for kind in kinds}
+    spent = {kind: CLIENT_SETUP_SECONDS.value(kind=kind) for kind in kinds}
+    handles = [k for k in kinds if k != "provider"]
+    saved = sum(reuses[k] * spent[k] / setups[k] for k in handles if setups[k])
+    if setups["provider"]:
+        saved += reuses["provider"] * sum(spent.values()) / setups["provider"]
+    total = sum(setups.values()) + sum(reuses.values())
+    return {
+        "setups": setups,
+        "reuses": reuses,
+        "reuse_rate": round(sum(reuses.values()) / total, 4) if total else 0.0,
+        "setup_seconds": round(sum(spent.values()), 6),
+        "setup_seconds_saved": round(saved, 6),
+    }
+
+
+class PoolMember:
+    """One (api_key, model) pair with its health statistics."""
+
+    def __init__(self, name: str, api_key: Optional[str], model_name: str, weight: float = 1.0, model=None):
+        self.name = name
+        self.api_key = api_key
+        self.model_name = model_name
+        self.weight = float(weight)
+        self.model = model if model is not None else get_model(api_key, model_name)
+
+        self.requests = 0
+        self.errors = 0
+        self.error_rate = 0.0          # EWMA of failures (0..1)
+        self.latency = 0.0             # EWMA of successful call latency (seconds)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def effective_weight(self) -> float:
+        return self.weight * max(0.05, 1.0 - self.error_rate) / (1.0 + self.latency)
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.error_rate = (1 - EWMA_ALPHA) * self.error_rate
+        self.latency = latency if self.requests == 1 else (1 - EWMA_ALPHA) * self.latency + EWMA_ALPHA * latency
+
+    def record_failure(self, exc: Exception, cooldown: bool = True) -> None:
+        self.requests += 1
+        self.errors += 1
+        self.error_rate = (1 - EWMA_ALPHA) * self.error_rate + EWMA_ALPHA
+        if not cooldown:
+            return
+        self.consecutive_failures += 1
+        base = RATE_LIMIT_COOLDOWN if is_rate_limit_error(exc) else SERVER_ERROR_COOLDOWN
+        pause = min(MAX_COOLDOWN, base * (2 ** (self.consecutive_failures - 1)))
+        self.cooldown_until = time.monotonic() + pause
+
+    def stats(self) -> Dict:
+        return {
+            "model": self.model_name,
+            "weight": self.weight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ms": round(self.latency * 1000.0, 1),
+            "healthy": self.healthy(time.monotonic()),
+        }
+
+
+class ProviderPool:
+    """
+    routes: optional {call_type: [model_name, ...]} restricting which models serve a call type.
+    Call types without a route may use any member.
+    """
+
+    def __init__(self, members: List[PoolMember], routes: Optional[Dict[str, List[str]]] = None):
+        if not members:
+            raise ValueError("ProviderPool needs at least one member")
+        self.members = members
+        self.routes = routes or {}
+        self._lock = threading.Lock()
+        self.failovers = 0
+
+    @classmethod
+    def from_env(cls, default_key: Optional[str], default_model: str) -> "ProviderPool":
+        """
+        GOOGLE_API_KEYS="key1,key2"                        (falls back to GOOGLE_API_KEY)
+        GEMINI_MODELS="gemini-2.5-flash-lite:3,gemini-2.0-flash:1"   (model:weight)
+        GEMINI_ROUTES="scorer=gemini-2.5-flash-lite;expert=gemini-2.0-flash"
+        Every key is paired with every model.
+        """
+        keys = [k.strip() for k in os.getenv("GOOGLE_API_KEYS", "").split(",") if k.strip()]
+        if not keys:
+            keys = [default_key]
+
+        models = []
+        for item in os.getenv("GEMINI_MODELS", "").split(","):
+            item = item.strip()
+            if not item:
+                continue
+            name, _, weight = item.partition(":")
+            models.append((name.strip(), float(weight) if weight else 1.0))
+        if not models:
+            models = [(default_model, 1.0)]
+
+        routes = {}
+        for item in os.getenv("GEMINI_ROUTES", "").split(";"):
+            if "=" not in item:
+                continue
+            call_type, _, names = item.partition("=")
+            routes[call_type.strip().lower()] = [n.strip() for n in names.split("|") if n.strip()]
+
+        members = [PoolMember(f"key{i}:{model_name}", key, model_name, weight)
+                   for i, key in enumerate(keys) for model_name, weight in models]
+        return cls(members, routes)
+
+    def _eligible(self, call_type: str) -> List[PoolMember]:
+        allowed = self.routes.get((call_type or "").lower())
+        if not allowed:
+            return self.members
+        return [m for m in self.members if m.model_name in allowed] or self.members
+
+    def _pick(self, call_type: str, exclude: set) -> Optional[PoolMember]:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [m for m in self._eligible(call_type) if m.name not in exclude]
+            healthy = [m for m in candidates if m.healthy(now)]
+            if healthy:
+                weights = [m.effective_weight() for m in healthy]
+                return random.choices(healthy, weights=weights, k=1)[0]
+            if candidates:
+                # Everyone eligible is cooling down: try the one that recovers first.
+                return min(candidates, key=lambda m: m.cooldown_until)
+            return None
+
+    def generate(self, call_type: str, prompt: str, generation_config=None, limiter=None,
+                 deadline: Optional[float] = None, priority: int = PRIORITY_INTERACTIVE,
+                 stream: bool = False, cancel: Optional[CancelToken] = None):
+        """
+        generate_content() on a healthy member, failing over on 429/5xx. Raises
+        RateLimitExhausted once `deadline` passes; other errors propagate unchanged.
+        Each HTTP request is given a timeout equal to the time left before `deadline`.
+        With stream=True the streaming response is returned; failover covers only the
+        initial request, not errors raised while iterating the chunks.
+        A cancelled `cancel` token stops admission waits and backoff at once and keeps requests
+        that were not sent yet from being sent (TurnCancelled).
+        """
+        if deadline is None:
+            deadline = time.monotonic() + 60.0
+        kwargs = {}
+        if generation_config is not None:
+            kwargs["generation_config"] = generation_config
+        if stream:
+            kwargs["stream"] = True
+        tokens = estimate_tokens(prompt)
+
+        attempt = 0
+        tried = set()
+        last_error = None
+        while True:
+            member = self._pick(call_type, tried)
+            if member is None:
+                # Every eligible member failed or was saturated this round: back off, then retry all.
+                delay = backoff_delay(attempt)
+                if time.monotonic() + delay >= deadline:
+                    if limiter is not None:
+                        limiter.record_exhausted()
+                    raise RateLimitExhausted(f"All Gemini pool members failed for {call_type}: {last_error}")
+                attempt += 1
+                cancellation.sleep(delay, cancel)
+                tried.clear()
+                continue
+            tried.add(member.name)
+
+            if limiter is not None:
+                admit_by = min(deadline, time.monotonic() + ADMISSION_WAIT)
+                if not limiter.acquire(member.name, tokens, admit_by, priority, cancel=cancel):
+                    last_error = f"{member.name} quota saturated"
+                    continue
+
+            cancellation.check(cancel)
+            start = time.monotonic()
+            kwargs["request_options"] = {"timeout": max(0.1, deadline - start)}
+            try:
+                response = member.model.generate_content(prompt, **kwargs)
+            except Exception as e:
+                with self._lock:
+                    member.record_failure(e, cooldown=is_failover_error(e))
+                if not is_failover_error(e):
+                    raise
+                last_error = e
+                with self._lock:
+                    self.failovers += 1
+                if limiter is not None and is_rate_limit_error(e):
+                    limiter.record_retry()
+                continue
+
+            with self._lock:
+                member.record_success(time.monotonic() - start)
+            if limiter is not None and not stream:
+                # usage of a streaming response is only known once it has been consumed
+                try:
+                    limiter.reconcile(member.name, tokens, response.usage_metadata.total_token_count)
+                except Exception:
+                    pass
+            return response
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"failovers": self.failovers,
+                    "members": {m.name: m.stats() for m in self.members},
+                    "clients": client_stats()}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_provider_pool(default_key: Optional[str], default_model: str) -> ProviderPool:
+    """The process-wide pool, built from the environment on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProviderPool.from_env(default_key, default_model)
+        return _pool
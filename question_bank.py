@@ -0,0 +1,286 @@
+# question_bank.py
+# Offline bank of opening (L0) questions per (domain, topic, difficulty).
+# - A batch job (python question_bank.py --domain ...) asks Gemini once per topic for several
+#   opening questions at each difficulty and stores them in SQLite (QUESTION_BANK_PATH). It also
+#   stores the domain's topic list; the orchestrator uses it as the syllabus, so the topics of a
+#   session are the topics that were banked.
+# - pick(domain, topic, difficulty, asked): a random banked question the session has not been asked
+#   yet (the nearest other difficulty if this one is used up), None on a miss.
+# - lead_in(...): the short transition sentence, chosen locally from the tone of the last answer,
+#   so serving a banked question makes no remote call. Gemini is only called on a bank miss.
+# - question_bank_lookups_total{kind="l0"|"pivot", outcome="hit"|"nearby"|"exhausted"|"miss"}.
+# Usage: python question_bank.py --domain "Machine Learning" --per-difficulty 4
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import metrics
+from score_cache import normalize_text
+
+DEFAULT_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "question_bank.db")
+
+DIFFICULTIES = ("easy", "moderate", "deep")
+EASY_BELOW = 4.0      # scores under this (or a gap / hesitation) get an easier opening question
+DEEP_FROM = 7.0       # scores from this up get a deeper one
+
+LOOKUPS = metrics.counter("question_bank_lookups_total", "Question bank lookups by outcome", ["kind", "outcome"])
+
+logger = logging.getLogger("kiro7.question_bank")
+
+PROMPT_QUESTION_BANK = """
+You are an expert technical interviewer preparing opening questions on the topic '{topic}' for an interview in the domain '{domain}'.
+
+Write {count} distinct questions for EACH difficulty:
+- "easy": simple, factual and introductory (a definition, the basic purpose of something).
+- "moderate": a fundamental mechanism, component or comparison.
+- "deep": theoretical depth or a trade-off, still answerable in a few sentences.
+
+Rules:
+- One sentence per question, at most 20 words, ending with "?".
+- No greeting, transition or feedback phrase. No semicolons.
+- Strictly technical (NO motivation/interest/personal questions).
+
+Output *only* a JSON object: {{"easy": [...], "moderate": [...], "deep": [...]}}
+"""
+
+# Transition sentences (3-10 words) put in front of a banked question. No praise after a weak
+# answer, none of kiro7's FORBIDDEN_TRANSITIONS.
+OPENING_LEADS = ("Alright, let's begin.", "Okay, to start with the basics.", "Let's get started.")
+PIVOT_LEADS = {
+    "struggling": ("No problem, let's try a different area.", "That's okay, here's another angle.",
+                   "Fair enough, let's look at something else."),
+    "neutral": ("Alright, let's look at another area.", "Okay, here's a different topic.",
+                "Sure, let's turn to something new."),
+    "confident": ("Got it, let's go somewhere new.", "Makes sense, now a different area.",
+                  "Alright, on to the next topic."),
+}
+STRUGGLING_TYPES = ("HESITATION_SIGNAL", "KNOWLEDGE_GAP", "EVASIVE_NON_ANSWER", "EVASIVE_CHALLENGE")
+
+
+def difficulty_for(score, answer_type: Optional[str]) -> str:
+    """Opening difficulty after an answer, as PROMPT_TOPIC_PIVOT asks: easier if confused, deeper if confident."""
+    if (answer_type or "").upper() in STRUGGLING_TYPES:
+        return "easy"
+    try:
+        score = float(score)
+    except (TypeError, ValueError):
+        return "moderate"
+    if score < EASY_BELOW:
+        return "easy"
+    return "deep" if score >= DEEP_FROM else "moderate"
+
+
+def lead_in(kind: str, answer_type: Optional[str] = None, recent_questions: Iterable[str] = (),
+            rng: Optional[random.Random] = None) -> str:
+    """Transition sentence for a banked question; never the lead-in of the last questions asked."""
+    if kind == "l0":
+        leads = OPENING_LEADS
+    elif (answer_type or "").upper() in STRUGGLING_TYPES:
+        leads = PIVOT_LEADS["struggling"]
+    elif (answer_type or "").upper() == "NORMAL":
+        leads = PIVOT_LEADS["confident"]
+    else:
+        leads = PIVOT_LEADS["neutral"]
+    recent = list(recent_questions)
+    fresh = [lead for lead in leads if not any(q.startswith(lead) for q in recent)]
+    return (rng or random).choice(fresh or leads)
+
+
+class QuestionBank:
+    """SQLite-backed question bank; every method is thread-safe."""
+
+    def __init__(self, path: str = DEFAULT_BANK_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS questions (
+                domain_key TEXT NOT NULL,
+                topic_key  TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                question   TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (domain_key, topic_key, difficulty, question)
+            )""")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS topics (
+                domain_key TEXT NOT NULL,
+                position   INTEGER NOT NULL,
+                topic      TEXT NOT NULL,
+                PRIMARY KEY (domain_key, position)
+            )""")
+        self.counts = {k: 0 for k in ("hit", "nearby", "exhausted", "miss")}
+
+    def add(self, domain: str, topic: str, difficulty: str, questions: Iterable[str]) -> int:
+        """Stores questions (duplicates are ignored); returns how many were new."""
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        rows = [(normalize_text(domain), normalize_text(topic), difficulty, q.strip(), time.time())
+                for q in questions if q and q.strip()]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO questions VALUES (?, ?, ?, ?, ?)", rows)
+            return self._conn.total_changes - before
+
+    def set_topics(self, domain: str, topics: List[str]) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM topics WHERE domain_key = ?", (normalize_text(domain),))
+            self._conn.executemany("INSERT INTO topics VALUES (?, ?, ?)",
+                                   [(normalize_text(domain), i, t) for i, t in enumerate(topics)])
+
+    def topics(self, domain: str) -> List[str]:
+        """The banked topic list of a domain (empty if the domain was never built)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT topic FROM topics WHERE domain_key = ? ORDER BY position",
+                                      (normalize_text(domain),)).fetchall()
+        return [r[0] for r in rows]
+
+    def questions(self, domain: str, topic: str, difficulty: Optional[str] = None) -> List[str]:
+        query = "SELECT question FROM questions WHERE domain_key = ? AND topic_key = ?"
+        params = [normalize_text(domain), normalize_text(topic)]
+        if difficulty is not None:
+            query += " AND difficulty = ?"
+            params.append(difficulty)
+        with self._lock:
+            return [r[0] for r in self._conn.execute(query, params).fetchall()]
+
+    def has_topic(self, domain: str, topic: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM questions WHERE domain_key = ? AND topic_key = ? LIMIT 1",
+                                     (normalize_text(domain), normalize_text(topic))).fetchone()
+        return row is not None
+
+    def pick(self, domain: str, topic: str, difficulty: str, asked: Iterable[str] = (), kind: str = "pivot",
+             rng: Optional[random.Random] = None) -> Optional[str]:
+        """
+        A random banked question not yet asked in the session (`asked`: its assistant messages).
+        Falls back to the nearest other difficulty; None when the topic has nothing left.
+        """
+        asked_keys = [normalize_text(q) for q in asked]
+        order = sorted(DIFFICULTIES, key=lambda d: abs(DIFFICULTIES.index(d) - DIFFICULTIES.index(difficulty)))
+        banked = False
+        for d in order:
+            candidates = self.questions(domain, topic, d)
+            banked = banked or bool(candidates)
+            unused = [q for q in candidates if not any(normalize_text(q) in a for a in asked_keys)]
+            if unused:
+                self._count(kind, "hit" if d == difficulty else "nearby")
+                return (rng or random).choice(unused)
+        self._count(kind, "exhausted" if banked else "miss")
+        return None
+
+    def _count(self, kind: str, outcome: str) -> None:
+        with self._lock:
+            self.counts[outcome] += 1
+        LOOKUPS.inc(kind=kind, outcome=outcome)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self.counts)
+            banked = self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+        lookups = sum(counts.values())
+        return dict(counts, questions=banked,
+                    hit_rate=round((counts["hit"] + counts["nearby"]) / lookups, 3) if lookups else None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _parse_questions(text: str) -> Dict[str, List[str]]:
+    data = json.loads(text.replace("```json", "").replace("```", "").strip())
+    parsed = {}
+    for difficulty in DIFFICULTIES:
+        items = data.get(difficulty) or []
+        parsed[difficulty] = [q.strip() for q in items
+                              if isinstance(q, str) and q.strip().endswith("?") and ";" not in q
+                              and len(q.split()) <= 25]
+    return parsed
+
+
+def build_bank(bank: QuestionBank, domain: str, llm, per_difficulty: int = 4,
+               topics: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Batch job: fills the bank for a domain with `llm` (an LLMProvider). Without `topics` the topic
+    list comes from the same syllabus prompt the orchestrator uses. The domain itself is banked
+    too, since it is every interview's first topic. Returns new questions per topic.
+    """
+    from kiro7 import PROMPT_SYLLABUS_GENERATOR
+    from rate_limiter import PRIORITY_BACKGROUND
+
+    if topics is None:
+        response = llm.generate(PROMPT_SYLLABUS_GENERATOR.format(domain=domain), call_type="syllabus",
+                                json_mode=True, priority=PRIORITY_BACKGROUND)
+        topics = json.loads(response.text.replace("```json", "").replace("```", "").strip())
+    topics = [t for t in topics if isinstance(t, str) and t.strip() and normalize_text(t) != normalize_text(domain)]
+    bank.set_topics(domain, topics)
+
+    added = {}
+    for topic in [domain] + topics:
+        prompt = PROMPT_QUESTION_BANK.format(domain=domain, topic=topic, count=per_difficulty)
+        try:
+            response = llm.generate(prompt, call_type="question_bank", json_mode=True, priority=PRIORITY_BACKGROUND)
+            parsed = _parse_questions(response.text)
+        except Exception as e:
+            logger.warning(f"❌ Could not bank questions for '{topic}': {e}")
+            added[topic] = 0
+            continue
+        added[topic] = sum(bank.add(domain, topic, d, qs) for d, qs in parsed.items())
+        logger.info(f"✅ Banked {added[topic]} new questions for '{topic}'.")
+    return added
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank(path: Optional[str] = None) -> Optional[QuestionBank]:
+    """The process-wide bank (QUESTION_BANK_PATH, default question_bank.db); None until the file is built."""
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            path = path or DEFAULT_BANK_PATH
+            if path != ":memory:" and not os.path.exists(path):
+                return None
+            _bank = QuestionBank(path)
+        return _bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate opening questions for the interview question bank.")
+    parser.add_argument("--domain", action="append", required=True, help="interview domain (repeatable)")
+    parser.add_argument("--topics", help="comma-separated topics (default: generate the syllabus)")
+    parser.add_argument("--per-difficulty", type=int, default=4, help="questions per topic and difficulty")
+    parser.add_argument("--db", default=DEFAULT_BANK_PATH)
+    parser.add_argument("--fake", action="store_true", help="use the offline FakeProvider instead of Gemini")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.fake:
+        from llm_providers import FakeProvider
+        llm = FakeProvider()
+    else:
+        from kiro7 import GEMINI_MODEL_NAME, GOOGLE_API_KEY
+        from llm_providers import get_gemini_provider
+        if not GOOGLE_API_KEY:
+            print("❌ GOOGLE_API_KEY not found. Please set it in your .env file.")
+            return
+        llm = get_gemini_provider(GOOGLE_API_KEY, GEMINI_MODEL_NAME)
+
+    bank = QuestionBank(args.db)
+    topics = [t.strip() for t in args.topics.split(",") if t.strip()] if args.topics else None
+    for domain in args.domain:
+        added = build_bank(bank, domain, llm, per_difficulty=args.per_difficulty, topics=topics)
+        print(f"📚 {domain}: {sum(added.values())} new questions over {len(added)} topics")
+    print(f"📝 Question bank written to {args.db} ({bank.stats()['questions']} questions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# rate_limiter.py
+# Process-wide client-side rate limiter for Gemini calls.
+# - One token bucket per model for requests/minute (RPM) and one for tokens/minute (TPM).
+# - Interactive (per-turn) calls have priority over background work: background callers
+#   wait while interactive callers are queued and never dip into the reserved headroom.
+# - backoff_delay() is the jittered exponential backoff that ProviderPool uses between 429
+#   retries (in a cancel-aware wait), bounded by the caller's deadline.
+# Usage: from rate_limiter import get_rate_limiter, RateLimitExhausted
+
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from cancellation import CancelToken, TurnCancelled
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+# Quota (per model). Defaults match the free tier of gemini-2.5-flash-lite.
+DEFAULT_RPM = int(os.getenv("GEMINI_RPM", "15"))
+DEFAULT_TPM = int(os.getenv("GEMINI_TPM", "250000"))
+BACKGROUND_RESERVE = 0.2      # fraction of each bucket kept for interactive calls
+
+BACKOFF_BASE = 0.5            # seconds
+BACKOFF_MAX = 8.0             # seconds
+
+
+class RateLimitExhausted(Exception):
+    """Raised when a call cannot be admitted or retried before its deadline."""
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    text = str(exc)
+    return "429" in text or "ResourceExhausted" in type(exc).__name__ or "RESOURCE_EXHAUSTED" in text
+
+
+def is_failover_error(exc: Exception) -> bool:
+    """429s plus transient 5xx / unavailable errors: worth retrying on another key or model."""
+    if is_rate_limit_error(exc):
+        return True
+    text = str(exc)
+    name = type(exc).__name__
+    return (any(code in text for code in ("500", "502", "503", "504", "UNAVAILABLE", "DEADLINE_EXCEEDED"))
+            or name in ("InternalServerError", "ServiceUnavailable", "DeadlineExceeded", "BadGateway"))
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff delay for the given retry attempt (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def estimate_tokens(prompt: str, expected_output: int = 256) -> int:
+    """Rough token estimate (~4 chars per token) used to charge the TPM bucket up front."""
+    return len(prompt or "") // 4 + expected_output
+
+
+class TokenBucket:
+    """Classic token bucket. Not thread-safe on its own; RateLimiter holds the lock."""
+
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = float(capacity)
+        self.refill_per_sec = float(refill_per_sec)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_sec)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float, reserve: float = 0.0) -> float:
+        """Seconds until `amount` tokens can be taken while leaving `reserve` tokens behind."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # oversized requests wait for a full bucket
+        needed = amount + reserve - self.tokens
+        if needed <= 0:
+            return 0.0
+        return needed / self.refill_per_sec
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """Shared limiter holding RPM/TPM buckets per model."""
+
+    def __init__(self, rpm: int = DEFAULT_RPM, tpm: int = DEFAULT_TPM):
+        self.default_rpm = rpm
+        self.default_tpm = tpm
+        self._cond = threading.Condition()
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self._interactive_waiting: Dict[str, int] = {}
+        self.stats = {"admitted": 0, "throttled_waits": 0, "retries": 0, "exhausted": 0}
+
+    def configure(self, model: str, rpm: Optional[int] = None, tpm: Optional[int] = None) -> None:
+        """Set (or reset) the quota for one model."""
+        rpm = rpm or self.default_rpm
+        tpm = tpm or self.default_tpm
+        with self._cond:
+            self._buckets[model] = {
+                "rpm": TokenBucket(rpm, rpm / 60.0),
+                "tpm": TokenBucket(tpm, tpm / 60.0),
+            }
+            self._cond.notify_all()
+
+    def _get_buckets(self, model: str) -> Dict[str, TokenBucket]:
+        if model not in self._buckets:
+            self.configure(model)
+        return self._buckets[model]
+
+    def acquire(self, model: str, tokens: int, deadline: float,
+                priority: int = PRIORITY_INTERACTIVE, cancel: Optional[CancelToken] = None) -> bool:
+        """
+        Block until one request and `tokens` tokens are available for `model`.
+        Returns False if that cannot happen before `deadline` (time.monotonic()).
+        Raises TurnCancelled (without consuming quota) if `cancel` fires while waiting.
+        """
+        interactive = (priority == PRIORITY_INTERACTIVE)
+        unregister = cancel.on_cancel(self._wake) if cancel is not None else None
+        try:
+            return self._acquire(model, tokens, deadline, interactive, cancel)
+        finally:
+            if unregister is not None:
+                unregister()
+
+    def _wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def _acquire(self, model, tokens, deadline, interactive, cancel) -> bool:
+        with self._cond:
+            buckets = self._get_buckets(model)
+            if interactive:
+                self._interactive_waiting[model] = self._interactive_waiting.get(model, 0) + 1
+            try:
+                waited = False
+                while True:
+                    if cancel is not None and cancel.cancelled:
+                        raise TurnCancelled(cancel.reason)
+                    now = time.monotonic()
+                    if interactive:
+                        wait = max(buckets["rpm"].wait_time(1, now),
+                                   buckets["tpm"].wait_time(tokens, now))
+                    elif self._interactive_waiting.get(model, 0) > 0:
+                        wait = 0.05  # yield to queued interactive calls
+                    else:
+                        rpm, tpm = buckets["rpm"], buckets["tpm"]
+                        wait = max(rpm.wait_time(1, now, BACKGROUND_RESERVE * rpm.capacity),
+                                   tpm.wait_time(tokens, now, BACKGROUND_RESERVE * tpm.capacity))
+                    if wait <= 0:
+                        buckets["rpm"].consume(1)
+                        buckets["tpm"].consume(tokens)
+                        self.stats["admitted"] += 1
+                        if waited:
+                            self.stats["throttled_waits"] += 1
+                        return True
+                    if now + wait > deadline:
+                        return False
+                    waited = True
+                    self._cond.wait(timeout=wait)
+            finally:
+                if interactive:
+                    self._interactive_waiting[model] -= 1
+                self._cond.notify_all()
+
+    def record_retry(self) -> None:
+        """Count a 429 that the caller will retry on another member or after backoff."""
+        with self._cond:
+            self.stats["retries"] += 1
+
+    def record_exhausted(self) -> None:
+        """Count a call given up because its deadline passed before any member admitted it."""
+        with self._cond:
+            self.stats["exhausted"] += 1
+
+    def reconcile(self, model: str, charged: int, actual: int) -> None:
+        """Correct the TPM bucket once the real token usage of a call is known."""
+        if actual is None:
+            return
+        with self._cond:
+            bucket = self._get_buckets(model)["tpm"]
+            if actual < charged:
+                bucket.refund(charged - actual)
+            else:
+                bucket.consume(actual - charged)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide limiter shared by every InterviewOrchestrator."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
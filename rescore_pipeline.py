@@ -0,0 +1,356 @@
+# rescore_pipeline.py
+# Bulk offline re-scoring of archived interviews (after a PROMPT_SCORER or scoring-model change).
+# - Streams answers from disk: JSONL transcripts (one interview per line, either bench_replay.py
+#   "turns" with question / answer / score or a "conversation_history"; small JSON arrays such as
+#   bench_data/sample_transcripts.json work too) and session-store databases (--sessions
+#   sessions.db, read a page at a time). Archives are never loaded all at once.
+# - A bounded asyncio worker pool fans the scorer (and, with --calls analyzer,scorer, the analyzer)
+#   requests out through the shared provider pool and RPM/TPM rate limiter at background
+#   priority: the quota is respected, live interviews in the same process go first, and 429s
+#   back off inside the limiter. The result caches are bypassed; prompts and parsing are kiro7's.
+# - Results go to zstd Parquet part files in --out. Each part is written atomically and doubles
+#   as the checkpoint: a restarted run skips every answer already in a part. Failed answers are
+#   listed in _failures.jsonl and retried by the next run. pyarrow.parquet.read_table(out_dir)
+#   reads the whole result.
+# - Reports answers per minute, calls, failures and the shift against the archived scores.
+# - --fake runs against the offline stand-in (stub_backends.py) with --gemini-latency / --rpm.
+# Usage: python rescore_pipeline.py archive/*.jsonl --sessions sessions.db --out rescored/ --workers 32
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Set
+
+os.environ.setdefault("KIRO_LOG_LEVEL", "ERROR")
+
+import kiro7
+import metrics
+from rate_limiter import PRIORITY_BACKGROUND, get_rate_limiter
+
+CALL_TYPES = ("analyzer", "scorer")
+DEFAULT_PART_ROWS = 2000
+DEFAULT_CALL_TIMEOUT = 300.0     # seconds a call may wait for quota (and back off) before it fails
+
+RESCORED = metrics.counter("rescore_answers_total", "Archived answers re-scored offline by outcome", ["outcome"])
+
+
+def prompt_version(template: str) -> str:
+    """Short fingerprint of a prompt template, stored with every row."""
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()[:12]
+
+
+# ---------------- Sources ----------------
+
+def _history_items(interview: str, domain: str, history: List[Dict]) -> Iterator[Dict]:
+    """Question / answer pairs of a conversation_history, with the analyzer's recent questions."""
+    questions: List[str] = []
+    turn = 0
+    for message in history:
+        content = message.get("content", "")
+        if message.get("role") == "assistant":
+            questions.append(content)
+        elif message.get("role") == "user" and questions and content.strip().lower() != "quit":
+            yield {"interview": interview, "turn": turn, "domain": domain, "question": questions[-1],
+                   "answer": content, "recent_questions": questions[-1:-3:-1], "previous_score": None}
+            turn += 1
+
+
+def _records(path: str) -> Iterator[Dict]:
+    """Interviews of a JSONL file, read line by line (a small JSON array file is loaded whole)."""
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "[":
+            yield from enumerate(json.load(f), 1)
+            return
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                yield line_no, json.loads(line)
+
+
+def transcript_items(path: str) -> Iterator[Dict]:
+    """Answers of a transcript file in the order they were given."""
+    for line_no, record in _records(path):
+        interview = str(record.get("session_id") or record.get("name") or f"{os.path.basename(path)}:{line_no}")
+        domain = record.get("domain", "")
+        if "conversation_history" in record:
+            yield from _history_items(interview, domain, record["conversation_history"])
+            continue
+        questions: List[str] = []
+        for turn, entry in enumerate(record.get("turns", [])):
+            question = entry.get("question", "")
+            if question:
+                questions.append(question)
+            yield {"interview": interview, "turn": turn, "domain": domain, "question": question,
+                   "answer": entry["answer"], "recent_questions": questions[-1:-3:-1],
+                   "previous_score": entry.get("score")}
+
+
+def session_items(path: str) -> Iterator[Dict]:
+    """Answers of every session in a session-store database."""
+    from session_store import SessionStore
+    store = SessionStore(path)
+    try:
+        for state in store.iter_states():
+            yield from _history_items(state.session_id, state.domain, state.conversation_history)
+    finally:
+        store.close()
+
+
+def item_key(item: Dict) -> str:
+    return f"{item['interview']}#{item['turn']}"
+
+
+# ---------------- Output (Parquet parts = checkpoint) ----------------
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("❌ pyarrow is required for the Parquet output (it is installed with streamlit).")
+    return pyarrow
+
+
+def _schema(pa):
+    return pa.schema([
+        ("key", pa.string()),
+        ("interview", pa.string()),
+        ("turn", pa.int32()),
+        ("domain", pa.dictionary(pa.int16(), pa.string())),
+        ("score", pa.float32()),
+        ("score_reason", pa.string()),
+        ("previous_score", pa.float32()),
+        ("answer_type", pa.dictionary(pa.int8(), pa.string())),
+        ("analysis_notes", pa.string()),
+        ("scorer_prompt", pa.dictionary(pa.int8(), pa.string())),
+        ("latency_ms", pa.int32()),
+    ])
+
+
+class PartWriter:
+    """Buffers result rows and writes them as numbered Parquet parts; existing parts mark answers done."""
+
+    def __init__(self, out_dir: str, part_rows: int = DEFAULT_PART_ROWS):
+        self.pa = _pyarrow()
+        self.out_dir = out_dir
+        self.part_rows = part_rows
+        self.schema = _schema(self.pa)
+        os.makedirs(out_dir, exist_ok=True)
+        self.parts = sorted(glob.glob(os.path.join(out_dir, "part-*.parquet")))
+        self._next = int(os.path.basename(self.parts[-1])[5:10]) + 1 if self.parts else 0
+        self._rows: List[Dict] = []
+        self.written = 0
+
+    def done_keys(self) -> Set[str]:
+        keys: Set[str] = set()
+        for part in self.parts:
+            keys.update(self.pa.parquet.read_table(part, columns=["key"]).column("key").to_pylist())
+        return keys
+
+    def add(self, row: Dict) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= self.part_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        table = self.pa.Table.from_pylist(self._rows, schema=self.schema)
+        name = f"part-{self._next:05d}.parquet"
+        path = os.path.join(self.out_dir, name)
+        tmp = os.path.join(self.out_dir, f".{name}.tmp")    # dot files are ignored by dataset readers
+        self.pa.parquet.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, path)     # a part is either complete or absent
+        self.parts.append(path)
+        self._next += 1
+        self.written += len(self._rows)
+        self._rows = []
+
+
+# ---------------- Pipeline ----------------
+
+class Rescorer:
+    """Re-scores answers through `llm` with up to `workers` answers in flight."""
+
+    def __init__(self, llm, calls=("scorer",), workers: int = 16, call_timeout: float = DEFAULT_CALL_TIMEOUT):
+        self.llm = llm
+        self.calls = tuple(calls)
+        self.workers = workers
+        self.call_timeout = call_timeout
+        self.scorer_prompt = prompt_version(kiro7.PROMPT_SCORER)
+        self.stats = {"answers": 0, "skipped": 0, "failed": 0, "calls": 0, "shift_total": 0.0, "shift_count": 0}
+
+    async def _call(self, call_type: str, prompt: str) -> str:
+        self.stats["calls"] += 1
+        result = await self.llm.agenerate(prompt, call_type=call_type, json_mode=True,
+                                          deadline=time.monotonic() + self.call_timeout,
+                                          priority=PRIORITY_BACKGROUND)
+        return result.text
+
+    async def _score(self, item: Dict) -> Dict:
+        start = time.perf_counter()
+        pending = {}
+        if "scorer" in self.calls:
+            pending["scorer"] = self._call("scorer", kiro7.PROMPT_SCORER.format(
+                question=item["question"], answer=item["answer"]))
+        if "analyzer" in self.calls:
+            pending["analyzer"] = self._call("analyzer", kiro7.PROMPT_ANALYZER.format(
+                question=item["question"], answer=item["answer"],
+                recent_questions_json=json.dumps(item["recent_questions"])))
+        texts = dict(zip(pending, await asyncio.gather(*pending.values())))
+        row = {"key": item_key(item), "interview": item["interview"], "turn": item["turn"], "domain": item["domain"],
+               "score": None, "score_reason": None, "previous_score": item["previous_score"], "answer_type": None,
+               "analysis_notes": None, "scorer_prompt": self.scorer_prompt}
+        if "scorer" in texts:
+            row.update(kiro7.parse_score_response(texts["scorer"]))
+        if "analyzer" in texts:
+            analysis = kiro7.parse_analysis_response(texts["analyzer"])
+            row["answer_type"] = analysis.get("answer_type")
+            row["analysis_notes"] = analysis.get("analysis_notes")
+        row["latency_ms"] = int((time.perf_counter() - start) * 1000)
+        return row
+
+    async def _worker(self, queue: asyncio.Queue, writer: PartWriter, failures) -> None:
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                try:
+                    row = await self._score(item)
+                except Exception as e:     # RateLimitExhausted, bad JSON, provider errors
+                    self.stats["failed"] += 1
+                    RESCORED.inc(outcome="failed")
+                    failures.write(json.dumps({"key": item_key(item), "error": f"{type(e).__name__}: {e}"}) + "\n")
+                    continue
+                self.stats["answers"] += 1
+                RESCORED.inc(outcome="scored")
+                if row["score"] is not None and row["previous_score"] is not None:
+                    self.stats["shift_total"] += row["score"] - float(row["previous_score"])
+                    self.stats["shift_count"] += 1
+                writer.add(row)
+            finally:
+                queue.task_done()
+
+    async def run(self, items: Iterator[Dict], writer: PartWriter, failures, done: Set[str],
+                  progress_every: float = 10.0) -> Dict:
+        loop = asyncio.get_running_loop()
+        # agenerate() runs the blocking provider call on the default executor: one thread per call in flight
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.workers * len(self.calls),
+                                                     thread_name_prefix="rescore"))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)   # backpressure on the reader
+        tasks = [asyncio.create_task(self._worker(queue, writer, failures)) for _ in range(self.workers)]
+        start = last_report = time.monotonic()
+        for item in items:
+            if item_key(item) in done:
+                self.stats["skipped"] += 1
+                continue
+            await queue.put(item)
+            now = time.monotonic()
+            if progress_every and now - last_report >= progress_every:
+                last_report = now
+                print(f"...{self.stats['answers']} answers re-scored "
+                      f"({self.stats['answers'] / (now - start) * 60:.0f}/min, {self.stats['failed']} failed)", flush=True)
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+        writer.flush()
+        elapsed = time.monotonic() - start
+        return dict(self.stats, seconds=round(elapsed, 2),
+                    answers_per_minute=round(self.stats["answers"] / elapsed * 60, 1) if elapsed else 0.0,
+                    mean_shift=(round(self.stats["shift_total"] / self.stats["shift_count"], 3)
+                                if self.stats["shift_count"] else None))
+
+
+def build_llm(args):
+    """The shared Gemini provider, or the offline stand-in behind the real pool and limiter with --fake."""
+    if not args.fake:
+        if not kiro7.GOOGLE_API_KEY:
+            raise SystemExit("❌ GOOGLE_API_KEY not found. Set it, or use --fake for the offline stand-in.")
+        limiter = get_rate_limiter()
+        if args.rpm or args.tpm:
+            limiter.configure(kiro7.GEMINI_MODEL_NAME, rpm=args.rpm, tpm=args.tpm)
+        return kiro7.get_gemini_provider(kiro7.GOOGLE_API_KEY, kiro7.GEMINI_MODEL_NAME)
+    from llm_providers import GeminiProvider
+    from provider_pool import PoolMember, ProviderPool
+    from stub_backends import LatencyModel, StubGeminiModel
+    gemini = StubGeminiModel(latency=LatencyModel(args.gemini_latency, seed=args.seed))
+    get_rate_limiter().configure("stub", rpm=args.rpm or 6000, tpm=args.tpm or 10000000)
+    return GeminiProvider(pool=ProviderPool([PoolMember("stub", None, gemini.model_name, model=gemini)]))
+
+
+def iter_sources(transcripts: List[str], sessions: List[str]) -> Iterator[Dict]:
+    for path in transcripts:
+        yield from transcript_items(path)
+    for path in sessions:
+        yield from session_items(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score archived interview answers in bulk (resumable).")
+    parser.add_argument("transcripts", nargs="*", help="JSONL transcript files")
+    parser.add_argument("--sessions", action="append", default=[], help="session-store database (repeatable)")
+    parser.add_argument("--out", required=True, help="output directory for the Parquet parts")
+    parser.add_argument("--calls", default="scorer", help="comma-separated: scorer, analyzer (default scorer)")
+    parser.add_argument("--workers", type=int, default=16, help="answers in flight")
+    parser.add_argument("--part-rows", type=int, default=DEFAULT_PART_ROWS, help="rows per Parquet part")
+    parser.add_argument("--call-timeout", type=float, default=DEFAULT_CALL_TIMEOUT,
+                        help="seconds a call may wait for quota before the answer fails")
+    parser.add_argument("--rpm", type=int, help="requests/minute quota (default GEMINI_RPM)")
+    parser.add_argument("--tpm", type=int, help="tokens/minute quota (default GEMINI_TPM)")
+    parser.add_argument("--fake", action="store_true", help="offline stand-in instead of Gemini")
+    parser.add_argument("--gemini-latency", default="fixed:0.2", help="stand-in latency (fixed:S, uniform:A,B, lognormal:M,S)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--progress", type=float, default=10.0, help="seconds between progress lines (0: off)")
+    parser.add_argument("--json-out", help="write the run summary as JSON")
+    args = parser.parse_args()
+
+    calls = [c.strip() for c in args.calls.split(",") if c.strip()]
+    if not calls or set(calls) - set(CALL_TYPES):
+        raise SystemExit(f"❌ --calls takes {', '.join(CALL_TYPES)}")
+    if not args.transcripts and not args.sessions:
+        raise SystemExit("❌ Nothing to re-score: give JSONL transcripts and/or --sessions.")
+
+    writer = PartWriter(args.out, part_rows=args.part_rows)
+    done = writer.done_keys()
+    if done:
+        print(f"↩️  Resuming: {len(done)} answers already in {len(writer.parts)} part(s).")
+    rescorer = Rescorer(build_llm(args), calls=calls, workers=args.workers, call_timeout=args.call_timeout)
+    with open(os.path.join(args.out, "_failures.jsonl"), "w", encoding="utf-8") as failures:
+        try:
+            summary = asyncio.run(rescorer.run(iter_sources(args.transcripts, args.sessions), writer, failures,
+                                               done, progress_every=args.progress))
+        except KeyboardInterrupt:
+            writer.flush()
+            print(f"\n⏸️  Interrupted after {rescorer.stats['answers']} answers; completed parts are kept, "
+                  f"rerun the same command to resume.")
+            sys.exit(130)
+
+    limiter = get_rate_limiter().stats
+    summary.update(parts=len(writer.parts), calls_per_answer=round(summary["calls"] / max(1, summary["answers"]
+                                                                                           + summary["failed"]), 2),
+                   throttled_waits=limiter["throttled_waits"], retries=limiter["retries"])
+    print(f"✅ Re-scored {summary['answers']} answers in {summary['seconds']}s "
+          f"({summary['answers_per_minute']} answers/min, {summary['calls']} calls)")
+    print(f"   skipped (already done): {summary['skipped']}   failed: {summary['failed']}   "
+          f"parts: {summary['parts']} in {args.out}")
+    print(f"   quota waits: {summary['throttled_waits']}   429 retries: {summary['retries']}")
+    if summary["mean_shift"] is not None:
+        print(f"   mean score shift vs. archived: {summary['mean_shift']:+.3f} over {summary['shift_count']} answers")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n📝 Summary written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
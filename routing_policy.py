@@ -0,0 +1,105 @@
+# routing_policy.py
+# The score-driven part of the orchestrator's routing, as a pure function.
+# - RoutingConfig: every knob of the decision (momentum divisor / weight, the density window,
+#   natural-completion bars, deep escalation, the pivot grace window, the min-questions rule).
+# - route(config, answer_type, score, momentum, ...): which branch a scored answer takes, given the
+#   MomentumTracker statistics after the answer and the topic state before it. No I/O, no backend
+#   calls: kiro7.py acts on the decision, routing_sim.py replays millions of score sequences with
+#   a vectorized copy of the same rules (and checks it against this function).
+# - Branches: knowledge_gap_pivot, evasive_expert, challenge_expert, hesitation_expert,
+#   natural_completion_pivot, momentum_pivot, density_pivot, pivot_blocked (a pivot refused by the
+#   min-questions rule; `cause` says which), expert_escalation, fusion_refine.
+# Usage: decision = route(ROUTING_CONFIG, "Normal", 6.5, tracker.momentum, tracker.strong_streak, ...)
+
+from dataclasses import dataclass
+from typing import Dict, NamedTuple, Optional
+
+from momentum_signal import MomentumTracker
+
+EXPERT_BRANCHES = ("evasive_expert", "challenge_expert", "hesitation_expert")
+PIVOT_BRANCHES = ("knowledge_gap_pivot", "natural_completion_pivot", "momentum_pivot", "density_pivot")
+
+
+@dataclass(frozen=True)
+class RoutingConfig:
+    normalization_divisor: float = 5.0      # kiro7 DEFAULT_MOMENTUM_NORM_DIV
+    momentum_weight: float = 1.25           # kiro7 DEFAULT_MOMENTUM_WEIGHT
+    deep_escalation_threshold: float = 8.0  # kiro7 DEEP_ESCALATION_THRESHOLD (NORMAL answers only)
+    low_score: float = 1.5                  # an "L" grade
+    density_window: int = 2
+    density_threshold: float = 0.75         # share of L grades in the window that forces a pivot
+    strong_score: float = 7.0
+    strong_run: int = 3                     # consecutive strong scores that complete a topic
+    average_window: int = 4
+    average_threshold: float = 6.0          # ... or a rolling average at least this high
+    pivot_grace_required: int = 2           # consecutive STRONG_NEGATIVE detections before a momentum pivot
+    min_questions_per_topic: int = 2        # pivots other than knowledge gaps wait for this many questions
+
+    def tracker(self, window: int = 10, variant: str = "window2", scores=()) -> MomentumTracker:
+        """A MomentumTracker keeping the statistics this config routes on."""
+        return MomentumTracker(window=window, variant=variant, normalization_divisor=self.normalization_divisor,
+                               weight=self.momentum_weight, low_score=self.low_score,
+                               density_window=self.density_window, average_window=self.average_window,
+                               strong_score=self.strong_score, scores=scores)
+
+
+class RoutingDecision(NamedTuple):
+    branch: str
+    cause: Optional[str]            # the pivot branch behind a pivot_blocked decision
+    pivot_grace_counter: int        # counter after this answer
+    completion_blocked: bool        # natural completion held back by the min-questions rule
+
+    @property
+    def pivot(self) -> bool:
+        return self.branch in PIVOT_BRANCHES
+
+
+def route(config: RoutingConfig, answer_type: str, score: float, momentum: Dict, strong_streak: int,
+          rolling_average: Optional[float], low_density: Optional[float], questions_in_topic: int,
+          pivot_grace_counter: int) -> RoutingDecision:
+    """
+    Branch for one answer. answer_type is the analyzer's type after the two-hesitations rule; the
+    statistics are the tracker's after adding `score`; questions_in_topic and pivot_grace_counter
+    are the values before the answer. Priorities follow process_user_answer: knowledge gap, evasive
+    and hesitation interceptors, natural completion, momentum (grace window), density, escalation.
+    """
+    grace = pivot_grace_counter
+    if answer_type == "KNOWLEDGE_GAP":
+        return RoutingDecision("knowledge_gap_pivot", None, grace, False)   # bypasses the min-questions rule
+    if answer_type == "EVASIVE_NON_ANSWER":
+        return RoutingDecision("evasive_expert", None, grace, False)
+    if answer_type == "EVASIVE_CHALLENGE":
+        return RoutingDecision("challenge_expert", None, grace, False)
+    if answer_type == "HESITATION_SIGNAL":
+        return RoutingDecision("hesitation_expert", None, grace, False)
+
+    cause = None
+    completion_blocked = False
+    weighted = momentum["weighted"]
+    if weighted >= 0.0 and (strong_streak >= config.strong_run or
+                            (rolling_average is not None and rolling_average >= config.average_threshold)):
+        if questions_in_topic < config.min_questions_per_topic:
+            completion_blocked = True
+        else:
+            cause = "natural_completion_pivot"
+
+    if cause is None:
+        if momentum["signal"] == "STRONG_NEGATIVE":
+            if grace < config.pivot_grace_required - 1:
+                grace += 1
+            else:
+                cause = "momentum_pivot"
+                grace = 0
+        else:
+            grace = 0
+        if low_density is not None and low_density >= config.density_threshold:
+            cause = "density_pivot"
+            grace = 0
+
+    if cause is not None:
+        if questions_in_topic < config.min_questions_per_topic:
+            return RoutingDecision("pivot_blocked", cause, grace, completion_blocked)
+        return RoutingDecision(cause, None, grace, completion_blocked)
+    if answer_type == "NORMAL" and float(score) >= config.deep_escalation_threshold:
+        return RoutingDecision("expert_escalation", None, grace, completion_blocked)
+    return RoutingDecision("fusion_refine", None, grace, completion_blocked)
@@ -0,0 +1,384 @@
+# routing_sim.py
+# Vectorized simulator of the score-driven routing (routing_policy.py) for threshold tuning.
+# - Replays score sequences through the orchestrator's rules for many interviews at once with
+#   NumPy: each turn is a handful of array operations over every sequence. Covers the
+#   two-hesitations rule, knowledge-gap mercy pivots, momentum (window2 / ewma / slope), the grace
+#   window, low-score density, natural completion, the min-questions rule, deep escalation and the
+#   syllabus running out.
+# - Sequences are synthetic candidates (--synthetic N) or recorded transcripts in the
+#   bench_replay.py format (--transcripts FILE; unscripted answers are scored like the stub does).
+#   Synthetic answers use the analyzer's own labels ("Normal", not "NORMAL"), so deep escalation
+#   stays off as in production; --normal-share P labels a share of them "NORMAL" to explore it.
+# - Reports pivots per turn and their causes, blocked pivots, escalations, topics covered and
+#   remote calls per turn (analyzer + scorer + the question call of each branch).
+# - --sweep FIELD=V1,V2 (any RoutingConfig field, or variant) evaluates every combination in a
+#   process pool; --verify N checks the vectorized branches against MomentumTracker + route().
+# Usage: python routing_sim.py --synthetic 1000000 --sweep pivot_grace_required=1,2,3 --sweep normalization_divisor=3,5,7
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, replace
+
+import numpy as np
+
+from momentum_signal import STRONG_THRESH, VARIANTS
+from routing_policy import RoutingConfig, route
+
+# Answer types. The analyzer's JSON schema (PROMPT_ANALYZER) asks for "Normal", "Vague" and
+# "Factually_Incorrect"; route() escalates only the exact label "NORMAL", so none of those ever
+# escalate. OTHER stands for all of them; NORMAL only occurs in synthetic data with
+# --normal-share > 0 (or in transcripts that record it).
+TYPES = ("NORMAL", "Normal", "HESITATION_SIGNAL", "KNOWLEDGE_GAP", "EVASIVE_NON_ANSWER", "EVASIVE_CHALLENGE")
+NORMAL, OTHER, HESITATION, KNOWLEDGE_GAP, EVASIVE, CHALLENGE = range(len(TYPES))
+
+BRANCHES = ("fusion_refine", "expert_escalation", "knowledge_gap_pivot", "evasive_expert", "challenge_expert",
+            "hesitation_expert", "natural_completion_pivot", "momentum_pivot", "density_pivot", "pivot_blocked",
+            "syllabus_finished")
+B = {name: i for i, name in enumerate(BRANCHES)}
+PIVOTS = (B["knowledge_gap_pivot"], B["natural_completion_pivot"], B["momentum_pivot"], B["density_pivot"])
+
+DEFAULT_TOPICS = 5        # topics after the first (kiro7: the syllabus minus the domain itself)
+_UNITS = 1000000          # MomentumTracker's integer micro-points
+
+
+# ---------------- Score sequences ----------------
+
+def synthetic_sequences(n, turns, seed=0, normal_share=0.0):
+    """
+    Synthetic candidates: an ability level, a per-turn drift and answer noise give the score; weak
+    answers are more often knowledge gaps or hesitations. Scores are rounded to 0.1 like the Scorer.
+    Answers scoring 5+ carry the analyzer's "Normal" label, except a normal_share of them labelled
+    "NORMAL" (the only label route() escalates) for what-if runs of the deep escalation.
+    """
+    rng = np.random.default_rng(seed)
+    ability = rng.uniform(1.0, 9.0, size=(n, 1))
+    drift = rng.normal(0.0, 0.3, size=(n, 1))
+    t = np.arange(turns)[None, :]
+    scores = np.clip(ability + drift * t + rng.normal(0.0, 1.5, size=(n, turns)), 0.0, 10.0).round(1)
+
+    roll = rng.random((n, turns))
+    weak = scores <= 1.5
+    types = np.where(scores >= 5.0, np.where(rng.random((n, turns)) < normal_share, NORMAL, OTHER), OTHER)
+    types = np.where(weak & (roll < 0.35), KNOWLEDGE_GAP, types)
+    types = np.where(weak & (roll >= 0.35) & (roll < 0.55), HESITATION, types)
+    types = np.where(~weak & (roll < 0.04), HESITATION, types)
+    types = np.where(~weak & (roll >= 0.04) & (roll < 0.05), EVASIVE, types)
+    types = np.where(~weak & (roll >= 0.05) & (roll < 0.06), CHALLENGE, types)
+    return scores, types.astype(np.int8)
+
+
+def recorded_sequences(path):
+    """Scores and answer types of bench_replay.py transcripts; NaN pads the shorter interviews."""
+    from bench_replay import build_script, load_transcripts
+    from stub_backends import _Script
+
+    transcripts = load_transcripts(path)
+    script = _Script(build_script(transcripts))
+    turns = max(len(t["turns"]) for t in transcripts)
+    scores = np.full((len(transcripts), turns), np.nan)
+    types = np.full((len(transcripts), turns), OTHER, dtype=np.int8)
+    for i, t in enumerate(transcripts):
+        for j, turn in enumerate(t["turns"]):
+            entry = script.lookup(turn["answer"])
+            scores[i, j] = float(entry["score"])
+            types[i, j] = TYPES.index(entry["answer_type"]) if entry["answer_type"] in TYPES else OTHER
+    return scores, types
+
+
+# ---------------- Vectorized routing ----------------
+
+def simulate(config, scores, types, variant="window2", topics=DEFAULT_TOPICS, ewma_alpha=0.5, slope_window=3,
+             return_branches=False):
+    """Routes every sequence at once; NaN scores end an interview. Returns summary stats (and the branch matrix)."""
+    n, turns = scores.shape
+    active = np.ones(n, dtype=bool)
+    hesitation_streak = np.zeros(n, dtype=np.int64)
+    questions = np.zeros(n, dtype=np.int64)
+    grace = np.zeros(n, dtype=np.int64)
+    topics_left = np.full(n, topics, dtype=np.int64)
+    count = np.zeros(n, dtype=np.int64)
+    last3 = np.zeros((n, 3))
+    low_ring = np.zeros((n, config.density_window), dtype=np.int64)
+    avg_ring = np.zeros((n, config.average_window), dtype=np.int64)
+    slope_ring = np.zeros((n, slope_window), dtype=np.int64)
+    ewma = np.full(n, np.nan)
+    streak = np.zeros(n, dtype=np.int64)
+    branch_counts = np.zeros(len(BRANCHES), dtype=np.int64)
+    remote_calls = 0
+    slm_calls = 0
+    branches = np.full((n, turns), -1, dtype=np.int8) if return_branches else None
+
+    for j in range(turns):
+        active &= ~np.isnan(scores[:, j])
+        if not active.any():
+            break
+        kind = types[:, j].astype(np.int64)
+
+        # two consecutive hesitations become a knowledge gap; a knowledge gap is not scored (0.0)
+        hesitation_streak = np.where(active, np.where(kind == HESITATION, hesitation_streak + 1, 0), hesitation_streak)
+        kind = np.where((kind == HESITATION) & (hesitation_streak >= 2), KNOWLEDGE_GAP, kind)
+        score = np.where(kind == KNOWLEDGE_GAP, 0.0, np.nan_to_num(scores[:, j]))
+
+        # ---- MomentumTracker.update(), for the active rows ----
+        a = active
+        units = np.where(np.isfinite(score), np.round(score * _UNITS), 0).astype(np.int64)
+        previous = last3[:, 2].copy()
+        count = np.where(a, count + 1, count)
+        last3 = np.where(a[:, None], np.concatenate([last3[:, 1:], score[:, None]], axis=1), last3)
+        low_ring = np.where(a[:, None], np.concatenate([low_ring[:, 1:], (score <= config.low_score)[:, None]], axis=1),
+                            low_ring)
+        avg_ring = np.where(a[:, None], np.concatenate([avg_ring[:, 1:], units[:, None]], axis=1), avg_ring)
+        streak = np.where(a, np.where(score >= config.strong_score, streak + 1, 0), streak)
+
+        if variant == "window2":
+            raw = (last3[:, 2] - last3[:, 1]) + (last3[:, 1] - last3[:, 0])
+        elif variant == "ewma":
+            delta = score - previous
+            step = (count >= 2) & a
+            ewma = np.where(step, np.where(np.isnan(ewma), delta, ewma_alpha * delta + (1.0 - ewma_alpha) * ewma), ewma)
+            raw = 2.0 * ewma
+        else:
+            slope_ring = np.where(a[:, None], np.concatenate([slope_ring[:, 1:], units[:, None]], axis=1), slope_ring)
+            k = slope_window
+            m = np.minimum(count, k)
+            x = np.arange(k)[None, :] - (k - m)[:, None]          # oldest of the last m scores at x = 0
+            sum_y = slope_ring.sum(axis=1)
+            sum_xy = (slope_ring * np.where(x >= 0, x, 0)).sum(axis=1)
+            sum_x = m * (m - 1) / 2.0
+            sum_xx = (m - 1) * m * (2 * m - 1) / 6.0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                raw = 2.0 * ((m * sum_xy - sum_x * sum_y) / (m * sum_xx - sum_x * sum_x) / _UNITS)
+        raw = np.where(count >= 3, raw, 0.0)
+        norm = np.clip(raw / config.normalization_divisor, -1.0, 1.0)
+        weighted = norm * config.momentum_weight
+        low_density = low_ring.sum(axis=1) / config.density_window
+        density_ready = count >= config.density_window
+        rolling_average = avg_ring.sum(axis=1) / config.average_window / _UNITS
+        average_ready = count >= config.average_window
+
+        # ---- route() ----
+        expert = (kind == EVASIVE) | (kind == CHALLENGE) | (kind == HESITATION)
+        eligible = ~expert & (kind != KNOWLEDGE_GAP)
+        completes = (weighted >= 0.0) & ((streak >= config.strong_run) |
+                                         (average_ready & (rolling_average >= config.average_threshold)))
+        natural = eligible & completes & (questions >= config.min_questions_per_topic)
+        checks = eligible & ~natural
+        strong_negative = norm <= -STRONG_THRESH
+        waits = grace < config.pivot_grace_required - 1
+        momentum_pivot = checks & strong_negative & ~waits
+        density_pivot = checks & density_ready & (low_density >= config.density_threshold)
+        new_grace = np.where(checks, np.where(strong_negative & waits, grace + 1, 0), grace)
+        new_grace = np.where(density_pivot, 0, new_grace)
+
+        branch = np.full(n, B["fusion_refine"], dtype=np.int64)
+        branch = np.where(eligible & (kind == NORMAL) & (score >= config.deep_escalation_threshold),
+                          B["expert_escalation"], branch)
+        branch = np.where(momentum_pivot, B["momentum_pivot"], branch)
+        branch = np.where(density_pivot, B["density_pivot"], branch)
+        branch = np.where(natural, B["natural_completion_pivot"], branch)
+        blocked = (momentum_pivot | density_pivot) & (questions < config.min_questions_per_topic)
+        branch = np.where(blocked, B["pivot_blocked"], branch)
+        branch = np.where(kind == HESITATION, B["hesitation_expert"], branch)
+        branch = np.where(kind == CHALLENGE, B["challenge_expert"], branch)
+        branch = np.where(kind == EVASIVE, B["evasive_expert"], branch)
+        branch = np.where(kind == KNOWLEDGE_GAP, B["knowledge_gap_pivot"], branch)
+        pivots = np.isin(branch, PIVOTS)
+        finished = pivots & (topics_left == 0)
+        branch = np.where(finished, B["syllabus_finished"], branch)
+        grace = np.where(a, new_grace, grace)
+
+        # ---- topic state and costs ----
+        pivoted = a & pivots & ~finished
+        topics_left = np.where(pivoted, topics_left - 1, topics_left)
+        asked = a & (branch != B["pivot_blocked"]) & ~finished
+        questions = np.where(pivoted, 1, np.where(asked, questions + 1, questions))
+        branch_counts += np.bincount(branch[a], minlength=len(BRANCHES))
+        remote_calls += int(a.sum() + (a & (kind != KNOWLEDGE_GAP)).sum() + asked.sum())
+        slm_calls += int((a & (branch == B["fusion_refine"])).sum())
+        if return_branches:
+            branches[:, j] = np.where(a, branch, -1)
+        active &= ~finished
+
+    turns_run = int(branch_counts.sum())
+    per_turn = lambda c: round(c / turns_run, 4) if turns_run else 0.0
+    pivot_total = int(sum(branch_counts[i] for i in PIVOTS))
+    stats = {
+        "interviews": n,
+        "turns": turns_run,
+        "pivots_per_turn": per_turn(pivot_total + branch_counts[B["syllabus_finished"]]),
+        "pivot_causes": {BRANCHES[i]: per_turn(branch_counts[i]) for i in PIVOTS},
+        "blocked_per_turn": per_turn(branch_counts[B["pivot_blocked"]]),
+        "escalations_per_turn": per_turn(branch_counts[B["expert_escalation"]]),
+        "remote_calls_per_turn": per_turn(remote_calls),
+        "slm_calls_per_turn": per_turn(slm_calls),
+        "topics_covered": round(1.0 + pivot_total / n, 3),
+        "finished_syllabus": round(branch_counts[B["syllabus_finished"]] / n, 4),
+        "branches": {BRANCHES[i]: int(c) for i, c in enumerate(branch_counts)},
+    }
+    return (stats, branches) if return_branches else stats
+
+
+# ---------------- Scalar reference (the orchestrator's own code path) ----------------
+
+def simulate_scalar(config, scores, types, variant="window2", topics=DEFAULT_TOPICS):
+    """Branches of one sequence via MomentumTracker + route(), the way kiro7.py routes it."""
+    tracker = config.tracker(variant=variant)
+    hesitation_streak, questions, grace, topics_left = 0, 0, 0, topics
+    out = []
+    for score, kind in zip(scores, types):
+        if np.isnan(score):
+            break
+        answer_type = TYPES[kind]
+        hesitation_streak = hesitation_streak + 1 if answer_type == "HESITATION_SIGNAL" else 0
+        if hesitation_streak >= 2 and answer_type == "HESITATION_SIGNAL":
+            answer_type = "KNOWLEDGE_GAP"
+        if answer_type == "KNOWLEDGE_GAP":
+            score = 0.0
+        momentum = tracker.update(float(score))
+        decision = route(config, answer_type, score, momentum, tracker.strong_streak, tracker.rolling_average(),
+                         tracker.low_density(), questions, grace)
+        grace = decision.pivot_grace_counter
+        if decision.pivot and topics_left == 0:
+            out.append("syllabus_finished")
+            break
+        out.append(decision.branch)
+        if decision.pivot:
+            topics_left -= 1
+            questions = 1
+        elif decision.branch != "pivot_blocked":
+            questions += 1
+    return out
+
+
+def verify(config, scores, types, variant, topics, limit):
+    _, branches = simulate(config, scores[:limit], types[:limit], variant=variant, topics=topics, return_branches=True)
+    mismatches = []
+    for i in range(min(limit, len(scores))):
+        expected = simulate_scalar(config, scores[i], types[i], variant=variant, topics=topics)
+        actual = [BRANCHES[b] for b in branches[i] if b >= 0]
+        if expected != actual:
+            mismatches.append((i, expected, actual))
+    return mismatches
+
+
+# ---------------- Parameter sweep ----------------
+
+_DATA = None
+
+
+def _load(spec):
+    if spec["transcripts"]:
+        return recorded_sequences(spec["transcripts"])
+    return synthetic_sequences(spec["synthetic"], spec["turns"], spec["seed"], spec["normal_share"])
+
+
+def _init_worker(spec):
+    global _DATA
+    _DATA = _load(spec)
+
+
+def _run_point(point):
+    params, topics = point
+    params = dict(params)
+    variant = params.pop("variant", "window2")
+    config = replace(RoutingConfig(), **params)
+    start = time.perf_counter()
+    stats = simulate(config, *_DATA, variant=variant, topics=topics)
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return dict(params, variant=variant), stats
+
+
+def parse_sweep(items):
+    """[("field", [values]), ...] from FIELD=V1,V2 arguments, typed like the RoutingConfig field."""
+    types = {f.name: f.type for f in fields(RoutingConfig)}
+    grid = []
+    for item in items or []:
+        name, _, values = item.partition("=")
+        name = name.strip()
+        if name == "variant":
+            parsed = [v.strip() for v in values.split(",") if v.strip()]
+            unknown = [v for v in parsed if v not in VARIANTS]
+            if unknown:
+                raise SystemExit(f"❌ Unknown variant(s): {unknown} (expected {', '.join(VARIANTS)})")
+        elif name in types:
+            cast = int if types[name] in (int, "int") else float
+            parsed = [cast(v) for v in values.split(",") if v.strip()]
+        else:
+            raise SystemExit(f"❌ Unknown sweep field '{name}' (RoutingConfig fields or 'variant')")
+        grid.append((name, parsed))
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the score-driven routing over many interviews to tune its thresholds.")
+    parser.add_argument("--synthetic", type=int, default=200000, metavar="N", help="synthetic interviews (default 200000)")
+    parser.add_argument("--turns", type=int, default=20, help="answers per synthetic interview")
+    parser.add_argument("--transcripts", help="replay recorded transcripts (bench_replay.py format) instead")
+    parser.add_argument("--topics", type=int, default=DEFAULT_TOPICS, help="topics after the first")
+    parser.add_argument("--sweep", action="append", metavar="FIELD=V1,V2",
+                        help="RoutingConfig field (or variant) values to sweep; combinations of all --sweep flags")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--verify", type=int, default=0, metavar="N",
+                        help="check N sequences against MomentumTracker + route() for every sweep point")
+    parser.add_argument("--normal-share", type=float, default=0.0,
+                        help='share of synthetic 5+ answers labelled "NORMAL" instead of the analyzer\'s "Normal" '
+                             '(default 0: only "NORMAL" escalates, which the live analyzer does not emit)')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json-out")
+    args = parser.parse_args()
+
+    spec = {"transcripts": args.transcripts, "synthetic": args.synthetic, "turns": args.turns, "seed": args.seed,
+            "normal_share": args.normal_share}
+    grid = parse_sweep(args.sweep)
+    points = [(tuple(zip([g[0] for g in grid], combo)), args.topics)
+              for combo in itertools.product(*[g[1] for g in grid])]
+
+    if args.verify:
+        scores, types = _load(spec)
+        for params, topics in points:
+            params = dict(params)
+            variant = params.pop("variant", "window2")
+            mismatches = verify(replace(RoutingConfig(), **params), scores, types, variant, topics, args.verify)
+            if mismatches:
+                i, expected, actual = mismatches[0]
+                print(f"❌ {len(mismatches)} mismatch(es) for {params or 'defaults'} ({variant}); "
+                      f"sequence {i}: route()={expected} vectorized={actual}")
+                sys.exit(1)
+        print(f"✅ {min(args.verify, len(scores))} sequences x {len(points)} configs: vectorized routing matches route().")
+
+    start = time.perf_counter()
+    if len(points) == 1 or args.workers <= 1:
+        _init_worker(spec)
+        results = [_run_point(p) for p in points]
+    else:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(points)), initializer=_init_worker,
+                                 initargs=(spec,)) as pool:
+            results = list(pool.map(_run_point, points))
+    elapsed = time.perf_counter() - start
+
+    source = args.transcripts or f"{args.synthetic} synthetic interviews x {args.turns} answers"
+    print(f"Simulated {len(points)} config(s) over {source} in {elapsed:.1f}s")
+    label_width = max([len(", ".join(f"{k}={v}" for k, v in p.items())) for p, _ in results] + [8])
+    print(f"  {'config':<{label_width}}  {'pivot/turn':>10}  {'blocked':>8}  {'escalate':>8}  "
+          f"{'calls/turn':>10}  {'topics':>7}  {'finished':>8}")
+    for params, stats in results:
+        label = ", ".join(f"{k}={v}" for k, v in params.items()) or "defaults"
+        print(f"  {label:<{label_width}}  {stats['pivots_per_turn']:>10.3f}  {stats['blocked_per_turn']:>8.3f}  "
+              f"{stats['escalations_per_turn']:>8.3f}  {stats['remote_calls_per_turn']:>10.3f}  "
+              f"{stats['topics_covered']:>7.2f}  {stats['finished_syllabus']:>8.1%}")
+
+    if args.json_out:
+        report = {"source": source, "defaults": asdict(RoutingConfig()), "topics": args.topics,
+                  "results": [{"params": p, **s} for p, s in results]}
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# score_batcher.py
+# Cross-session batching of Scorer requests.
+# - Concurrent turns in one process (Streamlit script threads, api_server workers) each need one
+#   small PROMPT_SCORER call. ScoreBatcher.score() queues the (question, answer) and waits: the
+#   first item of a batch opens a collection window (SCORE_BATCH_WINDOW_MS in kiro7) and the
+#   batch goes out as one multi-item JSON scoring prompt when the window closes or max_batch
+#   items have arrived.
+# - The reply is split back to the waiting turns by item id. score() returns None when the turn
+#   must send its own single request instead: the window closed with only this item, the batch
+#   call failed, the item is missing or unparsable in the reply, or the deadline passed.
+# - Batch calls run on a shared worker pool, not on a turn's thread, and without any turn's
+#   CancelToken: a cancelled turn stops waiting at once and never fails the other turns. Each
+#   turn waits at most until its own deadline; the batch call may use the latest one.
+# - score_batch_items_total{outcome} counts batched / single / fallback / timeout items and
+#   score_batch_wait_seconds the time items spent in the window; stats() reports the request
+#   reduction.
+# Usage: get_score_batcher(llm, PROMPT_BATCH_SCORER, parse_score_response).score(question, answer, deadline)
+
+import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import metrics
+from cancellation import CancelToken, TurnCancelled
+from rate_limiter import PRIORITY_INTERACTIVE
+
+DEFAULT_WINDOW = 0.01          # seconds
+DEFAULT_MAX_BATCH = 16
+BATCH_WORKERS = int(os.getenv("SCORE_BATCH_WORKERS", "32"))
+BATCH_OUTPUT_TOKENS = 64       # max_tokens per item in the batch reply
+
+ITEMS = metrics.counter("score_batch_items_total", "Scorer requests by batching outcome", ["outcome"])
+WAIT = metrics.histogram("score_batch_wait_seconds", "Time a score request waited for its batch to be sent",
+                         buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="score-batch")
+
+
+class _Item:
+    __slots__ = ("question", "answer", "deadline", "queued", "done", "result")
+
+    def __init__(self, question: str, answer: str, deadline: float):
+        self.question = question
+        self.answer = answer
+        self.deadline = deadline
+        self.queued = time.monotonic()
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+
+
+class _Batch:
+    __slots__ = ("items", "full")
+
+    def __init__(self):
+        self.items: List[_Item] = []
+        self.full = threading.Event()
+
+
+def parse_batch_reply(text: str, count: int, parse: Callable[[str], Dict]) -> Dict[int, Dict]:
+    """{item index: parsed score} for every well-formed entry of a batch reply; raises on invalid JSON."""
+    reply = json.loads(text.replace("```json", "").replace("```", "").strip())
+    entries = reply.get("scores", []) if isinstance(reply, dict) else reply
+    results = {}
+    for entry in entries:
+        try:
+            index = int(entry["id"]) - 1
+            if 0 <= index < count and index not in results:
+                results[index] = parse(json.dumps(entry))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return results
+
+
+class ScoreBatcher:
+    """Collects score requests for one LLM provider and sends them in multi-item batches; thread-safe."""
+
+    def __init__(self, llm, prompt_template: str, parse: Callable[[str], Dict],
+                 window: float = DEFAULT_WINDOW, max_batch: int = DEFAULT_MAX_BATCH,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.llm = llm
+        self.prompt_template = prompt_template
+        self.parse = parse
+        self.window = window
+        self.max_batch = max_batch
+        self.executor = executor or _EXECUTOR
+        self._lock = threading.Lock()
+        self._open: Optional[_Batch] = None
+        self._waits = deque(maxlen=2048)
+        self.counts = {"items": 0, "batches": 0, "batched": 0, "single": 0, "fallback": 0, "timeout": 0}
+
+    def _count(self, outcome: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[outcome] += n
+        ITEMS.inc(n, outcome=outcome)
+
+    def score(self, question: str, answer: str, deadline: float,
+              cancel: Optional[CancelToken] = None) -> Optional[Dict]:
+        """The parsed score for this answer, or None if the caller should send a single request."""
+        item = _Item(question, answer, deadline)
+        with self._lock:
+            self.counts["items"] += 1
+            batch = self._open
+            if batch is None:
+                batch = self._open = _Batch()
+                self.executor.submit(self._collect, batch)
+            batch.items.append(item)
+            if len(batch.items) >= self.max_batch:
+                self._open = None
+                batch.full.set()
+        unregister = cancel.on_cancel(item.done.set) if cancel is not None else None
+        try:
+            finished = item.done.wait(max(0.0, deadline - time.monotonic()))
+        finally:
+            if unregister is not None:
+                unregister()
+        if cancel is not None and cancel.cancelled:
+            raise TurnCancelled(cancel.reason)
+        if not finished:
+            self._count("timeout")
+            return None
+        return item.result
+
+    def _collect(self, batch: _Batch) -> None:
+        batch.full.wait(self.window)
+        with self._lock:
+            if self._open is batch:
+                self._open = None
+        now = time.monotonic()
+        for item in batch.items:
+            self._waits.append(now - item.queued)
+            WAIT.observe(now - item.queued)
+        if len(batch.items) == 1:
+            self._count("single")       # nothing to share: the turn sends its usual request
+            batch.items[0].done.set()
+            return
+        self._send(batch.items)
+
+    def _send(self, items: List[_Item]) -> None:
+        payload = [{"id": str(i + 1), "question": item.question, "answer": item.answer}
+                   for i, item in enumerate(items)]
+        prompt = self.prompt_template.format(count=len(items), items_json=json.dumps(payload, ensure_ascii=False))
+        results = {}
+        try:
+            response = self.llm.generate(prompt, call_type="batch_scorer", json_mode=True,
+                                         config={"max_tokens": BATCH_OUTPUT_TOKENS * len(items)},
+                                         deadline=max(item.deadline for item in items),
+                                         priority=PRIORITY_INTERACTIVE)
+            results = parse_batch_reply(response.text, len(items), self.parse)
+        except Exception:
+            pass      # every item falls back to its own request
+        with self._lock:
+            self.counts["batches"] += 1
+        self._count("batched", len(results))
+        if len(results) < len(items):
+            self._count("fallback", len(items) - len(results))
+        for i, item in enumerate(items):
+            item.result = results.get(i)
+            item.done.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self.counts)
+            waits = sorted(self._waits)
+        return _summary(counts, waits)
+
+
+def _summary(counts: Dict, waits: List[float]) -> Dict:
+    # without batching every item is one request; with it, one per batch plus every item sent alone
+    # (a timed-out turn degrades its scoring stage and sends nothing)
+    sent = counts["batches"] + counts["single"] + counts["fallback"]
+    return dict(counts,
+                requests_sent=sent,
+                request_reduction=round(1.0 - sent / counts["items"], 3) if counts["items"] else 0.0,
+                mean_batch_size=round((counts["batched"] + counts["fallback"]) / counts["batches"], 2)
+                if counts["batches"] else None,
+                window_wait_ms={"mean": round(sum(waits) / len(waits) * 1000, 2) if waits else None,
+                                "p95": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 2) if waits else None})
+
+
+_batchers = weakref.WeakKeyDictionary()      # provider -> ScoreBatcher
+_batchers_lock = threading.Lock()
+
+
+def get_score_batcher(llm, prompt_template: str, parse: Callable[[str], Dict],
+                      window: float = DEFAULT_WINDOW, max_batch: int = DEFAULT_MAX_BATCH) -> ScoreBatcher:
+    """The process-wide batcher for `llm`; sessions sharing a provider share its batches."""
+    with _batchers_lock:
+        batcher = _batchers.get(llm)
+        if batcher is None:
+            batcher = _batchers[llm] = ScoreBatcher(llm, prompt_template, parse, window=window, max_batch=max_batch)
+        batcher.window = window
+        batcher.max_batch = max_batch
+        return batcher
+
+
+def batch_stats() -> Dict:
+    """stats() summed over every batcher in the process."""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    counts = {"items": 0, "batches": 0, "batched": 0, "single": 0, "fallback": 0, "timeout": 0}
+    waits: List[float] = []
+    for batcher in batchers:
+        with batcher._lock:
+            for k in counts:
+                counts[k] += batcher.counts[k]
+            waits.extend(batcher._waits)
+    return _summary(counts, sorted(waits))
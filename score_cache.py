@@ -0,0 +1,183 @@
+# score_cache.py
+# Bounded LRU cache for Analyzer / Scorer results, keyed by a normalized hash
+# of (question, answer). Optionally detects near-duplicate answers to the same
+# question with MinHash signatures over word shingles (LSH banding).
+# - Lookups are exported as result_cache_lookups_total{cache,outcome="hit"|"near_hit"|"miss"}
+#   and the size as result_cache_entries{cache} on /metrics.
+# Usage: from score_cache import ResultCache
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+
+LOOKUPS = metrics.counter("result_cache_lookups_total", "Result cache lookups by outcome", ["cache", "outcome"])
+ENTRIES = metrics.gauge("result_cache_entries", "Entries held by the result cache", ["cache"])
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial edits hash the same."""
+    return " ".join(_WORD_RE.findall((text or "").lower()))
+
+
+def make_key(question: str, answer: str) -> str:
+    """Stable cache key for a (question, answer) pair."""
+    raw = normalize_text(question) + "\x1f" + normalize_text(answer)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _shingles(text: str, size: int) -> List[str]:
+    words = normalize_text(text).split()
+    if len(words) < size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def _base_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache for JSON-like result dicts.
+
+    get() returns (value, hit_kind) where hit_kind is "exact", "near" or None.
+    Near-duplicate lookup only considers entries for the *same* normalized question
+    and only runs when near_duplicates=True.
+    """
+
+    def __init__(self, name: str, max_entries: int = 512, near_duplicates: bool = False,
+                 similarity_threshold: float = 0.9, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 3):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.name = name
+        self.max_entries = max_entries
+        self.near_duplicates = near_duplicates
+        self.similarity_threshold = similarity_threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        self._lock = threading.Lock()
+        # key -> (value, question_key, signature or None)
+        self._entries: "OrderedDict[str, Tuple[Dict, str, Optional[Tuple[int, ...]]]]" = OrderedDict()
+        # (question_key, band_index, band_hash) -> set of entry keys
+        self._bands: Dict[Tuple[str, int, int], set] = {}
+
+        # Fixed permutation coefficients (deterministic across processes)
+        self._perms = []
+        for i in range(num_perm):
+            seed = hashlib.sha1(f"{name}:{i}".encode("utf-8")).digest()
+            a = int.from_bytes(seed[:8], "big") % _MERSENNE_PRIME or 1
+            b = int.from_bytes(seed[8:16], "big") % _MERSENNE_PRIME
+            self._perms.append((a, b))
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    # ---------- MinHash helpers ----------
+    def _signature(self, answer: str) -> Optional[Tuple[int, ...]]:
+        shingles = _shingles(answer, self.shingle_size)
+        if not shingles:
+            return None
+        base = [_base_hash(s) for s in set(shingles)]
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in base) for a, b in self._perms)
+
+    def _band_keys(self, question_key: str, sig: Tuple[int, ...]):
+        for band in range(self.bands):
+            chunk = sig[band * self.rows:(band + 1) * self.rows]
+            yield (question_key, band, hash(chunk))
+
+    @staticmethod
+    def _similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        same = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return same / float(len(sig_a))
+
+    # ---------- public API ----------
+    def get(self, question: str, answer: str) -> Tuple[Optional[Dict], Optional[str]]:
+        key = make_key(question, answer)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                LOOKUPS.inc(cache=self.name, outcome="hit")
+                return dict(entry[0]), "exact"
+
+            if self.near_duplicates:
+                question_key = make_key(question, "")
+                sig = self._signature(answer)
+                if sig is not None:
+                    best_key, best_sim = None, 0.0
+                    candidates = set()
+                    for band_key in self._band_keys(question_key, sig):
+                        candidates |= self._bands.get(band_key, set())
+                    for cand in candidates:
+                        cand_sig = self._entries[cand][2]
+                        sim = self._similarity(sig, cand_sig)
+                        if sim > best_sim:
+                            best_key, best_sim = cand, sim
+                    if best_key is not None and best_sim >= self.similarity_threshold:
+                        self._entries.move_to_end(best_key)
+                        self.near_hits += 1
+                        LOOKUPS.inc(cache=self.name, outcome="near_hit")
+                        return dict(self._entries[best_key][0]), "near"
+
+            self.misses += 1
+            LOOKUPS.inc(cache=self.name, outcome="miss")
+            return None, None
+
+    def put(self, question: str, answer: str, value: Dict) -> None:
+        key = make_key(question, answer)
+        question_key = make_key(question, "")
+        sig = self._signature(answer) if self.near_duplicates else None
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (dict(value), question_key, sig)
+            if sig is not None:
+                for band_key in self._band_keys(question_key, sig):
+                    self._bands.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+            ENTRIES.set(len(self._entries), cache=self.name)
+
+    def _drop(self, key: str) -> None:
+        _, question_key, sig = self._entries.pop(key)
+        if sig is None:
+            return
+        for band_key in self._band_keys(question_key, sig):
+            members = self._bands.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._bands[band_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bands.clear()
+        ENTRIES.set(0, cache=self.name)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters of this cache (exact and near-duplicate hits counted separately)."""
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": ((self.hits + self.near_hits) / lookups) if lookups else 0.0,
+            }
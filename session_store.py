@@ -0,0 +1,165 @@
+# session_store.py
+# Persistent, resumable interview sessions.
+# - SessionState: the serializable part of an InterviewOrchestrator (history, scores, syllabus,
+#   streak and grace counters). Compact JSON, no model handles or clients.
+# - SessionStore: SQLite table of session_id -> state, written after every turn. WAL mode, one
+#   connection shared under a lock, so Streamlit script threads and worker processes can share
+#   the file; save(expected_turn=...) rejects a write that lost a race with another worker.
+# - InterviewOrchestrator.snapshot() / InterviewOrchestrator.restore() (kiro7.py) convert between
+#   a live orchestrator and a SessionState. Restoring reuses the process-wide Gemini and SLM
+#   providers and makes no Gemini call.
+# Usage: store = SessionStore("sessions.db"); store.save(bot.snapshot()); state = store.load(session_id)
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+
+STATE_VERSION = 1
+DEFAULT_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.db")
+
+
+@dataclass
+class SessionState:
+    # Declared slots keep per-session memory small; no field defaults so this also works before
+    # dataclass(slots=True) existed (Python 3.10).
+    __slots__ = ("session_id", "domain", "turn", "conversation_history", "last_question",
+                 "recent_scores", "topic_syllabus", "current_topic", "questions_in_current_topic",
+                 "hesitation_streak", "low_score_streak", "pivot_grace_counter", "rate_limit_hit",
+                 "finished", "extra", "updated_at", "version")
+
+    session_id: str
+    domain: str
+    turn: int
+    conversation_history: List[Dict]
+    last_question: str
+    recent_scores: List[float]
+    topic_syllabus: List[str]
+    current_topic: Optional[str]
+    questions_in_current_topic: int
+    hesitation_streak: int
+    low_score_streak: int
+    pivot_grace_counter: int
+    rate_limit_hit: bool
+    finished: bool
+    extra: Dict          # caller-owned data saved alongside (e.g. the UI transcript)
+    updated_at: float
+    version: int
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "SessionState":
+        data = json.loads(raw)
+        version = data.get("version", 0)
+        if version > STATE_VERSION:
+            raise ValueError(f"Session state version {version} is newer than supported ({STATE_VERSION})")
+        data["version"] = STATE_VERSION
+        data.setdefault("extra", {})
+        data.setdefault("finished", False)
+        return cls(**{name: data[name] for name in cls.__slots__})
+
+
+class SessionStore:
+    """SQLite-backed SessionState store; every method is thread-safe."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                domain     TEXT NOT NULL,
+                state      TEXT NOT NULL,
+                turn       INTEGER NOT NULL,
+                finished   INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )""")
+
+    def save(self, state: SessionState, expected_turn: Optional[int] = None) -> bool:
+        """
+        Writes the state. With expected_turn the write only happens if the stored session is still
+        at that turn (optimistic concurrency between workers); returns False when it was not.
+        """
+        state.updated_at = time.time()
+        with self._lock:
+            if expected_turn is None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, domain, state, turn, finished, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (state.session_id, state.domain, state.to_json(), state.turn, int(state.finished), state.updated_at))
+                return True
+            cursor = self._conn.execute(
+                "UPDATE sessions SET domain = ?, state = ?, turn = ?, finished = ?, updated_at = ? "
+                "WHERE session_id = ? AND turn = ?",
+                (state.domain, state.to_json(), state.turn, int(state.finished), state.updated_at,
+                 state.session_id, expected_turn))
+            return cursor.rowcount == 1
+
+    def load(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return SessionState.from_json(row[0]) if row else None
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def list_sessions(self, include_finished: bool = False, limit: int = 50) -> List[Dict]:
+        """Most recently updated sessions first: id, domain, turn, finished, updated_at."""
+        query = "SELECT session_id, domain, turn, finished, updated_at FROM sessions"
+        if not include_finished:
+            query += " WHERE finished = 0"
+        query += " ORDER BY updated_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (limit,)).fetchall()
+        return [{"session_id": r[0], "domain": r[1], "turn": r[2], "finished": bool(r[3]), "updated_at": r[4]}
+                for r in rows]
+
+    def iter_states(self, include_finished: bool = True, page_size: int = 500) -> Iterator[SessionState]:
+        """Every stored session in session_id order, read a page at a time (for offline jobs over the archive)."""
+        query = "SELECT session_id, state FROM sessions WHERE session_id > ?"
+        if not include_finished:
+            query += " AND finished = 0"
+        query += " ORDER BY session_id LIMIT ?"
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(query, (last, page_size)).fetchall()
+            if not rows:
+                return
+            for session_id, raw in rows:
+                yield SessionState.from_json(raw)
+            last = rows[-1][0]
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Deletes sessions not updated for older_than_seconds; returns how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?",
+                                        (time.time() - older_than_seconds,))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store(path: Optional[str] = None) -> SessionStore:
+    """The process-wide store (SESSION_DB_PATH, default sessions.db), opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore(path or DEFAULT_DB_PATH)
+        return _store
@@ -3,11 +3,18 @@ Flask API Server for Local SLM Model
 Exposes the Phi-3 model via REST API for remote access through ngrok
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response, stream_with_context
 from flask_cors import CORS
 from llama_cpp import Llama
+from collections import deque
+from contextlib import closing
+import json
 import os
 import time
+import threading
+
+import metrics
+from text_utils import slm_draft_rejection
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Streamlit Cloud access
@@ -19,6 +26,131 @@ PORT = 5000
 # Global model instance
 slm_model = None
 
+# llama.cpp is not thread-safe: requests queue on this lock (Flask runs threaded)
+model_lock = threading.Lock()
+
+# --- Metrics (exposed on /metrics in Prometheus text format) ---
+REQUESTS = metrics.counter("slm_requests_total", "HTTP requests by endpoint and status code", ["endpoint", "status"])
+LATENCY = metrics.histogram("slm_request_duration_seconds", "End-to-end request latency", ["endpoint"])
+GENERATION_LATENCY = metrics.histogram("slm_generation_duration_seconds", "Model decode time per request", ["endpoint"])
+QUEUE_WAIT = metrics.histogram("slm_queue_wait_seconds", "Time spent waiting for the model lock", ["endpoint"])
+PROMPT_TOKENS = metrics.counter("slm_prompt_tokens_total", "Prompt tokens processed", ["endpoint"])
+COMPLETION_TOKENS = metrics.counter("slm_completion_tokens_total", "Completion tokens generated", ["endpoint"])
+QUEUE_DEPTH = metrics.gauge("slm_queue_depth", "Requests waiting for the model")
+IN_FLIGHT = metrics.gauge("slm_in_flight_requests", "Requests currently being handled")
+TRIAGE_OUTCOMES = metrics.counter("slm_triage_outcomes_total", "Triage results by confidence and reason", ["confidence", "reason"])
+PROMPT_TPS = metrics.gauge("slm_prompt_tokens_per_second", "Prompt tokens/sec over the last TOKEN_RATE_WINDOW seconds")
+COMPLETION_TPS = metrics.gauge("slm_completion_tokens_per_second", "Completion tokens/sec over the last TOKEN_RATE_WINDOW seconds")
+
+TOKEN_RATE_WINDOW = 60.0  # seconds
+_token_events = deque()   # (timestamp, prompt_tokens, completion_tokens)
+_token_lock = threading.Lock()
+
+
+def _token_rate(index):
+    now = time.time()
+    with _token_lock:
+        while _token_events and now - _token_events[0][0] > TOKEN_RATE_WINDOW:
+            _token_events.popleft()
+        total = sum(event[index] for event in _token_events)
+    return total / TOKEN_RATE_WINDOW
+
+
+PROMPT_TPS.set_function(lambda: _token_rate(1))
+COMPLETION_TPS.set_function(lambda: _token_rate(2))
+
+
+def run_model(endpoint, **kwargs):
+    """Run one chat completion under the model lock, recording queue and token metrics."""
+    queued_at = time.time()
+    QUEUE_DEPTH.inc()
+    try:
+        model_lock.acquire()
+    finally:
+        QUEUE_DEPTH.dec()
+    QUEUE_WAIT.observe(time.time() - queued_at, endpoint=endpoint)
+    try:
+        start_time = time.time()
+        output = slm_model.create_chat_completion(**kwargs)
+        generation_time = time.time() - start_time
+    finally:
+        model_lock.release()
+
+    GENERATION_LATENCY.observe(generation_time, endpoint=endpoint)
+    usage = output.get('usage') or {}
+    prompt_tokens = usage.get('prompt_tokens', 0) or 0
+    completion_tokens = usage.get('completion_tokens', 0) or 0
+    PROMPT_TOKENS.inc(prompt_tokens, endpoint=endpoint)
+    COMPLETION_TOKENS.inc(completion_tokens, endpoint=endpoint)
+    with _token_lock:
+        _token_events.append((time.time(), prompt_tokens, completion_tokens))
+    return output, generation_time
+
+
+def record_triage_outcome(text):
+    """Classifies a triage draft like the orchestrator does and counts it; returns (confidence, reason)."""
+    if not text or "[CONFIDENCE_LOW]" in text:
+        confidence, reason = "low", "model_bailout" if text else "empty"
+    else:
+        rejection = slm_draft_rejection(text)
+        confidence, reason = ("low", rejection) if rejection else ("high", "accepted")
+    TRIAGE_OUTCOMES.inc(confidence=confidence, reason=reason)
+    return confidence, reason
+
+
+def stream_model(endpoint, **kwargs):
+    """run_model() token by token. Closing the generator (client gone) stops the decode and frees the model."""
+    queued_at = time.time()
+    QUEUE_DEPTH.inc()
+    try:
+        model_lock.acquire()
+    finally:
+        QUEUE_DEPTH.dec()
+    QUEUE_WAIT.observe(time.time() - queued_at, endpoint=endpoint)
+    start_time = time.time()
+    # streamed chunks carry no usage: the prompt is tokenized here instead (message contents only,
+    # so the chat template's few control tokens are not counted)
+    prompt_tokens = sum(len(slm_model.tokenize(m.get('content', '').encode('utf-8'), add_bos=False))
+                        for m in kwargs.get('messages', []))
+    completion_tokens = 0
+    try:
+        for chunk in slm_model.create_chat_completion(stream=True, **kwargs):
+            text = chunk['choices'][0].get('delta', {}).get('content')
+            if text:
+                completion_tokens += 1
+                yield text
+    finally:
+        model_lock.release()
+        GENERATION_LATENCY.observe(time.time() - start_time, endpoint=endpoint)
+        PROMPT_TOKENS.inc(prompt_tokens, endpoint=endpoint)
+        COMPLETION_TOKENS.inc(completion_tokens, endpoint=endpoint)
+        with _token_lock:
+            _token_events.append((time.time(), prompt_tokens, completion_tokens))
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.time()
+    g.counted_in_flight = request.endpoint != 'metrics'
+    if g.counted_in_flight:
+        IN_FLIGHT.inc()
+
+
+@app.after_request
+def _record_request(response):
+    endpoint = request.endpoint or "unknown"
+    REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+    # a streamed body is still being generated here: its generator records latency and in-flight
+    if 'request_start' in g and not response.is_streamed:
+        LATENCY.observe(time.time() - g.request_start, endpoint=endpoint)
+    return response
+
+
+@app.teardown_request
+def _finish_request(exc):
+    if g.get('counted_in_flight'):
+        IN_FLIGHT.dec()
+
 def load_model():
     """Load the SLM model on server startup"""
     global slm_model
@@ -67,8 +199,19 @@ def generate():
         ],
         "max_tokens": 80,
         "temperature": 0.25,
-        "stop": ["<|end|>", "<|user|>"]
+        "stop": ["<|end|>", "<|user|>"],
+        "json_mode": false,
+        "stream": false,
+        "call_type": "slm_triage"
     }
+
+    call_type "slm_triage" marks an orchestrator triage draft: its outcome is counted in
+    slm_triage_outcomes_total like the /triage endpoint's.
+
+    json_mode constrains the output to a JSON object. With "stream": true the reply is NDJSON:
+    {"status": "queued"} at once, then one {"text": ...} line per token and a final
+    {"success": true, "done": true} (or {"success": false, "error": ...}). A client that
+    disconnects stops the decode at the next token.
     """
     if slm_model is None:
         return jsonify({
@@ -91,20 +234,44 @@ def generate():
                 "success": False
             }), 400
         
+        # the orchestrator drafts its triage questions here, so their outcomes are counted here too
+        triage = data.get('call_type') == 'slm_triage'
+        kwargs = dict(messages=messages, max_tokens=max_tokens, stop=stop, temperature=temperature)
+        if data.get('json_mode'):
+            kwargs['response_format'] = {"type": "json_object"}
+
+        if data.get('stream'):
+            # the body outlives the view and its teardown: the generator ends the request's metrics
+            request_start, g.counted_in_flight = g.request_start, False
+
+            def events():
+                try:
+                    # the first line sends the headers before the request queues for the model
+                    yield json.dumps({"status": "queued"}) + "\n"
+                    try:
+                        draft = []
+                        with closing(stream_model('generate', **kwargs)) as tokens:
+                            for text in tokens:
+                                draft.append(text)
+                                yield json.dumps({"text": text}) + "\n"
+                        if triage:
+                            record_triage_outcome("".join(draft).strip())
+                        yield json.dumps({"success": True, "done": True}) + "\n"
+                    except Exception as e:
+                        print(f"❌ Generation error: {e}")
+                        yield json.dumps({"success": False, "error": str(e)}) + "\n"
+                finally:
+                    LATENCY.observe(time.time() - request_start, endpoint='generate')
+                    IN_FLIGHT.dec()
+            return Response(stream_with_context(events()), mimetype='application/x-ndjson')
+
         # Generate response
-        start_time = time.time()
-        
-        output = slm_model.create_chat_completion(
-            messages=messages,
-            max_tokens=max_tokens,
-            stop=stop,
-            temperature=temperature
-        )
-        
-        generation_time = time.time() - start_time
+        output, generation_time = run_model('generate', **kwargs)
         
         # Extract the generated text
         generated_text = output['choices'][0]['message']['content'].strip()
+        if triage:
+            record_triage_outcome(generated_text)
         
         return jsonify({
             "success": True,
@@ -156,54 +323,31 @@ def triage():
         messages.extend(conversation_history)
         
         # Generate triage question
-        start_time = time.time()
-        
-        output = slm_model.create_chat_completion(
+        output, generation_time = run_model(
+            'triage',
             messages=messages,
             max_tokens=80,
             stop=["<|end|>", "<|user|>", "You:", "Candidate:", "Interviewer:"],
             temperature=0.25
         )
         
-        generation_time = time.time() - start_time
-        
         next_question = output['choices'][0]['message']['content'].strip()
         
-        # Check for confidence low signal
-        if not next_question or "[CONFIDENCE_LOW]" in next_question:
+        # Check for confidence low signal, then validate the question (shared with kiro7.py)
+        confidence, reason = record_triage_outcome(next_question)
+        if reason in ("model_bailout", "empty"):
             return jsonify({
                 "success": True,
                 "confidence": "low",
                 "text": "[CONFIDENCE_LOW]",
                 "generation_time": generation_time
             })
-        
-        # Validate the question (same logic as in kiro7.py)
-        import re
-        
-        def meaningful_word_count(s):
-            fillers = {"umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "like", "...", "uhm"}
-            tokens = re.findall(r"[A-Za-z']+", s.lower())
-            meaningful = [t for t in tokens if t not in fillers and len(t) > 1]
-            return len(meaningful)
-        
-        hesitation_tokens = ["umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "...", "uhm"]
-        
-        if any(tok in next_question.lower() for tok in hesitation_tokens):
+        if confidence == "low":
             return jsonify({
                 "success": True,
                 "confidence": "low",
                 "text": "[CONFIDENCE_LOW]",
-                "reason": "hesitation_detected",
-                "generation_time": generation_time
-            })
-        
-        if meaningful_word_count(next_question) < 3:
-            return jsonify({
-                "success": True,
-                "confidence": "low",
-                "text": "[CONFIDENCE_LOW]",
-                "reason": "too_short",
+                "reason": reason,
                 "generation_time": generation_time
             })
         
@@ -218,11 +362,18 @@ def triage():
         
     except Exception as e:
         print(f"❌ Triage error: {e}")
+        TRIAGE_OUTCOMES.inc(confidence="none", reason="error")
         return jsonify({
             "error": str(e),
             "success": False
         }), 500
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint: request counts, latency histograms, token throughput,
+    queue depth, in-flight requests and triage outcomes."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/', methods=['GET'])
 def index():
     """Root endpoint with API documentation"""
@@ -234,7 +385,8 @@ def index():
         "endpoints": {
             "/health": "GET - Health check",
             "/generate": "POST - Generate text",
-            "/triage": "POST - Interview question triage"
+            "/triage": "POST - Interview question triage",
+            "/metrics": "GET - Prometheus metrics"
         },
         "documentation": "See GITHUB_DEPLOY.md for usage"
     })
@@ -1,8 +1,15 @@
 import streamlit as st
 import time
 import json
-from kiro7 import InterviewOrchestrator
 import os
+import functools
+
+from cancellation import TurnCancelled
+from turn_registry import turn_key
+
+# With ORCHESTRATOR_API_URL set the app is a thin client of api_server.py and never imports the
+# orchestrator (or its model backends); otherwise interviews run in this process.
+ORCHESTRATOR_API_URL = os.getenv("ORCHESTRATOR_API_URL", "").strip()
 
 # Page configuration
 st.set_page_config(
@@ -262,6 +269,71 @@ if 'initialized' not in st.session_state:
     st.session_state.show_analysis = {}
     st.session_state.theme_color = "#667eea"
 
+def new_orchestrator(domain):
+    """Remote session on the API service, or an in-process InterviewOrchestrator."""
+    if ORCHESTRATOR_API_URL:
+        from api_client import RemoteOrchestrator
+        return RemoteOrchestrator(ORCHESTRATOR_API_URL, domain)
+    from kiro7 import InterviewOrchestrator
+    return InterviewOrchestrator(domain)
+
+def persist_session():
+    """Save the interview after each turn so a reconnect (or another worker) can resume it."""
+    bot = st.session_state.chatbot
+    if bot is None:
+        return
+    extra = {"messages": st.session_state.messages,
+             "question_count": st.session_state.question_count}
+    try:
+        if ORCHESTRATOR_API_URL:
+            # the service already saved the orchestrator state; only the transcript is ours
+            bot.save_extra(extra, finished=st.session_state.interview_ended)
+        else:
+            from session_store import get_session_store
+            get_session_store().save(bot.snapshot(finished=st.session_state.interview_ended, extra=extra))
+        st.query_params["session"] = bot.session_id
+    except Exception as e:
+        st.warning(f"⚠️ Could not save this interview, so it cannot be resumed after a reconnect: {e}")
+
+def cancel_running_turn(reason):
+    """Stop a turn still running for this session (quit, new interview) so its backend work ends now."""
+    bot = st.session_state.chatbot
+    if bot is not None:
+        bot.cancel(reason, timeout=1.0)
+
+def resume_session(session_id):
+    """Rebuild the orchestrator and transcript of a saved session; no model load or Gemini call."""
+    if ORCHESTRATOR_API_URL:
+        from api_client import RemoteOrchestrator
+        resumed = RemoteOrchestrator.resume(ORCHESTRATOR_API_URL, session_id)
+        if resumed is None:
+            return False
+        bot, state = resumed
+        extra, domain, finished = state.get("extra") or {}, state["domain"], state["finished"]
+    else:
+        from kiro7 import InterviewOrchestrator
+        from session_store import get_session_store
+        saved = get_session_store().load(session_id)
+        if saved is None:
+            return False
+        bot = InterviewOrchestrator.restore(saved)
+        extra, domain, finished = saved.extra, saved.domain, saved.finished
+    st.session_state.chatbot = bot
+    st.session_state.messages = extra.get("messages", [])
+    st.session_state.question_count = extra.get("question_count", 0)
+    st.session_state.domain = domain
+    st.session_state.interview_started = True
+    st.session_state.interview_ended = finished
+    return True
+
+# Reconnecting browser (or restarted worker): pick the interview up from the session store
+if st.session_state.chatbot is None and "session" in st.query_params:
+    try:
+        if not resume_session(st.query_params["session"]):
+            del st.query_params["session"]
+    except Exception as e:
+        st.warning(f"⚠️ Could not resume the previous interview: {e}")
+
 def typewriter_effect(text, speed=0.03):
     """Display text with typewriter effect"""
     placeholder = st.empty()
@@ -273,34 +345,50 @@ def typewriter_effect(text, speed=0.03):
     placeholder.markdown(f'<div class="chat-message bot"><div class="role">🤖 Interviewer</div><div class="content">{displayed_text}</div></div>', unsafe_allow_html=True)
     return placeholder
 
+# Only the latest messages are drawn as separate bubbles; older turns sit behind one collapsed
+# "earlier conversation" section that is only rendered when opened.
+RECENT_MESSAGES = 6
+
+@functools.lru_cache(maxsize=2048)
+def bubble_html(role, content):
+    """Chat bubble markup for one message (built once per message)"""
+    if role == "bot":
+        return f'<div class="chat-message bot"><div class="role">🤖 Interviewer</div><div class="content">{content}</div></div>'
+    return f'<div class="chat-message user"><div class="role">👤 You</div><div class="content">{content}</div></div>'
+
+@functools.lru_cache(maxsize=2048)
+def _analysis_html(notes, answer_type, summary):
+    parts = ['<div class="analysis-container">']
+    for label, value in (("Analysis Notes:", notes), ("Answer Type:", answer_type), ("Summary:", summary)):
+        if value is not None:
+            parts.append(f'<div class="analysis-label">{label}</div><div class="analysis-content">{value}</div>')
+    parts.append('</div>')
+    return "".join(parts)
+
+def analysis_html(analysis):
+    """Analysis panel markup (notes, answer type, summary) as one block"""
+    return _analysis_html(analysis.get("analysis_notes"), analysis.get("answer_type"), analysis.get("content_summary"))
+
 def display_message(role, content, analysis=None, msg_id=None):
     """Display a chat message with optional analysis"""
-    if role == "bot":
-        st.markdown(f'<div class="chat-message bot"><div class="role">🤖 Interviewer</div><div class="content">{content}</div></div>', unsafe_allow_html=True)
-    else:
-        st.markdown(f'<div class="chat-message user"><div class="role">👤 You</div><div class="content">{content}</div></div>', unsafe_allow_html=True)
+    st.markdown(bubble_html(role, content), unsafe_allow_html=True)
     
     # Show analysis if available
     if analysis and msg_id is not None:
         with st.expander("📊 View Analysis", expanded=False):
-            st.markdown(f'<div class="analysis-container">', unsafe_allow_html=True)
-            
-            # Display analysis notes
-            if 'analysis_notes' in analysis:
-                st.markdown(f'<div class="analysis-label">Analysis Notes:</div>', unsafe_allow_html=True)
-                st.markdown(f'<div class="analysis-content">{analysis["analysis_notes"]}</div>', unsafe_allow_html=True)
-            
-            # Display answer type
-            if 'answer_type' in analysis:
-                st.markdown(f'<div class="analysis-label">Answer Type:</div>', unsafe_allow_html=True)
-                st.markdown(f'<div class="analysis-content">{analysis["answer_type"]}</div>', unsafe_allow_html=True)
-            
-            # Display content summary
-            if 'content_summary' in analysis:
-                st.markdown(f'<div class="analysis-label">Summary:</div>', unsafe_allow_html=True)
-                st.markdown(f'<div class="analysis-content">{analysis["content_summary"]}</div>', unsafe_allow_html=True)
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown(analysis_html(analysis), unsafe_allow_html=True)
+
+def display_history(messages):
+    """Older messages as a single element, drawn only while the section is open"""
+    if not messages:
+        return
+    if st.toggle(f"📜 Show earlier conversation ({len(messages)} messages)", key="show_history"):
+        parts = []
+        for message in messages:
+            parts.append(bubble_html(message["role"], message["content"]))
+            if message.get("analysis"):
+                parts.append(f'<details><summary>📊 View Analysis</summary>{analysis_html(message["analysis"])}</details>')
+        st.markdown("".join(parts), unsafe_allow_html=True)
 
 def show_typing_indicator():
     """Show typing indicator animation"""
@@ -371,6 +459,131 @@ with st.sidebar:
         - **Real-time analysis** of your answers
         """)
 
+def display_transcript():
+    """Domain header, the collapsed older turns and the latest messages"""
+    st.markdown(f"### 📚 Domain: {st.session_state.domain} · Question {st.session_state.question_count}")
+    
+    messages = st.session_state.messages
+    split = max(0, len(messages) - RECENT_MESSAGES)
+    display_history(messages[:split])
+    for idx in range(split, len(messages)):
+        message = messages[idx]
+        display_message(
+            message["role"],
+            message["content"],
+            message.get("analysis"),
+            idx
+        )
+
+# Progress labels of InterviewOrchestrator.process_user_answer_events()
+STAGE_MESSAGES = {
+    "analyzing": "🧠 Analyzing your answer...",
+    "scoring": "📊 Scoring your answer...",
+    "drafting": "✍️ Drafting the next question...",
+    "refining": "✨ Polishing the question...",
+    "pivoting": "🔀 Moving on to a new topic...",
+}
+
+
+def answer_with_progress(user_answer, idempotency_key=None):
+    """
+    Runs the turn off the script thread and shows each stage in a status element as it happens;
+    the finished element keeps the per-stage timings. Returns the orchestrator result.
+    """
+    with st.status("🧠 Analyzing your answer...", expanded=False) as progress:
+        response = None
+        for event in st.session_state.chatbot.process_user_answer_events(user_answer, idempotency_key):
+            if event["type"] == "result":
+                response = event["result"]
+                break
+            if event["status"] == "started":
+                progress.update(label=STAGE_MESSAGES.get(event["label"], "⏳ Working..."))
+            else:
+                mark = "✅" if event["status"] == "ok" else "⚠️"
+                progress.write(f"{mark} {event['label']} · {event.get('elapsed_ms', 0):.0f} ms"
+                               + ("" if event["status"] == "ok" else f" ({event['status']})"))
+        progress.update(label="✅ Answer processed", state="complete")
+    return response
+
+
+@st.fragment
+def chat_area():
+    """
+    The running interview. Answering reruns only this fragment, and the new bubbles are added
+    directly below the existing ones instead of redrawing the page.
+    """
+    display_transcript()
+    
+    # Input area
+    user_input = st.chat_input("Type your answer here... (or 'quit' to end)")
+    
+    if user_input:
+        # A rerun can deliver a submission again, e.g. a double submit that interrupted the first
+        # run before its reply was shown. The key is the same for both, so the orchestrator hands
+        # back the first run's result instead of processing the answer twice.
+        messages = st.session_state.messages
+        question = next((m["content"] for m in reversed(messages) if m["role"] == "bot"), "")
+        idempotency_key = turn_key(st.session_state.question_count, question, user_input)
+        resubmitted = bool(messages) and messages[-1]["role"] == "user" and messages[-1]["content"] == user_input
+        
+        # Add user message
+        if not resubmitted:
+            messages.append({
+                "role": "user",
+                "content": user_input,
+                "analysis": None
+            })
+            display_message("user", user_input)
+        
+        # Check for quit
+        if user_input.lower() in ['quit', 'exit']:
+            cancel_running_turn("quit")
+            st.session_state.interview_ended = True
+            st.session_state.messages.append({
+                "role": "bot",
+                "content": "Thank you for participating! The interview has ended. 🎉",
+                "analysis": None
+            })
+            persist_session()
+            st.rerun()
+        
+        # Process answer
+        try:
+            response = answer_with_progress(user_input, idempotency_key)
+            
+            if response['status'] == "TERMINATED":
+                st.session_state.interview_ended = True
+                if response.get("reason") == "RateLimit":
+                    end_message = "🚨 Rate limit reached. Thank you for your time!"
+                elif response.get("reason") == "SyllabusFinished":
+                    end_message = "🎉 That covers all topics! Thank you for your time!"
+                else:
+                    end_message = "Thank you for your time. The interview has concluded."
+                
+                st.session_state.messages.append({
+                    "role": "bot",
+                    "content": end_message,
+                    "analysis": response.get('analysis')
+                })
+                persist_session()
+                st.rerun()   # whole page: switch to the completion screen
+            
+            st.session_state.question_count += 1
+            message = {
+                "role": "bot",
+                "content": response['next_question'],
+                "analysis": response.get('analysis')
+            }
+            st.session_state.messages.append(message)
+            persist_session()
+            display_message(message["role"], message["content"], message["analysis"], len(st.session_state.messages) - 1)
+            
+        except TurnCancelled:
+            st.info("⏹️ Processing of this answer was cancelled.")
+        except Exception as e:
+            st.error(f"❌ An error occurred: {str(e)}")
+
+
 # Main content area
 if not st.session_state.interview_started:
     # Welcome screen
@@ -392,7 +605,7 @@ if not st.session_state.interview_started:
                 if domain:
                     with st.spinner("🔄 Initializing interview..."):
                         try:
-                            st.session_state.chatbot = InterviewOrchestrator(domain)
+                            st.session_state.chatbot = new_orchestrator(domain)
                             
                             # Check for rate limit during initialization
                             if st.session_state.chatbot.rate_limit_hit:
@@ -419,6 +632,7 @@ if not st.session_state.interview_started:
                             st.session_state.interview_started = True
                             st.session_state.domain = domain
                             st.session_state.question_count = 1
+                            persist_session()
                             st.rerun()
                         except Exception as e:
                             st.error(f"❌ Error starting interview: {str(e)}")
@@ -427,82 +641,11 @@ if not st.session_state.interview_started:
 
 else:
     # Interview in progress
-    st.markdown(f"### 📚 Domain: {st.session_state.domain}")
-    
-    # Display chat history
-    for idx, message in enumerate(st.session_state.messages):
-        display_message(
-            message["role"],
-            message["content"],
-            message.get("analysis"),
-            idx
-        )
-    
-    # Input area
     if not st.session_state.interview_ended:
-        user_input = st.chat_input("Type your answer here... (or 'quit' to end)")
-        
-        if user_input:
-            # Add user message
-            st.session_state.messages.append({
-                "role": "user",
-                "content": user_input,
-                "analysis": None
-            })
-            
-            # Check for quit
-            if user_input.lower() in ['quit', 'exit']:
-                st.session_state.interview_ended = True
-                st.session_state.messages.append({
-                    "role": "bot",
-                    "content": "Thank you for participating! The interview has ended. 🎉",
-                    "analysis": None
-                })
-                st.rerun()
-            
-            # Process answer
-            with st.spinner(""):
-                typing_placeholder = st.empty()
-                typing_placeholder.markdown("""
-                    <div class="typing-indicator">
-                        <span></span>
-                        <span></span>
-                        <span></span>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                try:
-                    response = st.session_state.chatbot.process_user_answer(user_input)
-                    typing_placeholder.empty()
-                    
-                    if response['status'] == "TERMINATED":
-                        st.session_state.interview_ended = True
-                        if response.get("reason") == "RateLimit":
-                            end_message = "🚨 Rate limit reached. Thank you for your time!"
-                        elif response.get("reason") == "SyllabusFinished":
-                            end_message = "🎉 That covers all topics! Thank you for your time!"
-                        else:
-                            end_message = "Thank you for your time. The interview has concluded."
-                        
-                        st.session_state.messages.append({
-                            "role": "bot",
-                            "content": end_message,
-                            "analysis": response.get('analysis')
-                        })
-                    else:
-                        st.session_state.question_count += 1
-                        st.session_state.messages.append({
-                            "role": "bot",
-                            "content": response['next_question'],
-                            "analysis": response.get('analysis')
-                        })
-                    
-                    st.rerun()
-                    
-                except Exception as e:
-                    typing_placeholder.empty()
-                    st.error(f"❌ An error occurred: {str(e)}")
+        chat_area()
     else:
+        display_transcript()
+        
         # Interview ended
         st.markdown("---")
         st.markdown("### 🎊 Interview Complete!")
@@ -510,6 +653,7 @@ else:
         
         if st.button("🔄 Start New Interview", use_container_width=True):
             # Reset session state
+            cancel_running_turn("reset")
             st.session_state.initialized = False
             st.session_state.chatbot = None
             st.session_state.messages = []
@@ -517,4 +661,5 @@ else:
             st.session_state.interview_ended = False
             st.session_state.domain = ""
             st.session_state.question_count = 0
+            st.query_params.clear()
             st.rerun()
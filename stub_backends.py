@@ -0,0 +1,367 @@
+# stub_backends.py
+# Deterministic local stand-ins for Gemini and the GGUF SLM, for offline benchmarking.
+# - StubGeminiModel mimics GenerativeModel.generate_content(): it recognises the call type from
+#   the prompt and returns scripted JSON / text, sleeping for a configurable simulated latency.
+# - StubLlama mimics llama_cpp.Llama.create_chat_completion() for the SLM triage draft.
+# - Scripted outputs come from a {answer text: {"answer_type", "score", ...}} map; unscripted
+#   answers get a deterministic classification derived from the answer text.
+# - Latency specs: "fixed:0.2", "uniform:0.1,0.4", "lognormal:0.3,0.5" (median seconds, sigma).
+# - StubGeminiModel can inject 429 / 503 errors at a given rate; StubSLMServer serves StubLlama
+#   over HTTP with the same /generate and /triage API as slm_server.py.
+# Usage: from stub_backends import StubGeminiModel, StubLlama, StubSLMServer
+
+import hashlib
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+# Prompt markers identifying each Gemini call type (see the PROMPT_* templates in kiro7.py).
+CALL_TYPE_MARKERS = (
+    ("syllabus", "Generate a JSON list"),
+    ("l0", "about to begin an interview"),
+    ("analyzer", "interview judge and strategist"),
+    ("batch_scorer", "strict numeric scorer for a batch"),
+    ("scorer", "strict numeric scorer"),
+    ("expert", "You are taking over the conversation"),
+    ("refiner", "Editor-in-Chief"),
+    ("pivot", "FIRST question for a NEW topic"),
+    ("question_bank", "preparing opening questions"),
+)
+
+DEFAULT_SYLLABUS = ["Fundamentals", "Core Algorithms", "Evaluation Metrics", "Common Pitfalls", "Real-World Applications"]
+
+# Banked opening questions per difficulty (question_bank.py); {topic} and {n} are filled in
+_BANK_TEMPLATES = {
+    "easy": "In a sentence or two, what is {topic} used for (variant {n})?",
+    "moderate": "How does the core mechanism of {topic} work in practice (variant {n})?",
+    "deep": "What trade-offs come up when applying {topic} at scale (variant {n})?",
+}
+
+_KNOWLEDGE_GAP_TOKENS = ("idk", "i don't know", "i dont know", "not sure", "no idea", "pata nhi", "haven't read")
+_HESITATION_TOKENS = ("umm", "uhh", "uhm", "hmm", "...")
+_CHALLENGE_TOKENS = ("stupid question", "you tell", "pointless")
+
+
+def detect_call_type(prompt: str) -> str:
+    for call_type, marker in CALL_TYPE_MARKERS:
+        if marker in prompt:
+            return call_type
+    return "unknown"
+
+
+def _stable_fraction(text: str) -> float:
+    """Deterministic value in [0, 1) derived from the text."""
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) / 0x100000000
+
+
+class LatencyModel:
+    """Simulated backend latency drawn from a seeded distribution."""
+
+    def __init__(self, spec: str = "fixed:0", seed: int = 0):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",") if p.strip()]
+        if self.kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                return self.params[0] if self.params else 0.0
+            if self.kind == "uniform":
+                low, high = self.params
+                return self._rng.uniform(low, high)
+            median, sigma = self.params
+            return self._rng.lognormvariate(math.log(median), sigma)
+
+
+class _Usage:
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class _Response:
+    def __init__(self, text: str, prompt: str):
+        self.text = text
+        self.usage_metadata = _Usage(len(prompt) // 4, max(1, len(text) // 4))
+
+
+class _Script:
+    """Scripted per-answer outputs shared by the Gemini and SLM stand-ins."""
+
+    def __init__(self, script: Optional[Dict[str, Dict]] = None):
+        self.entries = {self.key(k): v for k, v in (script or {}).items()}
+
+    @staticmethod
+    def key(answer: str) -> str:
+        return " ".join((answer or "").lower().split())
+
+    def lookup(self, answer: str) -> Dict:
+        entry = dict(self.entries.get(self.key(answer), {}))
+        if "answer_type" not in entry:
+            entry["answer_type"] = self.default_answer_type(answer)
+        if "score" not in entry:
+            entry["score"] = self.default_score(answer, entry["answer_type"])
+        return entry
+
+    @staticmethod
+    def default_answer_type(answer: str) -> str:
+        text = (answer or "").lower()
+        words = re.findall(r"[a-z']+", text)
+        if any(tok in text for tok in _HESITATION_TOKENS) or len(words) < 3:
+            return "HESITATION_SIGNAL"
+        if any(tok in text for tok in _KNOWLEDGE_GAP_TOKENS):
+            return "KNOWLEDGE_GAP"
+        if any(tok in text for tok in _CHALLENGE_TOKENS):
+            return "EVASIVE_CHALLENGE"
+        if len(words) < 8:
+            return "Vague"
+        return "Normal"
+
+    @staticmethod
+    def default_score(answer: str, answer_type: str) -> float:
+        low, high = {
+            "HESITATION_SIGNAL": (0.0, 1.0),
+            "KNOWLEDGE_GAP": (0.0, 1.0),
+            "EVASIVE_NON_ANSWER": (0.0, 1.0),
+            "EVASIVE_CHALLENGE": (0.0, 1.0),
+            "Factually_Incorrect": (1.1, 2.9),
+            "Vague": (3.0, 4.9),
+        }.get(answer_type, (5.0, 9.5))
+        return round(low + (high - low) * _stable_fraction(answer), 1)
+
+
+class StubGeminiModel:
+    """
+    Stand-in for genai.GenerativeModel. `latency` is a LatencyModel or a {call_type: LatencyModel}
+    map (key "default" for the rest). `script` maps answer text to scripted fields:
+    answer_type, score, strategic_question, topic_is_complete, terminate_interview.
+    rate_limit_rate / error_rate: fraction of calls failing with a 429 / 503 (seeded).
+    """
+
+    def __init__(self, script: Optional[Dict[str, Dict]] = None, latency=None,
+                 syllabus=None, honour_timeouts: bool = True, rate_limit_rate: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.model_name = "stub-gemini"
+        self.script = _Script(script)
+        self.latency = latency or LatencyModel("fixed:0")
+        self.syllabus = list(syllabus or DEFAULT_SYLLABUS)
+        self.honour_timeouts = honour_timeouts
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self.injected = Counter()        # injected failures: "429" / "503"
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._question_seq = 0
+
+    def _latency_for(self, call_type: str) -> float:
+        if isinstance(self.latency, dict):
+            model = self.latency.get(call_type) or self.latency.get("default")
+            return model.sample() if model else 0.0
+        return self.latency.sample()
+
+    def _next_question(self, call_type: str) -> str:
+        with self._lock:
+            self._question_seq += 1
+            n = self._question_seq
+        return f"Alright. Can you walk me through a concrete example of concept {n} from the {call_type} stage?"
+
+    @staticmethod
+    def _extract(prompt: str, pattern: str) -> str:
+        match = re.search(pattern, prompt, re.S)
+        return match.group(1).strip() if match else ""
+
+    def _render(self, call_type: str, prompt: str) -> str:
+        if call_type == "syllabus":
+            return json.dumps(self.syllabus)
+        if call_type == "analyzer":
+            entry = self.script.lookup(self._extract(prompt, r"\nAnswer: (.*?)\nRecent_Assistant_Questions:"))
+            return json.dumps({
+                "content_summary": "Candidate answer (stub).",
+                "answer_quality_score": entry["score"],
+                "answer_type": entry["answer_type"],
+                "analysis_notes": f"Stub classification: {entry['answer_type']}.",
+                "strategic_question": entry.get("strategic_question") or self._next_question("analyzer"),
+                "topic_is_complete": bool(entry.get("topic_is_complete", False)),
+                "safety_violation": False,
+                "terminate_interview": bool(entry.get("terminate_interview", False)),
+                "reason_for_termination": entry.get("reason_for_termination"),
+            })
+        if call_type == "batch_scorer":
+            items = json.loads(self._extract(prompt, r'"answer"\}\):\n(.*?)\n\s*\nOutput'))
+            return json.dumps({"scores": [{"id": item["id"], "score": self.script.lookup(item["answer"])["score"],
+                                           "score_reason": "Stub score."} for item in items]})
+        if call_type == "scorer":
+            entry = self.script.lookup(self._extract(prompt, r"- Answer: (.*?)\n\s*\nOutput"))
+            return json.dumps({"score": entry["score"], "score_reason": "Stub score."})
+        if call_type == "question_bank":
+            topic = self._extract(prompt, r"on the topic '(.*?)' for an interview")
+            count = int(self._extract(prompt, r"Write (\d+) distinct") or 3)
+            return json.dumps({d: [t.format(topic=topic, n=n + 1) for n in range(count)]
+                               for d, t in _BANK_TEMPLATES.items()})
+        return self._next_question(call_type)
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        call_type = detect_call_type(prompt)
+        with self._lock:
+            self.calls[call_type] += 1
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self.injected["429"] += 1
+            raise RuntimeError("429 RESOURCE_EXHAUSTED (stub quota)")
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.injected["503"] += 1
+            raise RuntimeError("503 UNAVAILABLE (stub)")
+        delay = self._latency_for(call_type)
+        timeout = (request_options or {}).get("timeout")
+        if self.honour_timeouts and timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"504 DEADLINE_EXCEEDED (stub {call_type} took {delay:.2f}s)")
+        if delay > 0:
+            time.sleep(delay)
+        return _Response(self._render(call_type, prompt), prompt)
+
+    def call_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.calls)
+
+
+class StubLlama:
+    """Stand-in for llama_cpp.Llama (SLM triage drafts)."""
+
+    def __init__(self, latency=None, low_confidence_rate: float = 0.0):
+        self.latency = latency or LatencyModel("fixed:0")
+        self.low_confidence_rate = low_confidence_rate
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def tokenize(self, text: bytes, add_bos: bool = True, special: bool = False):
+        """About one token per four bytes, like the usage this stub reports."""
+        return list(range(len(text) // 4 + (1 if add_bos else 0)))
+
+    def create_chat_completion(self, messages, max_tokens=80, stop=None, temperature=0.25, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        last_user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+        delay = self.latency.sample()
+        if delay > 0:
+            time.sleep(delay)
+        if _stable_fraction(f"{n}:{last_user}") < self.low_confidence_rate:
+            content = "[CONFIDENCE_LOW]"
+        else:
+            content = f"How would you apply that idea in a real project, step {n}?"
+        if stream:
+            return ({"choices": [{"delta": {"content": word if i == 0 else " " + word}}]}
+                    for i, word in enumerate(content.split(" ")))
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        completion_tokens = max(1, len(content) // 4)
+        return {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+class StubSLMServer:
+    """
+    StubLlama behind a local HTTP server speaking the slm_server.py API (/health, /generate with
+    or without "stream", /triage), so SLMServerProvider can be exercised offline. start() returns
+    the base URL.
+    """
+
+    def __init__(self, llama: Optional[StubLlama] = None, host: str = "127.0.0.1", port: int = 0):
+        self.llama = llama or StubLlama()
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def _handler(self):
+        llama = self.llama
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, messages, data):
+                # NDJSON like slm_server.py; HTTP/1.0, so the body ends when the connection closes
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                try:
+                    self.wfile.write(b'{"status": "queued"}\n')
+                    self.wfile.flush()
+                    for chunk in llama.create_chat_completion(messages=messages, max_tokens=data.get("max_tokens", 80),
+                                                              stream=True):
+                        text = chunk["choices"][0]["delta"]["content"]
+                        self.wfile.write((json.dumps({"text": text}) + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                    self.wfile.write(b'{"success": true, "done": true}\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    pass      # client went away (cancelled)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._reply(200, {"status": "healthy", "model_loaded": True, "model_path": "stub"})
+                else:
+                    self._reply(404, {"error": "Not found", "success": False})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                data = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/generate":
+                    messages = data.get("messages", [])
+                elif self.path == "/triage":
+                    messages = [{"role": "system", "content": data.get("system_prompt", "")}]
+                    messages.extend(data.get("conversation_history", []))
+                else:
+                    self._reply(404, {"error": "Not found", "success": False})
+                    return
+                if self.path == "/generate" and data.get("stream"):
+                    self._stream(messages, data)
+                    return
+                start = time.time()
+                output = llama.create_chat_completion(messages=messages, max_tokens=data.get("max_tokens", 80))
+                text = output["choices"][0]["message"]["content"].strip()
+                payload = {"success": True, "text": text, "generation_time": time.time() - start,
+                           "tokens_used": output["usage"]["total_tokens"]}
+                if self.path == "/triage":
+                    payload["confidence"] = "low" if "[CONFIDENCE_LOW]" in text else "high"
+                self._reply(200, payload)
+
+        return Handler
+
+    def start(self) -> str:
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="stub-slm-server", daemon=True).start()
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
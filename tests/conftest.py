@@ -0,0 +1,10 @@
+# conftest.py
+# Shared pytest setup: the modules live flat in the repo root, so put it on sys.path, keep
+# logging quiet and the SQLite stores in memory. Run from the repo root with: python -m pytest -q
+import os
+import sys
+
+os.environ.setdefault("KIRO_LOG_LEVEL", "WARNING")
+os.environ.setdefault("SESSION_DB_PATH", ":memory:")
+os.environ.setdefault("QUESTION_BANK_PATH", ":memory:")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,94 @@
+# test_circuit_breaker.py
+# CircuitBreaker state machine, including half-open trials that end without a verdict.
+
+import time
+
+import pytest
+
+from cancellation import TurnCancelled
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def _open_breaker(**kwargs):
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=0.0, **kwargs)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_consecutive_failures_open_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=60.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()          # resets the consecutive count
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot()["short_circuited"] == 1
+
+
+def test_half_open_admits_one_trial_then_closes_on_success():
+    breaker = _open_breaker()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()        # the single trial slot is taken
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens():
+    breaker = _open_breaker()
+    breaker.recovery_timeout = 60.0
+    breaker._opened_at -= 61.0        # recovery elapsed
+    assert breaker.allow()
+    breaker.record_failure("boom")
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_released_trial_frees_the_slot():
+    # a cancelled trial has no verdict: without release() the breaker stays half-open with no slot
+    breaker = _open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_release_outside_half_open_is_a_no_op():
+    breaker = CircuitBreaker("test")
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.snapshot() == {"state": CLOSED, "consecutive_failures": 0, "short_circuited": 0}
+
+
+def test_abandoned_trial_stops_blocking_after_trial_timeout():
+    breaker = _open_breaker(trial_timeout=0.05)
+    assert breaker.allow()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_cancelled_stage_releases_its_trial(monkeypatch):
+    # the orchestrator path: _run_stage() must release the slot when the stage is cancelled
+    import kiro7
+    from llm_providers import FakeProvider
+
+    bot = kiro7.InterviewOrchestrator("Machine Learning", llm=FakeProvider(), slm=FakeProvider())
+    breaker = _open_breaker()
+    monkeypatch.setitem(bot.breakers, "scoring", breaker)
+
+    def cancelled():
+        raise TurnCancelled("test")
+
+    with pytest.raises(TurnCancelled):
+        bot._run_stage("scoring", cancelled)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
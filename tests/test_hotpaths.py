@@ -0,0 +1,75 @@
+# test_hotpaths.py
+# Randomised equivalence checks: the text_utils / momentum_signal hot paths must agree with the
+# original implementations kept in bench_hotpaths.py (reference_*).
+
+import json
+import random
+
+import pytest
+
+import bench_hotpaths as ref
+import kiro7
+from momentum_signal import compute_momentum
+from text_utils import meaningful_word_count, slm_draft_rejection
+
+ITERATIONS = 4000
+FORBIDDEN = kiro7.FORBIDDEN_TRANSITIONS
+
+_VOCAB = ["what", "how", "why", "model", "loss", "gradient", "Describe", "tell", "data", "is", "the",
+          "er", "uh", "ah", "umm", "like", "a", "I", "it's", "x", "OK", "Therefore,", "Moreover,",
+          "In conclusion,", "Which", "explain"]
+_PUNCT = [".", "?", "!", ",", ";", ":", "...", "??", "?!", ",.", " ", "  ", "\n", "\t", "\"", "'", ""]
+
+
+def _random_text(rng):
+    parts = []
+    for _ in range(rng.randint(0, 25)):
+        roll = rng.random()
+        if roll < 0.55:
+            parts.append(rng.choice(_VOCAB))
+        elif roll < 0.7:
+            phrase = rng.choice(FORBIDDEN)
+            parts.append("".join(c.upper() if rng.random() < 0.3 else c for c in phrase))
+        elif roll < 0.75:
+            # glue fragments of forbidden phrases together without spaces
+            parts.append(rng.choice(FORBIDDEN)[rng.randint(0, 6):] + rng.choice(FORBIDDEN)[:rng.randint(0, 8)])
+        else:
+            parts.append(rng.choice(_PUNCT))
+    joiner = rng.choice([" ", "", "  ", " \n "])
+    return joiner.join(parts)
+
+
+def _texts(seed):
+    rng = random.Random(seed)
+    return [_random_text(rng) for _ in range(ITERATIONS)] + ref.LLM_OUTPUTS + ref.SLM_DRAFTS + [ref.LONG_PASTE, ""]
+
+
+def _same(a, b):
+    return json.dumps(a, sort_keys=True) == json.dumps(b, sort_keys=True)
+
+
+@pytest.mark.parametrize("reference, optimized", [
+    (ref.reference_normalize_output, kiro7.normalize_output),
+    (ref.reference_meaningful_word_count, meaningful_word_count),
+    (ref.reference_slm_draft_rejection, slm_draft_rejection),
+], ids=["normalize_output", "meaningful_word_count", "slm_draft_rejection"])
+def test_text_helpers_match_reference(reference, optimized):
+    for text in _texts(seed=0):
+        assert optimized(text) == reference(text), text
+
+
+def test_compute_momentum_matches_reference():
+    rng = random.Random(1)
+    for _ in range(ITERATIONS):
+        scores = [rng.choice([rng.uniform(-2, 12), rng.randint(0, 10), float("nan"), float("inf")])
+                  for _ in range(rng.randint(0, 6))]
+        divisor, weight = rng.choice([10.0, 5.0, 0.5, 3]), rng.uniform(-2, 2)
+        assert _same(ref.reference_compute_momentum(scores, divisor, weight),
+                     compute_momentum(scores, divisor, weight)), (scores, divisor, weight)
+
+
+def test_momentum_tracker_matches_per_turn_rescans():
+    rng = random.Random(2)
+    for _ in range(ITERATIONS):
+        interview = [round(rng.uniform(0, 10), rng.choice([0, 1])) for _ in range(rng.randint(1, 14))]
+        assert _same(ref.reference_interview(interview), ref.tracker_interview(interview)), interview
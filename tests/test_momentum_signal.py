@@ -0,0 +1,88 @@
+# test_momentum_signal.py
+# MomentumTracker: windowed statistics, the ewma / slope variants and restoring from saved scores.
+
+import random
+
+import pytest
+
+from momentum_signal import MomentumTracker, compute_momentum
+
+
+def test_window2_matches_compute_momentum_on_the_kept_window():
+    rng = random.Random(0)
+    tracker = MomentumTracker(window=5, normalization_divisor=5.0, weight=1.25)
+    for _ in range(200):
+        info = tracker.update(round(rng.uniform(0, 10), 1))
+        assert info == compute_momentum(tracker.scores, 5.0, 1.25)
+    assert len(tracker.scores) == 5
+
+
+def test_neutral_until_three_scores():
+    for variant in ("window2", "ewma", "slope"):
+        tracker = MomentumTracker(variant=variant)
+        assert tracker.update(2.0)["signal"] == "NEUTRAL"
+        assert tracker.update(9.0)["signal"] == "NEUTRAL"
+        assert tracker.update(10.0)["signal"] != "NEUTRAL"
+
+
+def test_ewma_and_slope_scale_to_a_two_answer_change():
+    ewma = MomentumTracker(variant="ewma", ewma_alpha=0.5, normalization_divisor=10.0, weight=1.0)
+    for s in (2.0, 4.0, 8.0):
+        ewma.update(s)
+    # changes +2, +4 -> ewma 0.5*4 + 0.5*2 = 3, scaled x2
+    assert ewma.momentum["raw"] == pytest.approx(6.0)
+
+    slope = MomentumTracker(variant="slope", slope_window=3, normalization_divisor=10.0, weight=1.0)
+    for s in (9.0, 1.0, 3.0, 5.0):
+        slope.update(s)
+    # least-squares slope of 1, 3, 5 is 2 per answer, scaled x2
+    assert slope.momentum["raw"] == pytest.approx(4.0)
+    assert slope.momentum["signal"] == "STRONG_POSITIVE"
+
+
+def test_routing_statistics():
+    tracker = MomentumTracker(density_window=2, average_window=4, low_score=1.5, strong_score=7.0)
+    assert tracker.low_density() is None and tracker.rolling_average() is None
+    for s in (7.5, 1.0):
+        tracker.update(s)
+    assert tracker.low_density() == 0.5 and tracker.low_count == 1 and tracker.strong_streak == 0
+    for s in (1.5, 7.0, 8.0):
+        tracker.update(s)
+    assert tracker.low_density() == 0.0
+    assert tracker.strong_streak == 2
+    assert tracker.rolling_average() == pytest.approx((1.5 + 7.0 + 8.0 + 1.0) / 4)
+
+
+def test_rolling_average_has_no_float_drift():
+    scores = (0.1, 0.2, 0.3) * 50 + (4.8, 5.1, 8.4, 5.7)
+    assert sum(scores[-4:]) / 4 < 6.0          # 5.999999999999999 with plain float sums
+    tracker = MomentumTracker(average_window=4)
+    for s in scores:
+        tracker.update(s)
+    assert tracker.rolling_average() == 6.0
+
+
+def test_non_finite_scores_count_as_zero_in_sums():
+    tracker = MomentumTracker(average_window=2)
+    tracker.update(float("nan"))
+    tracker.update(4.0)
+    assert tracker.rolling_average() == 2.0
+
+
+def test_restoring_from_saved_scores_resumes_the_same_state():
+    rng = random.Random(1)
+    scores = [round(rng.uniform(0, 10), 1) for _ in range(30)]
+    live = MomentumTracker(window=10, variant="slope")
+    for s in scores:
+        live.update(s)
+    restored = MomentumTracker(window=10, variant="slope", scores=live.scores)
+    for s in (6.0, 2.5, 9.0):
+        assert restored.update(s) == live.update(s)
+    assert restored.rolling_average() == live.rolling_average()
+    assert restored.low_density() == live.low_density()
+
+
+@pytest.mark.parametrize("kwargs", [{"variant": "median"}, {"window": 0}, {"slope_window": 1}])
+def test_invalid_settings_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        MomentumTracker(**kwargs)
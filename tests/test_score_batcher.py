@@ -0,0 +1,139 @@
+# test_score_batcher.py
+# Batch-reply parsing and ScoreBatcher's batching, fallback, timeout and cancellation paths.
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cancellation import CancelToken, TurnCancelled
+from kiro7 import PROMPT_BATCH_SCORER, parse_score_response
+from llm_providers import GenerationResult
+from score_batcher import ScoreBatcher, parse_batch_reply
+
+
+class ScriptedLLM:
+    """Replies to batch prompts with reply(items) and records every prompt it received."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+
+    def generate(self, prompt, call_type="default", json_mode=False, config=None, deadline=None,
+                 priority=0, cancel=None):
+        self.prompts.append(prompt)
+        items, _ = json.JSONDecoder().raw_decode(prompt, prompt.index('[{"id"'))
+        return GenerationResult(self.reply(items))
+
+
+def _scores(items, skip=()):
+    """Scores each answer by its length; answers in `skip` are left out of the reply."""
+    return json.dumps({"scores": [{"id": it["id"], "score": len(it["answer"]), "score_reason": it["question"]}
+                                  for it in items if it["answer"] not in skip]})
+
+
+def _batcher(llm, window=0.2, max_batch=16):
+    return ScoreBatcher(llm, PROMPT_BATCH_SCORER, parse_score_response, window=window, max_batch=max_batch,
+                        executor=ThreadPoolExecutor(max_workers=4))
+
+
+def _score_concurrently(batcher, answers, deadline=5.0):
+    results = [None] * len(answers)
+    barrier = threading.Barrier(len(answers))
+
+    def score(i):
+        barrier.wait()
+        results[i] = batcher.score(f"q{i}", answers[i], time.monotonic() + deadline)
+
+    threads = [threading.Thread(target=score, args=(i,)) for i in range(len(answers))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return results
+
+
+# ---------------- parse_batch_reply ----------------
+
+def test_parse_batch_reply_maps_ids_to_items():
+    text = '```json\n{"scores": [{"id": "2", "score": 7.25, "score_reason": "b"}, {"id": "1", "score": 11}]}\n```'
+    assert parse_batch_reply(text, 2, parse_score_response) == {
+        0: {"score": 10.0, "score_reason": ""},
+        1: {"score": 7.2, "score_reason": "b"},
+    }
+
+
+def test_parse_batch_reply_skips_bad_entries_and_keeps_the_first_duplicate():
+    text = json.dumps([{"id": "1", "score": 3}, {"id": "1", "score": 9}, {"id": "7", "score": 5},
+                       {"id": "x", "score": 5}, {"score": 5}, "junk", {"id": "2", "score": "n/a"}])
+    assert parse_batch_reply(text, 2, parse_score_response) == {0: {"score": 3.0, "score_reason": ""}}
+
+
+def test_parse_batch_reply_raises_on_invalid_json():
+    with pytest.raises(ValueError):
+        parse_batch_reply("Scores: 1) 7 2) 5", 2, parse_score_response)
+
+
+# ---------------- ScoreBatcher ----------------
+
+def test_concurrent_requests_share_one_call():
+    llm = ScriptedLLM(_scores)
+    batcher = _batcher(llm)
+    results = _score_concurrently(batcher, ["a", "bb", "ccc"])
+    assert len(llm.prompts) == 1
+    assert [r["score"] for r in results] == [1.0, 2.0, 3.0]
+    assert [r["score_reason"] for r in results] == ["q0", "q1", "q2"]
+    stats = batcher.stats()
+    assert stats["batched"] == 3 and stats["requests_sent"] == 1 and stats["request_reduction"] == 0.667
+
+
+def test_lone_request_sends_its_own_call():
+    llm = ScriptedLLM(_scores)
+    batcher = _batcher(llm, window=0.01)
+    assert batcher.score("q", "answer", time.monotonic() + 5) is None
+    assert llm.prompts == []
+    assert batcher.stats()["single"] == 1
+
+
+def test_max_batch_sends_without_waiting_for_the_window():
+    llm = ScriptedLLM(_scores)
+    batcher = _batcher(llm, window=30.0, max_batch=2)
+    start = time.monotonic()
+    results = _score_concurrently(batcher, ["a", "bb"])
+    assert time.monotonic() - start < 5
+    assert [r["score"] for r in results] == [1.0, 2.0]
+
+
+def test_items_missing_from_the_reply_fall_back():
+    llm = ScriptedLLM(lambda items: _scores(items, skip=("bb",)))
+    batcher = _batcher(llm)
+    results = _score_concurrently(batcher, ["a", "bb", "ccc"])
+    assert results[1] is None and results[0]["score"] == 1.0 and results[2]["score"] == 3.0
+    assert batcher.stats()["fallback"] == 1
+
+
+def test_failed_batch_call_falls_back_for_every_item():
+    def unavailable(items):
+        raise RuntimeError("429 quota")
+
+    batcher = _batcher(ScriptedLLM(unavailable))
+    assert _score_concurrently(batcher, ["a", "bb"]) == [None, None]
+    assert batcher.stats()["fallback"] == 2
+
+
+def test_deadline_passing_in_the_window_times_out():
+    batcher = _batcher(ScriptedLLM(_scores), window=0.5)
+    assert batcher.score("q", "a", time.monotonic() + 0.05) is None
+    assert batcher.counts["timeout"] == 1
+
+
+def test_cancelled_turn_stops_waiting_at_once():
+    batcher = _batcher(ScriptedLLM(_scores), window=5.0)
+    cancel = CancelToken()
+    threading.Timer(0.05, cancel.cancel, args=("user_quit",)).start()
+    start = time.monotonic()
+    with pytest.raises(TurnCancelled):
+        batcher.score("q", "a", time.monotonic() + 10, cancel=cancel)
+    assert time.monotonic() - start < 2
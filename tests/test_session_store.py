@@ -0,0 +1,88 @@
+# test_session_store.py
+# SessionStore persistence and the expected_turn check that rejects a save that lost a race.
+
+import threading
+
+import pytest
+
+from session_store import STATE_VERSION, SessionState, SessionStore
+
+
+def _state(turn=0, session_id="s1", **changes):
+    state = SessionState(session_id=session_id, domain="Machine Learning", turn=turn, conversation_history=[],
+                         last_question="What is overfitting?", recent_scores=[], topic_syllabus=["SVM"],
+                         current_topic="Regularization", questions_in_current_topic=1, hesitation_streak=0,
+                         low_score_streak=0, pivot_grace_counter=0, rate_limit_hit=False, finished=False,
+                         extra={}, updated_at=0.0, version=STATE_VERSION)
+    for name, value in changes.items():
+        setattr(state, name, value)
+    return state
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def test_round_trip(db_path):
+    store = SessionStore(db_path)
+    store.save(_state(turn=2, recent_scores=[6.5, 7.0], extra={"ui": [1]}))
+    loaded = store.load("s1")
+    assert loaded.turn == 2 and loaded.recent_scores == [6.5, 7.0] and loaded.extra == {"ui": [1]}
+    assert store.load("missing") is None
+
+
+def test_newer_state_version_is_rejected():
+    raw = _state().to_json().replace(f'"version":{STATE_VERSION}', f'"version":{STATE_VERSION + 1}')
+    with pytest.raises(ValueError):
+        SessionState.from_json(raw)
+
+
+def test_stale_worker_loses_the_race(db_path):
+    # two workers (connections) restore the same turn; only the first save lands
+    SessionStore(db_path).save(_state(turn=3))
+    worker_a, worker_b = SessionStore(db_path), SessionStore(db_path)
+    state_a, state_b = worker_a.load("s1"), worker_b.load("s1")
+
+    state_a.turn, state_a.last_question = 4, "from A"
+    state_b.turn, state_b.last_question = 4, "from B"
+    assert worker_a.save(state_a, expected_turn=3)
+    assert not worker_b.save(state_b, expected_turn=3)
+    assert worker_b.load("s1").last_question == "from A"
+
+
+def test_only_one_concurrent_save_wins(db_path):
+    SessionStore(db_path).save(_state(turn=0))
+    workers = [SessionStore(db_path) for _ in range(8)]
+    barrier = threading.Barrier(len(workers))
+    results = [None] * len(workers)
+
+    def save(i):
+        state = _state(turn=1, last_question=f"worker {i}")
+        barrier.wait()
+        results[i] = workers[i].save(state, expected_turn=0)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(len(workers))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+
+    assert results.count(True) == 1
+    winner = results.index(True)
+    assert workers[0].load("s1").last_question == f"worker {winner}"
+
+
+def test_expected_turn_on_a_missing_session_does_not_insert(db_path):
+    store = SessionStore(db_path)
+    assert not store.save(_state(turn=1), expected_turn=0)
+    assert store.load("s1") is None
+
+
+def test_list_and_iter_skip_finished(db_path):
+    store = SessionStore(db_path)
+    store.save(_state(session_id="a"))
+    store.save(_state(session_id="b", finished=True))
+    assert [s["session_id"] for s in store.list_sessions()] == ["a"]
+    assert [s.session_id for s in store.iter_states(include_finished=False, page_size=1)] == ["a"]
+    assert [s.session_id for s in store.iter_states(page_size=1)] == ["a", "b"]
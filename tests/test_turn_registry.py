@@ -0,0 +1,113 @@
+# test_turn_registry.py
+# Idempotent turn submission: concurrent and later duplicates, failures and cancellation.
+
+import threading
+
+import pytest
+
+from cancellation import TurnCancelled
+from turn_registry import TurnRegistry, turn_key
+
+
+def _slow_turn(started, release, result, calls):
+    def fn():
+        calls.append(1)
+        started.set()
+        assert release.wait(5)
+        return result
+    return fn
+
+
+def _submit(registry, key, fn, out):
+    thread = threading.Thread(target=lambda: out.append(registry.run("s1", key, fn)))
+    thread.start()
+    return thread
+
+
+def test_concurrent_duplicate_attaches_and_later_one_is_cached():
+    registry = TurnRegistry()
+    started, release, calls, out = threading.Event(), threading.Event(), [], []
+    fn = _slow_turn(started, release, {"next_question": "Q2"}, calls)
+    first = _submit(registry, "k", fn, out)
+    assert started.wait(5)
+    second = _submit(registry, "k", fn, out)
+    while registry.stats()["suppressed"]["attached"] == 0:
+        threading.Event().wait(0.005)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert len(calls) == 1
+    assert sorted(out, key=lambda r: r[1] or "") == [({"next_question": "Q2"}, None),
+                                                     ({"next_question": "Q2"}, "attached")]
+    assert registry.run("s1", "k", fn) == ({"next_question": "Q2"}, "cached")
+    assert len(calls) == 1
+
+
+def test_keys_are_per_session():
+    registry = TurnRegistry()
+    assert registry.run("s1", "k", lambda: {"n": 1}) == ({"n": 1}, None)
+    assert registry.run("s2", "k", lambda: {"n": 2}) == ({"n": 2}, None)
+
+
+def test_failed_turn_is_not_stored():
+    registry = TurnRegistry()
+
+    def boom():
+        raise RuntimeError("backend down")
+
+    with pytest.raises(RuntimeError):
+        registry.run("s1", "k", boom)
+    assert registry.run("s1", "k", lambda: {"ok": True}) == ({"ok": True}, None)
+
+
+def test_duplicate_of_a_cancelled_turn_runs_it_again():
+    registry = TurnRegistry()
+    started, release = threading.Event(), threading.Event()
+    errors, out = [], []
+
+    def cancelled_turn():
+        started.set()
+        assert release.wait(5)
+        raise TurnCancelled("user_quit")
+
+    def first():
+        try:
+            registry.run("s1", "k", cancelled_turn)
+        except TurnCancelled as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=first)
+    owner.start()
+    assert started.wait(5)
+    duplicate = _submit(registry, "k", lambda: {"rerun": True}, out)
+    while registry.stats()["suppressed"]["attached"] == 0:
+        threading.Event().wait(0.005)
+    release.set()
+    owner.join(5)
+    duplicate.join(5)
+
+    assert len(errors) == 1
+    assert out == [({"rerun": True}, None)]
+
+
+def test_forget_drops_a_sessions_completed_turns():
+    registry = TurnRegistry()
+    registry.run("s1", "k", lambda: {"n": 1})
+    registry.run("s2", "k", lambda: {"n": 1})
+    registry.forget("s1")
+    assert registry.run("s1", "k", lambda: {"n": 2}) == ({"n": 2}, None)
+    assert registry.run("s2", "k", lambda: {"n": 2}) == ({"n": 1}, "cached")
+
+
+def test_completed_turns_are_bounded():
+    registry = TurnRegistry(max_completed=2)
+    for key in ("a", "b", "c"):
+        registry.run("s1", key, lambda: {"key": key})
+    assert registry.stats()["completed"] == 2
+    assert registry.run("s1", "a", lambda: {"key": "again"}) == ({"key": "again"}, None)
+
+
+def test_turn_key_ignores_trivial_edits_but_not_the_turn():
+    assert turn_key(3, "What is bias?", "It is  error.") == turn_key(3, "what is bias", "it is error")
+    assert turn_key(3, "What is bias?", "x") != turn_key(4, "What is bias?", "x")
@@ -0,0 +1,112 @@
+# text_utils.py
+# Precompiled text helpers for the orchestrator hot paths.
+# - OutputNormalizer: the interviewer-output cleanup (semicolons, robotic phrases, punctuation,
+#   two-sentence trim). Patterns are compiled once, and one combined search replaces the
+#   per-phrase compile-and-substitute loop for outputs without forbidden phrases.
+# - meaningful_word_count() / slm_draft_rejection(): SLM draft validation shared by kiro7.py and
+#   slm_server.py: one combined hesitation search, and the draft check stops tokenising once
+#   enough meaningful words are found.
+# Behaviour matches the original per-call implementations (kept in bench_hotpaths.py;
+# tests/test_hotpaths.py checks the equivalence).
+# Usage: from text_utils import OutputNormalizer, slm_draft_rejection
+
+import re
+from typing import Iterable, Optional
+
+# SLM draft validation (PROMPT_SLM_TRIAGE post-checks)
+SLM_FILLERS = frozenset({"umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "like", "...", "uhm"})
+# Matched as plain substrings of the lowercased draft, exactly as the original check did.
+SLM_HESITATION_TOKENS = ("umm", "ummm", "uh", "uhh", "hmm", "er", "ah", "...", "uhm")
+MIN_MEANINGFUL_WORDS = 3
+
+# The original tokenising, precompiled. (A single-pass [a-z']{2,} variant was not measurably
+# faster on long pastes, so the length filter stays in Python.)
+_WORD_RE = re.compile(r"[a-z']+")
+_HESITATION_RE = re.compile("|".join(re.escape(t) for t in sorted(SLM_HESITATION_TOKENS, key=len, reverse=True)))
+
+# Output normalisation
+_CONNECTORS = (("Therefore,", "So,"), ("Moreover,", "Also,"), ("In conclusion,", "Ultimately,"))
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPACE_BEFORE_PUNCT_RE = re.compile(r'\s+([?.!,])')
+_REPEATED_PUNCT_RE = re.compile(r'([?.!,]){2,}')
+_ENDS_WITH_PUNCT_RE = re.compile(r'[.?!"\']$')
+_QUESTION_WORD_RE = re.compile(r'\b(what|why|how|when|which|describe|explain|tell)\b')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_LEADING_JUNK_RE = re.compile(r'^[\s\.,;:]+')
+_TRAILING_JUNK_RE = re.compile(r'[\s\.,;:]+$')
+
+
+def meaningful_word_count(text: str) -> int:
+    """Words longer than one character that are not filler tokens."""
+    fillers = SLM_FILLERS
+    return len([t for t in _WORD_RE.findall(text.lower()) if t not in fillers and len(t) > 1])
+
+
+def slm_draft_rejection(text: str) -> Optional[str]:
+    """
+    Why an SLM triage draft should be treated as [CONFIDENCE_LOW]: "hesitation_detected",
+    "too_short", or None if the draft is acceptable.
+    """
+    lowered = text.lower()
+    if _HESITATION_RE.search(lowered):
+        return "hesitation_detected"
+    count = 0
+    for t in _WORD_RE.finditer(lowered):
+        word = t.group()
+        if len(word) > 1 and word not in SLM_FILLERS:
+            count += 1
+            if count >= MIN_MEANINGFUL_WORDS:
+                return None
+    return "too_short"
+
+
+class OutputNormalizer:
+    """
+    Callable doing the interviewer-output cleanup for a fixed list of forbidden phrases.
+
+    A cheap substring scan of the lowercased text decides whether any forbidden phrase is present;
+    only then are the phrases removed one after the other (the order matters when phrases overlap,
+    so the removal itself stays sequential). Most outputs contain none and skip the per-phrase
+    passes entirely. Non-ASCII text always takes the regex path, since re's case-insensitive
+    matching and str.lower() disagree on a few characters.
+    """
+
+    def __init__(self, forbidden_phrases: Iterable[str]):
+        self.phrases = tuple(forbidden_phrases)
+        self._sequential = [re.compile(re.escape(p), flags=re.IGNORECASE) for p in self.phrases]
+        self._lowered = tuple(p.lower() for p in self.phrases)
+
+    def remove_phrases(self, text: str) -> str:
+        if text.isascii():
+            lowered = text.lower()
+            if not any(p in lowered for p in self._lowered):
+                return text
+        for pattern in self._sequential:
+            text = pattern.sub("", text)
+        return text
+
+    def __call__(self, text: str) -> str:
+        if not text:
+            return text
+
+        text = text.strip().strip('"').strip("'")
+        for formal, friendly in _CONNECTORS:
+            if formal in text:
+                text = text.replace(formal, friendly)
+        text = text.replace(";", ",")
+        text = self.remove_phrases(text)
+
+        text = _WHITESPACE_RE.sub(' ', text)
+        text = _SPACE_BEFORE_PUNCT_RE.sub(r'\1', text)
+        text = _REPEATED_PUNCT_RE.sub(r'\1', text)
+
+        if not _ENDS_WITH_PUNCT_RE.search(text):
+            text += "?" if _QUESTION_WORD_RE.search(text.lower()) else "."
+
+        sentences = _SENTENCE_SPLIT_RE.split(text)
+        if len(sentences) > 2:
+            sentences = sentences[-2:]
+        final = " ".join(s.strip() for s in sentences).strip()
+
+        final = _LEADING_JUNK_RE.sub('', final)
+        return _TRAILING_JUNK_RE.sub('', final)
@@ -0,0 +1,184 @@
+# tracing.py
+# Structured per-turn tracing for the orchestrator.
+# - One span per backend call (Syllabus, L0, Analyzer, Scorer, SLM Triage, Expert, Refiner, Pivot)
+#   with duration, prompt/output token counts, outcome and routing branch.
+# - Spans and turn summaries are written as JSON lines to TRACE_LOG_PATH (off unless set) through
+#   a QueueHandler/QueueListener pair, so the request thread never blocks on file I/O. Importing
+#   kiro7 therefore never creates a file; deployments opt in with TRACE_LOG_PATH=traces.jsonl.
+# - Records are tied together by session_id and turn number.
+# - configure_logging() routes the orchestrator's "kiro7" logger through the same kind of queue.
+# Usage: from tracing import Tracer, annotate, configure_logging
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", "")   # e.g. traces.jsonl; unset or empty: no file sink
+LOG_LEVEL = os.getenv("KIRO_LOG_LEVEL", "INFO")
+
+_trace_logger = logging.getLogger("kiro7.trace")
+_trace_logger.propagate = False
+_trace_logger.setLevel(logging.INFO)
+
+_listeners: List[logging.handlers.QueueListener] = []
+_setup_lock = threading.Lock()
+_trace_ready = False
+_logging_ready = False
+
+# In-process consumers (e.g. benchmark harnesses) receiving every record dict synchronously.
+_sinks: List[Callable[[Dict], None]] = []
+
+# Span currently open in this context; copied into stage worker threads by TurnBudget.run().
+_current_span: contextvars.ContextVar = contextvars.ContextVar("kiro7_current_span", default=None)
+
+
+def _start_queue(target_logger: logging.Logger, handler: logging.Handler) -> None:
+    q = queue.Queue(-1)
+    target_logger.addHandler(logging.handlers.QueueHandler(q))
+    listener = logging.handlers.QueueListener(q, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+
+def _ensure_trace_sink() -> None:
+    global _trace_ready
+    with _setup_lock:
+        if _trace_ready:
+            return
+        _trace_ready = True
+        if TRACE_LOG_PATH:
+            handler = logging.FileHandler(TRACE_LOG_PATH, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _start_queue(_trace_logger, handler)
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """Send the orchestrator's log lines to stderr through a non-blocking queue (idempotent)."""
+    global _logging_ready
+    with _setup_lock:
+        if _logging_ready:
+            return
+        _logging_ready = True
+        app_logger = logging.getLogger("kiro7")
+        app_logger.setLevel((level or LOG_LEVEL).upper())
+        app_logger.propagate = False
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _start_queue(app_logger, handler)
+
+
+def _stop_listeners() -> None:
+    for listener in _listeners:
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+
+atexit.register(_stop_listeners)
+
+
+def add_sink(sink: Callable[[Dict], None]) -> None:
+    _sinks.append(sink)
+
+
+def remove_sink(sink: Callable[[Dict], None]) -> None:
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def _emit(record: Dict) -> None:
+    for sink in list(_sinks):
+        try:
+            sink(record)
+        except Exception:
+            pass
+    if TRACE_LOG_PATH:
+        _trace_logger.info(json.dumps(record, default=str))
+
+
+class Span:
+    """Mutable span record; fields can be filled in while the call runs."""
+
+    def __init__(self, tracer: "Tracer", call_type: str, branch: Optional[str]):
+        self.tracer = tracer
+        self.call_type = call_type
+        self.branch = branch
+        self.outcome = "ok"
+        self.prompt_tokens = None
+        self.output_tokens = None
+        self.attrs: Dict = {}
+        self.start_wall = time.time()
+        self.start = time.perf_counter()
+
+    def set(self, **fields) -> None:
+        for key, value in fields.items():
+            if key in ("outcome", "branch", "prompt_tokens", "output_tokens"):
+                setattr(self, key, value)
+            else:
+                self.attrs[key] = value
+
+    def to_record(self, duration: float) -> Dict:
+        record = {
+            "type": "span",
+            "session_id": self.tracer.session_id,
+            "turn": self.tracer.turn,
+            "call_type": self.call_type,
+            "start": self.start_wall,
+            "duration_ms": round(duration * 1000.0, 2),
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "outcome": self.outcome,
+            "branch": self.branch,
+        }
+        record.update(self.attrs)
+        return record
+
+
+class Tracer:
+    """Per-session tracer; the orchestrator owns one and bumps the turn number each answer."""
+
+    def __init__(self, session_id: Optional[str] = None):
+        _ensure_trace_sink()
+        self.session_id = session_id or uuid.uuid4().hex
+        self.turn = 0
+
+    def next_turn(self) -> int:
+        self.turn += 1
+        return self.turn
+
+    @contextmanager
+    def span(self, call_type: str, branch: Optional[str] = None):
+        span = Span(self, call_type, branch)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            if span.outcome == "ok":
+                span.outcome = f"error:{type(e).__name__}"
+            raise
+        finally:
+            _current_span.reset(token)
+            _emit(span.to_record(time.perf_counter() - span.start))
+
+    def event(self, kind: str, **fields) -> None:
+        """Non-span record (e.g. the per-turn routing summary)."""
+        record = {"type": kind, "session_id": self.session_id, "turn": self.turn, "at": time.time()}
+        record.update(fields)
+        _emit(record)
+
+
+def annotate(**fields) -> None:
+    """Set fields (tokens, outcome, ...) on the span open in the current context, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.set(**fields)
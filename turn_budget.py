@@ -0,0 +1,136 @@
+# turn_budget.py
+# Per-turn latency budget split across the orchestrator stages.
+# - Each stage gets its share of the turn budget plus whatever earlier stages left unspent.
+# - run() executes a stage on a worker thread and stops waiting once its allowance is used up,
+#   raising StageTimeout so the orchestrator can degrade that stage instead of blocking the turn.
+# - Degraded stages are recorded so the turn response can report them.
+# - With a CancelToken (cancellation.py), run() stops waiting as soon as the turn is cancelled
+#   and raises TurnCancelled; the abandoned call sees the same token and stops at its next check.
+# Usage: from turn_budget import TurnBudget, StageTimeout, StageUnavailable
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from cancellation import RECLAIMED, CancelToken, TurnCancelled
+
+# Fraction of the turn budget reserved for each stage. Stages that are skipped in a turn
+# (e.g. triage on a pivot) leave their share to the stages that follow.
+STAGE_SHARES = {
+    "analysis": 0.25,
+    "scoring": 0.20,
+    "triage": 0.15,
+    "refinement": 0.20,
+    "expert": 0.20,
+    "pivot": 0.20,
+}
+
+# Shared worker threads for stage calls (abandoned calls finish in the background).
+_STAGE_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="turn-stage")
+
+
+class StageUnavailable(Exception):
+    """A stage produced no usable result; the orchestrator should use its fallback."""
+
+    def __init__(self, stage: str, reason: str, message: Optional[str] = None):
+        super().__init__(message or f"Stage '{stage}' unavailable: {reason}")
+        self.stage = stage
+        self.reason = reason
+
+
+class StageTimeout(StageUnavailable):
+    """A stage could not finish within its share of the turn budget."""
+
+    def __init__(self, stage: str, allowance: float):
+        super().__init__(stage, "timeout", f"Stage '{stage}' exceeded its {allowance:.2f}s allowance")
+        self.allowance = allowance
+
+
+class TurnBudget:
+    def __init__(self, total_seconds: float, shares: Optional[Dict[str, float]] = None,
+                 cancel: Optional[CancelToken] = None):
+        self.total = float(total_seconds)
+        self.cancel = cancel
+        self.shares = shares or STAGE_SHARES
+        self.started = time.monotonic()
+        self.deadline = self.started + self.total
+        self.banked = 0.0                 # unspent allowance carried to later stages
+        self.stage_deadline = self.deadline
+        self.degraded: List[Dict] = []
+        self.timings: Dict[str, float] = {}
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exhausted(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def allowance(self, stage: str) -> float:
+        """Seconds granted to `stage`: its share plus banked time, capped by what is left."""
+        share = self.shares.get(stage)
+        if share is None:
+            return self.remaining()
+        return min(self.remaining(), share * self.total + self.banked)
+
+    def run(self, stage: str, fn: Callable, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) against the stage allowance. Returns its result, or raises
+        StageTimeout (after recording the stage as degraded) if the allowance runs out.
+        Exceptions raised by fn propagate unchanged; TurnCancelled is raised once the budget's
+        cancel token fires.
+        """
+        self.check_cancelled()
+        allowance = self.allowance(stage)
+        if allowance <= 0:
+            self.degrade(stage, "budget_exhausted")
+            raise StageTimeout(stage, 0.0)
+
+        start = time.monotonic()
+        self.stage_deadline = start + allowance
+        # copy the caller's context so tracing spans follow the call onto the worker thread
+        ctx = contextvars.copy_context()
+        future = _STAGE_EXECUTOR.submit(ctx.run, fn, *args, **kwargs)
+        settled = threading.Event()   # set when the call returns or the turn is cancelled
+        future.add_done_callback(lambda _: settled.set())
+        unregister = self.cancel.on_cancel(settled.set) if self.cancel is not None else None
+        try:
+            if not settled.wait(allowance):
+                future.cancel()
+                raise StageTimeout(stage, allowance)
+            if not future.done():
+                future.cancel()   # cancelled while waiting; the call stops at its own token check
+                raise TurnCancelled(self.cancel.reason)
+            result = future.result()
+        except TurnCancelled:
+            self.timings[stage] = time.monotonic() - start
+            RECLAIMED.inc(self.remaining(), source="turn_budget")
+            raise
+        except StageTimeout:
+            self.timings[stage] = time.monotonic() - start
+            self.banked = 0.0
+            self.degrade(stage, "timeout")
+            raise
+        finally:
+            self.stage_deadline = self.deadline
+            if unregister is not None:
+                unregister()
+
+        elapsed = time.monotonic() - start
+        self.timings[stage] = elapsed
+        if stage in self.shares:
+            self.banked = max(0.0, allowance - elapsed)
+        return result
+
+    def check_cancelled(self) -> None:
+        """Raises TurnCancelled if the turn was cancelled, counting the turn budget left unspent."""
+        if self.cancel is not None and self.cancel.cancelled:
+            RECLAIMED.inc(self.remaining(), source="turn_budget")
+            raise TurnCancelled(self.cancel.reason)
+
+    def degrade(self, stage: str, reason: str) -> None:
+        self.degraded.append({"stage": stage, "reason": reason})
+
+    def degraded_stages(self) -> List[str]:
+        return [d["stage"] for d in self.degraded]
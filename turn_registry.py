@@ -0,0 +1,126 @@
+# turn_registry.py
+# Idempotent turn submission. Streamlit reruns, double submits and client retries can deliver the
+# same answer twice; each copy would otherwise append to conversation_history again and repeat
+# every Gemini and SLM call of the turn.
+# - TurnRegistry.run(session_id, key, fn): the first submission of (session_id, key) runs fn. A
+#   duplicate arriving while it runs waits for that computation; one arriving later gets the stored
+#   result. Neither starts backend calls. A turn that raised is not stored, so a retry runs again;
+#   a duplicate waiting on a turn that was cancelled runs the turn itself.
+# - turn_key(...) builds a key from what identifies a submission (turn index, question, answer);
+#   api_server.py takes the client's Idempotency-Key header instead.
+# - turn_duplicates_suppressed_total{outcome="attached"|"cached"} counts suppressed duplicates.
+# Usage: result, duplicate = get_turn_registry().run(session_id, key, lambda: bot.process_user_answer(answer))
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import metrics
+from cancellation import TurnCancelled
+from score_cache import make_key
+
+DUPLICATES = metrics.counter("turn_duplicates_suppressed_total",
+                             "Duplicate turn submissions answered without running the turn again", ["outcome"])
+
+MAX_COMPLETED = 4096   # completed turns remembered across all sessions (LRU)
+
+
+def turn_key(turn: int, question: str, answer: str) -> str:
+    """Key of "this answer to this question at this turn"; a repeated generic question later on gets a new key."""
+    return f"{turn}:{make_key(question, answer)}"
+
+
+class _InFlight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class TurnRegistry:
+    """In-flight and completed turns by (session_id, key); thread-safe."""
+
+    def __init__(self, max_completed: int = MAX_COMPLETED):
+        self.max_completed = max_completed
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, str], _InFlight] = {}
+        self._completed: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+        self.suppressed = {"attached": 0, "cached": 0}
+
+    def run(self, session_id: str, key: str, fn: Callable[[], Dict]) -> Tuple[Dict, Optional[str]]:
+        """
+        (result, duplicate) where duplicate is None when fn ran, "attached" when the result came
+        from a concurrent submission of the same key and "cached" when it came from an earlier one.
+        """
+        slot = (session_id, key)
+        while True:
+            outcome = self._run_once(slot, fn)
+            if outcome is not None:
+                return outcome
+
+    def _run_once(self, slot, fn):
+        with self._lock:
+            if slot in self._completed:
+                self._completed.move_to_end(slot)
+                self._suppress("cached")
+                return self._completed[slot], "cached"
+            entry = self._inflight.get(slot)
+            owner = entry is None
+            if owner:
+                entry = self._inflight[slot] = _InFlight()
+            else:
+                self._suppress("attached")
+
+        if not owner:
+            entry.done.wait()
+            if isinstance(entry.error, TurnCancelled):
+                return None   # the submission this one attached to was cancelled: run it again
+            if entry.error is not None:
+                raise entry.error
+            return entry.result, "attached"
+
+        try:
+            entry.result = fn()
+        except BaseException as e:
+            entry.error = e
+            raise
+        else:
+            with self._lock:
+                self._completed[slot] = entry.result
+                while len(self._completed) > self.max_completed:
+                    self._completed.popitem(last=False)
+        finally:
+            with self._lock:
+                self._inflight.pop(slot, None)
+            entry.done.set()
+        return entry.result, None
+
+    def _suppress(self, outcome: str) -> None:
+        self.suppressed[outcome] += 1
+        DUPLICATES.inc(outcome=outcome)
+
+    def forget(self, session_id: str) -> None:
+        """Drops the completed turns of a session (e.g. when it is deleted)."""
+        with self._lock:
+            for slot in [s for s in self._completed if s[0] == session_id]:
+                del self._completed[slot]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"in_flight": len(self._inflight), "completed": len(self._completed),
+                    "suppressed": dict(self.suppressed)}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_turn_registry() -> TurnRegistry:
+    """The process-wide registry shared by every orchestrator and API worker thread."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TurnRegistry()
+        return _registry